@@ -5,10 +5,144 @@ load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./kintari.db")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
+# Endpoint Gemini alternatif, mis. fake server lokal untuk benchmark/uji offline
+# (benchmarks/fake_gemini_server.py); kosong = API Google
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", "")
 ALLOWED_ORIGINS = os.getenv(
     "ALLOWED_ORIGINS", "http://localhost:3000,http://localhost:8000"
 ).split(",")
 UPLOAD_DIR = os.getenv("UPLOAD_DIR", "./uploads")
 
+# Cache hasil analisis AI: entry lebih tua dari TTL tetap dikirim lalu di-refresh di background
+ANALYTICS_CACHE_TTL_SECONDS = int(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "21600"))
+
+# Scheduler precompute analytics dashboard
+ANALYTICS_SCHEDULER_ENABLED = (
+    os.getenv("ANALYTICS_SCHEDULER_ENABLED", "true").lower() == "true"
+)
+ANALYTICS_SCHEDULER_TICK_SECONDS = float(
+    os.getenv("ANALYTICS_SCHEDULER_TICK_SECONDS", "5")
+)
+# Tunggu data berhenti berubah selama N detik sebelum recompute (debounce import beruntun)
+ANALYTICS_DEBOUNCE_SECONDS = float(os.getenv("ANALYTICS_DEBOUNCE_SECONDS", "10"))
+# Recompute berkala walaupun data tidak berubah (analisis AI tetap segar)
+ANALYTICS_REFRESH_INTERVAL_SECONDS = float(
+    os.getenv("ANALYTICS_REFRESH_INTERVAL_SECONDS", "21600")
+)
+
+# Jumlah row per batch INSERT/commit saat import CSV pengurus
+MEMBER_IMPORT_BATCH_SIZE = int(os.getenv("MEMBER_IMPORT_BATCH_SIZE", "5000"))
+# Parser import CSV mode append: "columnar" (pandas/pyarrow) atau "rows"
+MEMBER_IMPORT_PARSER = os.getenv("MEMBER_IMPORT_PARSER", "columnar")
+
+# Cache jawaban AI chat (in-memory, LRU + TTL, terikat versi data knowledge base)
+CHAT_CACHE_ENABLED = os.getenv("CHAT_CACHE_ENABLED", "true").lower() == "true"
+CHAT_CACHE_MAX_ENTRIES = int(os.getenv("CHAT_CACHE_MAX_ENTRIES", "256"))
+CHAT_CACHE_TTL_SECONDS = float(os.getenv("CHAT_CACHE_TTL_SECONDS", "3600"))
+# Minimal cosine similarity TF-IDF untuk pertanyaan mirip; 0 = hanya key yang sama persis
+CHAT_CACHE_SIMILARITY = float(os.getenv("CHAT_CACHE_SIMILARITY", "0.85"))
+
+# Panggilan Gemini: timeout per percobaan, total waktu per panggilan (termasuk retry)
+# jika request tidak punya deadline sendiri, dan deadline request chat
+GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "30"))
+GEMINI_DEADLINE_SECONDS = float(os.getenv("GEMINI_DEADLINE_SECONDS", "60"))
+CHAT_REQUEST_DEADLINE_SECONDS = float(os.getenv("CHAT_REQUEST_DEADLINE_SECONDS", "30"))
+# Retry hanya untuk error sementara (timeout, koneksi, 408/429/5xx), backoff eksponensial + jitter
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "2"))
+GEMINI_RETRY_BASE_SECONDS = float(os.getenv("GEMINI_RETRY_BASE_SECONDS", "0.5"))
+GEMINI_RETRY_MAX_SECONDS = float(os.getenv("GEMINI_RETRY_MAX_SECONDS", "8"))
+# Circuit breaker: buka setelah N kegagalan berturut-turut, coba lagi setelah M detik
+GEMINI_BREAKER_FAILURE_THRESHOLD = int(os.getenv("GEMINI_BREAKER_FAILURE_THRESHOLD", "5"))
+GEMINI_BREAKER_RESET_SECONDS = float(os.getenv("GEMINI_BREAKER_RESET_SECONDS", "30"))
+
+# Ringkasan AI dokumen panjang (map-reduce): ukuran potongan teks, jumlah ringkasan
+# yang digabung per panggilan di level reduce, dan panggilan Gemini paralel maksimal
+DOCUMENT_SUMMARY_CHUNK_CHARS = int(os.getenv("DOCUMENT_SUMMARY_CHUNK_CHARS", "16000"))
+DOCUMENT_SUMMARY_FANOUT = int(os.getenv("DOCUMENT_SUMMARY_FANOUT", "6"))
+DOCUMENT_SUMMARY_CONCURRENCY = int(os.getenv("DOCUMENT_SUMMARY_CONCURRENCY", "8"))
+
+# Worker pool enrichment AI dokumen (ringkasan + insight di background)
+AI_ENRICHMENT_ENABLED = os.getenv("AI_ENRICHMENT_ENABLED", "true").lower() == "true"
+AI_ENRICHMENT_WORKERS = int(os.getenv("AI_ENRICHMENT_WORKERS", "2"))
+AI_ENRICHMENT_BATCH_SIZE = int(os.getenv("AI_ENRICHMENT_BATCH_SIZE", "10"))
+AI_ENRICHMENT_TICK_SECONDS = float(os.getenv("AI_ENRICHMENT_TICK_SECONDS", "10"))
+# Batas global panggilan Gemini dari enrichment (per menit, 0 = tanpa batas)
+AI_ENRICHMENT_CALLS_PER_MINUTE = float(os.getenv("AI_ENRICHMENT_CALLS_PER_MINUTE", "60"))
+AI_ENRICHMENT_MAX_ATTEMPTS = int(os.getenv("AI_ENRICHMENT_MAX_ATTEMPTS", "3"))
+# Dokumen "processing" lebih lama dari ini dianggap ditinggal worker yang mati
+AI_ENRICHMENT_STALE_SECONDS = float(os.getenv("AI_ENRICHMENT_STALE_SECONDS", "900"))
+
+# Lane prioritas (interactive vs background) untuk panggilan Gemini dan pekerjaan CPU:
+# bobot weighted fair queuing, slot Gemini paralel (sebagian dicadangkan untuk
+# interactive) dan slot ekstraksi/analytics (0 = jumlah CPU)
+WORK_INTERACTIVE_WEIGHT = float(os.getenv("WORK_INTERACTIVE_WEIGHT", "8"))
+WORK_BACKGROUND_WEIGHT = float(os.getenv("WORK_BACKGROUND_WEIGHT", "1"))
+GEMINI_MAX_CONCURRENT_CALLS = int(os.getenv("GEMINI_MAX_CONCURRENT_CALLS", "8"))
+GEMINI_INTERACTIVE_RESERVED_SLOTS = int(os.getenv("GEMINI_INTERACTIVE_RESERVED_SLOTS", "2"))
+EXTRACTION_MAX_CONCURRENT = int(os.getenv("EXTRACTION_MAX_CONCURRENT", "0"))
+
+# Budget token prompt per caller Gemini ("caller=token,..."; 0/tidak ada = tanpa batas).
+# Context dikecilkan sebelum panggilan jika perkiraan token melewati budget.
+GEMINI_TOKEN_BUDGETS = {
+    caller.strip(): int(budget)
+    for caller, budget in (
+        item.split("=", 1)
+        for item in os.getenv(
+            "GEMINI_TOKEN_BUDGETS",
+            "chat=8000,analytics_members=2000,analytics_documents=2000,analytics_overview=500,"
+            "summarization=6000,document_summary=6000,extraction=1000",
+        ).split(",")
+        if "=" in item
+    )
+}
+
+
+def _parse_mapping(raw: str) -> dict:
+    """"a=1,b=2" -> {"a": "1", "b": "2"}"""
+    return {
+        key.strip(): value.strip()
+        for key, value in (item.split("=", 1) for item in raw.split(",") if "=" in item)
+    }
+
+
+# Routing model Gemini per caller: model utama, model ringan (prompt pendek/tugas
+# sederhana) dan batas token prompt untuk routing berdasarkan ukuran
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash-exp")
+GEMINI_LIGHT_MODEL = os.getenv("GEMINI_LIGHT_MODEL", "gemini-2.0-flash-lite")
+GEMINI_LIGHT_MAX_PROMPT_TOKENS = int(os.getenv("GEMINI_LIGHT_MAX_PROMPT_TOKENS", "1500"))
+# Override per caller: "caller=light|default|size|<nama model>", mis. "chat=default"
+GEMINI_MODEL_ROUTES = _parse_mapping(os.getenv("GEMINI_MODEL_ROUTES", ""))
+# Target latency per caller (ms): jika latency model utama melewati target, caller
+# yang di-route berdasarkan ukuran prompt dipindah ke model ringan
+GEMINI_LATENCY_TARGETS_MS = {
+    caller: float(target)
+    for caller, target in _parse_mapping(os.getenv("GEMINI_LATENCY_TARGETS_MS", "chat=8000")).items()
+}
+# Harga per 1 juta token "model=input:output" (USD) untuk estimasi biaya per route
+GEMINI_MODEL_PRICES = {
+    model: tuple(float(price) for price in prices.split(":", 1))
+    for model, prices in _parse_mapping(
+        os.getenv(
+            "GEMINI_MODEL_PRICES",
+            "gemini-2.0-flash-exp=0.10:0.40,gemini-2.0-flash=0.10:0.40,gemini-2.0-flash-lite=0.075:0.30",
+        )
+    ).items()
+}
+
+# Endpoint /metrics (format Prometheus) + middleware latency/SQL per request
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# Profil SQL per request (N+1, slow query); DEBUG menambah header X-SQL-Profile.
+# Default mengikuti DEBUG: log slow query memuat parameter (data pengurus)
+DEBUG = os.getenv("DEBUG", "false").lower() == "true"
+SQL_PROFILER_ENABLED = os.getenv("SQL_PROFILER_ENABLED", str(DEBUG)).lower() == "true"
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "100"))
+# Bentuk statement yang sama sebanyak ini dalam satu request ditandai N+1
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5"))
+SQL_PROFILER_BUFFER_SIZE = int(os.getenv("SQL_PROFILER_BUFFER_SIZE", "200"))
+
+# Endpoint admin (GET/DELETE /api/stats/sql); selalu aktif saat DEBUG
+ADMIN_ENDPOINTS_ENABLED = os.getenv("ADMIN_ENDPOINTS_ENABLED", "false").lower() == "true"
+
 # Pastikan direktori upload ada
 os.makedirs(UPLOAD_DIR, exist_ok=True)
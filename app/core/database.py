@@ -1,12 +1,20 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.schema import CreateIndex
 from sqlalchemy.orm import declarative_base, sessionmaker
-from app.core.config import DATABASE_URL
+from app.core.config import DATABASE_URL, METRICS_ENABLED, SQL_PROFILER_ENABLED
+from app.core.metrics import instrument_engine
+from app.core.sql_profiler import install_sql_profiler
 
 engine = create_engine(
     DATABASE_URL,
     connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
 )
 
+if METRICS_ENABLED:
+    instrument_engine(engine)
+if SQL_PROFILER_ENABLED:
+    install_sql_profiler(engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -17,3 +25,33 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def ensure_schema_columns():
+    """
+    Tambahkan kolom nullable dan index baru ke tabel yang sudah ada
+
+    create_all hanya membuat tabel yang belum ada, sehingga database lama tidak
+    mendapat kolom baru dari model. Kolom NOT NULL tetap butuh init_fresh_db.py.
+    """
+    inspector = inspect(engine)
+    preparer = engine.dialect.identifier_preparer
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(
+                    text(
+                        f"ALTER TABLE {preparer.format_table(table)} "
+                        f"ADD COLUMN {preparer.format_column(column)} {column_type}"
+                    )
+                )
+                print(f"🛠️ Added column {table.name}.{column.name}")
+            # IF NOT EXISTS: index berbasis ekspresi tidak bisa di-reflect (checkfirst)
+            for index in table.indexes:
+                conn.execute(CreateIndex(index, if_not_exists=True))
@@ -0,0 +1,352 @@
+"""
+Metrics
+Metric in-process dalam format teks Prometheus (exposition 0.0.4) untuk endpoint
+/metrics, tanpa agent atau library eksternal.
+
+- Counter, Gauge dan Histogram dengan label. Satu observasi = satu lock + bisect,
+  cukup murah untuk selalu aktif di production
+- MetricsMiddleware (ASGI): latency request per route template, jumlah dan waktu
+  query DB per request
+- instrument_engine: jumlah dan durasi query lewat event SQLAlchemy
+- register_collector: metric yang dibaca saat scrape dari get_stats() service
+  (telemetry Gemini, cache, antrian)
+"""
+
+from bisect import bisect_left
+from contextvars import ContextVar
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import math
+import threading
+import time
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels_text(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name}: label harus {self.labelnames}, bukan {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._children.items())
+        return [f"{self.name}{_labels_text(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            *self._samples(),
+        ]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._children[key] = self._children.get(key, 0.0) + amount
+
+    def set_total(self, value: float, **labels: Any) -> None:
+        """Isi nilai total dari counter yang dihitung di tempat lain (untuk collector)"""
+        key = self._key(labels)
+        with self._lock:
+            self._children[key] = float(value)
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._children[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._children[key] = self._children.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """Histogram bucket tetap; disimpan per bucket, dirender kumulatif (le)"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            child[0][index] += 1
+            child[1] += value
+
+    def set_counts(self, counts: Sequence[int], total: float, **labels: Any) -> None:
+        """Isi jumlah per bucket (bukan kumulatif, bucket terakhir +Inf) dari histogram lain"""
+        if len(counts) != len(self.buckets) + 1:
+            raise ValueError(f"{self.name}: butuh {len(self.buckets) + 1} bucket, bukan {len(counts)}")
+        key = self._key(labels)
+        with self._lock:
+            self._children[key] = [list(counts), float(total)]
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._children.items())
+        names = self.labelnames + ("le",)
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket{_labels_text(names, key + (_format_value(bound),))} {cumulative}"
+                )
+            labels = _labels_text(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+Collector = Callable[[], Iterable[Metric]]
+
+
+class MetricsRegistry:
+    """Metric terdaftar + collector yang dipanggil saat scrape"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Tuple[str, Collector]] = []
+
+    def _register(self, metric: Metric) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} sudah terdaftar dengan tipe/label lain")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, name: str, collector: Collector) -> None:
+        """Daftarkan fungsi yang mengembalikan metric baru setiap scrape (nama unik)"""
+        with self._lock:
+            self._collectors = [item for item in self._collectors if item[0] != name]
+            self._collectors.append((name, collector))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for name, collector in collectors:
+            try:
+                collected = list(collector())
+            except Exception as e:
+                print(f"⚠️ Metrics collector {name} failed: {e}")
+                continue
+            for metric in collected:
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# HTTP
+http_requests = registry.counter(
+    "http_requests_total", "Jumlah request HTTP", ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "Latency request HTTP per route template", ("method", "route")
+)
+http_requests_in_progress = registry.gauge(
+    "http_requests_in_progress", "Request HTTP yang sedang diproses"
+)
+
+# Database
+db_queries = registry.counter(
+    "db_queries_total", "Jumlah statement SQL yang dieksekusi", ("operation",)
+)
+db_query_duration = registry.histogram(
+    "db_query_duration_seconds", "Durasi satu statement SQL", ("operation",), QUERY_BUCKETS
+)
+db_queries_per_request = registry.histogram(
+    "db_queries_per_request", "Jumlah statement SQL per request HTTP", ("route",), QUERY_COUNT_BUCKETS
+)
+db_time_per_request = registry.histogram(
+    "db_time_per_request_seconds", "Total waktu SQL per request HTTP", ("route",), QUERY_BUCKETS
+)
+
+# Ekstraksi PDF
+extraction_documents = registry.counter(
+    "extraction_documents_total", "Dokumen PDF yang diekstrak", ("status",)
+)
+extraction_pages = registry.counter("extraction_pages_total", "Halaman PDF yang diekstrak")
+extraction_document_duration = registry.histogram(
+    "extraction_document_seconds", "Waktu ekstraksi satu dokumen PDF"
+)
+extraction_page_duration = registry.histogram(
+    "extraction_page_seconds",
+    "Waktu ekstraksi satu halaman PDF (teks + tabel)",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+extraction_pages_per_second = registry.gauge(
+    "extraction_pages_per_second", "Throughput ekstraksi dokumen PDF terakhir (halaman/detik)"
+)
+
+# Statistik SQL request yang sedang berjalan: [jumlah statement, detik]
+_request_db: ContextVar[Optional[List[float]]] = ContextVar("request_db", default=None)
+
+
+def _operation(statement: str) -> str:
+    head = statement.lstrip()[:8].split(None, 1)
+    verb = head[0].lower() if head else ""
+    return verb if verb in ("select", "insert", "update", "delete") else "other"
+
+
+def instrument_engine(engine) -> None:
+    """Pasang event SQLAlchemy untuk db_queries_total, durasi dan statistik per request"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["metrics_query_start"].pop()
+        operation = _operation(statement)
+        db_queries.inc(operation=operation)
+        db_query_duration.observe(elapsed, operation=operation)
+        request = _request_db.get()
+        if request is not None:
+            request[0] += 1
+            request[1] += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        starts = context.connection.info.get("metrics_query_start") if context.connection else None
+        if starts:
+            starts.pop()
+
+
+def route_template(scope: Dict[str, Any]) -> str:
+    """Template path route yang cocok (mis. /api/documents/{document_id})"""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    return path or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware: latency, status dan statistik SQL per route template
+
+    Label route memakai template path (mis. /api/documents/{document_id}) supaya
+    jumlah seri metric tidak tumbuh per id.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        request_db = [0, 0.0]
+        token = _request_db.set(request_db)
+        http_requests_in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_progress.dec()
+            _request_db.reset(token)
+            route = route_template(scope)
+            method = scope.get("method", "")
+            http_requests.inc(method=method, route=route, status=status["code"])
+            http_request_duration.observe(elapsed, method=method, route=route)
+            db_queries_per_request.observe(request_db[0], route=route)
+            db_time_per_request.observe(request_db[1], route=route)
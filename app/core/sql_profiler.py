@@ -0,0 +1,335 @@
+"""
+SQL Profiler
+Profil SQL per request HTTP lewat event engine SQLAlchemy: jumlah statement,
+total waktu DB, baris yang di-fetch, pola N+1 dan query lambat.
+
+- Statement dinormalisasi menjadi "bentuk" (literal dan daftar IN diganti ?);
+  bentuk yang sama >= SQL_N_PLUS_ONE_THRESHOLD kali dalam satu request ditandai
+  sebagai N+1
+- Query >= SQL_SLOW_QUERY_MS dicatat di log beserta parameternya (juga di luar
+  request, mis. background worker); untuk executemany hanya jumlah row dan tipe
+  kolomnya, bukan isi row (data pengurus dari import)
+- Ringkasan per request masuk ring buffer (GET /api/stats/sql) dan, jika
+  DEBUG=true, header response X-SQL-Profile
+"""
+
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Deque, Dict, List, Optional
+import logging
+import re
+import threading
+import time
+
+from app.core.config import (
+    DEBUG,
+    SQL_N_PLUS_ONE_THRESHOLD,
+    SQL_PROFILER_BUFFER_SIZE,
+    SQL_SLOW_QUERY_MS,
+)
+from app.core.metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+HEADER_NAME = "X-SQL-Profile"
+
+# Panjang maksimal statement/parameter di ringkasan dan log
+_MAX_STATEMENT_CHARS = 300
+_MAX_PARAMS_CHARS = 500
+# Slow query per request yang disimpan di ringkasan
+_MAX_SLOW_PER_REQUEST = 10
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def statement_shape(statement: str) -> str:
+    """Bentuk statement: literal -> ?, "(?, ?, ?)" -> "(?...)", spasi dirapikan"""
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _IN_LIST.sub("(?...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def _param_types(row: Any) -> str:
+    if isinstance(row, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in row.items()) + "}"
+    if isinstance(row, (list, tuple)):
+        return "(" + ", ".join(type(value).__name__ for value in row) + ")"
+    return type(row).__name__
+
+
+def describe_params(parameters: Any, executemany: bool) -> str:
+    """
+    Parameter untuk log slow query
+
+    executemany (bulk insert/update) hanya jumlah row + tipe kolom row pertama,
+    mis. "5000 rows x (int, str, str)"; isi row tidak ikut ke log/ring buffer.
+    """
+    if executemany:
+        rows = list(parameters or [])
+        return f"{len(rows)} rows x {_param_types(rows[0]) if rows else '()'}"
+    return _truncate(repr(parameters), _MAX_PARAMS_CHARS)
+
+
+class RequestProfile:
+    """Statistik SQL satu request (bisa diisi dari beberapa thread, mis. to_thread)"""
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.started_at = datetime.utcnow()
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.rows = 0
+        # bentuk statement -> [jumlah, detik]
+        self.shapes: Dict[str, List[float]] = {}
+        self.slow: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, elapsed: float, slow: Optional[Dict[str, Any]]) -> None:
+        shape = statement_shape(statement)
+        with self._lock:
+            self.statements += 1
+            self.db_seconds += elapsed
+            entry = self.shapes.get(shape)
+            if entry is None:
+                self.shapes[shape] = [1, elapsed]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+            if slow is not None and len(self.slow) < _MAX_SLOW_PER_REQUEST:
+                self.slow.append(slow)
+
+    def add_rows(self, count: int) -> None:
+        with self._lock:
+            self.rows += count
+
+    def n_plus_one(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            repeated = [
+                (shape, count, seconds)
+                for shape, (count, seconds) in self.shapes.items()
+                if count >= SQL_N_PLUS_ONE_THRESHOLD
+            ]
+        repeated.sort(key=lambda item: item[1], reverse=True)
+        return [
+            {
+                "statement": _truncate(shape, _MAX_STATEMENT_CHARS),
+                "count": int(count),
+                "total_ms": round(seconds * 1000, 2),
+            }
+            for shape, count, seconds in repeated
+        ]
+
+    def header_value(self) -> str:
+        return (
+            f"queries={self.statements}; db_ms={self.db_seconds * 1000:.1f}; "
+            f"rows={self.rows}; n_plus_one={len(self.n_plus_one())}"
+        )
+
+    def summary(self, route: str, status: int, duration: float) -> Dict[str, Any]:
+        with self._lock:
+            slow = list(self.slow)
+            distinct = len(self.shapes)
+        return {
+            "started_at": self.started_at.isoformat(),
+            "method": self.method,
+            "path": self.path,
+            "route": route,
+            "status": status,
+            "duration_ms": round(duration * 1000, 2),
+            "statements": self.statements,
+            "distinct_statements": distinct,
+            "db_time_ms": round(self.db_seconds * 1000, 2),
+            "rows_fetched": self.rows,
+            "n_plus_one": self.n_plus_one(),
+            "slow_queries": slow,
+        }
+
+
+_current: ContextVar[Optional[RequestProfile]] = ContextVar("sql_profile", default=None)
+
+
+class _CountingCursor:
+    """Proxy cursor DBAPI yang menghitung baris hasil fetch untuk RequestProfile"""
+
+    def __init__(self, cursor, profile: RequestProfile):
+        self._cursor = cursor
+        self._profile = profile
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._profile.add_rows(1)
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._cursor.fetchmany(*args)
+        self._profile.add_rows(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._profile.add_rows(len(rows))
+        return rows
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._profile.add_rows(1)
+            yield row
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class SQLProfiler:
+    """Ring buffer ringkasan request + counter global"""
+
+    def __init__(self, buffer_size: int = SQL_PROFILER_BUFFER_SIZE):
+        self._lock = threading.Lock()
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=buffer_size)
+        self._stats = {"requests": 0, "n_plus_one_requests": 0, "slow_queries": 0}
+        # (route, bentuk statement) N+1 yang sudah pernah di-log
+        self._reported: set = set()
+
+    def count_slow_query(self) -> None:
+        with self._lock:
+            self._stats["slow_queries"] += 1
+
+    def add(self, summary: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Simpan ringkasan; return pola N+1 yang baru pertama kali terlihat di route ini"""
+        new = []
+        with self._lock:
+            self._stats["requests"] += 1
+            if summary["n_plus_one"]:
+                self._stats["n_plus_one_requests"] += 1
+            self._buffer.append(summary)
+            for item in summary["n_plus_one"]:
+                key = (summary["method"], summary["route"], item["statement"])
+                if key not in self._reported:
+                    self._reported.add(key)
+                    new.append(item)
+        return new
+
+    def recent(self, limit: int = 50, n_plus_one_only: bool = False, min_statements: int = 0) -> List[Dict[str, Any]]:
+        """Ringkasan terbaru dulu"""
+        with self._lock:
+            items = list(self._buffer)
+        items = [
+            item
+            for item in reversed(items)
+            if item["statements"] >= min_statements and (item["n_plus_one"] or not n_plus_one_only)
+        ]
+        return items[:limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buffer.clear()
+            self._reported.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "buffered": len(self._buffer),
+                "buffer_size": self._buffer.maxlen,
+                "slow_query_ms": SQL_SLOW_QUERY_MS,
+                "n_plus_one_threshold": SQL_N_PLUS_ONE_THRESHOLD,
+                "debug_header": DEBUG,
+            }
+
+
+sql_profiler = SQLProfiler()
+
+
+def install_sql_profiler(engine) -> None:
+    """Pasang event SQLAlchemy untuk profil per request dan log slow query"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("sql_profiler_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["sql_profiler_start"].pop()
+        slow = None
+        if elapsed * 1000 >= SQL_SLOW_QUERY_MS:
+            sql_profiler.count_slow_query()
+            slow = {
+                "statement": _truncate(_WHITESPACE.sub(" ", statement).strip(), _MAX_STATEMENT_CHARS),
+                "params": describe_params(parameters, executemany),
+                "ms": round(elapsed * 1000, 2),
+            }
+            logger.warning("🐢 Slow query (%s ms): %s | params=%s", slow["ms"], slow["statement"], slow["params"])
+        profile = _current.get()
+        if profile is None:
+            return
+        profile.record(statement, elapsed, slow)
+        # Hitung baris yang di-fetch: result dibuat dari context.cursor setelah event ini
+        if context is not None and not executemany and cursor.description is not None:
+            context.cursor = _CountingCursor(cursor, profile)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        starts = context.connection.info.get("sql_profiler_start") if context.connection else None
+        if starts:
+            starts.pop()
+
+
+class SQLProfilerMiddleware:
+    """
+    ASGI middleware: satu RequestProfile per request HTTP
+
+    Ringkasan masuk ring buffer setelah response selesai (termasuk BackgroundTasks);
+    header X-SQL-Profile (DEBUG) berisi statement sampai response mulai dikirim.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope.get("method", ""), scope.get("path", ""))
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                if DEBUG:
+                    headers = list(message.get("headers", []))
+                    headers.append((HEADER_NAME.lower().encode(), profile.header_value().encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        token = _current.set(profile)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            if profile.statements:
+                summary = profile.summary(route_template(scope), status["code"], time.perf_counter() - started)
+                # Log sekali per route + bentuk statement; detail lengkap di ring buffer
+                for item in sql_profiler.add(summary):
+                    logger.warning(
+                        "⚠️ N+1 %s %s: %sx (%s ms) %s",
+                        profile.method,
+                        summary["route"],
+                        item["count"],
+                        item["total_ms"],
+                        item["statement"],
+                    )
@@ -1,16 +1,32 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.core.config import ALLOWED_ORIGINS
-from app.core.database import Base, engine
+from app.core.config import (
+    ADMIN_ENDPOINTS_ENABLED,
+    ALLOWED_ORIGINS,
+    ANALYTICS_SCHEDULER_ENABLED,
+    AI_ENRICHMENT_ENABLED,
+    DEBUG,
+    METRICS_ENABLED,
+    SQL_PROFILER_ENABLED,
+)
+from app.core.database import Base, engine, ensure_schema_columns
+from app.core.metrics import MetricsMiddleware
+from app.core.sql_profiler import SQLProfilerMiddleware
 
 # Import all models to ensure they're registered with SQLAlchemy
 from app.models import (
     Member,
+    MemberAggregate,
+    MemberNameIndex,
+    MemberNameTrigram,
+    MemberNameTrigramStat,
     OrganizationInfo,
     MembershipType,
     OrgStructure,
     UniversalDocument,
     DocumentCollection,
+    AnalyticsCache,
+    AnalyticsSnapshot,
 )
 
 from app.routes import (
@@ -19,10 +35,17 @@ from app.routes import (
     stats,
     universal_documents,
     analytics,
+    metrics,
 )
+from app.services.analytics_scheduler import analytics_scheduler
+from app.services.ai_enrichment import ai_enrichment_worker
+from app.services.member_name_search import refresh_member_name_index_in_background
+from app.services.metrics_collectors import register_default_collectors
+import threading
 
 # Create tables
 Base.metadata.create_all(bind=engine)
+ensure_schema_columns()
 
 app = FastAPI(
     title="Kintari Backend API - Universal Knowledge Base",
@@ -51,12 +74,45 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Metrics Middleware (paling luar: latency termasuk CORS)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# SQL Profiler Middleware (N+1, slow query, header X-SQL-Profile saat DEBUG)
+if SQL_PROFILER_ENABLED:
+    app.add_middleware(SQLProfilerMiddleware)
+
 # Include routes
 app.include_router(universal_documents.router)  # ⭐ Universal Documents (MAIN)
 app.include_router(chat.router)  # 🤖 AI Chatbot with universal knowledge
 app.include_router(stats.router)  # 📊 Statistics
+if DEBUG or ADMIN_ENDPOINTS_ENABLED:
+    app.include_router(stats.admin_router)  # 🔒 SQL profiler buffer (admin)
 app.include_router(members.router)  # 👥 Members management
 app.include_router(analytics.router)  # 🧠 AI Analytics for HIPMI data
+if METRICS_ENABLED:
+    register_default_collectors()
+    app.include_router(metrics.router)  # 📈 Prometheus /metrics
+
+
+@app.on_event("startup")
+async def start_background_jobs():
+    if ANALYTICS_SCHEDULER_ENABLED:
+        analytics_scheduler.start()
+    if AI_ENRICHMENT_ENABLED:
+        ai_enrichment_worker.start()
+    # Bangun index trigram nama pengurus tanpa menahan startup
+    threading.Thread(
+        target=refresh_member_name_index_in_background,
+        name="member-name-index",
+        daemon=True,
+    ).start()
+
+
+@app.on_event("shutdown")
+async def stop_background_jobs():
+    analytics_scheduler.stop()
+    ai_enrichment_worker.stop()
 
 
 @app.get("/")
@@ -4,18 +4,32 @@ Import all models here so SQLAlchemy can detect them
 """
 
 from app.models.member import Member
+from app.models.member_aggregate import MemberAggregate
+from app.models.member_name_index import (
+    MemberNameIndex,
+    MemberNameTrigram,
+    MemberNameTrigramStat,
+)
 from app.models.organization import (
     OrganizationInfo,
     MembershipType,
     OrgStructure,
 )
 from app.models.universal_document import UniversalDocument, DocumentCollection
+from app.models.analytics_cache import AnalyticsCache
+from app.models.analytics_snapshot import AnalyticsSnapshot
 
 __all__ = [
     "Member",
+    "MemberAggregate",
+    "MemberNameIndex",
+    "MemberNameTrigram",
+    "MemberNameTrigramStat",
     "OrganizationInfo",
     "MembershipType",
     "OrgStructure",
     "UniversalDocument",
     "DocumentCollection",
+    "AnalyticsCache",
+    "AnalyticsSnapshot",
 ]
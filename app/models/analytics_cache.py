@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON
+from datetime import datetime
+from app.core.database import Base
+
+
+class AnalyticsCache(Base):
+    """
+    Cache hasil analisis AI (Gemini) untuk endpoint analytics
+    Key = fingerprint dari statistik input + versi prompt + model
+    """
+
+    __tablename__ = "analytics_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False, index=True)  # members, documents, overview
+    fingerprint = Column(String(64), nullable=False, unique=True, index=True)
+    model = Column(String(100))
+    prompt_version = Column(String(20))
+    payload = Column(JSON)  # Hasil analisis AI
+    created_at = Column(DateTime, default=datetime.utcnow)
+    refreshed_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+    def age_seconds(self) -> float:
+        """Umur entry sejak terakhir di-refresh"""
+        if not self.refreshed_at:
+            return float("inf")
+        return (datetime.utcnow() - self.refreshed_at).total_seconds()
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float, JSON
+from datetime import datetime
+from app.core.database import Base
+
+
+class AnalyticsSnapshot(Base):
+    """
+    Snapshot hasil analytics (statistik + analisis AI) yang dihitung di background
+    oleh scheduler dan dikirim langsung oleh endpoint analytics
+    """
+
+    __tablename__ = "analytics_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False, unique=True)  # members, documents, overview
+    payload = Column(JSON)  # Response body endpoint analytics
+    source_signature = Column(String(64))  # Signature data saat snapshot dihitung
+    duration_ms = Column(Float)  # Lama perhitungan snapshot
+    computed_at = Column(DateTime, default=datetime.utcnow)
+
+    def age_seconds(self) -> float:
+        """Umur snapshot dalam detik"""
+        if not self.computed_at:
+            return 0.0
+        return max((datetime.utcnow() - self.computed_at).total_seconds(), 0.0)
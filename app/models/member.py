@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, func
 from datetime import datetime
 from app.core.database import Base
 
@@ -13,6 +13,19 @@ class Member(Base):
     """
 
     __tablename__ = "members"
+    __table_args__ = (
+        # Index komposit untuk GET /api/members/search (filter kategori + gender +
+        # rentang usia); kolom pertama adalah filter yang paling sering dipakai
+        Index("ix_members_jabatan_gender_usia", "jabatan", "jenis_kelamin", "usia"),
+        Index(
+            "ix_members_bidang_gender_usia",
+            "kategori_bidang_usaha",
+            "jenis_kelamin",
+            "usia",
+        ),
+        Index("ix_members_status_kta_gender_usia", "status_kta", "jenis_kelamin", "usia"),
+        Index("ix_members_gender_usia", "jenis_kelamin", "usia"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -23,7 +36,7 @@ class Member(Base):
         String, nullable=True, index=True
     )  # Ketum, WKU, Sekum, Ketua Bidang, dll
     status_kta = Column(
-        String, nullable=True
+        String, nullable=True, index=True
     )  # KTA Fisik, KTA HIPMI NET, Hilang, SK Tum Ibam
     no_kta = Column(String, nullable=True)  # Nomor KTA
 
@@ -63,7 +76,19 @@ class Member(Base):
     region = Column(String, nullable=True)
     entry_year = Column(Integer, nullable=True)
 
+    # Sinkronisasi CSV
+    natural_key = Column(
+        String, nullable=True, index=True
+    )  # kta:<no_kta> / email:<email> / name:<nama> (dinormalisasi)
+    content_hash = Column(String(64), nullable=True)  # SHA-256 isi kolom CSV
+
     # Metadata
     joined_date = Column(DateTime, default=datetime.utcnow)
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = Column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True
+    )  # Versi data untuk cache jawaban chat
+
+
+# Prefix nama perusahaan (case-insensitive) dicari sebagai range pada lower(...)
+Index("ix_members_nama_perusahaan_lower", func.lower(Member.nama_perusahaan))
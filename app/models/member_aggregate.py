@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint
+from datetime import datetime
+from app.core.database import Base
+
+
+class MemberAggregate(Base):
+    """
+    Ringkasan statistik pengurus (materialized), di-update dalam transaksi yang sama
+    dengan import/mutasi Member sehingga query statistik cukup membaca tabel kecil ini
+
+    dimension: jabatan, bidang_usaha, status_kta, gender, age_bucket,
+               company_ownership, perusahaan, totals
+    value    : nilai dimensi (mis. "Ketum", "Male", "20-25") atau nama total
+               (pengurus, with_name, karyawan, pengurus_with_karyawan)
+    count    : jumlah pengurus (atau jumlah karyawan untuk totals/karyawan)
+    """
+
+    __tablename__ = "member_aggregates"
+    __table_args__ = (
+        UniqueConstraint(
+            "dimension", "value", name="uq_member_aggregates_dimension_value"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    dimension = Column(String(50), nullable=False)
+    value = Column(String, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
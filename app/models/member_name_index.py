@@ -0,0 +1,43 @@
+from sqlalchemy import Column, Integer, String, PrimaryKeyConstraint
+from app.core.database import Base
+
+
+class MemberNameIndex(Base):
+    """
+    Nama pengurus yang sudah dinormalisasi untuk pencarian fuzzy (trigram)
+
+    Satu row per pengurus; dipakai untuk menghitung skor kemiripan kandidat dan
+    menandai pengurus mana saja yang sudah masuk index (max member_id).
+    """
+
+    __tablename__ = "member_name_index"
+
+    member_id = Column(Integer, primary_key=True)
+    normalized = Column(String, nullable=False)  # mis. "muhamad rizki"
+
+
+class MemberNameTrigram(Base):
+    """
+    Posting list trigram -> pengurus (side table, tanpa rowid di SQLite)
+
+    Primary key (trigram, member_id) sehingga semua pengurus untuk satu trigram
+    tersimpan berurutan dan bisa dibaca dengan satu range scan.
+    """
+
+    __tablename__ = "member_name_trigrams"
+    __table_args__ = (
+        PrimaryKeyConstraint("trigram", "member_id"),
+        {"sqlite_with_rowid": False},
+    )
+
+    trigram = Column(String(3), nullable=False)
+    member_id = Column(Integer, nullable=False, index=True)
+
+
+class MemberNameTrigramStat(Base):
+    """Jumlah pengurus per trigram (document frequency), untuk memilih trigram langka"""
+
+    __tablename__ = "member_name_trigram_stats"
+
+    trigram = Column(String(3), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -25,9 +25,9 @@ class UniversalDocument(Base):
 
     # Document classification
     document_type = Column(
-        String(50), nullable=False, default="OTHER"
+        String(50), nullable=False, default="OTHER", index=True
     )  # Auto-detected type
-    category = Column(String(100))  # Custom category from user
+    category = Column(String(100), index=True)  # Custom category from user
     tags = Column(JSON)  # Array of tags for better search
 
     # Content
@@ -44,12 +44,17 @@ class UniversalDocument(Base):
     # AI Processing
     ai_summary = Column(Text)  # Gemini-generated summary
     ai_insights = Column(JSON)  # Gemini-extracted insights
+    # Status enrichment AI di background (ai_enrichment): pending, processing, done, failed
+    ai_status = Column(String(20), index=True)
+    ai_attempts = Column(Integer, default=0)
+    ai_error = Column(Text)
+    ai_updated_at = Column(DateTime)
     embedding_vector = Column(Text)  # For future vector search
     processed = Column(Boolean, default=False)
     processed_at = Column(DateTime)
 
     # Timestamps
-    uploaded_at = Column(DateTime, default=datetime.utcnow)
+    uploaded_at = Column(DateTime, default=datetime.utcnow, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Access control (optional)
@@ -74,6 +79,7 @@ class UniversalDocument(Base):
             "keywords": self.keywords,
             "uploaded_at": self.uploaded_at.isoformat() if self.uploaded_at else None,
             "processed": self.processed,
+            "ai_status": self.ai_status,
         }
 
     def to_dict_full(self):
@@ -1,99 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from app.core.database import get_db
-from app.models.member import Member
 from app.models.universal_document import UniversalDocument
-from app.services.gemini_service import GeminiService
+from app.services.gemini_service import GeminiService, PROMPT_VERSIONS
+from app.services.analytics_cache import get_cached_analysis
+from app.services.gemini_telemetry import (
+    CALLER_ANALYTICS_DOCUMENTS,
+    CALLER_ANALYTICS_MEMBERS,
+    CALLER_ANALYTICS_OVERVIEW,
+)
+from app.services.analytics_scheduler import register_snapshot_builder, serve_snapshot
+from app.services.member_aggregation import (
+    gender_counts,
+    get_member_aggregates,
+    get_total,
+)
 from datetime import datetime
+from typing import Optional
 
 router = APIRouter(prefix="/api", tags=["analytics"])
 
 
-def build_age_range(age: int) -> str:
-    """Konversi usia ke rentang untuk histogram"""
-    if age < 25:
-        return "20-25"
-    elif age < 30:
-        return "25-30"
-    elif age < 35:
-        return "30-35"
-    elif age < 40:
-        return "35-40"
-    elif age < 45:
-        return "40-45"
-    else:
-        return "45+"
-
-
-def process_member_statistics(members: list) -> tuple:
-    """Proses statistik dari list members, return tuple (members_data, counts, visualizations)"""
-    members_data = []
-    jabatan_count = {}
-    bidang_usaha_count = {}
-    status_kta_count = {}
-    gender_count = {"Male": 0, "Female": 0}
-    age_distribution = {}
-    company_ownership = {"Memiliki Perusahaan": 0, "Tidak Memiliki Perusahaan": 0}
-    unique_companies = set()  # Track unique perusahaan
-
-    for m in members:
-        # Data untuk AI analysis
-        members_data.append(
-            {
-                "name": m.name,
-                "email": m.email,
-                "jabatan": m.jabatan,
-                "status_kta": m.status_kta,
-                "usia": m.usia,
-                "jenis_kelamin": m.jenis_kelamin,
-                "kategori_bidang_usaha": m.kategori_bidang_usaha,
-                "nama_perusahaan": m.nama_perusahaan,
-                "jmlh_karyawan": m.jmlh_karyawan,
-            }
-        )
-
-        # Count statistics
-        jabatan = m.jabatan or "Tidak Diketahui"
-        jabatan_count[jabatan] = jabatan_count.get(jabatan, 0) + 1
-
-        bidang = m.kategori_bidang_usaha or "Tidak Diketahui"
-        bidang_usaha_count[bidang] = bidang_usaha_count.get(bidang, 0) + 1
-
-        status = m.status_kta or "Tidak Diketahui"
-        status_kta_count[status] = status_kta_count.get(status, 0) + 1
-
-        if m.jenis_kelamin and m.jenis_kelamin.strip() in ["Male", "Female"]:
-            gender_count[m.jenis_kelamin.strip()] += 1
-
-        if m.usia and m.usia > 0:
-            age_range = build_age_range(m.usia)
-            age_distribution[age_range] = age_distribution.get(age_range, 0) + 1
-
-        # Track unique companies
-        if m.nama_perusahaan and m.nama_perusahaan.strip():
-            company_ownership["Memiliki Perusahaan"] += 1
-            unique_companies.add(m.nama_perusahaan.strip())
-        else:
-            company_ownership["Tidak Memiliki Perusahaan"] += 1
+def process_member_statistics(db: Session) -> tuple:
+    """Proses statistik pengurus dari tabel ringkasan, return tuple (aggregates, stats, visualizations)"""
+    aggregates = get_member_aggregates(db)
 
     stats = {
-        "total_pengurus": len(members),
-        "by_jabatan": jabatan_count,
-        "by_bidang_usaha": bidang_usaha_count,
-        "by_status_kta": status_kta_count,
-        "total_perusahaan": len(unique_companies),  # Jumlah perusahaan unik
+        "total_pengurus": aggregates["total_pengurus"],
+        "by_jabatan": aggregates["by_jabatan"],
+        "by_bidang_usaha": aggregates["by_bidang_usaha"],
+        "by_status_kta": aggregates["by_status_kta"],
+        "total_perusahaan": aggregates["total_perusahaan"],  # Jumlah perusahaan unik
     }
 
     visualizations = {
-        "age_distribution": dict(sorted(age_distribution.items())),
-        "gender_proportion": gender_count,
+        "age_distribution": dict(sorted(aggregates["age_distribution"].items())),
+        "gender_proportion": gender_counts(aggregates),
         "by_business_category": dict(
-            sorted(bidang_usaha_count.items(), key=lambda x: x[1], reverse=True)
+            sorted(
+                aggregates["by_bidang_usaha"].items(), key=lambda x: x[1], reverse=True
+            )
         ),
-        "company_ownership": company_ownership,
+        "company_ownership": aggregates["company_ownership"],
     }
 
-    return members_data, stats, visualizations
+    return aggregates, stats, visualizations
 
 
 def process_document_statistics(documents: list) -> tuple:
@@ -111,7 +63,9 @@ def process_document_statistics(documents: list) -> tuple:
                 "document_type": doc.document_type,
                 "category": doc.category,
                 "page_count": doc.page_count,
-                "file_size_mb": doc.file_size_mb,
+                "file_size_mb": (
+                    round(doc.file_size / (1024 * 1024), 2) if doc.file_size else 0
+                ),
             }
         )
 
@@ -123,8 +77,8 @@ def process_document_statistics(documents: list) -> tuple:
 
         if doc.page_count:
             total_pages += doc.page_count
-        if doc.file_size_mb:
-            total_size += doc.file_size_mb
+        if doc.file_size:
+            total_size += doc.file_size / (1024 * 1024)
 
     stats = {
         "total_documents": len(documents),
@@ -139,131 +93,192 @@ def process_document_statistics(documents: list) -> tuple:
     return docs_data, stats
 
 
-@router.get("/analytics/members")
-async def analyze_members(db: Session = Depends(get_db)):
-    """Analisis data pengurus HIPMI dengan AI Gemini"""
-    try:
-        members = db.query(Member).all()
-
-        if not members:
-            return {
-                "status": "success",
-                "message": "Belum ada data anggota untuk dianalisis",
-                "data": {
-                    "summary": "Belum ada data anggota HIPMI yang tersimpan di sistem",
-                    "total_members": 0,
-                    "key_insights": [],
-                    "trends": "Tidak ada data untuk analisis tren",
-                    "recommendations": [
-                        "Upload data anggota untuk mendapatkan analisis"
-                    ],
-                },
-            }
-
-        # Process statistics menggunakan helper
-        members_data, stats, visualizations = process_member_statistics(members)
+def build_members_analytics(
+    db: Session, background_tasks: Optional[BackgroundTasks] = None
+) -> dict:
+    """Hitung response analytics pengurus (statistik + analisis AI)"""
+    # Process statistics menggunakan agregasi di database
+    aggregates, stats, visualizations = process_member_statistics(db)
+
+    if not aggregates["total_pengurus"]:
+        return {
+            "status": "success",
+            "message": "Belum ada data anggota untuk dianalisis",
+            "data": {
+                "summary": "Belum ada data anggota HIPMI yang tersimpan di sistem",
+                "total_members": 0,
+                "key_insights": [],
+                "trends": "Tidak ada data untuk analisis tren",
+                "recommendations": ["Upload data anggota untuk mendapatkan analisis"],
+            },
+        }
 
-        # AI analysis
-        gemini = GeminiService()
-        ai_analysis = gemini.analyze_members_data(members_data)
+    # AI analysis (cache berdasarkan fingerprint statistik)
+    gemini = GeminiService()
+    ai_analysis, cache_info = get_cached_analysis(
+        db,
+        kind="members",
+        inputs=aggregates,
+        prompt_version=PROMPT_VERSIONS["members"],
+        model=gemini.model_for(CALLER_ANALYTICS_MEMBERS),
+        compute=lambda: gemini.analyze_members_data(aggregates),
+        background_tasks=background_tasks,
+    )
+
+    result = {
+        **ai_analysis,
+        "total_members": aggregates["total_pengurus"],
+        "statistics": stats,
+        "visualizations": visualizations,
+        "ai_cache": cache_info,
+        "last_updated": datetime.now().isoformat(),
+    }
 
-        result = {
-            **ai_analysis,
-            "statistics": stats,
-            "visualizations": visualizations,
-            "last_updated": datetime.now().isoformat(),
+    return {"status": "success", "data": result}
+
+
+def build_documents_analytics(
+    db: Session, background_tasks: Optional[BackgroundTasks] = None
+) -> dict:
+    """Hitung response analytics dokumen (statistik + analisis AI)"""
+    documents = db.query(UniversalDocument).all()
+
+    if not documents:
+        return {
+            "status": "success",
+            "message": "Belum ada dokumen untuk dianalisis",
+            "data": {
+                "summary": "Belum ada dokumen HIPMI yang tersimpan di sistem",
+                "total_documents": 0,
+                "total_pages": 0,
+                "key_insights": [],
+                "document_health": "Belum ada data",
+                "recommendations": ["Upload dokumen HIPMI untuk mendapatkan analisis"],
+            },
         }
 
-        return {"status": "success", "data": result}
+    # Process statistics menggunakan helper
+    docs_data, stats = process_document_statistics(documents)
+
+    # AI analysis (cache berdasarkan fingerprint statistik)
+    gemini = GeminiService()
+    ai_analysis, cache_info = get_cached_analysis(
+        db,
+        kind="documents",
+        inputs=stats,
+        prompt_version=PROMPT_VERSIONS["documents"],
+        model=gemini.model_for(CALLER_ANALYTICS_DOCUMENTS),
+        compute=lambda: gemini.analyze_documents_data(docs_data),
+        background_tasks=background_tasks,
+    )
+
+    result = {
+        **ai_analysis,
+        "total_documents": stats["total_documents"],
+        "total_pages": stats["total_pages"],
+        "statistics": stats,
+        "ai_cache": cache_info,
+        "last_updated": datetime.now().isoformat(),
+    }
 
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Failed to analyze members: {str(e)}"
-        )
+    return {"status": "success", "data": result}
 
 
-@router.get("/analytics/documents")
-async def analyze_documents(db: Session = Depends(get_db)):
-    """Analisis data dokumen HIPMI dengan AI Gemini"""
-    try:
-        documents = db.query(UniversalDocument).all()
-
-        if not documents:
-            return {
-                "status": "success",
-                "message": "Belum ada dokumen untuk dianalisis",
-                "data": {
-                    "summary": "Belum ada dokumen HIPMI yang tersimpan di sistem",
-                    "total_documents": 0,
-                    "total_pages": 0,
-                    "key_insights": [],
-                    "document_health": "Belum ada data",
-                    "recommendations": [
-                        "Upload dokumen HIPMI untuk mendapatkan analisis"
-                    ],
-                },
-            }
+def build_overview_analytics(
+    db: Session, background_tasks: Optional[BackgroundTasks] = None
+) -> dict:
+    """Hitung response overview analytics untuk dashboard"""
+    members_count = get_total(db, "pengurus")
+    documents_count = db.query(UniversalDocument).count()
 
-        # Process statistics menggunakan helper
-        docs_data, stats = process_document_statistics(documents)
+    overview = {
+        "total_members": members_count,
+        "total_documents": documents_count,
+        "has_data": members_count > 0 or documents_count > 0,
+    }
 
-        # AI analysis
+    if overview["has_data"]:
         gemini = GeminiService()
-        ai_analysis = gemini.analyze_documents_data(docs_data)
+        ai_overview, cache_info = get_cached_analysis(
+            db,
+            kind="overview",
+            inputs={"members": members_count, "documents": documents_count},
+            prompt_version=PROMPT_VERSIONS["overview"],
+            model=gemini.model_for(CALLER_ANALYTICS_OVERVIEW),
+            compute=lambda: gemini.analyze_overview(members_count, documents_count),
+            background_tasks=background_tasks,
+        )
 
-        result = {
-            **ai_analysis,
-            "statistics": stats,
-            "last_updated": datetime.now().isoformat(),
-        }
+        if "error" in ai_overview:
+            overview["message"] = "AI analysis tidak tersedia, menampilkan data statistik"
+            overview["error_detail"] = ai_overview["error"]
+        else:
+            overview.update(ai_overview)
+        overview["ai_cache"] = cache_info
 
-        return {"status": "success", "data": result}
+    return {"status": "success", "data": overview}
 
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Failed to analyze documents: {str(e)}"
-        )
 
+def members_signature(db: Session) -> dict:
+    """Signature data pengurus (dibaca dari tabel ringkasan)"""
+    return get_member_aggregates(db)
 
-@router.get("/analytics/overview")
-async def get_overview_analytics(db: Session = Depends(get_db)):
-    """Get combined analytics overview untuk dashboard"""
-    try:
-        members_count = db.query(Member).count()
-        documents_count = db.query(UniversalDocument).count()
 
-        overview = {
-            "total_members": members_count,
-            "total_documents": documents_count,
-            "has_data": members_count > 0 or documents_count > 0,
-        }
+def documents_signature(db: Session) -> list:
+    """Signature data dokumen: jumlah, total halaman dan waktu update terakhir"""
+    row = db.query(
+        func.count(UniversalDocument.id),
+        func.sum(UniversalDocument.page_count),
+        func.max(UniversalDocument.uploaded_at),
+        func.max(UniversalDocument.updated_at),
+    ).one()
+    return list(row)
+
 
-        if overview["has_data"]:
-            gemini = GeminiService()
-            prompt = f"""Sebagai AI analyst untuk HIPMI, berikan ringkasan singkat kondisi organisasi:
+def overview_signature(db: Session) -> list:
+    return [get_total(db, "pengurus"), db.query(UniversalDocument).count()]
 
-Total Anggota: {members_count}
-Total Dokumen: {documents_count}
 
-Berikan 3 poin insight singkat dalam format JSON:
-{{
-    "health_status": "Excellent/Good/Fair/Needs Improvement",
-    "key_points": ["Poin 1", "Poin 2", "Poin 3"],
-    "next_actions": "Rekomendasi prioritas"
-}}"""
+register_snapshot_builder("members", build_members_analytics, members_signature)
+register_snapshot_builder("documents", build_documents_analytics, documents_signature)
+register_snapshot_builder("overview", build_overview_analytics, overview_signature)
+
+
+# Handler sync (bukan async def): serve_snapshot bisa memanggil Gemini secara
+# blocking saat snapshot/cache AI belum ada, jadi harus jalan di threadpool FastAPI
+# supaya event loop tidak tertahan dan request yang bersamaan ikut single flight
+@router.get("/analytics/members")
+def analyze_members(
+    background_tasks: BackgroundTasks, db: Session = Depends(get_db)
+):
+    """Analisis data pengurus HIPMI dengan AI Gemini (dari snapshot precompute)"""
+    try:
+        return serve_snapshot(db, "members", background_tasks)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to analyze members: {str(e)}"
+        )
 
-            try:
-                response = gemini._call_api(prompt)
-                import json
 
-                ai_overview = json.loads(response)
-                overview.update(ai_overview)
-            except:
-                overview["message"] = (
-                    "AI analysis tidak tersedia, menampilkan data statistik"
-                )
+@router.get("/analytics/documents")
+def analyze_documents(
+    background_tasks: BackgroundTasks, db: Session = Depends(get_db)
+):
+    """Analisis data dokumen HIPMI dengan AI Gemini (dari snapshot precompute)"""
+    try:
+        return serve_snapshot(db, "documents", background_tasks)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to analyze documents: {str(e)}"
+        )
 
-        return {"status": "success", "data": overview}
 
+@router.get("/analytics/overview")
+def get_overview_analytics(
+    background_tasks: BackgroundTasks, db: Session = Depends(get_db)
+):
+    """Get combined analytics overview untuk dashboard (dari snapshot precompute)"""
+    try:
+        return serve_snapshot(db, "overview", background_tasks)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get overview: {str(e)}")
@@ -1,141 +1,250 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from typing import Optional
 from app.core.database import get_db
+from app.core.config import CHAT_REQUEST_DEADLINE_SECONDS
 from app.services.gemini_service import GeminiService
+from app.services.gemini_resilience import request_deadline
 from app.services.universal_document_service import UniversalDocumentService
+from app.services.universal_document_processor import UniversalDocumentProcessor
+from app.services.document_metadata import (
+    count_by_category,
+    count_by_type,
+    count_documents,
+    get_document_categories,
+    latest_documents,
+    page_totals,
+    search_document_mentions,
+)
+from app.services.member_aggregation import (
+    gender_counts,
+    get_dimension_counts,
+    get_dimension_values,
+    get_member_aggregates,
+    get_total,
+)
+from app.services.member_name_search import NameLookup, lookup_member_name
+from app.services.member_query import count_members, value_condition
+from app.services.chat_intent_router import VALUE_DIMENSIONS, ParsedQuery, router as intent_router
+from app.services.chat_member_context import select_context_members
+from app.services.prompt_encoding import encode_counts, encode_members
+from app.services.chat_answer_cache import chat_answer_cache, is_cacheable_answer, knowledge_base_version
 from app.schemas.chat_schema import ChatQuerySchema, ChatResponseSchema
 from app.models.member import Member
 from app.models.universal_document import UniversalDocument
 import re
+import time
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
 
-# Handler 1: Statistik per Jabatan
-def handle_jabatan_query(query_lower: str, db: Session) -> dict | None:
-    """Handle query tentang jabatan pengurus"""
-    if not ("berapa" in query_lower and ("jabatan" in query_lower or "ketua" in query_lower or "sekum" in query_lower or "bendum" in query_lower)):
+def slot_condition(slots: dict, dimension: str, value: str) -> list:
+    """Kondisi pengurus untuk nilai slot (persis, atau awalan seperti "Ketua Bidang")"""
+    return value_condition(dimension, value, prefix=bool(slots.get("prefix")))
+
+
+# Handler: Statistik per Jabatan
+def handle_jabatan_count(slots: dict, db: Session) -> dict | None:
+    """Jumlah pengurus dengan jabatan tertentu"""
+    jabatan_name = slots["jabatan"]
+    count = count_members(db, slot_condition(slots, "jabatan", jabatan_name))
+    return {
+        "type": "specific_query",
+        "answer": f"Jumlah pengurus dengan jabatan '{jabatan_name}': **{count} orang**",
+        "data": {"jabatan": jabatan_name, "count": count},
+    }
+
+
+def handle_jabatan_distribution(slots: dict, db: Session) -> dict | None:
+    """Jumlah pengurus per jabatan"""
+    jabatan_counts = get_dimension_counts(db, "jabatan", include_unknown=False)
+    if not jabatan_counts:
         return None
-    
-    # Extract specific jabatan
-    jabatan_match = re.search(r"['\"]([^'\"]+)['\"]", query_lower)
-    if jabatan_match:
-        jabatan_name = jabatan_match.group(1)
-        count = db.query(Member).filter(func.lower(Member.jabatan).like(f"%{jabatan_name.lower()}%")).count()
-        return {
-            "type": "specific_query",
-            "answer": f"Jumlah pengurus dengan jabatan '{jabatan_name}': **{count} orang**",
-            "data": {"jabatan": jabatan_name, "count": count},
-        }
-    
-    # Show all jabatan
-    if "per jabatan" in query_lower or "jumlah pengurus per jabatan" in query_lower:
-        result = db.query(Member.jabatan, func.count(Member.id).label("count")).filter(Member.jabatan.isnot(None)).group_by(Member.jabatan).order_by(func.count(Member.id).desc()).all()
-        if result:
-            answer = "**Jumlah Pengurus per Jabatan:**\n" + "\n".join([f"- {r.jabatan}: {r.count} orang" for r in result])
-            return {"type": "specific_query", "answer": answer, "data": {"jabatan_counts": {r.jabatan: r.count for r in result}}}
-    
-    return None
+    answer = "**Jumlah Pengurus per Jabatan:**\n" + "\n".join([f"- {jabatan}: {count} orang" for jabatan, count in jabatan_counts.items()])
+    return {"type": "specific_query", "answer": answer, "data": {"jabatan_counts": jabatan_counts}}
 
 
-# Handler 2: Statistik Bidang Usaha
-def handle_bidang_usaha_query(query_lower: str, db: Session) -> dict | None:
-    """Handle query tentang bidang usaha"""
-    if "bidang usaha" not in query_lower and "kategori bisnis" not in query_lower:
+# Handler: Statistik Bidang Usaha
+def handle_bidang_usaha_top(slots: dict, db: Session) -> dict | None:
+    """Bidang usaha dengan pengurus terbanyak"""
+    bidang_counts = get_dimension_counts(db, "bidang_usaha", include_unknown=False)
+    if not bidang_counts:
         return None
-    
-    # Most popular bidang
-    if "paling banyak" in query_lower or "terbanyak" in query_lower:
-        result = db.query(Member.kategori_bidang_usaha, func.count(Member.id).label("count")).filter(Member.kategori_bidang_usaha.isnot(None)).group_by(Member.kategori_bidang_usaha).order_by(func.count(Member.id).desc()).first()
-        if result:
-            return {
-                "type": "specific_query",
-                "answer": f"Bidang usaha terbanyak di kepengurusan: **{result.kategori_bidang_usaha}** ({result.count} pengurus)",
-                "data": {"bidang_usaha": result.kategori_bidang_usaha, "count": result.count},
-            }
-    
-    # Specific bidang count
-    if "berapa" in query_lower:
-        bidang_match = re.search(r"['\"]([^'\"]+)['\"]", query_lower)
-        if bidang_match:
-            bidang_name = bidang_match.group(1)
-            count = db.query(Member).filter(func.lower(Member.kategori_bidang_usaha).like(f"%{bidang_name.lower()}%")).count()
-            return {
-                "type": "specific_query",
-                "answer": f"Jumlah pengurus di bidang '{bidang_name}': **{count} orang**",
-                "data": {"bidang_usaha": bidang_name, "count": count},
-            }
-    
-    return None
+    bidang, count = next(iter(bidang_counts.items()))
+    return {
+        "type": "specific_query",
+        "answer": f"Bidang usaha terbanyak di kepengurusan: **{bidang}** ({count} pengurus)",
+        "data": {"bidang_usaha": bidang, "count": count},
+    }
 
 
-# Handler 3: Statistik Status KTA
-def handle_kta_query(query_lower: str, query: str, db: Session) -> dict | None:
-    """Handle query tentang status KTA"""
-    if "kta" not in query_lower:
+def handle_bidang_usaha_count(slots: dict, db: Session) -> dict | None:
+    """Jumlah pengurus di bidang usaha tertentu"""
+    bidang_name = slots["bidang_usaha"]
+    count = count_members(db, slot_condition(slots, "bidang_usaha", bidang_name))
+    return {
+        "type": "specific_query",
+        "answer": f"Jumlah pengurus di bidang '{bidang_name}': **{count} orang**",
+        "data": {"bidang_usaha": bidang_name, "count": count},
+    }
+
+
+def handle_bidang_usaha_distribution(slots: dict, db: Session) -> dict | None:
+    """Jumlah pengurus per bidang usaha"""
+    bidang_counts = get_dimension_counts(db, "bidang_usaha", include_unknown=False)
+    if not bidang_counts:
         return None
-    
-    # Specific status
-    status_match = re.search(r"['\"]([^'\"]+)['\"]", query)
-    if status_match:
-        status_name = status_match.group(1)
-        count = db.query(Member).filter(func.lower(Member.status_kta).like(f"%{status_name.lower()}%")).count()
-        return {
-            "type": "specific_query",
-            "answer": f"Jumlah pengurus dengan status KTA '{status_name}': **{count} orang**",
-            "data": {"status_kta": status_name, "count": count},
-        }
-    
-    # Show all status
-    if "tampilkan status kta" in query_lower:
-        result = db.query(Member.status_kta, func.count(Member.id).label("count")).filter(Member.status_kta.isnot(None)).group_by(Member.status_kta).all()
-        if result:
-            answer = "**Status KTA Semua Pengurus:**\n" + "\n".join([f"- {r.status_kta}: {r.count} orang" for r in result])
-            return {"type": "specific_query", "answer": answer, "data": {"status_counts": {r.status_kta: r.count for r in result}}}
-    
-    return None
+    answer = "**Jumlah Pengurus per Bidang Usaha:**\n" + "\n".join([f"- {bidang}: {count} orang" for bidang, count in bidang_counts.items()])
+    return {"type": "specific_query", "answer": answer, "data": {"bidang_usaha_counts": bidang_counts}}
 
 
-# Handler 4: Statistik Gender
-def handle_gender_query(query_lower: str, db: Session) -> dict | None:
-    """Handle query tentang rasio gender"""
-    if "rasio" in query_lower and ("pria" in query_lower or "wanita" in query_lower or "gender" in query_lower):
-        male_count = db.query(Member).filter(Member.jenis_kelamin == "Male").count()
-        female_count = db.query(Member).filter(Member.jenis_kelamin == "Female").count()
-        total = male_count + female_count
-        if total > 0:
-            male_pct = (male_count / total * 100)
-            female_pct = (female_count / total * 100)
-            return {
-                "type": "specific_query",
-                "answer": f"**Rasio Gender Pengurus:**\n- Pria: {male_count} orang ({male_pct:.1f}%)\n- Wanita: {female_count} orang ({female_pct:.1f}%)",
-                "data": {"male": male_count, "female": female_count, "male_pct": male_pct, "female_pct": female_pct},
-            }
-    return None
+# Handler: Statistik Status KTA
+def handle_status_kta_count(slots: dict, db: Session) -> dict | None:
+    """Jumlah pengurus dengan status KTA tertentu"""
+    status_name = slots["status_kta"]
+    count = count_members(db, slot_condition(slots, "status_kta", status_name))
+    return {
+        "type": "specific_query",
+        "answer": f"Jumlah pengurus dengan status KTA '{status_name}': **{count} orang**",
+        "data": {"status_kta": status_name, "count": count},
+    }
 
 
-# Handler 5: Detail Pengurus (Natural Language)
-def handle_detail_pengurus_query(query_lower: str, db: Session) -> dict | None:
-    """Handle query tentang detail pengurus specific"""
-    if not ("cari" in query_lower or "info" in query_lower or "siapa" in query_lower or "jabatannya" in query_lower):
+def handle_status_kta_distribution(slots: dict, db: Session) -> dict | None:
+    """Jumlah pengurus per status KTA"""
+    status_counts = get_dimension_counts(db, "status_kta", include_unknown=False)
+    if not status_counts:
         return None
-    
-    # Extract name dari quotes atau natural language
-    name = None
-    name_match = re.search(r"['\"]([^'\"]+)['\"]", query_lower)
-    if name_match:
-        name = name_match.group(1)
-    else:
-        # Natural language extraction
-        for word in ["cari", "info", "lengkap", "siapa", "jabatannya", "apa", "sebagai", "perusahaannya", "umurnya", "kontaknya"]:
-            query_lower = query_lower.replace(word, " ")
-        potential_name = query_lower.strip()
-        if potential_name and len(potential_name) > 2:
-            name = potential_name
-    
+    answer = "**Status KTA Semua Pengurus:**\n" + "\n".join([f"- {status}: {count} orang" for status, count in status_counts.items()])
+    return {"type": "specific_query", "answer": answer, "data": {"status_counts": status_counts}}
+
+
+# Handler: Statistik Gender
+def handle_gender_ratio(slots: dict, db: Session) -> dict | None:
+    """Rasio gender pengurus"""
+    by_gender = get_dimension_counts(db, "gender")
+    male_count = by_gender.get("Male", 0)
+    female_count = by_gender.get("Female", 0)
+    total = male_count + female_count
+    if total == 0:
+        return None
+    male_pct = (male_count / total * 100)
+    female_pct = (female_count / total * 100)
+    return {
+        "type": "specific_query",
+        "answer": f"**Rasio Gender Pengurus:**\n- Pria: {male_count} orang ({male_pct:.1f}%)\n- Wanita: {female_count} orang ({female_pct:.1f}%)",
+        "data": {"male": male_count, "female": female_count, "male_pct": male_pct, "female_pct": female_pct},
+    }
+
+
+# Handler: Total Karyawan & Pengurus
+def handle_total_karyawan(slots: dict, db: Session) -> dict | None:
+    """Total karyawan dari perusahaan pengurus"""
+    total_karyawan = get_total(db, "karyawan")
+    pengurus_count = get_total(db, "pengurus_with_karyawan")
+    return {
+        "type": "specific_query",
+        "answer": f"**Total Jumlah Karyawan:**\n- Total karyawan dari semua perusahaan pengurus: **{total_karyawan:,} karyawan**\n- Dari {pengurus_count} pengurus yang memiliki data karyawan",
+        "data": {"total_karyawan": total_karyawan, "pengurus_with_data": pengurus_count},
+    }
+
+
+def handle_total_pengurus(slots: dict, db: Session) -> dict | None:
+    """Jumlah seluruh pengurus"""
+    total = get_total(db, "pengurus")
+    return {
+        "type": "specific_query",
+        "answer": f"Jumlah seluruh pengurus HIPMI: **{total} orang**",
+        "data": {"total_pengurus": total},
+    }
+
+
+# Handler: Daftar pengurus dengan jabatan/bidang/status tertentu
+MEMBERS_BY_VALUE_LIMIT = 20
+CONTACTS_BY_VALUE_LIMIT = 10
+
+VALUE_LABELS = {"jabatan": "jabatan", "bidang_usaha": "bidang usaha", "status_kta": "status KTA"}
+
+
+def handle_members_by_value(slots: dict, db: Session) -> dict | None:
+    """Siapa saja pengurus dengan jabatan/bidang usaha/status KTA tertentu"""
+    dimension, value = slots["dimension"], slots["value"]
+    # Daftar dan jumlah memakai kondisi yang sama supaya "(N orang)" sesuai daftar
+    conditions = slot_condition(slots, dimension, value)
+    members = (
+        db.query(Member.name, Member.jabatan, Member.nama_perusahaan)
+        .filter(*conditions, Member.name.isnot(None))
+        .order_by(Member.id)
+        .limit(MEMBERS_BY_VALUE_LIMIT + 1)
+        .all()
+    )
+    if not members:
+        return None
+    count = count_members(db, [*conditions, Member.name.isnot(None)])
+    label = VALUE_LABELS[dimension]
+    lines = []
+    for m in members[:MEMBERS_BY_VALUE_LIMIT]:
+        line = f"- {m.name}"
+        if dimension != "jabatan" and m.jabatan:
+            line += f" ({m.jabatan})"
+        if m.nama_perusahaan:
+            line += f", {m.nama_perusahaan}"
+        lines.append(line)
+    answer = f"**Pengurus dengan {label} '{value}'** ({count} orang):\n" + "\n".join(lines)
+    if count > MEMBERS_BY_VALUE_LIMIT:
+        answer += f"\n... dan {count - MEMBERS_BY_VALUE_LIMIT} pengurus lainnya"
+    return {
+        "type": "specific_query",
+        "answer": answer,
+        "data": {
+            dimension: value,
+            "count": count,
+            "names": [m.name for m in members[:MEMBERS_BY_VALUE_LIMIT]],
+        },
+    }
+
+
+# Lookup nama pengurus (fuzzy, index trigram) untuk handler detail/kontak/perusahaan
+def find_member_by_name(name: str, db: Session) -> tuple[Member | None, NameLookup]:
+    """Cari pengurus paling mirip dengan nama; member None jika tidak ada/ambigu"""
+    lookup = lookup_member_name(db, name)
+    if not lookup.best or lookup.ambiguous:
+        return None, lookup
+    return db.get(Member, lookup.best.member_id), lookup
+
+
+def ambiguous_name_answer(name: str, lookup: NameLookup) -> dict:
+    """Jawaban jika nama cocok dengan beberapa pengurus"""
+    options = "\n".join(
+        f"- {match.name} (kemiripan {match.score:.0%})" for match in lookup.matches
+    )
+    return {
+        "type": "specific_query",
+        "answer": f"Ditemukan beberapa pengurus yang mirip dengan '{name}'. Maksud Anda yang mana?\n{options}",
+        "data": {
+            "query_name": name,
+            "ambiguous": True,
+            "candidates": [
+                {"id": match.member_id, "name": match.name, "score": match.score}
+                for match in lookup.matches
+            ],
+        },
+    }
+
+
+def similar_names(lookup: NameLookup) -> list[dict]:
+    """Nama lain yang juga mirip (ditampilkan sebagai alternatif)"""
+    return [{"id": match.member_id, "name": match.name, "score": match.score} for match in lookup.alternatives]
+
+
+# Handler: Detail Pengurus (Natural Language)
+def handle_member_detail(slots: dict, db: Session) -> dict | None:
+    """Detail pengurus berdasarkan nama"""
+    name = slots["person"]
     if name:
-        member = db.query(Member).filter(func.lower(Member.name).like(f"%{name.lower()}%")).first()
+        member, lookup = find_member_by_name(name, db)
+        if lookup.ambiguous:
+            return ambiguous_name_answer(name, lookup)
         if member:
             return {
                 "type": "specific_query",
@@ -165,40 +274,77 @@ def handle_detail_pengurus_query(query_lower: str, db: Session) -> dict | None:
                     "nama_perusahaan": member.nama_perusahaan,
                     "kategori_bidang_usaha": member.kategori_bidang_usaha,
                     "jmlh_karyawan": member.jmlh_karyawan,
+                    "similar_names": similar_names(lookup),
                 },
             }
     return None
 
 
-# Handler 6: Kontak Pengurus
-def handle_kontak_query(query_lower: str, db: Session) -> dict | None:
-    """Handle query tentang kontak pengurus"""
-    if not ("nomor" in query_lower or "wa" in query_lower or "whatsapp" in query_lower or "email" in query_lower or "kontak" in query_lower):
-        return None
-    
-    name_match = re.search(r"['\"]([^'\"]+)['\"]", query_lower)
-    if name_match:
-        name = name_match.group(1)
-        member = db.query(Member).filter(func.lower(Member.name).like(f"%{name.lower()}%")).first()
+# Handler: Kontak Pengurus
+def handle_member_contact(slots: dict, db: Session) -> dict | None:
+    """Kontak (WhatsApp, email) pengurus berdasarkan nama"""
+    name = slots["person"]
+    if name:
+        member, lookup = find_member_by_name(name, db)
+        if lookup.ambiguous:
+            return ambiguous_name_answer(name, lookup)
         if member:
             return {
                 "type": "specific_query",
                 "answer": f"**Kontak {member.name}:**\n- WhatsApp: {member.phone or 'Tidak tersedia'}\n- Email: {member.email or 'Tidak tersedia'}",
-                "data": {"name": member.name, "whatsapp": member.phone, "email": member.email},
+                "data": {
+                    "name": member.name,
+                    "whatsapp": member.phone,
+                    "email": member.email,
+                    "similar_names": similar_names(lookup),
+                },
             }
     return None
 
 
-# Handler 7: Perusahaan Pengurus
-def handle_perusahaan_query(query_lower: str, db: Session) -> dict | None:
-    """Handle query tentang perusahaan pengurus"""
-    if not ("perusahaan" in query_lower and "nama" in query_lower):
+def handle_member_contact_by_value(slots: dict, db: Session) -> dict | None:
+    """Kontak pengurus dengan jabatan/bidang usaha/status KTA tertentu (mis. ketua umum)"""
+    dimension, value = slots["dimension"], slots["value"]
+    conditions = [*slot_condition(slots, dimension, value), Member.name.isnot(None)]
+    members = (
+        db.query(Member.name, Member.jabatan, Member.phone, Member.email)
+        .filter(*conditions)
+        .order_by(Member.id)
+        .limit(CONTACTS_BY_VALUE_LIMIT + 1)
+        .all()
+    )
+    if not members:
         return None
-    
-    name_match = re.search(r"['\"]([^'\"]+)['\"]", query_lower)
-    if name_match:
-        name = name_match.group(1)
-        member = db.query(Member).filter(func.lower(Member.name).like(f"%{name.lower()}%")).first()
+    count = count_members(db, conditions) if len(members) > CONTACTS_BY_VALUE_LIMIT else len(members)
+    lines = [
+        f"- {m.name} ({m.jabatan or '-'}): WhatsApp {m.phone or 'Tidak tersedia'}, Email {m.email or 'Tidak tersedia'}"
+        for m in members[:CONTACTS_BY_VALUE_LIMIT]
+    ]
+    answer = f"**Kontak Pengurus dengan {VALUE_LABELS[dimension]} '{value}':**\n" + "\n".join(lines)
+    if count > CONTACTS_BY_VALUE_LIMIT:
+        answer += f"\n... dan {count - CONTACTS_BY_VALUE_LIMIT} pengurus lainnya"
+    return {
+        "type": "specific_query",
+        "answer": answer,
+        "data": {
+            dimension: value,
+            "count": count,
+            "contacts": [
+                {"name": m.name, "jabatan": m.jabatan, "whatsapp": m.phone, "email": m.email}
+                for m in members[:CONTACTS_BY_VALUE_LIMIT]
+            ],
+        },
+    }
+
+
+# Handler: Perusahaan Pengurus
+def handle_member_company(slots: dict, db: Session) -> dict | None:
+    """Perusahaan pengurus berdasarkan nama"""
+    name = slots["person"]
+    if name:
+        member, lookup = find_member_by_name(name, db)
+        if lookup.ambiguous:
+            return ambiguous_name_answer(name, lookup)
         if member:
             return {
                 "type": "specific_query",
@@ -208,92 +354,247 @@ def handle_perusahaan_query(query_lower: str, db: Session) -> dict | None:
                     "nama_perusahaan": member.nama_perusahaan,
                     "jabatan_perusahaan": member.jabatan_dlm_akta_perusahaan,
                     "bidang_usaha": member.kategori_bidang_usaha,
+                    "similar_names": similar_names(lookup),
                 },
             }
     return None
 
 
-# Handler 8: Total Karyawan
-def handle_total_karyawan_query(query_lower: str, db: Session) -> dict | None:
-    """Handle query tentang total karyawan"""
-    if "total" in query_lower and "karyawan" in query_lower:
-        total_karyawan = db.query(func.sum(Member.jmlh_karyawan)).scalar() or 0
-        pengurus_count = db.query(Member).filter(Member.jmlh_karyawan.isnot(None)).count()
+# Handler: Metadata dokumen (universal_documents)
+DOCUMENT_LIST_LIMIT = 10
+LATEST_DOCUMENTS_LIMIT = 5
+
+
+def document_type_label(document_type: str) -> str:
+    """Nama tipe dokumen yang mudah dibaca (mis. HIPMI_PO -> Peraturan Organisasi HIPMI)"""
+    return UniversalDocumentProcessor.get_document_category_info(document_type)["name"]
+
+
+def document_filter_label(slots: dict) -> str:
+    """Keterangan filter tipe/kategori untuk kalimat jawaban"""
+    parts = []
+    if slots.get("document_type"):
+        parts.append(f"tipe {document_type_label(slots['document_type'])}")
+    if slots.get("document_category"):
+        parts.append(f"kategori '{slots['document_category']}'")
+    return f" ({', '.join(parts)})" if parts else ""
+
+
+def document_line(doc: dict) -> str:
+    """Satu baris daftar dokumen: nama file, tipe, halaman, tanggal upload"""
+    details = [document_type_label(doc["document_type"])]
+    if doc["category"]:
+        details.append(doc["category"])
+    if doc["page_count"]:
+        details.append(f"{doc['page_count']} halaman")
+    if doc["uploaded_at"]:
+        details.append(f"diupload {doc['uploaded_at'][:10]}")
+    return f"- {doc['filename']} ({', '.join(details)})"
+
+
+def handle_document_count(slots: dict, db: Session) -> dict | None:
+    """Jumlah dokumen, opsional per tipe/kategori yang disebut"""
+    document_type, category = slots.get("document_type"), slots.get("document_category")
+    count = count_documents(db, document_type, category)
+    answer = f"Jumlah dokumen{document_filter_label(slots)}: **{count} dokumen**"
+    data = {"document_type": document_type, "category": category, "count": count}
+    if not document_type and not category and count:
+        by_type = count_by_type(db)
+        answer += "\n" + "\n".join(f"- {document_type_label(t)}: {c} dokumen" for t, c in by_type.items())
+        data["by_type"] = by_type
+    return {"type": "specific_query", "answer": answer, "data": data}
+
+
+def handle_document_types(slots: dict, db: Session) -> dict | None:
+    """Jumlah dokumen per tipe dan per kategori"""
+    by_type = count_by_type(db)
+    if not by_type:
+        return {"type": "specific_query", "answer": "Belum ada dokumen di knowledge base.", "data": {"by_type": {}}}
+    by_category = count_by_category(db)
+    answer = "**Jumlah Dokumen per Tipe:**\n" + "\n".join(
+        f"- {document_type_label(t)}: {c} dokumen" for t, c in by_type.items()
+    )
+    if by_category:
+        answer += "\n\n**Jumlah Dokumen per Kategori:**\n" + "\n".join(
+            f"- {category}: {c} dokumen" for category, c in by_category.items()
+        )
+    return {"type": "specific_query", "answer": answer, "data": {"by_type": by_type, "by_category": by_category}}
+
+
+def handle_document_list(slots: dict, db: Session) -> dict | None:
+    """Daftar dokumen (terbaru dulu), opsional per tipe/kategori"""
+    document_type, category = slots.get("document_type"), slots.get("document_category")
+    count = count_documents(db, document_type, category)
+    if not count:
         return {
             "type": "specific_query",
-            "answer": f"**Total Jumlah Karyawan:**\n- Total karyawan dari semua perusahaan pengurus: **{total_karyawan:,} karyawan**\n- Dari {pengurus_count} pengurus yang memiliki data karyawan",
-            "data": {"total_karyawan": total_karyawan, "pengurus_with_data": pengurus_count},
+            "answer": f"Belum ada dokumen{document_filter_label(slots)} di knowledge base.",
+            "data": {"count": 0, "documents": []},
         }
-    return None
+    documents = latest_documents(db, DOCUMENT_LIST_LIMIT, document_type, category)
+    answer = f"**Daftar Dokumen{document_filter_label(slots)}** ({count} dokumen):\n" + "\n".join(
+        document_line(doc) for doc in documents
+    )
+    if count > DOCUMENT_LIST_LIMIT:
+        answer += f"\n... dan {count - DOCUMENT_LIST_LIMIT} dokumen lainnya"
+    return {"type": "specific_query", "answer": answer, "data": {"count": count, "documents": documents}}
+
+
+def handle_document_latest(slots: dict, db: Session) -> dict | None:
+    """Dokumen yang terakhir di-upload"""
+    documents = latest_documents(
+        db, LATEST_DOCUMENTS_LIMIT, slots.get("document_type"), slots.get("document_category")
+    )
+    if not documents:
+        return {
+            "type": "specific_query",
+            "answer": f"Belum ada dokumen{document_filter_label(slots)} yang di-upload.",
+            "data": {"documents": []},
+        }
+    latest = documents[0]
+    uploaded = latest["uploaded_at"][:16].replace("T", " ") if latest["uploaded_at"] else "tidak diketahui"
+    answer = f"Upload terakhir{document_filter_label(slots)}: **{latest['filename']}** ({uploaded})"
+    if len(documents) > 1:
+        answer += "\n\n**Dokumen terbaru lainnya:**\n" + "\n".join(document_line(doc) for doc in documents[1:])
+    return {"type": "specific_query", "answer": answer, "data": {"documents": documents}}
+
+
+def handle_document_pages(slots: dict, db: Session) -> dict | None:
+    """Total halaman dokumen, opsional per tipe/kategori"""
+    totals = page_totals(db, slots.get("document_type"), slots.get("document_category"))
+    answer = (
+        f"Total halaman{document_filter_label(slots)}: **{totals['total_pages']} halaman** "
+        f"dari {totals['documents']} dokumen"
+    )
+    if totals["longest"]:
+        longest = totals["longest"]
+        answer += f"\n- Dokumen terpanjang: {longest['filename']} ({longest['page_count']} halaman)"
+    return {"type": "specific_query", "answer": answer, "data": totals}
+
+
+def handle_document_search(slots: dict, db: Session) -> dict | None:
+    """Dokumen yang menyebut kata tertentu (search_index) atau bertipe sesuai"""
+    topic = slots["topic"]
+    result = search_document_mentions(db, topic, slots.get("document_type"), DOCUMENT_LIST_LIMIT)
+    if not result["count"]:
+        return None
+    answer = f"**Dokumen tentang '{topic}'** ({result['count']} dokumen):\n" + "\n".join(
+        document_line(doc) for doc in result["documents"]
+    )
+    if result["count"] > DOCUMENT_LIST_LIMIT:
+        answer += f"\n... dan {result['count'] - DOCUMENT_LIST_LIMIT} dokumen lainnya"
+    return {"type": "specific_query", "answer": answer, "data": {"topic": topic, **result}}
+
+
+INTENT_HANDLERS = {
+    "jabatan_count": handle_jabatan_count,
+    "jabatan_distribution": handle_jabatan_distribution,
+    "bidang_usaha_top": handle_bidang_usaha_top,
+    "bidang_usaha_count": handle_bidang_usaha_count,
+    "bidang_usaha_distribution": handle_bidang_usaha_distribution,
+    "status_kta_count": handle_status_kta_count,
+    "status_kta_distribution": handle_status_kta_distribution,
+    "gender_ratio": handle_gender_ratio,
+    "total_karyawan": handle_total_karyawan,
+    "total_pengurus": handle_total_pengurus,
+    "members_by_value": handle_members_by_value,
+    "member_detail": handle_member_detail,
+    "member_contact": handle_member_contact,
+    "member_contact_by_value": handle_member_contact_by_value,
+    "member_company": handle_member_company,
+    "document_count": handle_document_count,
+    "document_types": handle_document_types,
+    "document_list": handle_document_list,
+    "document_latest": handle_document_latest,
+    "document_pages": handle_document_pages,
+    "document_search": handle_document_search,
+}
+
+
+def prepare_intent_router(db: Session) -> None:
+    """Update gazetteer intent router dengan nilai data terbaru (di-cache jika sama)"""
+    gazetteer = get_dimension_values(db, VALUE_DIMENSIONS)
+    gazetteer["document_category"] = get_document_categories(db)
+    intent_router.set_gazetteer(gazetteer)
 
 
 def detect_specific_query(query: str, db: Session) -> dict | None:
-    """Deteksi dan jawab query spesifik dengan 8 handlers"""
-    query_lower = query.lower()
-    
-    handlers = [
-        handle_jabatan_query,
-        lambda q, db: handle_bidang_usaha_query(q, db),
-        lambda q, db: handle_kta_query(q, query, db),
-        handle_gender_query,
-        handle_detail_pengurus_query,
-        handle_kontak_query,
-        handle_perusahaan_query,
-        handle_total_karyawan_query,
-    ]
-    
-    for handler in handlers:
-        result = handler(query_lower, db)
+    """
+    Deteksi dan jawab query spesifik lewat intent router
+
+    Intent dicoba dari skor tertinggi; handler yang return None (mis. nama tidak
+    ditemukan) membuat intent berikutnya dicoba, lalu fallback ke AI.
+    """
+    prepare_intent_router(db)
+    for match in intent_router.route(query):
+        result = INTENT_HANDLERS[match.intent](match.slots, db)
         if result:
+            result["intent"] = match.intent
             return result
-    
+
     return None
 
 
-def build_ai_context(db: Session) -> tuple:
-    """Build context untuk AI dari database, return (context_string, members_count, docs_count)"""
-    # Get data
-    members = db.query(Member).all()
+# Perusahaan terbanyak yang ditampilkan saat budget daftar pengurus tidak terpakai
+TOP_COMPANIES_LIMIT = 10
+
+
+def build_member_section(db: Session, parsed: Optional[ParsedQuery], aggregates: dict) -> str:
+    """
+    Bagian DAFTAR PENGURUS di prompt
+
+    Berisi pengurus yang disebut di pertanyaan (nama, perusahaan, jabatan, bidang,
+    status KTA); sisa budget diisi ringkasan agregat, bukan row acak.
+    """
+    selection = select_context_members(db, parsed)
+    lines = []
+    if selection.members:
+        lines.append(f"DAFTAR PENGURUS (relevan dengan pertanyaan: {', '.join(selection.matched)}):")
+        lines.append(encode_members(selection.members))
+        for label, total in selection.value_totals.items():
+            lines.append(f"- Total pengurus dengan {label}: {total}")
+    else:
+        lines.append(
+            "DAFTAR PENGURUS: tidak ada nama/perusahaan/jabatan yang disebut di pertanyaan. "
+            f"Data lengkap {aggregates['with_name']} pengurus ada di database; gunakan statistik."
+        )
+
+    if selection.remaining:
+        top_companies = get_dimension_counts(
+            db, "perusahaan", include_unknown=False, limit=min(TOP_COMPANIES_LIMIT, selection.remaining)
+        )
+        lines.append("")
+        lines.append("RINGKASAN PENGURUS:")
+        lines.append(f"- Distribusi Usia: {encode_counts(aggregates['age_distribution'])}")
+        lines.append(f"- Kepemilikan Perusahaan: {encode_counts(aggregates['company_ownership'])}")
+        lines.append(f"- Jumlah Perusahaan Unik: {aggregates['total_perusahaan']}")
+        lines.append(f"- Pengurus dengan Data Karyawan: {aggregates['pengurus_with_karyawan']}")
+        if top_companies:
+            lines.append(f"- Perusahaan dengan Pengurus Terbanyak: {encode_counts(top_companies)}")
+    return "\n".join(lines)
+
+
+def build_ai_context(db: Session, parsed: Optional[ParsedQuery] = None) -> tuple:
+    """
+    Build context untuk AI dari database, return (context_string, members_count, docs_count)
+
+    parsed: hasil intent_router.parse(pertanyaan), untuk memilih pengurus yang relevan
+    """
+    # Stats pengurus dari tabel ringkasan
+    aggregates = get_member_aggregates(db)
     documents = db.query(UniversalDocument).all()
     
-    # Stats pengurus
     members_stats = {
-        "total": len(members),
-        "jabatan": {},
-        "bidang_usaha": {},
-        "status_kta": {},
-        "gender": {"Male": 0, "Female": 0},
-        "total_karyawan": 0,
+        "total": aggregates["total_pengurus"],
+        "jabatan": aggregates["by_jabatan"],
+        "bidang_usaha": aggregates["by_bidang_usaha"],
+        "status_kta": aggregates["by_status_kta"],
+        "gender": gender_counts(aggregates),
+        "total_karyawan": aggregates["total_karyawan"],
     }
     
-    members_list = []
-    for m in members:
-        # Count stats
-        jabatan = m.jabatan or "Tidak Diketahui"
-        members_stats["jabatan"][jabatan] = members_stats["jabatan"].get(jabatan, 0) + 1
-        
-        bidang = m.kategori_bidang_usaha or "Tidak Diketahui"
-        members_stats["bidang_usaha"][bidang] = members_stats["bidang_usaha"].get(bidang, 0) + 1
-        
-        status = m.status_kta or "Tidak Diketahui"
-        members_stats["status_kta"][status] = members_stats["status_kta"].get(status, 0) + 1
-        
-        if m.jenis_kelamin:
-            members_stats["gender"][m.jenis_kelamin] = members_stats["gender"].get(m.jenis_kelamin, 0) + 1
-        
-        if m.jmlh_karyawan:
-            members_stats["total_karyawan"] += m.jmlh_karyawan
-        
-        # Build member list untuk AI
-        if m.name:
-            member_info = f"- {m.name}"
-            if m.jabatan:
-                member_info += f" (Jabatan: {m.jabatan})"
-            if m.nama_perusahaan:
-                member_info += f", Perusahaan: {m.nama_perusahaan}"
-            if m.kategori_bidang_usaha:
-                member_info += f", Bidang: {m.kategori_bidang_usaha}"
-            members_list.append(member_info)
+    # Pengurus yang relevan dengan pertanyaan (lookup ber-index) + ringkasan agregat
+    member_section = build_member_section(db, parsed, aggregates)
     
     # Stats dokumen
     docs_stats = {"total": len(documents), "types": {}, "categories": {}}
@@ -311,18 +612,16 @@ STATISTIK PENGURUS:
 - Total Pengurus: {members_stats['total']}
 - Total Karyawan (semua perusahaan): {members_stats['total_karyawan']:,}
 - Gender: {members_stats['gender']['Male']} Pria, {members_stats['gender']['Female']} Wanita
-- Distribusi Jabatan: {members_stats['jabatan']}
-- Distribusi Bidang Usaha: {members_stats['bidang_usaha']}
-- Status KTA: {members_stats['status_kta']}
+- Distribusi Jabatan: {encode_counts(members_stats['jabatan'])}
+- Distribusi Bidang Usaha: {encode_counts(members_stats['bidang_usaha'])}
+- Status KTA: {encode_counts(members_stats['status_kta'])}
 
-DAFTAR PENGURUS:
-{chr(10).join(members_list[:50])}  
-{"... (dan " + str(len(members_list) - 50) + " pengurus lainnya)" if len(members_list) > 50 else ""}
+{member_section}
 
 DOKUMEN HIPMI:
 - Total Dokumen: {docs_stats['total']}
-- Tipe Dokumen: {docs_stats['types']}
-- Kategori: {docs_stats['categories']}
+- Tipe Dokumen: {encode_counts(docs_stats['types'])}
+- Kategori: {encode_counts(docs_stats['categories'])}
 
 ===========================
 """
@@ -362,12 +661,13 @@ DOKUMEN HIPMI:
     if len(context) > 25000:
         context = context[:25000] + "\n\n[Context truncated...]"
     
-    return context, len(members), len(documents)
+    return context, aggregates["total_pengurus"], len(documents)
 
 
 @router.post("/query")
 async def chat_query(request: ChatQuerySchema, db: Session = Depends(get_db)):
     """Endpoint chatbot AI dengan deteksi query spesifik + knowledge base"""
+    request_started = time.monotonic()
     try:
         # Step 1: Check specific queries (fast path)
         specific_result = detect_specific_query(request.query, db)
@@ -378,18 +678,41 @@ async def chat_query(request: ChatQuerySchema, db: Session = Depends(get_db)):
                 "response": specific_result["answer"],
                 "source": "Direct Database Query",
                 "query_type": "specific",
+                "intent": specific_result.get("intent"),
                 "data": specific_result.get("data", {}),
             }
         
-        # Step 2: Build context untuk AI
+        # Step 2: Jawaban AI dari cache (pertanyaan sama/mirip, data belum berubah).
+        # Context custom dari client tidak di-cache.
+        data_version = None
+        if not request.context:
+            data_version = knowledge_base_version(db)
+            cached = chat_answer_cache.get(request.query, data_version)
+            if cached:
+                entry, match, similarity = cached
+                return {
+                    **entry.response,
+                    "query": request.query,
+                    "cached": True,
+                    "cache": {
+                        "match": match,
+                        "similarity": similarity,
+                        "cached_query": entry.query,
+                        "age_seconds": round(entry.age_seconds(), 1),
+                    },
+                }
+
+        # Step 3: Build context untuk AI
+        started = time.perf_counter()
         context = request.context or ""
         members_count = 0
         docs_count = 0
         
         if not context:
-            context, members_count, docs_count = build_ai_context(db)
+            # Gazetteer sudah di-update oleh detect_specific_query
+            context, members_count, docs_count = build_ai_context(db, intent_router.parse(request.query))
         
-        # Step 3: Call Gemini AI
+        # Step 4: Call Gemini AI
         gemini = GeminiService()
         enhanced_query = f"""Berdasarkan data HIPMI (pengurus, dokumen organisasi, dan peraturan) yang tersedia, jawab pertanyaan berikut:
 
@@ -398,6 +721,7 @@ Pertanyaan: {request.query}
 Instruksi:
 - Gunakan DAFTAR PENGURUS untuk pertanyaan tentang nama, jabatan, perusahaan pengurus tertentu
 - Contoh: "Ibrahim jabatannya apa?" → cari di daftar pengurus nama "Ibrahim"
+- DAFTAR PENGURUS berupa tabel (kolom dipisah "|"); kode seperti J1/B1 diartikan lewat baris KODE di atas tabel
 - Gunakan data statistik untuk pertanyaan tentang angka/jumlah
 - Gunakan isi dokumen untuk pertanyaan tentang peraturan, sejarah, visi/misi, dll
 - Jika informasi tidak tersedia, katakan "Saya tidak memiliki informasi tersebut dalam database"
@@ -407,9 +731,11 @@ Instruksi:
 - Untuk nama pengurus, gunakan nama lengkap yang ada di daftar
 """
         
-        response = gemini.answer_question(enhanced_query, context)
+        # Deadline dihitung dari request masuk (termasuk waktu build context)
+        with request_deadline(CHAT_REQUEST_DEADLINE_SECONDS, started=request_started):
+            response = await gemini.answer_question_async(enhanced_query, context)
         
-        return {
+        result = {
             "status": "success",
             "query": request.query,
             "response": response,
@@ -419,16 +745,25 @@ Instruksi:
             "documents_count": docs_count,
             "context_size": len(context),
         }
+        if data_version and is_cacheable_answer(response):
+            chat_answer_cache.put(
+                request.query, data_version, result, (time.perf_counter() - started) * 1000
+            )
+        return result
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chat query failed: {str(e)}")
 
 
 @router.get("/context")
-async def get_chat_context(db: Session = Depends(get_db)):
-    """Get AI context summary untuk debugging"""
+async def get_chat_context(query: Optional[str] = None, db: Session = Depends(get_db)):
+    """Get AI context summary untuk debugging (opsional: context untuk pertanyaan `query`)"""
     try:
-        context, members_count, docs_count = build_ai_context(db)
+        parsed = None
+        if query:
+            prepare_intent_router(db)
+            parsed = intent_router.parse(query)
+        context, members_count, docs_count = build_ai_context(db, parsed)
         return {
             "status": "success",
             "members_count": members_count,
@@ -438,3 +773,16 @@ async def get_chat_context(db: Session = Depends(get_db)):
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get context: {str(e)}")
+
+
+@router.get("/cache/stats")
+async def get_chat_cache_stats():
+    """Statistik cache jawaban AI: hit ratio, eviction, latency yang dihemat"""
+    return {"status": "success", "cache": chat_answer_cache.get_stats()}
+
+
+@router.delete("/cache")
+async def clear_chat_cache():
+    """Kosongkan cache jawaban AI"""
+    chat_answer_cache.clear()
+    return {"status": "success", "message": "Chat answer cache cleared"}
@@ -1,137 +1,206 @@
-from fastapi import APIRouter, File, UploadFile, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, File, UploadFile, Depends, HTTPException
 from sqlalchemy.orm import Session
+from app.core.config import MEMBER_IMPORT_PARSER
 from app.core.database import get_db
-from app.models.member import Member
-import csv
-import io
+from app.services.member_import import (
+    get_import_progress,
+    import_members_csv,
+    list_import_progress,
+    sync_members_csv,
+)
+from app.services.member_import_columnar import import_members_csv_columnar
+from app.services.member_aggregation import get_total
+from app.services.member_query import (
+    DEFAULT_PAGE_SIZE,
+    build_member_filters,
+    count_members,
+    fetch_member_page,
+    parse_fields,
+)
+from app.services.analytics_scheduler import mark_analytics_dirty
+from app.services.member_name_search import refresh_member_name_index_in_background
+from app.services.work_scheduler import cpu_scheduler
+from typing import Optional
 
 router = APIRouter(prefix="/api/members", tags=["members"])
 
 
-def parse_int_field(value: str) -> int | None:
-    """Parse string ke integer, return None jika gagal"""
-    if not value:
-        return None
-    try:
-        val = value.strip()
-        return int(val) if val.isdigit() else None
-    except:
-        return None
-
-
-def get_str_field(row: dict, key: str) -> str | None:
-    """Ambil field string dari row, return None jika kosong"""
-    val = row.get(key, "").strip()
-    return val if val else None
-
-
 @router.post("/upload-csv")
-async def upload_members_csv(
-    file: UploadFile = File(...), db: Session = Depends(get_db)
+def upload_members_csv(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    import_id: Optional[str] = None,
+    mode: str = "append",
+    delete_missing: bool = False,
+    parser: str = MEMBER_IMPORT_PARSER,
+    db: Session = Depends(get_db),
 ):
-    """Upload CSV data pengurus HIPMI"""
+    """
+    Upload CSV data pengurus HIPMI
+
+    mode=append: semua row di-insert (streaming, commit per batch)
+    mode=sync  : upsert berdasarkan no_kta/email/nama, row yang tidak berubah
+                 dilewati; delete_missing=true menghapus pengurus yang tidak ada di CSV
+    parser     : columnar (pandas, default) atau rows untuk mode append
+    """
     if not file.filename or not file.filename.lower().endswith(".csv"):
         raise HTTPException(status_code=400, detail="Only CSV files are allowed")
+    if mode not in ("append", "sync"):
+        raise HTTPException(status_code=400, detail="mode must be 'append' or 'sync'")
+    if parser not in ("columnar", "rows"):
+        raise HTTPException(
+            status_code=400, detail="parser must be 'columnar' or 'rows'"
+        )
 
     try:
-        contents = await file.read()
-        stream = io.StringIO(contents.decode("utf-8"))
-        reader = csv.DictReader(stream)
-
-        # Bersihkan header (trim spasi)
-        reader.fieldnames = [f.strip() if f else f for f in reader.fieldnames]
-
-        imported_count = 0
-        errors = []
-
-        for row_num, row in enumerate(reader, 1):
-            try:
-                member = Member(
-                    no=parse_int_field(row.get("no", "")),
-                    name=get_str_field(row, "nama"),
-                    jabatan=get_str_field(row, "jabatan"),
-                    status_kta=get_str_field(row, "status_kta"),
-                    no_kta=get_str_field(row, "no_kta"),
-                    tanggal_lahir=get_str_field(row, "tanggal_lahir"),
-                    usia=parse_int_field(row.get("usia", "")),
-                    jenis_kelamin=get_str_field(row, "jenis_kelamin"),
-                    phone=get_str_field(row, "whatsapp"),
-                    email=get_str_field(row, "email"),
-                    instagram=get_str_field(row, "instagram"),
-                    nama_perusahaan=get_str_field(row, "nama_perusahaan"),
-                    jabatan_dlm_akta_perusahaan=get_str_field(
-                        row, "jabatan_dlm_akta_perusahaan"
-                    ),
-                    kategori_bidang_usaha=get_str_field(row, "kategori_bidang_usaha"),
-                    alamat_perusahaan=get_str_field(row, "alamat_perusahaan"),
-                    perusahaan_berdiri_sejak=get_str_field(
-                        row, "perusahaan_berdiri_sejak"
-                    ),
-                    jmlh_karyawan=parse_int_field(row.get("jmlh_karyawan", "")),
-                    website=get_str_field(row, "website"),
-                    twitter=get_str_field(row, "twitter"),
-                    facebook=get_str_field(row, "facebook"),
-                    youtube=get_str_field(row, "youtube"),
-                    # Backward compatibility
-                    position=get_str_field(row, "jabatan"),
-                    organization=get_str_field(row, "kategori_bidang_usaha"),
+        # Parsing CSV berebut CPU dengan ekstraksi PDF/refresh analytics
+        with cpu_scheduler.slot():
+            if mode == "sync":
+                result = sync_members_csv(
+                    db,
+                    file.file,
+                    filename=file.filename,
+                    import_id=import_id,
+                    delete_missing=delete_missing,
+                )
+            elif parser == "columnar":
+                result = import_members_csv_columnar(
+                    db, file.file, filename=file.filename, import_id=import_id
                 )
-                db.add(member)
-                imported_count += 1
-            except Exception as e:
-                errors.append(f"Row {row_num}: {str(e)}")
+            else:
+                result = import_members_csv(
+                    db, file.file, filename=file.filename, import_id=import_id
+                )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
-        db.commit()
+    import_status = result.pop("status")
+    completed = import_status == "completed"
+    if mode == "sync":
+        diff = result["diff"]
+        # Sync satu transaksi: jika gagal tidak ada yang ter-commit
+        changed = diff["inserted"] + diff["updated"] + diff["deleted"] if completed else 0
+        changed += diff["duplicates_removed"] if completed else 0
+        if completed:
+            message = (
+                f"Synced pengurus from CSV: {diff['inserted']} inserted, "
+                f"{diff['updated']} updated, {diff['unchanged']} unchanged, "
+                f"{diff['deleted']} deleted"
+            )
+        else:
+            message = "Sync pengurus from CSV failed, no changes were saved"
+    else:
+        # Append commit per batch: batch sebelum error tetap tersimpan
+        changed = result["imported"]
+        if completed:
+            message = f"Successfully imported {result['imported']} pengurus from CSV"
+        else:
+            message = (
+                f"Import pengurus from CSV failed; "
+                f"{result['imported']} pengurus saved before the error"
+            )
+    if changed:
+        mark_analytics_dirty()
+        # Index nama untuk fuzzy search di chat (pengurus baru)
+        background_tasks.add_task(refresh_member_name_index_in_background)
 
-        return {
-            "status": "success",
-            "imported": imported_count,
-            "errors": errors if errors else None,
-            "message": f"Successfully imported {imported_count} pengurus from CSV",
-        }
+    return {
+        **result,
+        "status": "success" if completed else "error",
+        "import_status": import_status,
+        "errors": result["errors"] if result["errors"] else None,
+        "message": message,
+    }
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
+
+@router.get("/imports")
+async def list_member_imports():
+    """Daftar progress import CSV terakhir"""
+    return {"status": "success", "imports": list_import_progress()}
+
+
+@router.get("/imports/{import_id}")
+async def get_member_import(import_id: str):
+    """Progress import CSV (bisa di-poll selama upload berjalan)"""
+    progress = get_import_progress(import_id)
+    if not progress:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return {"status": "success", "import": progress}
+
+
+@router.get("/search")
+def search_members(
+    jabatan: Optional[str] = None,
+    kategori_bidang_usaha: Optional[str] = None,
+    status_kta: Optional[str] = None,
+    jenis_kelamin: Optional[str] = None,
+    usia_min: Optional[int] = None,
+    usia_max: Optional[int] = None,
+    perusahaan: Optional[str] = None,
+    cursor: Optional[int] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    fields: Optional[str] = None,
+    include_total: bool = True,
+    db: Session = Depends(get_db),
+):
+    """
+    Cari pengurus dengan filter (semua filter digabung dengan AND)
+
+    - jabatan, kategori_bidang_usaha, status_kta, jenis_kelamin: nilai persis
+    - usia_min, usia_max: rentang usia (inklusif)
+    - perusahaan: prefix nama perusahaan (case-insensitive)
+    - cursor, limit, fields, include_total: sama dengan GET /api/members
+    """
+    try:
+        columns = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    conditions = build_member_filters(
+        jabatan=jabatan,
+        kategori_bidang_usaha=kategori_bidang_usaha,
+        status_kta=status_kta,
+        jenis_kelamin=jenis_kelamin,
+        usia_min=usia_min,
+        usia_max=usia_max,
+        perusahaan_prefix=perusahaan,
+    )
+    page = fetch_member_page(
+        db, columns, cursor=cursor, limit=limit, conditions=conditions
+    )
+
+    return {
+        "status": "success",
+        "total": count_members(db, conditions) if include_total else None,
+        **page,
+    }
 
 
 @router.get("/")
-async def list_members(db: Session = Depends(get_db)):
-    """Ambil semua data pengurus"""
-    members = db.query(Member).all()
+def list_members(
+    cursor: Optional[int] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    fields: Optional[str] = None,
+    include_total: bool = True,
+    db: Session = Depends(get_db),
+):
+    """
+    Ambil data pengurus per halaman (keyset pagination urut id)
+
+    - cursor: next_cursor dari response sebelumnya
+    - limit: jumlah row per halaman (maks 1000)
+    - fields: kolom yang diambil, dipisah koma (mis. name,jabatan); id selalu ikut
+    - include_total: false untuk melewati hitung total
+    """
+    try:
+        columns = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    page = fetch_member_page(db, columns, cursor=cursor, limit=limit)
 
     return {
         "status": "success",
-        "total": len(members),
-        "data": [
-            {
-                "id": m.id,
-                "no": m.no,
-                "name": m.name,
-                "email": m.email,
-                "phone": m.phone,
-                "jabatan": m.jabatan,
-                "status_kta": m.status_kta,
-                "no_kta": m.no_kta,
-                "tanggal_lahir": m.tanggal_lahir,
-                "usia": m.usia,
-                "jenis_kelamin": m.jenis_kelamin,
-                "instagram": m.instagram,
-                "nama_perusahaan": m.nama_perusahaan,
-                "jabatan_dlm_akta_perusahaan": m.jabatan_dlm_akta_perusahaan,
-                "kategori_bidang_usaha": m.kategori_bidang_usaha,
-                "alamat_perusahaan": m.alamat_perusahaan,
-                "perusahaan_berdiri_sejak": m.perusahaan_berdiri_sejak,
-                "jmlh_karyawan": m.jmlh_karyawan,
-                "website": m.website,
-                "twitter": m.twitter,
-                "facebook": m.facebook,
-                "youtube": m.youtube,
-                "position": m.position,
-                "organization": m.organization,
-                "status": m.status,
-                "region": m.region,
-                "entry_year": m.entry_year,
-            }
-            for m in members
-        ],
+        "total": get_total(db, "pengurus") if include_total else None,
+        **page,
     }
@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from app.core.metrics import CONTENT_TYPE, registry
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """
+    📈 PROMETHEUS METRICS
+
+    Format teks Prometheus: latency request per route, query SQL per request,
+    ekstraksi PDF (per halaman/dokumen, halaman/detik), latency dan token Gemini,
+    hit ratio cache dan kedalaman antrian.
+    """
+    return Response(registry.render(), media_type=CONTENT_TYPE)
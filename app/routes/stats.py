@@ -1,11 +1,22 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from app.core.database import get_db
-from app.models.member import Member
+from app.services.member_aggregation import get_total
 from app.models.universal_document import UniversalDocument
+from app.services.gemini_service import gemini_single_flight
+from app.services.gemini_resilience import gemini_caller
+from app.services.work_scheduler import cpu_scheduler, gemini_scheduler
+from app.services.gemini_telemetry import gemini_telemetry
+from app.services import model_router
+from app.core.config import GEMINI_TOKEN_BUDGETS
+from app.core.sql_profiler import sql_profiler
 
 router = APIRouter(prefix="/api/stats", tags=["stats"])
 
+# Endpoint admin (isi ring buffer SQL profiler memuat parameter query); hanya
+# di-include saat DEBUG atau ADMIN_ENDPOINTS_ENABLED, selain itu 404
+admin_router = APIRouter(prefix="/api/stats", tags=["stats"])
+
 
 @router.get("/overview")
 async def get_stats_overview(db: Session = Depends(get_db)):
@@ -26,8 +37,8 @@ async def get_stats_overview(db: Session = Depends(get_db)):
         db.query(UniversalDocument).filter(UniversalDocument.processed == True).count()
     )
 
-    # Count members
-    total_members = db.query(Member).count()
+    # Count members (dari tabel ringkasan)
+    total_members = get_total(db, "pengurus")
 
     # Get latest document
     latest_doc = (
@@ -54,3 +65,97 @@ async def get_stats_overview(db: Session = Depends(get_db)):
             ),
         },
     }
+
+
+@router.get("/gemini")
+async def get_gemini_stats():
+    """
+    🤖 GEMINI CALL STATS
+
+    Counter panggilan Gemini:
+    - single_flight: panggilan yang benar-benar dikirim (executed) dan yang ikut
+      menunggu panggilan identik yang sedang berjalan (coalesced)
+    - resilience: percobaan, retry, deadline habis, status circuit breaker
+    """
+    return {
+        "status": "success",
+        "single_flight": gemini_single_flight.get_stats(),
+        "resilience": gemini_caller.get_stats(),
+        "lanes": gemini_scheduler.get_stats(),
+    }
+
+
+@router.get("/gemini/tokens")
+async def get_gemini_token_stats():
+    """
+    🔢 GEMINI TOKEN & LATENCY
+
+    Per caller (chat, analytics_members/documents/overview, summarization,
+    document_summary, extraction): jumlah panggilan, token prompt/jawaban dari
+    usage_metadata, histogram latency dan token, rata-rata latency per ukuran
+    prompt, serta berapa kali context dikecilkan karena budget token.
+    """
+    return {
+        "status": "success",
+        "budgets": GEMINI_TOKEN_BUDGETS,
+        **gemini_telemetry.get_stats(),
+    }
+
+
+@router.get("/gemini/routes")
+async def get_gemini_route_stats():
+    """
+    🧭 GEMINI MODEL ROUTING
+
+    Policy routing model (model utama/ringan, tier per caller, batas token dan
+    target latency) + statistik per route (caller:model): panggilan, token,
+    estimasi biaya (USD), latency dan alasan routing.
+    """
+    return {
+        "status": "success",
+        "policy": model_router.get_policy(),
+        "routes": gemini_telemetry.get_stats()["routes"],
+    }
+
+
+@router.get("/work-queues")
+async def get_work_queue_stats():
+    """
+    🚦 PRIORITY LANES
+
+    Antrian per lane (interactive vs background) untuk slot Gemini dan CPU
+    (ekstraksi PDF, import CSV, refresh analytics): kedalaman antrian, pekerjaan
+    yang sedang berjalan dan waktu tunggu (p50/p95/max).
+    """
+    return {
+        "status": "success",
+        "gemini": gemini_scheduler.get_stats(),
+        "cpu": cpu_scheduler.get_stats(),
+    }
+
+
+@admin_router.get("/sql")
+async def get_sql_profiles(
+    limit: int = Query(50, ge=1, le=500),
+    n_plus_one: bool = Query(False, description="Hanya request dengan pola N+1"),
+    min_statements: int = Query(0, ge=0),
+):
+    """
+    🐢 SQL PROFILER
+
+    Ringkasan SQL request terbaru (ring buffer, terbaru dulu): jumlah statement,
+    waktu DB, baris yang di-fetch, bentuk statement yang berulang (N+1) dan
+    query lambat beserta parameternya.
+    """
+    return {
+        "status": "success",
+        "profiler": sql_profiler.get_stats(),
+        "requests": sql_profiler.recent(limit, n_plus_one, min_statements),
+    }
+
+
+@admin_router.delete("/sql")
+async def clear_sql_profiles():
+    """Kosongkan ring buffer SQL profiler"""
+    sql_profiler.clear()
+    return {"status": "success"}
@@ -8,8 +8,11 @@ from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.services.universal_document_service import UniversalDocumentService
 from app.services.universal_document_processor import UniversalDocumentProcessor
+from app.services.analytics_scheduler import mark_analytics_dirty
+from app.services import ai_enrichment
 from pathlib import Path
 from typing import List, Optional
+import asyncio
 import os
 
 router = APIRouter(prefix="/api/documents", tags=["universal-documents"])
@@ -32,7 +35,7 @@ async def upload_any_document(
     - Detect document type
     - Extract tables
     - Find emails, dates, phone numbers
-    - Generate AI summary (optional, set generate_ai_summary=true)
+    - Queue AI summary (optional, set generate_ai_summary=true)
     - Create searchable index
 
     Examples of supported documents:
@@ -47,7 +50,8 @@ async def upload_any_document(
 
     Performance:
     - generate_ai_summary=false (default): Fast upload, ~2-5 seconds for 1MB
-    - generate_ai_summary=true: Slower, adds 10-30 seconds for AI processing
+    - generate_ai_summary=true: Same upload time; the AI summary is generated by
+      the background enrichment worker (poll ai_status: pending -> done/failed)
     """
     if file.filename is None or not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files are allowed")
@@ -84,9 +88,11 @@ async def upload_any_document(
         tags_list = [tag.strip() for tag in tags.split(",")] if tags else []
 
         # Process and save to knowledge base
-        # OPTIMIZATION: If generate_ai_summary=True, we still do it synchronously
-        # but you can change this to background task using FastAPI BackgroundTasks
-        document = UniversalDocumentService.process_and_save_document(
+        # generate_ai_summary=True hanya mengantrikan dokumen untuk worker enrichment.
+        # Ekstraksi berjalan di thread (bisa menunggu slot CPU) supaya event loop
+        # tetap melayani request lain
+        document = await asyncio.to_thread(
+            UniversalDocumentService.process_and_save_document,
             db=db,
             file_path=str(file_path),
             filename=file.filename,
@@ -95,6 +101,7 @@ async def upload_any_document(
             tags=tags_list,
             generate_ai_summary=generate_ai_summary,
         )
+        mark_analytics_dirty()
 
         # Get document type info
         type_info = UniversalDocumentProcessor.get_document_category_info(
@@ -118,6 +125,7 @@ async def upload_any_document(
                     len(document.tables_data) > 0 if document.tables_data else False
                 ),
                 "processed": document.processed,
+                "ai_status": document.ai_status,
                 "uploaded_at": (
                     document.uploaded_at.isoformat() if document.uploaded_at else None
                 ),
@@ -218,6 +226,8 @@ async def delete_document(document_id: int, db: Session = Depends(get_db)):
     if not success:
         raise HTTPException(status_code=404, detail="Document not found")
 
+    mark_analytics_dirty()
+
     return {"status": "success", "message": "Document deleted successfully"}
 
 
@@ -235,6 +245,8 @@ async def update_document_tags(
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
 
+    mark_analytics_dirty()
+
     return {
         "status": "success",
         "message": "Tags updated successfully",
@@ -258,6 +270,8 @@ async def update_document_category(
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
 
+    mark_analytics_dirty()
+
     return {
         "status": "success",
         "message": "Category updated successfully",
@@ -277,6 +291,35 @@ async def get_documents_stats(db: Session = Depends(get_db)):
     return {"status": "success", "stats": stats}
 
 
+@router.get("/ai/status")
+async def get_ai_enrichment_status(db: Session = Depends(get_db)):
+    """Jumlah dokumen per ai_status + statistik worker enrichment"""
+    return {
+        "status": "success",
+        "documents": ai_enrichment.status_counts(db),
+        "worker": ai_enrichment.ai_enrichment_worker.get_stats(),
+    }
+
+
+@router.post("/ai/backfill")
+async def backfill_ai_summaries(
+    retry_failed: bool = Query(False, description="Antrikan ulang dokumen yang gagal"),
+    db: Session = Depends(get_db),
+):
+    """
+    Antrikan semua dokumen yang belum punya ringkasan AI ke worker enrichment
+
+    Laju panggilan Gemini tetap dibatasi AI_ENRICHMENT_CALLS_PER_MINUTE.
+    """
+    queued = ai_enrichment.queue_documents(db, retry_failed=retry_failed)
+    ai_enrichment.ai_enrichment_worker.notify()
+    return {
+        "status": "success",
+        "queued": queued,
+        "worker_running": ai_enrichment.ai_enrichment_worker.is_running(),
+    }
+
+
 @router.get("/types/list")
 async def get_document_types(db: Session = Depends(get_db)):
     """
@@ -0,0 +1,291 @@
+"""
+AI Enrichment
+Worker pool background untuk ringkasan + insight AI dokumen.
+
+Upload dengan generate_ai_summary=true tidak lagi menunggu Gemini: dokumen
+disimpan dengan ai_status="pending" lalu worker ini yang mengerjakannya.
+
+- Dispatcher thread mengambil dokumen pending (ai_summary IS NULL) per batch
+  (AI_ENRICHMENT_BATCH_SIZE). Klaim dilakukan dengan UPDATE bersyarat
+  (pending -> processing), jadi aman walaupun ada beberapa proses app.
+- Dokumen dalam batch dikerjakan AI_ENRICHMENT_WORKERS thread
+  (document_summarizer, map-reduce).
+- Semua panggilan Gemini dari enrichment berbagi satu rate limiter
+  (AI_ENRICHMENT_CALLS_PER_MINUTE), sehingga backfill tidak menghabiskan kuota.
+- Gagal -> kembali pending sampai AI_ENRICHMENT_MAX_ATTEMPTS, lalu "failed".
+  Selama circuit breaker Gemini terbuka, dispatcher tidak mengklaim dokumen.
+- Dokumen "processing" yang terlalu lama (worker mati) dikembalikan ke pending.
+- Semua pekerjaan worker berjalan di lane background (work_scheduler), jadi
+  chat tetap didahulukan saat backfill berjalan.
+
+Status: pending -> processing -> done / failed.
+"""
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import threading
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    AI_ENRICHMENT_BATCH_SIZE,
+    AI_ENRICHMENT_CALLS_PER_MINUTE,
+    AI_ENRICHMENT_MAX_ATTEMPTS,
+    AI_ENRICHMENT_STALE_SECONDS,
+    AI_ENRICHMENT_TICK_SECONDS,
+    AI_ENRICHMENT_WORKERS,
+)
+from app.core.database import SessionLocal
+from app.models.universal_document import UniversalDocument
+from app.services.document_summarizer import summarize_document
+from app.services.gemini_resilience import gemini_caller
+from app.services.gemini_service import GeminiService
+from app.services.rate_limiter import RateLimiter
+from app.services.work_scheduler import BACKGROUND, work_lane
+
+STATUS_PENDING = "pending"
+STATUS_PROCESSING = "processing"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+# Panjang pesan error yang disimpan di ai_error
+MAX_ERROR_LENGTH = 500
+
+
+def _needs_enrichment():
+    return [
+        UniversalDocument.ai_summary.is_(None),
+        UniversalDocument.full_text.isnot(None),
+        UniversalDocument.full_text != "",
+    ]
+
+
+def queue_documents(
+    db: Session, document_ids: Optional[List[int]] = None, retry_failed: bool = False
+) -> int:
+    """
+    Tandai dokumen tanpa ai_summary sebagai pending
+
+    Args:
+        document_ids: hanya dokumen ini (None = semua dokumen, untuk backfill)
+        retry_failed: ikutkan dokumen yang sudah "failed" (attempt di-reset)
+
+    Returns:
+        Jumlah dokumen yang masuk antrian
+    """
+    statuses = [UniversalDocument.ai_status.is_(None), UniversalDocument.ai_status == STATUS_DONE]
+    if retry_failed:
+        statuses.append(UniversalDocument.ai_status == STATUS_FAILED)
+    query = db.query(UniversalDocument).filter(*_needs_enrichment(), or_(*statuses))
+    if document_ids is not None:
+        query = query.filter(UniversalDocument.id.in_(document_ids))
+    queued = query.update(
+        {
+            UniversalDocument.ai_status: STATUS_PENDING,
+            UniversalDocument.ai_attempts: 0,
+            UniversalDocument.ai_error: None,
+            UniversalDocument.ai_updated_at: datetime.utcnow(),
+        },
+        synchronize_session=False,
+    )
+    db.commit()
+    return queued
+
+
+def status_counts(db: Session) -> Dict[str, int]:
+    """Jumlah dokumen per ai_status ("none" = belum pernah diantrikan)"""
+    rows = db.query(UniversalDocument.ai_status, func.count(UniversalDocument.id)).group_by(
+        UniversalDocument.ai_status
+    )
+    return {status or "none": count for status, count in rows}
+
+
+def enrich_document(db: Session, document_id: int, gemini: GeminiService) -> bool:
+    """Ringkas satu dokumen yang sudah diklaim; return True jika berhasil"""
+    document = db.query(UniversalDocument).filter(UniversalDocument.id == document_id).first()
+    if document is None:
+        return False
+    try:
+        result = summarize_document(document.full_text, document.document_type, gemini=gemini)
+    except Exception as e:
+        attempts = (document.ai_attempts or 0) + 1
+        document.ai_attempts = attempts  # type: ignore
+        document.ai_error = str(e)[:MAX_ERROR_LENGTH]  # type: ignore
+        document.ai_status = STATUS_FAILED if attempts >= AI_ENRICHMENT_MAX_ATTEMPTS else STATUS_PENDING  # type: ignore
+        document.ai_updated_at = datetime.utcnow()  # type: ignore
+        db.commit()
+        print(f"⚠️ AI enrichment failed for {document.filename} (attempt {attempts}): {e}")
+        return False
+
+    document.ai_summary = result.summary  # type: ignore
+    document.ai_insights = result.insights()  # type: ignore
+    document.ai_status = STATUS_DONE  # type: ignore
+    document.ai_error = None  # type: ignore
+    document.ai_attempts = (document.ai_attempts or 0) + 1  # type: ignore
+    document.ai_updated_at = datetime.utcnow()  # type: ignore
+    db.commit()
+    print(f"✅ AI summary generated for {document.filename} ({result.chunks} bagian, {result.calls} panggilan)")
+    return True
+
+
+class AIEnrichmentWorker:
+    """Dispatcher thread + worker pool untuk dokumen ai_status pending"""
+
+    def __init__(
+        self,
+        workers: int = AI_ENRICHMENT_WORKERS,
+        batch_size: int = AI_ENRICHMENT_BATCH_SIZE,
+        tick_seconds: float = AI_ENRICHMENT_TICK_SECONDS,
+        calls_per_minute: float = AI_ENRICHMENT_CALLS_PER_MINUTE,
+    ):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.tick_seconds = tick_seconds
+        self.rate_limiter = RateLimiter.per_minute(calls_per_minute)
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._stats: Counter = Counter()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ai-enrichment")
+        self._thread = threading.Thread(target=self._run, name="ai-enrichment-dispatcher", daemon=True)
+        self._thread.start()
+        print(f"🤖 AI enrichment worker started ({self.workers} workers)")
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def notify(self) -> None:
+        """Bangunkan dispatcher setelah ada dokumen baru di antrian"""
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                # Batch penuh -> langsung ambil batch berikutnya
+                with work_lane(BACKGROUND):
+                    while not self._stop.is_set() and self.run_once() >= self.batch_size:
+                        pass
+            except Exception as e:
+                print(f"⚠️ AI enrichment dispatcher error: {e}")
+            self._wakeup.wait(self.tick_seconds)
+            self._wakeup.clear()
+
+    def _gemini(self) -> GeminiService:
+        return GeminiService(rate_limiter=self.rate_limiter)
+
+    def recover_stale(self, db: Session) -> int:
+        """Kembalikan dokumen processing yang ditinggal worker mati ke pending"""
+        cutoff = datetime.utcnow() - timedelta(seconds=AI_ENRICHMENT_STALE_SECONDS)
+        recovered = (
+            db.query(UniversalDocument)
+            .filter(
+                UniversalDocument.ai_status == STATUS_PROCESSING,
+                UniversalDocument.ai_updated_at < cutoff,
+            )
+            .update({UniversalDocument.ai_status: STATUS_PENDING}, synchronize_session=False)
+        )
+        db.commit()
+        return recovered
+
+    def claim_batch(self, db: Session) -> List[int]:
+        """Klaim maksimal batch_size dokumen pending (pending -> processing)"""
+        # Dokumen yang baru gagal menunggu satu tick sebelum dicoba lagi
+        retry_after = datetime.utcnow() - timedelta(seconds=self.tick_seconds)
+        candidates = [
+            row.id
+            for row in db.query(UniversalDocument.id)
+            .filter(
+                UniversalDocument.ai_status == STATUS_PENDING,
+                *_needs_enrichment(),
+                or_(
+                    func.coalesce(UniversalDocument.ai_attempts, 0) == 0,
+                    UniversalDocument.ai_updated_at < retry_after,
+                ),
+            )
+            .order_by(UniversalDocument.ai_attempts, UniversalDocument.uploaded_at, UniversalDocument.id)
+            .limit(self.batch_size)
+        ]
+        if not candidates:
+            return []
+        now = datetime.utcnow()
+        db.query(UniversalDocument).filter(
+            UniversalDocument.id.in_(candidates), UniversalDocument.ai_status == STATUS_PENDING
+        ).update(
+            {UniversalDocument.ai_status: STATUS_PROCESSING, UniversalDocument.ai_updated_at: now},
+            synchronize_session=False,
+        )
+        db.commit()
+        # Hanya yang benar-benar berhasil diklaim proses ini
+        return [
+            row.id
+            for row in db.query(UniversalDocument.id).filter(
+                UniversalDocument.id.in_(candidates),
+                UniversalDocument.ai_status == STATUS_PROCESSING,
+                UniversalDocument.ai_updated_at == now,
+            )
+        ]
+
+    def _process(self, document_id: int) -> bool:
+        db = SessionLocal()
+        try:
+            with work_lane(BACKGROUND):
+                return enrich_document(db, document_id, self._gemini())
+        finally:
+            db.close()
+
+    def run_once(self) -> int:
+        """Kerjakan satu batch; return jumlah dokumen yang diklaim"""
+        if gemini_caller.breaker.get_stats()["state"] == "open":
+            return 0
+        db = SessionLocal()
+        try:
+            self.recover_stale(db)
+            claimed = self.claim_batch(db)
+        finally:
+            db.close()
+        if not claimed:
+            return 0
+
+        pool = self._pool or ThreadPoolExecutor(max_workers=self.workers)
+        results = list(pool.map(self._process, claimed))
+        if pool is not self._pool:
+            pool.shutdown()
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["succeeded"] += sum(results)
+            self._stats["failed_attempts"] += len(results) - sum(results)
+        return len(claimed)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        return {
+            "running": self.is_running(),
+            "workers": self.workers,
+            "batch_size": self.batch_size,
+            "batches": stats.get("batches", 0),
+            "succeeded": stats.get("succeeded", 0),
+            "failed_attempts": stats.get("failed_attempts", 0),
+            "rate_limit": self.rate_limiter.get_stats() if self.rate_limiter else None,
+        }
+
+
+ai_enrichment_worker = AIEnrichmentWorker()
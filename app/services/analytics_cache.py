@@ -0,0 +1,236 @@
+"""
+Analytics Cache Service
+Cache persisten untuk hasil analisis AI (Gemini) di endpoint analytics.
+
+Key cache adalah fingerprint dari statistik input, versi prompt dan model sehingga
+Gemini hanya dipanggil ulang jika data berubah. Entry yang sudah lewat TTL (atau
+dibuat dari data sebelumnya) tetap langsung dikirim ke client lalu di-refresh
+di background (stale-while-revalidate).
+"""
+
+from fastapi import BackgroundTasks
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import ANALYTICS_CACHE_TTL_SECONDS
+from app.core.database import SessionLocal
+from app.models.analytics_cache import AnalyticsCache
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+import hashlib
+import json
+import threading
+
+# Jumlah entry yang disimpan per jenis analisis
+MAX_ENTRIES_PER_KIND = 20
+
+# Fingerprint yang sedang di-refresh, supaya satu entry tidak di-refresh berkali-kali
+_refreshing: set = set()
+_refreshing_lock = threading.Lock()
+
+# (kind, status) -> jumlah lookup; status hit, stale, miss
+_lookups: Counter = Counter()
+_lookups_lock = threading.Lock()
+
+
+def _count_lookup(kind: str, status: str) -> None:
+    with _lookups_lock:
+        _lookups[(kind, status)] += 1
+
+
+def get_cache_stats() -> Dict[str, Dict[str, int]]:
+    """Jumlah lookup per jenis analisis dan status (hit, stale, miss)"""
+    with _lookups_lock:
+        stats: Dict[str, Dict[str, int]] = {}
+        for (kind, status), count in _lookups.items():
+            stats.setdefault(kind, {})[status] = count
+        return stats
+
+
+def build_fingerprint(
+    kind: str, inputs: Dict[str, Any], prompt_version: str, model: str
+) -> str:
+    """SHA-256 dari input analisis (urutan key dinormalisasi)"""
+    raw = json.dumps(
+        {
+            "kind": kind,
+            "inputs": inputs,
+            "prompt_version": prompt_version,
+            "model": model,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def is_cacheable(payload: Dict[str, Any]) -> bool:
+    """Hasil fallback/error dari Gemini tidak disimpan"""
+    return bool(payload) and "error" not in payload and "error_detail" not in payload
+
+
+def _store(
+    db: Session,
+    kind: str,
+    fingerprint: str,
+    prompt_version: str,
+    model: str,
+    payload: Dict[str, Any],
+) -> None:
+    """Simpan/replace entry cache untuk fingerprint"""
+    entry = (
+        db.query(AnalyticsCache)
+        .filter(AnalyticsCache.fingerprint == fingerprint)
+        .first()
+    )
+    now = datetime.utcnow()
+    if entry:
+        entry.payload = payload  # type: ignore
+        entry.refreshed_at = now  # type: ignore
+    else:
+        db.add(
+            AnalyticsCache(
+                kind=kind,
+                fingerprint=fingerprint,
+                model=model,
+                prompt_version=prompt_version,
+                payload=payload,
+                created_at=now,
+                refreshed_at=now,
+            )
+        )
+    try:
+        db.commit()
+    except IntegrityError:
+        # Request lain sudah menyimpan fingerprint yang sama
+        db.rollback()
+        return
+
+    # Hapus entry lama supaya tabel cache tidak terus membesar
+    old_ids = [
+        row.id
+        for row in db.query(AnalyticsCache.id)
+        .filter(AnalyticsCache.kind == kind)
+        .order_by(AnalyticsCache.refreshed_at.desc())
+        .offset(MAX_ENTRIES_PER_KIND)
+        .all()
+    ]
+    if old_ids:
+        db.query(AnalyticsCache).filter(AnalyticsCache.id.in_(old_ids)).delete(
+            synchronize_session=False
+        )
+        db.commit()
+
+
+def _refresh_in_background(
+    kind: str,
+    fingerprint: str,
+    prompt_version: str,
+    model: str,
+    compute: Callable[[], Dict[str, Any]],
+) -> None:
+    """Background task: panggil Gemini lalu update cache"""
+    db = SessionLocal()
+    try:
+        payload = compute()
+        if is_cacheable(payload):
+            _store(db, kind, fingerprint, prompt_version, model, payload)
+    except Exception as e:
+        print(f"⚠️ Analytics cache refresh failed ({kind}): {e}")
+    finally:
+        db.close()
+        with _refreshing_lock:
+            _refreshing.discard(fingerprint)
+
+
+def _schedule_refresh(
+    background_tasks: BackgroundTasks,
+    kind: str,
+    fingerprint: str,
+    prompt_version: str,
+    model: str,
+    compute: Callable[[], Dict[str, Any]],
+) -> None:
+    with _refreshing_lock:
+        if fingerprint in _refreshing:
+            return
+        _refreshing.add(fingerprint)
+    background_tasks.add_task(
+        _refresh_in_background, kind, fingerprint, prompt_version, model, compute
+    )
+
+
+def get_cached_analysis(
+    db: Session,
+    kind: str,
+    inputs: Dict[str, Any],
+    prompt_version: str,
+    model: str,
+    compute: Callable[[], Dict[str, Any]],
+    background_tasks: Optional[BackgroundTasks] = None,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Ambil hasil analisis AI dari cache atau hitung baru
+
+    Args:
+        kind: Jenis analisis (members, documents, overview)
+        inputs: Statistik yang dikirim ke prompt (dasar fingerprint)
+        prompt_version: Versi template prompt
+        model: Nama model Gemini
+        compute: Fungsi yang memanggil Gemini dan mengembalikan payload
+        background_tasks: FastAPI BackgroundTasks untuk refresh stale entry;
+            jika None, entry stale dihitung ulang secara sinkron
+
+    Returns:
+        Tuple (payload, cache_info) dengan cache_info["status"] salah satu dari
+        hit, stale, miss
+    """
+    fingerprint = build_fingerprint(kind, inputs, prompt_version, model)
+
+    entry = (
+        db.query(AnalyticsCache)
+        .filter(AnalyticsCache.fingerprint == fingerprint)
+        .first()
+    )
+    if entry is None:
+        # Data berubah: pakai analisis terakhir untuk jenis, prompt dan model yang
+        # sama sambil refresh (hasil model lain tidak pernah dipakai)
+        entry = (
+            db.query(AnalyticsCache)
+            .filter(
+                AnalyticsCache.kind == kind,
+                AnalyticsCache.prompt_version == prompt_version,
+                AnalyticsCache.model == model,
+            )
+            .order_by(AnalyticsCache.refreshed_at.desc())
+            .first()
+        )
+        stale = entry is not None
+    else:
+        stale = entry.age_seconds() > ANALYTICS_CACHE_TTL_SECONDS
+
+    # Tanpa BackgroundTasks (mis. dari scheduler) entry stale langsung dihitung ulang
+    if entry is not None and not (stale and background_tasks is None):
+        if stale:
+            _schedule_refresh(
+                background_tasks, kind, fingerprint, prompt_version, model, compute
+            )
+        _count_lookup(kind, "stale" if stale else "hit")
+        return dict(entry.payload or {}), {
+            "status": "stale" if stale else "hit",
+            "fingerprint": fingerprint[:16],
+            "cached_at": (
+                entry.refreshed_at.isoformat() if entry.refreshed_at else None
+            ),
+        }
+
+    _count_lookup(kind, "miss")
+    payload = compute()
+    if is_cacheable(payload):
+        _store(db, kind, fingerprint, prompt_version, model, payload)
+
+    return payload, {
+        "status": "miss",
+        "fingerprint": fingerprint[:16],
+        "cached_at": None,
+    }
@@ -0,0 +1,233 @@
+"""
+Analytics Scheduler
+Precompute statistik + analisis AI dashboard di background thread dan simpan ke
+tabel analytics_snapshots, sehingga endpoint analytics cukup membaca snapshot.
+
+Perubahan data dideteksi lewat signature murah per jenis analytics (dibaca dari
+database, jadi tetap benar walaupun upload diproses worker lain). Recompute
+di-debounce: snapshot baru dihitung setelah signature stabil selama
+ANALYTICS_DEBOUNCE_SECONDS.
+"""
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import (
+    ANALYTICS_DEBOUNCE_SECONDS,
+    ANALYTICS_REFRESH_INTERVAL_SECONDS,
+    ANALYTICS_SCHEDULER_TICK_SECONDS,
+)
+from app.core.database import SessionLocal
+from app.models.analytics_snapshot import AnalyticsSnapshot
+from app.services.work_scheduler import BACKGROUND, cpu_scheduler, work_lane
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+import hashlib
+import json
+import threading
+import time
+
+# kind -> (builder(db) -> response body, signature(db) -> data yang bisa di-hash)
+_registry: Dict[str, Tuple[Callable[..., Dict[str, Any]], Callable[[Session], Any]]] = {}
+
+
+def register_snapshot_builder(
+    kind: str,
+    builder: Callable[..., Dict[str, Any]],
+    signature: Callable[[Session], Any],
+) -> None:
+    """Daftarkan fungsi untuk menghitung snapshot dan signature datanya"""
+    _registry[kind] = (builder, signature)
+
+
+def compute_signature(db: Session, kind: str) -> str:
+    """Hash dari signature data untuk satu jenis analytics"""
+    _, signature = _registry[kind]
+    raw = json.dumps(signature(db), sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def get_snapshot(db: Session, kind: str) -> Optional[AnalyticsSnapshot]:
+    return db.query(AnalyticsSnapshot).filter(AnalyticsSnapshot.kind == kind).first()
+
+
+def save_snapshot(
+    db: Session,
+    kind: str,
+    payload: Dict[str, Any],
+    source_signature: str,
+    duration_ms: float,
+) -> AnalyticsSnapshot:
+    """Simpan/replace snapshot untuk satu jenis analytics"""
+    snapshot = get_snapshot(db, kind)
+    if snapshot is None:
+        snapshot = AnalyticsSnapshot(kind=kind)
+        db.add(snapshot)
+    snapshot.payload = payload  # type: ignore
+    snapshot.source_signature = source_signature  # type: ignore
+    snapshot.duration_ms = duration_ms  # type: ignore
+    snapshot.computed_at = datetime.utcnow()  # type: ignore
+    try:
+        db.commit()
+    except IntegrityError:
+        # Worker lain menyimpan snapshot yang sama lebih dulu
+        db.rollback()
+        snapshot = get_snapshot(db, kind)
+    return snapshot  # type: ignore
+
+
+def build_snapshot(
+    db: Session, kind: str, background_tasks: Any = None
+) -> AnalyticsSnapshot:
+    """Hitung snapshot sekarang juga lalu simpan"""
+    builder, _ = _registry[kind]
+    signature = compute_signature(db, kind)
+    started = time.perf_counter()
+    payload = builder(db, background_tasks)
+    duration_ms = (time.perf_counter() - started) * 1000
+    return save_snapshot(db, kind, payload, signature, duration_ms)
+
+
+def snapshot_response(snapshot: AnalyticsSnapshot) -> Dict[str, Any]:
+    """Response body dari snapshot, ditambah umur snapshot"""
+    body = dict(snapshot.payload or {})
+    data = dict(body.get("data") or {})
+    data["snapshot_age_seconds"] = round(snapshot.age_seconds(), 1)
+    data["snapshot_computed_at"] = (
+        snapshot.computed_at.isoformat() if snapshot.computed_at else None
+    )
+    body["data"] = data
+    return body
+
+
+def is_snapshot_current(db: Session, kind: str, snapshot: AnalyticsSnapshot) -> bool:
+    """
+    Snapshot masih boleh dikirim tanpa scheduler
+
+    Signature data sama, umur di bawah interval refresh, dan bagian AI-nya final:
+    bukan analisis stale yang sedang di-refresh di background, bukan fallback error.
+    """
+    if snapshot.source_signature != compute_signature(db, kind):
+        return False
+    if snapshot.age_seconds() >= analytics_scheduler.refresh_interval_seconds:
+        return False
+    data = (snapshot.payload or {}).get("data") or {}
+    if (data.get("ai_cache") or {}).get("status") == "stale":
+        return False
+    return "error" not in data and "error_detail" not in data
+
+
+def serve_snapshot(
+    db: Session, kind: str, background_tasks: Any = None
+) -> Dict[str, Any]:
+    """
+    Kirim snapshot analytics
+
+    Jika scheduler berjalan, snapshot yang ada langsung dikirim (dihitung inline
+    hanya jika belum pernah dibuat). Jika scheduler tidak aktif (tes, CLI,
+    ANALYTICS_SCHEDULER_ENABLED=false), snapshot yang tersimpan tetap dipakai
+    selama signature datanya sama dan umurnya di bawah interval refresh; selain
+    itu dihitung ulang di request ini lewat cache AI (stale-while-revalidate
+    dengan background_tasks).
+    """
+    snapshot = get_snapshot(db, kind)
+    if analytics_scheduler.is_running():
+        if snapshot is None:
+            snapshot = build_snapshot(db, kind)
+        return snapshot_response(snapshot)
+
+    if snapshot is None or not is_snapshot_current(db, kind, snapshot):
+        snapshot = build_snapshot(db, kind, background_tasks)
+    return snapshot_response(snapshot)
+
+
+class AnalyticsScheduler:
+    """Thread periodik yang me-refresh snapshot analytics setelah data berubah"""
+
+    def __init__(
+        self,
+        tick_seconds: float = ANALYTICS_SCHEDULER_TICK_SECONDS,
+        debounce_seconds: float = ANALYTICS_DEBOUNCE_SECONDS,
+        refresh_interval_seconds: float = ANALYTICS_REFRESH_INTERVAL_SECONDS,
+    ):
+        self.tick_seconds = tick_seconds
+        self.debounce_seconds = debounce_seconds
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # kind -> (signature terakhir yang terlihat, waktu pertama terlihat)
+        self._pending: Dict[str, Tuple[str, float]] = {}
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="analytics-scheduler", daemon=True
+        )
+        self._thread.start()
+        print("📅 Analytics scheduler started")
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def notify(self) -> None:
+        """Bangunkan scheduler lebih cepat setelah ada perubahan data"""
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                # Refresh terjadwal: Gemini/CPU dipakai di lane background
+                with work_lane(BACKGROUND):
+                    self.run_once()
+            except Exception as e:
+                print(f"⚠️ Analytics scheduler error: {e}")
+            self._wakeup.wait(self.tick_seconds)
+            self._wakeup.clear()
+
+    def run_once(self, now: Optional[float] = None) -> list:
+        """Cek semua jenis analytics, return daftar kind yang di-recompute"""
+        now = time.monotonic() if now is None else now
+        refreshed = []
+        db = SessionLocal()
+        try:
+            for kind in list(_registry):
+                if self._should_refresh(db, kind, now):
+                    with cpu_scheduler.slot():
+                        build_snapshot(db, kind)
+                    self._pending.pop(kind, None)
+                    refreshed.append(kind)
+                    print(f"📅 Analytics snapshot '{kind}' refreshed")
+        finally:
+            db.close()
+        return refreshed
+
+    def _should_refresh(self, db: Session, kind: str, now: float) -> bool:
+        signature = compute_signature(db, kind)
+        snapshot = get_snapshot(db, kind)
+
+        if snapshot is not None and snapshot.source_signature == signature:
+            self._pending.pop(kind, None)
+            return snapshot.age_seconds() >= self.refresh_interval_seconds
+
+        # Data berubah: tunggu sampai signature stabil (debounce)
+        pending = self._pending.get(kind)
+        if pending is None or pending[0] != signature:
+            self._pending[kind] = (signature, now)
+            return self.debounce_seconds <= 0
+        return now - pending[1] >= self.debounce_seconds
+
+
+analytics_scheduler = AnalyticsScheduler()
+
+
+def mark_analytics_dirty() -> None:
+    """Dipanggil setelah import/mutasi data supaya scheduler segera mengecek"""
+    analytics_scheduler.notify()
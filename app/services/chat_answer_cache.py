@@ -0,0 +1,240 @@
+"""
+Chat Answer Cache
+Cache in-memory untuk jawaban AI (Gemini) di /api/chat/query.
+
+Pertanyaan yang sama ("visi misi HIPMI", "apa visi dan misi hipmi?") dinormalisasi
+ke key yang sama: casefold, stopword dibuang, token di-dedupe dan diurutkan. Kata
+tanya selain "apa" (kapan, berapa, siapa, ...) dan kata depan dari/ke/untuk tidak
+dibuang karena mengubah jawaban ("kapan musda" != "apa itu musda"). Jika key tidak ada, pertanyaan
+yang mirip dicari lewat cosine similarity TF-IDF atas token pertanyaan yang ada di
+cache (opsional, CHAT_CACHE_SIMILARITY), hanya di antara pertanyaan dengan kata
+tanya yang sama.
+
+Setiap entry terikat versi data knowledge base (signature tabel members +
+universal_documents, dibaca dari database seperti signature analytics scheduler),
+sehingga jawaban lama tidak dipakai setelah import/upload. Eviction: LRU
+(CHAT_CACHE_MAX_ENTRIES) + TTL (CHAT_CACHE_TTL_SECONDS).
+"""
+
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.config import (
+    CHAT_CACHE_ENABLED,
+    CHAT_CACHE_MAX_ENTRIES,
+    CHAT_CACHE_SIMILARITY,
+    CHAT_CACHE_TTL_SECONDS,
+)
+from app.models.member import Member
+from app.models.universal_document import UniversalDocument
+from app.services.chat_intent_router import STOPWORDS
+from app.services.gemini_service import is_ai_error
+from typing import Any, Dict, Optional, Tuple
+import hashlib
+import json
+import math
+import re
+import threading
+import time
+
+# Kata tanya yang menentukan jenis jawaban (ya/tidak, jumlah, waktu, tempat, orang,
+# cara, alasan); "apa" tetap stopword karena "apa visi misi" = "visi misi"
+QUESTION_WORDS = frozenset("apakah berapa kapan mana dimana siapa bagaimana mengapa kenapa".split())
+
+# Stopword router (untuk nama orang) tanpa kata tanya dan kata depan arah/tujuan,
+# ditambah kata perintah yang tidak mengubah isi ("jelaskan visi misi" = "visi misi")
+CACHE_STOPWORDS = (STOPWORDS - QUESTION_WORDS - {"dari", "ke", "untuk"}) | frozenset(
+    "jelaskan sebutkan ceritakan terangkan beritahu tolong dong".split()
+)
+
+_TOKEN = re.compile(r"[0-9a-z]+")
+
+
+def query_tokens(query: str) -> list:
+    """Token pertanyaan tanpa stopword, unik dan terurut"""
+    return sorted({token for token in _TOKEN.findall(query.casefold()) if token not in CACHE_STOPWORDS})
+
+
+def normalize_query(query: str) -> str:
+    """Key cache: casefold, tanpa stopword, token diurutkan"""
+    return " ".join(query_tokens(query))
+
+
+def knowledge_base_version(db: Session) -> str:
+    """
+    Versi data yang dipakai untuk menjawab chat
+
+    Jumlah, id terbesar dan updated_at terakhir dari members dan
+    universal_documents: berubah saat import, edit, hapus atau upload.
+    """
+    members = db.query(func.count(Member.id), func.max(Member.id), func.max(Member.updated_at)).one()
+    documents = db.query(
+        func.count(UniversalDocument.id),
+        func.max(UniversalDocument.id),
+        func.max(UniversalDocument.updated_at),
+    ).one()
+    raw = json.dumps([list(members), list(documents)], default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def is_cacheable_answer(answer: Optional[str]) -> bool:
+    """Jawaban error/fallback Gemini tidak disimpan"""
+    return not is_ai_error(answer)
+
+
+@dataclass
+class CachedAnswer:
+    key: str
+    query: str
+    response: Dict[str, Any]
+    data_version: str
+    latency_ms: float
+    created_at: float = field(default_factory=time.monotonic)
+    hits: int = 0
+
+    def age_seconds(self) -> float:
+        return time.monotonic() - self.created_at
+
+
+class ChatAnswerCache:
+    """LRU + TTL cache jawaban chat, dengan pencarian pertanyaan mirip (TF-IDF)"""
+
+    def __init__(
+        self,
+        max_entries: int = CHAT_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = CHAT_CACHE_TTL_SECONDS,
+        similarity: float = CHAT_CACHE_SIMILARITY,
+        enabled: bool = CHAT_CACHE_ENABLED,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity = similarity
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, CachedAnswer]" = OrderedDict()
+        # Document frequency token di antara key yang ada di cache (untuk IDF)
+        self._document_frequency: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stats: Counter = Counter()
+        self._saved_ms = 0.0
+
+    def _remove(self, key: str, reason: Optional[str] = None) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._document_frequency.subtract(key.split())
+            self._document_frequency += Counter()  # buang count <= 0
+            if reason:
+                self._stats[reason] += 1
+
+    def _is_valid(self, entry: CachedAnswer, data_version: str) -> bool:
+        if entry.data_version != data_version:
+            self._remove(entry.key, "invalidated")
+            return False
+        if entry.age_seconds() > self.ttl_seconds:
+            self._remove(entry.key, "expired")
+            return False
+        return True
+
+    def _vector(self, tokens: list) -> Dict[str, float]:
+        total = len(self._entries) + 1
+        weights = {
+            token: math.log((1 + total) / (1 + self._document_frequency[token])) + 1
+            for token in tokens
+        }
+        norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+        return {token: weight / norm for token, weight in weights.items()}
+
+    def _most_similar(self, tokens: list, data_version: str) -> Tuple[Optional[CachedAnswer], float]:
+        if not tokens or self.similarity <= 0:
+            return None, 0.0
+        query_vector = self._vector(tokens)
+        question = QUESTION_WORDS.intersection(tokens)
+        best, best_score = None, 0.0
+        for entry in list(self._entries.values()):
+            if not self._is_valid(entry, data_version):
+                continue
+            entry_tokens = entry.key.split()
+            if QUESTION_WORDS.intersection(entry_tokens) != question:
+                continue
+            entry_vector = self._vector(entry_tokens)
+            score = sum(weight * entry_vector.get(token, 0.0) for token, weight in query_vector.items())
+            if score > best_score:
+                best, best_score = entry, score
+        if best is None or best_score < self.similarity:
+            return None, best_score
+        return best, best_score
+
+    def get(self, query: str, data_version: str) -> Optional[Tuple[CachedAnswer, str, float]]:
+        """Entry untuk pertanyaan: (entry, "exact"/"similar", similarity) atau None"""
+        if not self.enabled:
+            return None
+        tokens = query_tokens(query)
+        key = " ".join(tokens)
+        with self._lock:
+            entry = self._entries.get(key)
+            match, score = "exact", 1.0
+            if entry is None or not self._is_valid(entry, data_version):
+                entry, score = self._most_similar(tokens, data_version)
+                match = "similar"
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(entry.key)
+            entry.hits += 1
+            self._stats[f"{match}_hits"] += 1
+            self._saved_ms += entry.latency_ms
+            return entry, match, round(score, 3)
+
+    def put(
+        self, query: str, data_version: str, response: Dict[str, Any], latency_ms: float
+    ) -> None:
+        """Simpan jawaban (key yang sama diganti, entry paling lama dipakai dibuang)"""
+        if not self.enabled:
+            return
+        key = normalize_query(query)
+        if not key:
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = CachedAnswer(
+                key=key,
+                query=query,
+                response=response,
+                data_version=data_version,
+                latency_ms=latency_ms,
+            )
+            self._document_frequency.update(key.split())
+            self._stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)), "evictions")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._document_frequency.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self._stats["exact_hits"] + self._stats["similar_hits"]
+            lookups = hits + self._stats["misses"]
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "similarity_threshold": self.similarity,
+                "lookups": lookups,
+                "hits": hits,
+                "exact_hits": self._stats["exact_hits"],
+                "similar_hits": self._stats["similar_hits"],
+                "misses": self._stats["misses"],
+                "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+                "stores": self._stats["stores"],
+                "evictions": self._stats["evictions"],
+                "expired": self._stats["expired"],
+                "invalidated": self._stats["invalidated"],
+                "latency_saved_ms": round(self._saved_ms, 1),
+            }
+
+
+chat_answer_cache = ChatAnswerCache()
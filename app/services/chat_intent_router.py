@@ -0,0 +1,581 @@
+"""
+Chat Intent Router
+Routing pertanyaan chat ke handler database tanpa LLM.
+
+Pertanyaan di-tokenisasi sekali, lalu keyword/frasa (mis. "bidang usaha",
+"paling banyak") dan nilai data (jabatan, bidang usaha, status KTA yang ada di
+member_aggregates) dicocokkan dalam satu pass lewat token trie (leftmost-longest).
+Setiap intent punya syarat fitur + slot; semua intent yang memenuhi syarat diberi
+skor dan diurutkan, sehingga urutan handler tidak lagi menentukan pemenang dan
+kata seperti "wa" di dalam "wakil" tidak memicu intent kontak.
+
+Intent hitung/daftar bersifat closed: hanya cocok jika setiap kata di pertanyaan
+dipahami handler-nya. Pertanyaan dengan filter tambahan ("berapa pengurus bidang
+IT yang perempuan") diteruskan ke AI, tidak dijawab dengan angka yang salah.
+
+Slot yang diekstrak:
+- quoted: teks di dalam tanda kutip (case asli)
+- jabatan / bidang_usaha / status_kta: nilai data yang disebut di pertanyaan
+- document_type / document_category: tipe dokumen ("PO", "laporan") dan kategori
+  custom dokumen yang disebut di pertanyaan
+- person: nama dari tanda kutip, atau sisa token yang bukan keyword/stopword
+- topic: kata yang dicari di dokumen (kutip, sisa teks, atau frasa tipe dokumen)
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+import re
+
+# Dimensi member_aggregates yang nilainya dikenali sebagai slot
+VALUE_DIMENSIONS = ["jabatan", "bidang_usaha", "status_kta"]
+
+# Dimensi dokumen dari database (kategori custom universal_documents)
+DOCUMENT_DIMENSIONS = ["document_category"]
+
+GAZETTEER_DIMENSIONS = VALUE_DIMENSIONS + DOCUMENT_DIMENSIONS
+
+# Nilai statis: frasa -> document_type (sama dengan UniversalDocumentProcessor.detect_document_type)
+DOCUMENT_TYPE_PHRASES: Dict[str, List[str]] = {
+    "HIPMI_PO": ["po", "peraturan organisasi"],
+    "HIPMI_AD": ["ad", "anggaran dasar"],
+    "HIPMI_ART": ["art", "anggaran rumah tangga"],
+    "HIPMI_SK": ["sk", "surat keputusan"],
+    "CONTRACT": ["kontrak", "perjanjian"],
+    "REPORT": ["laporan"],
+    "PROPOSAL": ["proposal"],
+    "PRESENTATION": ["presentasi", "slide"],
+    "REGULATION": ["peraturan", "regulasi", "kebijakan"],
+    "MANUAL": ["manual", "panduan"],
+}
+
+# Keyword/frasa -> fitur. Frasa ditulis dalam token lowercase dipisah spasi.
+KEYWORDS: Dict[str, List[str]] = {
+    "count": ["berapa", "ada berapa", "jumlah", "total", "banyaknya", "hitung"],
+    "list": ["tampilkan", "daftar", "list", "sebutkan", "apa saja", "siapa saja"],
+    "per": ["per", "distribusi", "sebaran", "breakdown", "masing masing", "setiap", "tiap"],
+    "most": ["terbanyak", "paling banyak", "mayoritas", "dominan", "terbesar"],
+    "jabatan": ["jabatan", "posisi", "ketua", "ketum", "wakil", "sekretaris", "sekum", "bendahara", "bendum"],
+    "bidang_usaha": [
+        "bidang",
+        "usaha",
+        "bidang usaha",
+        "bidang bisnis",
+        "kategori bisnis",
+        "kategori usaha",
+        "sektor",
+        "sektor usaha",
+        "industri",
+    ],
+    "status_kta": ["kta", "kartu tanda anggota", "status kta"],
+    "gender": ["gender", "jenis kelamin", "pria", "wanita", "laki laki", "perempuan"],
+    "ratio": ["rasio", "perbandingan", "komposisi", "persentase", "proporsi"],
+    "contact": [
+        "kontak",
+        "nomor",
+        "no hp",
+        "nomor hp",
+        "hp",
+        "wa",
+        "whatsapp",
+        "email",
+        "telepon",
+        "telp",
+        "ponsel",
+    ],
+    "company": ["perusahaan", "nama perusahaan", "kantor"],
+    "person_cue": ["siapa", "cari", "carikan", "info", "informasi", "detail", "profil", "data lengkap"],
+    "age": ["usia", "umur"],
+    "karyawan": ["karyawan", "pegawai", "tenaga kerja", "pekerja"],
+    "member": ["pengurus", "anggota", "member", "orang", "kepengurusan"],
+    "scope": ["saat ini", "sekarang", "semua", "seluruh", "keseluruhan", "terdaftar"],
+    # Pertanyaan tentang isi dokumen/organisasi: bukan lookup/metadata, biarkan ke AI
+    "document": [
+        "menurut",
+        "batas",
+        "minimal",
+        "maksimal",
+        "ketentuan",
+        "aturan",
+        "diatur",
+        "mengatur",
+        "didirikan",
+        "jelaskan",
+        "bagaimana",
+        "mengapa",
+        "kenapa",
+        "tugas",
+        "wewenang",
+        "kewajiban",
+        "syarat",
+        "isi",
+        "bunyi",
+        "pasal",
+        "ayat",
+        "visi",
+        "misi",
+        "sejarah",
+        "motto",
+    ],
+    # Metadata dokumen (universal_documents)
+    "document_noun": ["dokumen", "file", "berkas", "pdf", "arsip"],
+    "doc_kind": ["jenis", "tipe", "kategori"],
+    "mention": ["tentang", "mengenai", "terkait", "membahas", "menyebut", "mengandung", "berisi", "soal"],
+    "latest": ["terakhir", "terbaru", "paling baru", "baru"],
+    "upload": ["upload", "diupload", "unggah", "diunggah", "ditambahkan", "masuk"],
+    "pages": ["halaman", "page"],
+}
+
+# Token yang tidak pernah dianggap bagian dari nama orang
+STOPWORDS = frozenset(
+    """
+    apa apakah ada adalah yang dari di ke untuk dengan dan atau itu ini nya
+    saya aku kami kita tolong mohon minta dong ya sih kah bisa boleh berikan
+    kasih lihat cek tahu tau mau ingin sebagai punya milik bernama namanya nama
+    pak bu bapak ibu sdr saudara mas mbak kak lengkap lengkapnya saja hipmi
+    berapa kapan mana the of
+    """.split()
+)
+
+_QUOTED = re.compile(r"['\"]([^'\"]+)['\"]")
+_TOKEN = re.compile(r"[0-9a-z]+")
+
+# Akhiran yang dilepas saat mencocokkan keyword ("jabatannya" -> "jabatan")
+SUFFIXES = ("nya", "kah")
+
+
+@dataclass(frozen=True)
+class Intent:
+    """
+    Definisi intent
+
+    requires: setiap elemen adalah sekumpulan fitur; minimal satu fitur dari
+    setiap kumpulan harus ada di pertanyaan.
+    slot: slot yang wajib terisi (None = tidak perlu slot).
+    optional: dimensi yang ikut dikirim ke handler jika disebut (filter opsional).
+    closed: semua kata harus keyword dari requires/bonus, nilai slot intent ini
+    atau stopword; sisa kata (mis. "yang lahir tahun 1990") atau fitur lain (mis.
+    gender di pertanyaan jumlah per jabatan) berarti filter yang tidak dipahami
+    handler, sehingga pertanyaan diteruskan ke AI.
+    """
+
+    name: str
+    requires: Tuple[FrozenSet[str], ...]
+    slot: Optional[str] = None
+    bonus: FrozenSet[str] = frozenset()
+    excludes: FrozenSet[str] = frozenset()
+    priority: float = 0.0
+    optional: Tuple[str, ...] = ()
+    closed: bool = False
+
+
+@dataclass
+class RouteMatch:
+    intent: str
+    score: float
+    slots: Dict[str, str]
+
+
+@dataclass
+class ParsedQuery:
+    """Hasil satu pass tokenisasi + pencocokan trie"""
+
+    tokens: List[str]
+    features: Dict[str, int] = field(default_factory=dict)
+    values: Dict[str, str] = field(default_factory=dict)
+    # Teks asli yang cocok dengan nilai per dimensi (mis. "kontrak" untuk CONTRACT)
+    phrases: Dict[str, str] = field(default_factory=dict)
+    # Dimensi yang nilainya hanya cocok sebagai awalan (mis. "Ketua Bidang")
+    prefixes: Set[str] = field(default_factory=set)
+    quoted: Optional[str] = None
+    person: Optional[str] = None
+    # Semua rangkaian sisa teks (kandidat nama/perusahaan), terpanjang dulu
+    texts: List[str] = field(default_factory=list)
+    # Jumlah token di luar kutip yang bukan keyword, nilai data atau stopword
+    unmatched: int = 0
+
+
+def _intent(
+    name, *requires, slot=None, bonus=(), excludes=(), priority=0.0, optional=(), closed=False
+) -> Intent:
+    return Intent(
+        name=name,
+        requires=tuple(frozenset(group) for group in requires),
+        slot=slot,
+        bonus=frozenset(bonus),
+        excludes=frozenset(excludes),
+        priority=priority,
+        optional=tuple(optional),
+        closed=closed,
+    )
+
+
+# Fitur yang menandakan pertanyaan tentang dokumen, bukan tentang pengurus
+DOCUMENT_FEATURES = ["document", "document_noun", "document_type", "document_category", "mention"]
+ANY_DOCUMENT = ["document_noun", "document_type", "document_category"]
+DOCUMENT_SLOTS = ["document_type", "document_category"]
+
+
+INTENTS: List[Intent] = [
+    # Intent hitung/daftar closed: filter lain di pertanyaan ("bidang IT yang
+    # perempuan", "ketua umum yang berusia di atas 40") tidak bisa dijawab handler,
+    # jadi pertanyaannya diteruskan ke AI
+    # "berapa nomor wa ketua umum?" menanyakan kontak, bukan jumlah
+    _intent("jabatan_count", ["count"], slot="jabatan", bonus=["member"], excludes=["contact", "document"], closed=True),
+    _intent(
+        "bidang_usaha_count", ["count"], slot="bidang_usaha", bonus=["member"], excludes=["contact", "document"], closed=True
+    ),
+    _intent("status_kta_count", ["status_kta"], slot="status_kta", bonus=["count", "member"], excludes=["document"], closed=True),
+    _intent(
+        "jabatan_distribution",
+        ["jabatan"],
+        ["per", "list", "count"],
+        bonus=["member"],
+        excludes=["contact", "document"],
+        priority=-0.25,
+        closed=True,
+    ),
+    _intent("bidang_usaha_top", ["bidang_usaha"], ["most"], bonus=["member"], excludes=["document"], priority=0.5, closed=True),
+    _intent(
+        "bidang_usaha_distribution",
+        ["bidang_usaha"],
+        ["per", "list", "count", "scope"],
+        bonus=["member"],
+        excludes=["document"],
+        priority=-0.25,
+        closed=True,
+    ),
+    _intent(
+        "status_kta_distribution",
+        ["status_kta"],
+        ["per", "list", "count", "scope"],
+        bonus=["member"],
+        excludes=["document"],
+        priority=-0.25,
+        closed=True,
+    ),
+    _intent("gender_ratio", ["gender"], ["ratio", "count", "per"], bonus=["member"], closed=True),
+    _intent("total_karyawan", ["karyawan"], ["count"], bonus=["company", "member"], closed=True),
+    _intent(
+        "members_by_value", ["person_cue", "list"], slot="value", bonus=["member"], excludes=DOCUMENT_FEATURES, closed=True
+    ),
+    # "nomor KTA Budi" menanyakan KTA, bukan WhatsApp/email
+    _intent("member_contact", ["contact"], slot="person", excludes=["status_kta", *DOCUMENT_FEATURES], priority=0.2),
+    # Kontak pemegang jabatan/bidang ("nomor wa ketua umum"); nama orang tetap menang
+    _intent(
+        "member_contact_by_value",
+        ["contact"],
+        slot="value",
+        bonus=["member", "count"],
+        excludes=["status_kta", *DOCUMENT_FEATURES],
+        priority=-1.0,
+        closed=True,
+    ),
+    _intent("member_company", ["company"], slot="person", excludes=["count", *DOCUMENT_FEATURES], priority=0.1),
+    _intent("member_detail", ["person_cue", "age"], slot="person", excludes=DOCUMENT_FEATURES),
+    # "Ibrahim jabatannya apa?"; dengan kata hitung ("berapa wakil ketua umum dari
+    # Makassar?") jabatan adalah filter jumlah, bukan pertanyaan tentang orang
+    _intent("member_detail", ["jabatan"], slot="person", excludes=["count", *DOCUMENT_FEATURES]),
+    # Hanya "berapa jumlah pengurus?"; pertanyaan dengan filter lain diteruskan ke AI
+    _intent("total_pengurus", ["count"], ["member"], bonus=["scope"], priority=-0.5, closed=True),
+    # Metadata dokumen; pertanyaan isi dokumen ("document") tetap ke AI
+    _intent(
+        "document_count",
+        ["count"],
+        ANY_DOCUMENT,
+        bonus=["document_noun"],
+        excludes=["document", "mention", "pages", "member", "karyawan"],
+        optional=DOCUMENT_SLOTS,
+    ),
+    _intent("document_types", ["document_noun"], ["per", "doc_kind"], excludes=["document", "mention"], priority=-0.25),
+    _intent(
+        "document_list",
+        ANY_DOCUMENT,
+        ["list"],
+        excludes=["document", "mention", "doc_kind", "pages", "member"],
+        optional=DOCUMENT_SLOTS,
+    ),
+    _intent(
+        "document_latest",
+        ["latest"],
+        ["upload", *ANY_DOCUMENT],
+        excludes=["document", "mention", "member"],
+        priority=0.25,
+        optional=DOCUMENT_SLOTS,
+    ),
+    _intent("document_pages", ["pages"], excludes=["document", "mention"], bonus=["count"], optional=DOCUMENT_SLOTS),
+    _intent("document_search", ANY_DOCUMENT, ["mention"], slot="topic", excludes=["document"], optional=DOCUMENT_SLOTS),
+]
+
+# Fitur yang boleh ada di pertanyaan intent closed mana pun ("saat ini", "terdaftar")
+CLOSED_NEUTRAL_FEATURES = ("scope",)
+
+# Bobot slot: nilai data yang dikenali paling kuat, nama dari sisa teks paling lemah
+SLOT_WEIGHTS = {"value": 1.5, "quoted": 1.0, "text": 0.5}
+
+
+def _stem(token: str) -> str:
+    for suffix in SUFFIXES:
+        if token.endswith(suffix) and len(token) > len(suffix) + 2:
+            return token[: -len(suffix)]
+    return token
+
+
+def _clean_text(text: str) -> Optional[str]:
+    """Buang stopword + tanda baca di tepi; None jika terlalu pendek/angka saja"""
+    words = [word for word in re.split(r"[^\w.'-]+", text) if word]
+    kept = [word for word in words if word.lower() not in STOPWORDS]
+    candidate = " ".join(kept).strip(" .,'-")
+    if len(candidate) > 2 and not candidate.isdigit():
+        return candidate
+    return None
+
+
+def _phrase_tokens(phrase: str) -> Tuple[str, ...]:
+    return tuple(_TOKEN.findall(phrase.lower()))
+
+
+class IntentRouter:
+    """
+    Router intent dengan token trie yang di-compile sekali
+
+    Trie statis berisi keyword + tipe dokumen; nilai data (gazetteer) di-compile
+    ke trie kedua yang di-cache selama daftar nilainya tidak berubah.
+    """
+
+    def __init__(
+        self,
+        keywords: Mapping[str, Sequence[str]] = KEYWORDS,
+        intents: Sequence[Intent] = INTENTS,
+    ):
+        self.intents = list(intents)
+        entries = [
+            (_phrase_tokens(phrase), ("feature", feature))
+            for feature, phrases in keywords.items()
+            for phrase in phrases
+        ] + [
+            (_phrase_tokens(phrase), ("value", "document_type", document_type, True))
+            for document_type, phrases in DOCUMENT_TYPE_PHRASES.items()
+            for phrase in phrases
+        ]
+        self._keyword_trie = self._compile(entries)
+        self._keyword_depth = max(len(tokens) for tokens, _ in entries)
+        self._gazetteer_key: Optional[tuple] = None
+        self._value_trie: dict = {}
+        self._value_depth = 0
+
+    @staticmethod
+    def _compile(entries: Iterable[Tuple[Tuple[str, ...], tuple]]) -> dict:
+        """Token trie: node = dict token -> node, terminal disimpan di key None"""
+        trie: dict = {}
+        for tokens, payload in entries:
+            if not tokens:
+                continue
+            node = trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node.setdefault(None, []).append(payload)
+        return trie
+
+    def set_gazetteer(self, values: Mapping[str, Sequence[str]]) -> None:
+        """Compile nilai data per dimensi (dilewati jika sama dengan sebelumnya)"""
+        key = tuple((dimension, tuple(values.get(dimension, ()))) for dimension in GAZETTEER_DIMENSIONS)
+        if key == self._gazetteer_key:
+            return
+        # Nilai lengkap + awalan 2 kata atau lebih ("Ketua Bidang" untuk "Ketua
+        # Bidang 1", "Ketua Bidang 2"); nilai lengkap menang jika teksnya sama
+        phrases: Dict[Tuple[Tuple[str, ...], str], Tuple[str, bool]] = {}
+        for dimension, dimension_values in key:
+            for value in dimension_values:
+                words = value.split()
+                for size in range(2, len(words)):
+                    prefix = " ".join(words[:size])
+                    phrases.setdefault((_phrase_tokens(prefix), dimension), (prefix, False))
+                phrases[(_phrase_tokens(value), dimension)] = (value, True)
+        entries = [
+            (tokens, ("value", dimension, text, exact))
+            for (tokens, dimension), (text, exact) in phrases.items()
+        ]
+        self._value_trie = self._compile(entries)
+        self._value_depth = max((len(tokens) for tokens, _ in entries), default=0)
+        self._gazetteer_key = key
+
+    @staticmethod
+    def _longest(trie: dict, tokens: List[str], start: int, depth: int) -> Tuple[int, list]:
+        """Match terpanjang di trie mulai dari tokens[start]: (panjang, payloads)"""
+        node = trie
+        best_length, best = 0, []
+        for offset in range(min(depth, len(tokens) - start)):
+            node = node.get(tokens[start + offset])
+            if node is None:
+                break
+            if None in node:
+                best_length, best = offset + 1, node[None]
+        return best_length, best
+
+    def parse(self, query: str) -> ParsedQuery:
+        """Tokenisasi + pencocokan keyword dan nilai data dalam satu pass"""
+        quoted_match = _QUOTED.search(query)
+        quoted = quoted_match.group(1).strip() if quoted_match else None
+
+        lowered = query.lower()
+        spans = [(m.start(), m.end()) for m in _TOKEN.finditer(lowered)]
+        raw_tokens = [lowered[start:end] for start, end in spans]
+        tokens = [_stem(token) for token in raw_tokens]
+        inside_quotes = [
+            bool(quoted_match) and quoted_match.start(1) <= start < quoted_match.end(1)
+            for start, _ in spans
+        ]
+
+        parsed = ParsedQuery(tokens=tokens, quoted=quoted)
+        leftover: List[int] = []
+        position = 0
+        while position < len(tokens):
+            keyword_length, keywords = self._longest(
+                self._keyword_trie, tokens, position, self._keyword_depth
+            )
+            value_length, values = self._longest(
+                self._value_trie, raw_tokens, position, self._value_depth
+            )
+            # Keyword menang untuk frasa yang sama panjang (mis. jabatan "Anggota")
+            if value_length > keyword_length:
+                length, payloads = value_length, values
+            else:
+                length, payloads = keyword_length, keywords
+            if length:
+                text = query[spans[position][0] : spans[position + length - 1][1]]
+                for payload in payloads:
+                    if payload[0] == "feature":
+                        name = payload[1]
+                    else:
+                        _, name, value, exact = payload
+                        if name not in parsed.values:
+                            parsed.values[name] = value
+                            parsed.phrases[name] = text
+                            if not exact:
+                                parsed.prefixes.add(name)
+                    parsed.features[name] = parsed.features.get(name, 0) + 1
+                position += length
+            else:
+                if not inside_quotes[position] and raw_tokens[position] not in STOPWORDS:
+                    leftover.append(position)
+                position += 1
+
+        parsed.unmatched = len(leftover)
+
+        # Rangkaian token sisa berurutan, dari teks asli (case asli)
+        runs: List[List[int]] = []
+        for index in leftover:
+            if runs and runs[-1][-1] == index - 1:
+                runs[-1].append(index)
+            else:
+                runs.append([index])
+        cleaned = [_clean_text(query[spans[run[0]][0] : spans[run[-1]][1]]) for run in runs]
+        # sorted() stabil: untuk panjang sama, rangkaian pertama tetap di depan
+        for position in sorted(range(len(runs)), key=lambda i: -len(runs[i])):
+            if cleaned[position]:
+                parsed.texts.append(cleaned[position])
+
+        # Nama = kutip, atau rangkaian sisa terpanjang
+        if quoted:
+            parsed.person = quoted
+        elif runs:
+            parsed.person = cleaned[runs.index(max(runs, key=len))]
+        return parsed
+
+    def _slot(self, intent: Intent, parsed: ParsedQuery) -> Optional[Tuple[Dict[str, str], float]]:
+        """Isi slot intent: (slots, bobot) atau None jika slot wajib tidak terisi"""
+        slots: Dict[str, str] = {}
+        if parsed.quoted:
+            slots["quoted"] = parsed.quoted
+        for dimension in intent.optional:
+            if dimension in parsed.values:
+                slots[dimension] = parsed.values[dimension]
+        if intent.slot is None:
+            return slots, 0.0
+
+        if intent.slot == "person":
+            if not parsed.person:
+                return None
+            slots["person"] = parsed.person
+            return slots, SLOT_WEIGHTS["quoted" if parsed.quoted else "text"]
+
+        if intent.slot == "topic":
+            # Kata yang dicari: kutip > sisa teks > frasa tipe/kategori dokumen
+            if parsed.quoted:
+                slots["topic"] = parsed.quoted
+                return slots, SLOT_WEIGHTS["quoted"]
+            if parsed.person:
+                slots["topic"] = parsed.person
+                return slots, SLOT_WEIGHTS["text"]
+            for dimension in DOCUMENT_SLOTS:
+                if dimension in parsed.phrases:
+                    slots["topic"] = parsed.phrases[dimension]
+                    return slots, SLOT_WEIGHTS["text"]
+            return None
+
+        if intent.slot == "value":
+            for dimension in VALUE_DIMENSIONS:
+                if dimension in parsed.values:
+                    slots["dimension"] = dimension
+                    slots["value"] = parsed.values[dimension]
+                    if dimension in parsed.prefixes:
+                        slots["prefix"] = "true"
+                    return slots, SLOT_WEIGHTS["value"]
+            return None
+
+        # Slot dimensi: nilai data yang dikenali, atau teks kutip + keyword dimensinya
+        if intent.slot in parsed.values:
+            slots[intent.slot] = parsed.values[intent.slot]
+            if intent.slot in parsed.prefixes:
+                slots["prefix"] = "true"
+            return slots, SLOT_WEIGHTS["value"]
+        if parsed.quoted and intent.slot in parsed.features:
+            slots[intent.slot] = parsed.quoted
+            return slots, SLOT_WEIGHTS["quoted"]
+        return None
+
+    @staticmethod
+    def _covers(intent: Intent, parsed: ParsedQuery, slots: Dict[str, str]) -> bool:
+        """Intent closed: tidak ada kata sisa, semua fitur milik intent/slotnya"""
+        if parsed.unmatched:
+            return False
+        allowed = set(intent.bonus).union(*intent.requires, intent.optional, CLOSED_NEUTRAL_FEATURES)
+        if intent.slot:
+            allowed.add(slots.get("dimension", intent.slot))
+        if not allowed.issuperset(parsed.features):
+            return False
+        # Teks kutip harus menjadi nilai slot, bukan filter tambahan
+        if parsed.quoted:
+            quoted = parsed.quoted.lower()
+            used = [value for key, value in slots.items() if key != "quoted"]
+            return any(quoted == text.lower() for text in [*used, *parsed.phrases.values()])
+        return True
+
+    def route(self, query: str) -> List[RouteMatch]:
+        """Semua intent yang cocok, urut skor tertinggi"""
+        parsed = self.parse(query)
+        features = parsed.features
+        matches: List[RouteMatch] = []
+        for intent in self.intents:
+            if any(feature in features for feature in intent.excludes):
+                continue
+            if not all(any(feature in features for feature in group) for group in intent.requires):
+                continue
+            filled = self._slot(intent, parsed)
+            if filled is None:
+                continue
+            slots, slot_weight = filled
+            if intent.closed and not self._covers(intent, parsed, slots):
+                continue
+            score = (
+                len(intent.requires)
+                + slot_weight
+                + 0.25 * sum(1 for feature in intent.bonus if feature in features)
+                + intent.priority
+            )
+            matches.append(RouteMatch(intent=intent.name, score=round(score, 3), slots=slots))
+        matches.sort(key=lambda match: -match.score)
+        return matches
+
+
+router = IntentRouter()
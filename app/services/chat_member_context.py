@@ -0,0 +1,153 @@
+"""
+Chat Member Context
+Memilih pengurus yang relevan dengan pertanyaan untuk prompt AI.
+
+Sebelumnya prompt berisi 50 pengurus pertama (urutan row), sehingga pertanyaan
+tentang pengurus ke-300 tidak bisa dijawab. Sekarang row dipilih dari hasil parse
+intent router, semuanya lewat lookup ber-index:
+- nama: index trigram (member_name_search)
+- perusahaan: prefix pada lower(nama_perusahaan) (expression index)
+- jabatan / bidang usaha / status KTA: kolom ber-index (nilai persis atau awalan)
+
+Sisa budget tidak diisi row acak; build_ai_context mengisinya dengan agregat.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models.member import Member
+from app.services.chat_intent_router import VALUE_DIMENSIONS, ParsedQuery
+from app.services.member_name_search import AMBIGUITY_MARGIN, search_member_names
+from app.services.member_query import build_member_filters, count_members, value_condition
+
+# Maksimal row pengurus di prompt. Dengan encode_members (prompt_encoding) 75 row
+# kira-kira sama jumlah tokennya dengan 50 row format lama
+# (benchmarks/bench_prompt_encoding.py)
+CONTEXT_MEMBER_LIMIT = 75
+
+# Kandidat per teks yang disebut (nama mirip / perusahaan dengan prefix sama)
+MATCHES_PER_TEXT = 3
+
+# Nama perusahaan sering ditulis tanpa badan usahanya ("Maju Jaya" -> "PT Maju Jaya")
+COMPANY_PREFIXES = ["pt", "cv"]
+
+# Teks sisa sering membawa kata lain ("peran Budi Santoso"); sub-rangkaian kata
+# dicoba hanya untuk teks sampai sepanjang ini
+MAX_NAME_WORDS = 4
+
+# Kolom yang ditampilkan di prompt
+CONTEXT_COLUMNS = (
+    Member.id,
+    Member.name,
+    Member.jabatan,
+    Member.nama_perusahaan,
+    Member.kategori_bidang_usaha,
+)
+
+VALUE_LABELS = {"jabatan": "jabatan", "bidang_usaha": "bidang usaha", "status_kta": "status KTA"}
+
+
+@dataclass
+class MemberSelection:
+    """Pengurus terpilih untuk prompt + alasan pemilihannya"""
+
+    members: list = field(default_factory=list)
+    # Yang disebut di pertanyaan dan cocok (mis. "nama 'Ibrahim'", "jabatan 'Ketua Umum'")
+    matched: List[str] = field(default_factory=list)
+    # Total pengurus per nilai yang disebut (untuk "... dan N lainnya")
+    value_totals: Dict[str, int] = field(default_factory=dict)
+    limit: int = CONTEXT_MEMBER_LIMIT
+
+    @property
+    def remaining(self) -> int:
+        """Budget row yang tidak terpakai (diisi agregat oleh pemanggil)"""
+        return max(self.limit - len(self.members), 0)
+
+
+def _name_ids(db: Session, text: str, limit: int) -> List[int]:
+    """
+    Pengurus yang namanya mirip `text`, atau mirip sub-rangkaian katanya
+    ("peran Budi Santoso" -> "Budi Santoso"); hanya kandidat yang skornya dekat
+    dengan skor terbaik
+    """
+    words = text.split()
+    candidates = [text]
+    if 1 < len(words) <= MAX_NAME_WORDS:
+        for size in range(len(words) - 1, 0, -1):
+            candidates += [" ".join(words[start : start + size]) for start in range(len(words) - size, -1, -1)]
+    for candidate in candidates:
+        matches = search_member_names(db, candidate, limit)
+        if matches:
+            best = matches[0].score
+            return [match.member_id for match in matches if best - match.score < AMBIGUITY_MARGIN]
+    return []
+
+
+def _company_ids(db: Session, text: str, limit: int) -> List[int]:
+    """Pengurus dari perusahaan bernama `text` (persis dulu, lalu prefix)"""
+    lowered = text.lower()
+    names = [lowered] + [
+        f"{company_prefix} {lowered}"
+        for company_prefix in COMPANY_PREFIXES
+        if not lowered.startswith(f"{company_prefix} ")
+    ]
+    company = func.lower(Member.nama_perusahaan)
+    for conditions in [[company.in_(names)]] + [
+        build_member_filters(perusahaan_prefix=name) for name in names
+    ]:
+        rows = db.query(Member.id).filter(*conditions).order_by(Member.id).limit(limit)
+        ids = [row.id for row in rows]
+        if ids:
+            return ids
+    return []
+
+
+def select_context_members(
+    db: Session, parsed: Optional[ParsedQuery], limit: int = CONTEXT_MEMBER_LIMIT
+) -> MemberSelection:
+    """Pengurus yang disebut di pertanyaan (nama, perusahaan, jabatan/bidang/status)"""
+    selection = MemberSelection(limit=limit)
+    if parsed is None:
+        return selection
+
+    selected: Dict[int, None] = {}
+
+    def add(ids: List[int]) -> None:
+        for member_id in ids:
+            if len(selected) >= limit:
+                return
+            selected.setdefault(member_id, None)
+
+    texts = [parsed.quoted] if parsed.quoted else []
+    texts += [text for text in parsed.texts if text != parsed.quoted]
+    for text in texts:
+        names = _name_ids(db, text, MATCHES_PER_TEXT)
+        if names:
+            add(names)
+            selection.matched.append(f"nama '{text}'")
+        companies = _company_ids(db, text, MATCHES_PER_TEXT)
+        if companies:
+            add(companies)
+            selection.matched.append(f"perusahaan '{text}'")
+
+    for dimension in VALUE_DIMENSIONS:
+        value = parsed.values.get(dimension)
+        if not value:
+            continue
+        conditions = value_condition(dimension, value, dimension in parsed.prefixes)
+        label = f"{VALUE_LABELS[dimension]} '{value}'"
+        selection.matched.append(label)
+        selection.value_totals[label] = count_members(db, conditions)
+        remaining = limit - len(selected)
+        if remaining > 0:
+            rows = db.query(Member.id).filter(*conditions).order_by(Member.id).limit(remaining)
+            add([row.id for row in rows])
+
+    if selected:
+        rows = {
+            row.id: row
+            for row in db.query(*CONTEXT_COLUMNS).filter(Member.id.in_(list(selected)))
+        }
+        selection.members = [rows[member_id] for member_id in selected if member_id in rows]
+    return selection
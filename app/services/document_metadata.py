@@ -0,0 +1,159 @@
+"""
+Document Metadata Service
+Query metadata universal_documents untuk fast path chat (jumlah per tipe/kategori,
+upload terbaru, total halaman, dokumen yang menyebut kata tertentu).
+
+Semua query hanya mengambil kolom metadata (GROUP BY / COUNT / SUM di database);
+full_text tidak pernah di-load.
+"""
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+from app.models.universal_document import UniversalDocument
+from typing import Any, Dict, List, Optional
+
+# Kolom yang di-load untuk daftar dokumen (tanpa full_text/search_index)
+LISTING_COLUMNS = (
+    UniversalDocument.id,
+    UniversalDocument.filename,
+    UniversalDocument.document_type,
+    UniversalDocument.category,
+    UniversalDocument.page_count,
+    UniversalDocument.uploaded_at,
+)
+
+
+def _filters(document_type: Optional[str] = None, category: Optional[str] = None) -> list:
+    conditions = []
+    if document_type:
+        conditions.append(UniversalDocument.document_type == document_type)
+    if category:
+        conditions.append(UniversalDocument.category == category)
+    return conditions
+
+
+def _listing(row) -> Dict[str, Any]:
+    return {
+        "id": row.id,
+        "filename": row.filename,
+        "document_type": row.document_type,
+        "category": row.category,
+        "page_count": row.page_count,
+        "uploaded_at": row.uploaded_at.isoformat() if row.uploaded_at else None,
+    }
+
+
+def get_document_categories(db: Session) -> List[str]:
+    """Kategori custom yang dipakai dokumen (untuk gazetteer intent router)"""
+    rows = (
+        db.query(UniversalDocument.category)
+        .filter(UniversalDocument.category.isnot(None), UniversalDocument.category != "")
+        .distinct()
+        .order_by(UniversalDocument.category)
+    )
+    return [row.category for row in rows]
+
+
+def count_documents(
+    db: Session, document_type: Optional[str] = None, category: Optional[str] = None
+) -> int:
+    """Jumlah dokumen, opsional difilter tipe/kategori"""
+    return (
+        db.query(func.count(UniversalDocument.id))
+        .filter(*_filters(document_type, category))
+        .scalar()
+        or 0
+    )
+
+
+def count_by_type(db: Session) -> Dict[str, int]:
+    """Jumlah dokumen per document_type, urut terbanyak"""
+    total = func.count(UniversalDocument.id)
+    rows = (
+        db.query(UniversalDocument.document_type, total)
+        .group_by(UniversalDocument.document_type)
+        .order_by(total.desc(), UniversalDocument.document_type)
+    )
+    return {document_type or "OTHER": count for document_type, count in rows}
+
+
+def count_by_category(db: Session) -> Dict[str, int]:
+    """Jumlah dokumen per kategori custom (tanpa dokumen yang belum dikategorikan)"""
+    total = func.count(UniversalDocument.id)
+    rows = (
+        db.query(UniversalDocument.category, total)
+        .filter(UniversalDocument.category.isnot(None), UniversalDocument.category != "")
+        .group_by(UniversalDocument.category)
+        .order_by(total.desc(), UniversalDocument.category)
+    )
+    return {category: count for category, count in rows}
+
+
+def latest_documents(
+    db: Session,
+    limit: int = 5,
+    document_type: Optional[str] = None,
+    category: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Dokumen yang paling baru di-upload"""
+    rows = (
+        db.query(*LISTING_COLUMNS)
+        .filter(*_filters(document_type, category))
+        .order_by(UniversalDocument.uploaded_at.desc(), UniversalDocument.id.desc())
+        .limit(limit)
+    )
+    return [_listing(row) for row in rows]
+
+
+def page_totals(
+    db: Session, document_type: Optional[str] = None, category: Optional[str] = None
+) -> Dict[str, Any]:
+    """Total halaman + jumlah dokumen + dokumen terpanjang"""
+    conditions = _filters(document_type, category)
+    documents, pages = (
+        db.query(func.count(UniversalDocument.id), func.sum(UniversalDocument.page_count))
+        .filter(*conditions)
+        .one()
+    )
+    longest = (
+        db.query(*LISTING_COLUMNS)
+        .filter(*conditions, UniversalDocument.page_count.isnot(None))
+        .order_by(UniversalDocument.page_count.desc())
+        .first()
+    )
+    return {
+        "documents": documents or 0,
+        "total_pages": pages or 0,
+        "longest": _listing(longest) if longest else None,
+    }
+
+
+def search_document_mentions(
+    db: Session,
+    term: Optional[str],
+    document_type: Optional[str] = None,
+    limit: int = 10,
+) -> Dict[str, Any]:
+    """
+    Dokumen yang menyebut `term` di search_index (nama file + awal teks),
+    atau yang tipenya sama dengan document_type
+
+    Return {"count": total dokumen cocok, "documents": maksimal `limit` dokumen}.
+    """
+    matches = []
+    if term:
+        matches.append(func.lower(UniversalDocument.search_index).contains(term.lower(), autoescape=True))
+    if document_type:
+        matches.append(UniversalDocument.document_type == document_type)
+    if not matches:
+        return {"count": 0, "documents": []}
+
+    condition = or_(*matches)
+    count = db.query(func.count(UniversalDocument.id)).filter(condition).scalar() or 0
+    rows = (
+        db.query(*LISTING_COLUMNS)
+        .filter(condition)
+        .order_by(UniversalDocument.uploaded_at.desc(), UniversalDocument.id.desc())
+        .limit(limit)
+    )
+    return {"count": count, "documents": [_listing(row) for row in rows]}
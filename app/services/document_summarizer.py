@@ -0,0 +1,172 @@
+"""
+Document Summarizer
+Ringkasan AI untuk dokumen panjang secara map-reduce.
+
+Sebelumnya ringkasan hanya dibuat dari 15.000 karakter pertama (sebagian kecil
+dari PO 200 halaman), lalu insight dibuat dengan panggilan kedua yang serial dari
+8.000 karakter pertama. Sekarang:
+- map: teks penuh dipotong per DOCUMENT_SUMMARY_CHUNK_CHARS (di batas paragraf/
+  kalimat), setiap potongan diringkas paralel (maksimal
+  DOCUMENT_SUMMARY_CONCURRENCY panggilan sekaligus)
+- reduce: ringkasan digabung per DOCUMENT_SUMMARY_FANOUT, level demi level,
+  sampai tersisa satu
+
+Setiap panggilan mengembalikan ringkasan + insight (topik, temuan, entitas)
+sekaligus dalam JSON, jadi jumlah level = 1 + ceil(log_fanout(jumlah potongan))
+dan dokumen pendek cukup satu panggilan. Ukuran potongan juga dibatasi budget
+token caller document_summary (GEMINI_TOKEN_BUDGETS), jadi budget yang lebih kecil
+berarti lebih banyak potongan, bukan teks yang dibuang.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+import contextvars
+import re
+
+from app.core.config import (
+    DOCUMENT_SUMMARY_CHUNK_CHARS,
+    DOCUMENT_SUMMARY_CONCURRENCY,
+    DOCUMENT_SUMMARY_FANOUT,
+)
+from app.services.gemini_service import GeminiService
+from app.services.gemini_telemetry import CALLER_DOCUMENT_SUMMARY
+from app.services.token_budget import chars_for_budget
+
+# Batas potongan dicari mundur dari ukuran maksimal, paling jauh sebanyak ini
+_BOUNDARY_WINDOW = 0.2
+_BOUNDARIES = [re.compile(r"\n\s*\n"), re.compile(r"\n"), re.compile(r"[.!?]\s"), re.compile(r"\s")]
+
+# Jumlah item maksimal per daftar insight di hasil akhir
+MAX_TOPICS = 5
+MAX_FINDINGS = 5
+MAX_ENTITIES = 10
+
+
+class DocumentSummaryError(Exception):
+    """Ringkasan tidak bisa dibuat (ada potongan yang gagal diringkas)"""
+
+
+@dataclass
+class DocumentSummary:
+    summary: str
+    main_topics: List[str] = field(default_factory=list)
+    key_findings: List[str] = field(default_factory=list)
+    entities: List[str] = field(default_factory=list)
+    chunks: int = 1
+    levels: int = 1
+    calls: int = 1
+
+    def insights(self) -> dict:
+        """Isi kolom ai_insights ("analysis" tetap ada untuk client lama)"""
+        lines = ["Topik utama:"] + [f"- {topic}" for topic in self.main_topics]
+        lines += ["Temuan penting:"] + [f"- {finding}" for finding in self.key_findings]
+        if self.entities:
+            lines.append("Entitas penting: " + ", ".join(self.entities))
+        return {
+            "analysis": "\n".join(lines),
+            "main_topics": self.main_topics,
+            "key_findings": self.key_findings,
+            "entities": self.entities,
+            "chunks": self.chunks,
+            "levels": self.levels,
+        }
+
+
+def split_into_chunks(text: str, chunk_chars: int = DOCUMENT_SUMMARY_CHUNK_CHARS) -> List[str]:
+    """Potong teks maksimal chunk_chars per potongan, di batas paragraf/baris/kalimat/kata"""
+    text = text.strip()
+    chunks = []
+    while len(text) > chunk_chars:
+        window_start = int(chunk_chars * (1 - _BOUNDARY_WINDOW))
+        cut = chunk_chars
+        for boundary in _BOUNDARIES:
+            matches = list(boundary.finditer(text, window_start, chunk_chars))
+            if matches:
+                cut = matches[-1].end()
+                break
+        chunks.append(text[:cut].strip())
+        text = text[cut:].strip()
+    if text:
+        chunks.append(text)
+    return chunks
+
+
+def _run_level(fn: Callable, items: list, concurrency: int) -> list:
+    """
+    Jalankan fn untuk setiap item paralel (urutan hasil sama dengan items)
+
+    Context pemanggil (lane prioritas, deadline) disalin ke setiap thread.
+    """
+    if len(items) == 1:
+        return [fn(0, items[0])]
+    contexts = [contextvars.copy_context() for _ in items]
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(items))) as pool:
+        return list(pool.map(lambda index, item: contexts[index].run(fn, index, item), range(len(items)), items))
+
+
+def _checked(result: dict, stage: str) -> dict:
+    if "error" in result:
+        raise DocumentSummaryError(f"{stage}: {result['error']}")
+    return result
+
+
+def _unique(values: List[str], limit: int) -> List[str]:
+    seen = {}
+    for value in values:
+        seen.setdefault(value.casefold(), value)
+    return list(seen.values())[:limit]
+
+
+def summarize_document(
+    text: str,
+    document_type: str,
+    gemini: Optional[GeminiService] = None,
+    chunk_chars: int = DOCUMENT_SUMMARY_CHUNK_CHARS,
+    fanout: int = DOCUMENT_SUMMARY_FANOUT,
+    concurrency: int = DOCUMENT_SUMMARY_CONCURRENCY,
+) -> DocumentSummary:
+    """
+    Ringkasan + insight untuk seluruh teks dokumen (map-reduce)
+
+    Raises:
+        DocumentSummaryError: jika ada potongan/level yang gagal diringkas
+            (hasil parsial tidak dipakai supaya ringkasan tidak menyesatkan)
+    """
+    gemini = gemini or GeminiService()
+    overhead = gemini.document_part_prompt("", document_type, 1, 1)
+    budget_chars = chars_for_budget(CALLER_DOCUMENT_SUMMARY, text[:chunk_chars], overhead)
+    if budget_chars:
+        chunk_chars = min(chunk_chars, budget_chars)
+    chunks = split_into_chunks(text, chunk_chars)
+    if not chunks:
+        raise DocumentSummaryError("Document has no text")
+
+    def summarize_chunk(index: int, chunk: str) -> dict:
+        result = gemini.summarize_document_part(chunk, document_type, index + 1, len(chunks))
+        return _checked(result, f"chunk {index + 1}/{len(chunks)}")
+
+    partials = _run_level(summarize_chunk, chunks, concurrency)
+    levels, calls = 1, len(chunks)
+
+    def combine(index: int, group: List[dict]) -> dict:
+        if len(group) == 1:
+            return group[0]
+        return _checked(gemini.combine_document_summaries(group, document_type), f"reduce level {levels + 1}")
+
+    while len(partials) > 1:
+        groups = [partials[start : start + max(fanout, 2)] for start in range(0, len(partials), max(fanout, 2))]
+        partials = _run_level(combine, groups, concurrency)
+        levels += 1
+        calls += sum(1 for group in groups if len(group) > 1)
+
+    final = partials[0]
+    return DocumentSummary(
+        summary=final["summary"],
+        main_topics=_unique(final.get("main_topics", []), MAX_TOPICS),
+        key_findings=_unique(final.get("key_findings", []), MAX_FINDINGS),
+        entities=_unique(final.get("entities", []), MAX_ENTITIES),
+        chunks=len(chunks),
+        levels=levels,
+        calls=calls,
+    )
@@ -0,0 +1,255 @@
+"""
+Gemini Resilience
+Deadline, retry dan circuit breaker untuk panggilan Gemini.
+
+- Deadline: setiap panggilan punya batas waktu total. Endpoint bisa memasang
+  deadline request (request_deadline) yang berlaku untuk semua panggilan di
+  dalamnya; timeout tiap percobaan dipotong ke sisa deadline. Tanpa deadline
+  request dipakai GEMINI_DEADLINE_SECONDS.
+- Retry: hanya untuk error sementara (timeout, koneksi putus, HTTP 408/429/5xx),
+  backoff eksponensial dengan full jitter, dan tidak pernah melewati deadline.
+- Circuit breaker: setelah GEMINI_BREAKER_FAILURE_THRESHOLD kegagalan sementara
+  berturut-turut, panggilan langsung gagal (CircuitOpenError) selama
+  GEMINI_BREAKER_RESET_SECONDS; setelah itu satu panggilan percobaan (half-open)
+  menentukan breaker ditutup atau dibuka lagi. Pemanggil (analytics, chat)
+  memakai jawaban statistik/fallback yang sudah ada.
+
+Deadline disimpan di contextvar, jadi ikut terbawa ke asyncio.to_thread.
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+import random
+import threading
+import time
+
+import httpx
+from google.genai import errors
+
+from app.core.config import (
+    GEMINI_BREAKER_FAILURE_THRESHOLD,
+    GEMINI_BREAKER_RESET_SECONDS,
+    GEMINI_DEADLINE_SECONDS,
+    GEMINI_MAX_RETRIES,
+    GEMINI_RETRY_BASE_SECONDS,
+    GEMINI_RETRY_MAX_SECONDS,
+    GEMINI_TIMEOUT_SECONDS,
+)
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# Deadline request yang sedang berjalan (time.monotonic), None = tidak ada
+_deadline: ContextVar[Optional[float]] = ContextVar("gemini_deadline", default=None)
+
+
+class GeminiCallError(Exception):
+    """Panggilan Gemini gagal; retryable = error sementara"""
+
+    def __init__(self, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class DeadlineExceededError(GeminiCallError):
+    """Deadline habis sebelum Gemini menjawab"""
+
+
+class CircuitOpenError(GeminiCallError):
+    """Circuit breaker terbuka: Gemini tidak dipanggil sama sekali"""
+
+
+@contextmanager
+def request_deadline(seconds: float, started: Optional[float] = None):
+    """
+    Pasang deadline untuk semua panggilan Gemini di dalam blok ini
+
+    Args:
+        seconds: Batas waktu dihitung dari `started` (time.monotonic saat request
+            masuk; default sekarang)
+
+    Deadline yang lebih ketat dari luar (nested) tetap berlaku.
+    """
+    deadline = (time.monotonic() if started is None else started) + seconds
+    outer = _deadline.get()
+    token = _deadline.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def current_deadline() -> float:
+    """Deadline panggilan saat ini (deadline request atau GEMINI_DEADLINE_SECONDS dari sekarang)"""
+    deadline = _deadline.get()
+    return deadline if deadline is not None else time.monotonic() + GEMINI_DEADLINE_SECONDS
+
+
+def remaining_seconds() -> float:
+    return max(current_deadline() - time.monotonic(), 0.0)
+
+
+def is_retryable(error: Exception) -> bool:
+    """Error sementara yang layak dicoba lagi"""
+    if isinstance(error, GeminiCallError):
+        return error.retryable
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (httpx.TimeoutException, httpx.TransportError, TimeoutError, ConnectionError))
+
+
+class CircuitBreaker:
+    """Circuit breaker closed -> open -> half_open (satu panggilan percobaan) -> closed"""
+
+    def __init__(
+        self,
+        failure_threshold: int = GEMINI_BREAKER_FAILURE_THRESHOLD,
+        reset_seconds: float = GEMINI_BREAKER_RESET_SECONDS,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._stats: Counter = Counter()
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError jika panggilan tidak boleh dilakukan"""
+        with self._lock:
+            if self._state == "open":
+                wait = self._opened_at + self.reset_seconds - time.monotonic()
+                if wait > 0:
+                    self._stats["short_circuited"] += 1
+                    raise CircuitOpenError(
+                        f"Gemini sementara tidak tersedia (circuit breaker open, coba lagi dalam {wait:.0f} detik)"
+                    )
+                self._state = "half_open"
+            if self._state == "half_open":
+                if self._probing:
+                    self._stats["short_circuited"] += 1
+                    raise CircuitOpenError("Gemini sementara tidak tersedia (circuit breaker half-open)")
+                self._probing = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != "closed":
+                print("✅ Gemini circuit breaker closed")
+            self._state = "closed"
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                if self._state != "open":
+                    self._stats["opened"] += 1
+                    print(f"⚠️ Gemini circuit breaker open ({self._failures} kegagalan berturut-turut)")
+                self._state = "open"
+                self._opened_at = time.monotonic()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._probing = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "reset_seconds": self.reset_seconds,
+                "opened": self._stats["opened"],
+                "short_circuited": self._stats["short_circuited"],
+            }
+
+
+class ResilientCaller:
+    """Jalankan satu panggilan Gemini dengan deadline, retry + jitter dan circuit breaker"""
+
+    def __init__(
+        self,
+        breaker: Optional[CircuitBreaker] = None,
+        max_retries: int = GEMINI_MAX_RETRIES,
+        attempt_timeout: float = GEMINI_TIMEOUT_SECONDS,
+        retry_base: float = GEMINI_RETRY_BASE_SECONDS,
+        retry_max: float = GEMINI_RETRY_MAX_SECONDS,
+    ):
+        self.breaker = breaker or CircuitBreaker()
+        self.max_retries = max_retries
+        self.attempt_timeout = attempt_timeout
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self._lock = threading.Lock()
+        self._stats: Counter = Counter()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def backoff(self, retry: int) -> float:
+        """Full jitter: acak antara 0 dan base * 2^retry (maksimal retry_max)"""
+        return random.uniform(0, min(self.retry_max, self.retry_base * 2**retry))
+
+    def call(self, attempt: Callable[[float], Any]) -> Any:
+        """
+        Panggil attempt(timeout_seconds) sampai berhasil, error tidak retryable,
+        retry habis atau deadline lewat
+
+        Raises:
+            CircuitOpenError: breaker terbuka (tanpa memanggil Gemini)
+            DeadlineExceededError: deadline habis
+            GeminiCallError: error lain (retryable menandai error sementara)
+        """
+        deadline = current_deadline()
+        self._count("calls")
+        retry = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._count("deadline_exceeded")
+                raise DeadlineExceededError("Gemini API call failed: deadline exceeded", retryable=True)
+            self.breaker.before_call()
+            self._count("attempts")
+            try:
+                result = attempt(min(self.attempt_timeout, remaining))
+            except Exception as e:
+                retryable = is_retryable(e)
+                if not retryable:
+                    # Gemini menjawab (mis. 400): endpoint sehat, error milik request ini
+                    self.breaker.record_success()
+                    self._count("failures")
+                    raise GeminiCallError(f"Gemini API call failed: {e}") from e
+                self.breaker.record_failure()
+                delay = self.backoff(retry)
+                if retry >= self.max_retries or time.monotonic() + delay >= deadline:
+                    self._count("failures")
+                    if time.monotonic() >= deadline:
+                        self._count("deadline_exceeded")
+                        raise DeadlineExceededError(
+                            f"Gemini API call failed: deadline exceeded ({e})", retryable=True
+                        ) from e
+                    raise GeminiCallError(f"Gemini API call failed: {e}", retryable=True) from e
+                retry += 1
+                self._count("retries")
+                time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {
+                name: self._stats[name]
+                for name in ("calls", "attempts", "retries", "failures", "deadline_exceeded")
+            }
+        return {**stats, "circuit_breaker": self.breaker.get_stats()}
+
+
+gemini_caller = ResilientCaller()
@@ -1,26 +1,130 @@
 import os
 import json
+import hashlib
+import time
 from typing import Optional
 from google import genai
 from google.genai import types
+from app.services.member_aggregation import gender_counts
+from app.services.prompt_encoding import encode_counts
+from app.core.config import GEMINI_BASE_URL, GEMINI_MODEL
+from app.services.single_flight import SingleFlight
+from app.services.rate_limiter import RateLimiter
+from app.services.work_scheduler import SchedulerTimeoutError, gemini_scheduler
+from app.services.prompt_encoding import estimate_tokens
+from app.services.gemini_telemetry import (
+    CALLER_ANALYTICS_DOCUMENTS,
+    CALLER_ANALYTICS_MEMBERS,
+    CALLER_ANALYTICS_OVERVIEW,
+    CALLER_CHAT,
+    CALLER_DOCUMENT_SUMMARY,
+    CALLER_EXTRACTION,
+    CALLER_OTHER,
+    CALLER_SUMMARIZATION,
+    gemini_telemetry,
+)
+from app.services.token_budget import choose_within_budget, fit_to_budget
+from app.services import model_router
+from app.services.gemini_resilience import (
+    DeadlineExceededError,
+    GeminiCallError,
+    gemini_caller,
+    remaining_seconds,
+)
+
+# Versi template prompt analytics - naikkan jika prompt diubah supaya cache lama tidak dipakai
+PROMPT_VERSIONS = {
+    "members": "2",
+    "documents": "2",
+    "overview": "1",
+}
+
+# Parameter generate_content yang dipakai semua panggilan (bagian dari key coalescing)
+GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "top_p": 0.95,
+    "max_output_tokens": 2048,
+}
+
+# Dibagi semua instance GeminiService: prompt identik yang sedang diproses
+# (mis. /analytics/members dari beberapa tab) cukup dikirim sekali
+gemini_single_flight = SingleFlight()
+
+
+def request_key(model: str, prompt: str, config: dict) -> str:
+    """Key coalescing untuk (model, prompt, config)"""
+    raw = json.dumps([model, prompt, config], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# Format jawaban ringkasan dokumen: ringkasan + insight dalam satu panggilan
+DOCUMENT_SUMMARY_FORMAT = """Balas HANYA dengan JSON (tanpa markdown) berformat:
+{"summary": "ringkasan maksimal 5 kalimat", "main_topics": ["2-3 topik utama"], "key_findings": ["2-3 temuan penting"], "entities": ["orang, organisasi, tanggal penting (maksimal 10)"]}"""
+
+DOCUMENT_SUMMARY_LISTS = ("main_topics", "key_findings", "entities")
+
+
+def parse_document_summary(response: str) -> dict:
+    """Parse JSON ringkasan dokumen (toleran terhadap ```json dan teks di sekitarnya)"""
+    start, end = response.find("{"), response.rfind("}")
+    if start < 0 or end < start:
+        raise ValueError("Gemini response is not JSON")
+    data = json.loads(response[start : end + 1])
+    summary = str(data.get("summary") or "").strip()
+    if not summary:
+        raise ValueError("Gemini response has no summary")
+    result = {"summary": summary}
+    for key in DOCUMENT_SUMMARY_LISTS:
+        values = data.get(key) or []
+        if isinstance(values, str):
+            values = [values]
+        result[key] = [str(value).strip() for value in values if str(value).strip()]
+    return result
+
+
+def create_client(api_key: str, base_url: Optional[str] = GEMINI_BASE_URL) -> genai.Client:
+    """Client google-genai; base_url mengarahkan ke endpoint lain (fake server lokal)"""
+    http_options = types.HttpOptions(base_url=base_url) if base_url else None
+    return genai.Client(api_key=api_key, http_options=http_options)
+
+
+def _ranked(counts: dict, limit: Optional[int]) -> dict:
+    """Urutkan distribusi dari jumlah terbesar jika hanya `limit` nilai yang ditampilkan"""
+    if limit is None:
+        return counts
+    return dict(sorted(counts.items(), key=lambda item: item[1], reverse=True))
+
+
+def is_ai_error(text: Optional[str]) -> bool:
+    """Teks fallback/error dari GeminiService (bukan jawaban AI)"""
+    return not text or text.startswith(("Error:", "API Key not configured"))
 
 
 class GeminiService:
     """Service untuk integrasi dengan Gemini API"""
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        client: Optional[genai.Client] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
         self.api_key = api_key or os.getenv("GEMINI_API_KEY")
-        self.model = "gemini-2.0-flash-exp"
-        self.client = genai.Client(api_key=self.api_key) if self.api_key else None
+        # Model utama; model per panggilan dipilih model_router (lihat model_for)
+        self.model = GEMINI_MODEL
+        self.client = client or (create_client(self.api_key) if self.api_key else None)
+        # Opsional: batas laju panggilan bersama (mis. worker enrichment background)
+        self.rate_limiter = rate_limiter
 
     def summarize_text(self, text: str, max_length: int = 500) -> str:
         """Ringkasan teks menggunakan Gemini"""
         if not self.api_key:
             return "API Key not configured"
 
-        prompt = f"Buatkan ringkasan singkat ({max_length} karakter) dari teks berikut:\n\n{text}\n\nRingkasan:"
+        template = f"Buatkan ringkasan singkat ({max_length} karakter) dari teks berikut:\n\n{{text}}\n\nRingkasan:"
+        text = fit_to_budget(CALLER_SUMMARIZATION, text, overhead=template)
         try:
-            return self._call_api(prompt)
+            return self._call_api(template.format(text=text), caller=CALLER_SUMMARIZATION)
         except Exception as e:
             return f"Error: {str(e)}"
 
@@ -29,12 +133,28 @@ class GeminiService:
         if not self.api_key:
             return "API Key not configured"
 
-        prompt = f"Berdasarkan konteks berikut, jawab pertanyaan:\n\nKONTEKS:\n{context}\n\nPERTANYAAN:\n{question}\n\nJAWABAN:"
         try:
-            return self._call_api(prompt)
+            return self._call_api(self._question_prompt(question, context), caller=CALLER_CHAT)
         except Exception as e:
             return f"Error: {str(e)}"
 
+    async def answer_question_async(self, question: str, context: str) -> str:
+        """answer_question untuk endpoint async (tidak memblokir event loop)"""
+        if not self.api_key:
+            return "API Key not configured"
+
+        try:
+            return await self._call_api_async(self._question_prompt(question, context), caller=CALLER_CHAT)
+        except Exception as e:
+            return f"Error: {str(e)}"
+
+    def _question_prompt(self, question: str, context: str) -> str:
+        """Prompt chat; context dikecilkan (bagian belakang dibuang) jika melewati budget token"""
+        template = "Berdasarkan konteks berikut, jawab pertanyaan:\n\nKONTEKS:\n{context}\n\nPERTANYAAN:\n{question}\n\nJAWABAN:"
+        overhead = template.format(context="", question=question)
+        context = fit_to_budget(CALLER_CHAT, context, overhead=overhead, separator="\n\n---\n\n")
+        return template.format(context=context, question=question)
+
     def extract_key_info(self, text: str) -> dict:
         """Ekstrak info kunci dari dokumen organisasi"""
         if not self.api_key:
@@ -47,26 +167,72 @@ Dokumen:
 
 Format JSON."""
         try:
-            return {"info": self._call_api(prompt)}
+            return {"info": self._call_api(prompt, caller=CALLER_EXTRACTION)}
         except Exception as e:
             return {"error": str(e)}
 
-    def analyze_members_data(self, members_data: list) -> dict:
-        """Analisis data pengurus HIPMI dengan AI - menghasilkan insight natural"""
+    def summarize_document_part(
+        self, text: str, document_type: str, part: int, parts: int
+    ) -> dict:
+        """Ringkasan + insight terstruktur untuk satu potongan dokumen (level map)"""
+        if not self.api_key:
+            return {"error": "API Key not configured"}
+
+        return self._document_summary_call(self.document_part_prompt(text, document_type, part, parts))
+
+    def document_part_prompt(self, text: str, document_type: str, part: int, parts: int) -> str:
+        scope = f"bagian {part} dari {parts}" if parts > 1 else "seluruh dokumen"
+        return f"""Ringkas dokumen organisasi HIPMI berikut (tipe {document_type}, {scope}).
+
+{DOCUMENT_SUMMARY_FORMAT}
+
+TEKS:
+{text}"""
+
+    def combine_document_summaries(self, partials: list, document_type: str) -> dict:
+        """Gabungkan ringkasan beberapa bagian dokumen menjadi satu (level reduce)"""
+        if not self.api_key:
+            return {"error": "API Key not configured"}
+
+        parts = "\n".join(
+            f"[{index}] " + json.dumps(partial, ensure_ascii=False)
+            for index, partial in enumerate(partials, 1)
+        )
+        prompt = f"""Berikut ringkasan berurutan dari bagian-bagian satu dokumen organisasi HIPMI (tipe {document_type}). Gabungkan menjadi satu ringkasan utuh untuk keseluruhan bagian tersebut; hilangkan duplikasi.
+
+{DOCUMENT_SUMMARY_FORMAT}
+
+RINGKASAN BAGIAN:
+{parts}"""
+        return self._document_summary_call(prompt)
+
+    def _document_summary_call(self, prompt: str) -> dict:
+        try:
+            return parse_document_summary(self._call_api(prompt, caller=CALLER_DOCUMENT_SUMMARY))
+        except Exception as e:
+            return {"error": str(e)}
+
+    def analyze_members_data(self, aggregates: dict) -> dict:
+        """Analisis data pengurus HIPMI dengan AI - menghasilkan insight natural
+
+        Args:
+            aggregates: Hasil compute_member_aggregates (statistik dari database)
+        """
         if not self.api_key:
             return {"error": "API Key not configured"}
 
         # Build statistics
-        total = len(members_data)
-        stats = self._build_member_stats(members_data)
+        total = aggregates.get("total_pengurus", 0)
+        stats = self._build_member_stats(aggregates)
 
-        prompt = f"""Kamu adalah AI analyst untuk organisasi HIPMI. Analisis data keanggotaan berikut dan berikan insight dalam bahasa Indonesia yang mudah dipahami.
+        def build_prompt(limit: Optional[int]) -> str:
+            return f"""Kamu adalah AI analyst untuk organisasi HIPMI. Analisis data keanggotaan berikut dan berikan insight dalam bahasa Indonesia yang mudah dipahami.
 
 DATA ANGGOTA:
 - Total: {total} orang
-- Distribusi Jabatan: {stats['positions']}
-- Distribusi Bidang Usaha: {stats['business']}
-- Distribusi Gender: {stats['gender']}
+- Distribusi Jabatan: {encode_counts(_ranked(stats['positions'], limit), limit)}
+- Distribusi Bidang Usaha: {encode_counts(_ranked(stats['business'], limit), limit)}
+- Distribusi Gender: {encode_counts(_ranked(stats['gender'], limit), limit)}
 
 Berikan analisis dalam format berikut (TANPA markdown, TANPA ```json):
 
@@ -88,8 +254,11 @@ RECOMMENDATIONS:
 
 Gunakan bahasa yang profesional namun mudah dipahami. Fokus pada insight yang praktis dan actionable."""
 
+        # Distribusi dipersingkat (nilai teratas saja) jika prompt melewati budget token
+        prompt = choose_within_budget(CALLER_ANALYTICS_MEMBERS, build_prompt)
+
         try:
-            response = self._call_api(prompt).strip()
+            response = self._call_api(prompt, caller=CALLER_ANALYTICS_MEMBERS).strip()
 
             # Parse response
             summary = ""
@@ -187,13 +356,14 @@ Gunakan bahasa yang profesional namun mudah dipahami. Fokus pada insight yang pr
         total = len(documents_data)
         stats = self._build_document_stats(documents_data)
 
-        prompt = f"""Kamu adalah AI analyst untuk dokumentasi HIPMI. Analisis data dokumen berikut dan berikan insight dalam bahasa Indonesia yang mudah dipahami.
+        def build_prompt(limit: Optional[int]) -> str:
+            return f"""Kamu adalah AI analyst untuk dokumentasi HIPMI. Analisis data dokumen berikut dan berikan insight dalam bahasa Indonesia yang mudah dipahami.
 
 DATA DOKUMEN:
 - Total Dokumen: {total}
 - Total Halaman: {stats['total_pages']}
-- Distribusi Tipe: {stats['types']}
-- Distribusi Kategori: {stats['categories']}
+- Distribusi Tipe: {encode_counts(_ranked(stats['types'], limit), limit)}
+- Distribusi Kategori: {encode_counts(_ranked(stats['categories'], limit), limit)}
 
 Berikan analisis dalam format berikut (TANPA markdown, TANPA ```json):
 
@@ -215,8 +385,11 @@ RECOMMENDATIONS:
 
 Gunakan bahasa yang profesional namun mudah dipahami."""
 
+        # Distribusi dipersingkat (nilai teratas saja) jika prompt melewati budget token
+        prompt = choose_within_budget(CALLER_ANALYTICS_DOCUMENTS, build_prompt)
+
         try:
-            response = self._call_api(prompt).strip()
+            response = self._call_api(prompt, caller=CALLER_ANALYTICS_DOCUMENTS).strip()
 
             # Parse response
             summary = ""
@@ -310,27 +483,35 @@ Gunakan bahasa yang profesional namun mudah dipahami."""
                 "error_detail": str(e),
             }
 
-    def _build_member_stats(self, members_data: list) -> dict:
-        """Build statistik dari data members"""
-        positions = {}
-        business = {}
-        gender = {"Male": 0, "Female": 0}
+    def analyze_overview(self, members_count: int, documents_count: int) -> dict:
+        """Ringkasan singkat kondisi organisasi untuk dashboard (format JSON)"""
+        if not self.api_key:
+            return {"error": "API Key not configured"}
+
+        prompt = f"""Sebagai AI analyst untuk HIPMI, berikan ringkasan singkat kondisi organisasi:
 
-        for m in members_data:
-            # Count positions
-            pos = m.get("jabatan", "Unknown")
-            positions[pos] = positions.get(pos, 0) + 1
+Total Anggota: {members_count}
+Total Dokumen: {documents_count}
 
-            # Count business categories
-            biz = m.get("kategori_bidang_usaha", "Unknown")
-            business[biz] = business.get(biz, 0) + 1
+Berikan 3 poin insight singkat dalam format JSON:
+{{
+    "health_status": "Excellent/Good/Fair/Needs Improvement",
+    "key_points": ["Poin 1", "Poin 2", "Poin 3"],
+    "next_actions": "Rekomendasi prioritas"
+}}"""
 
-            # Count gender
-            g = m.get("jenis_kelamin")
-            if g in ["Male", "Female"]:
-                gender[g] += 1
+        try:
+            return json.loads(self._call_api(prompt, caller=CALLER_ANALYTICS_OVERVIEW))
+        except Exception as e:
+            return {"error": str(e)}
 
-        return {"positions": positions, "business": business, "gender": gender}
+    def _build_member_stats(self, aggregates: dict) -> dict:
+        """Build statistik prompt dari hasil agregasi members"""
+        return {
+            "positions": aggregates.get("by_jabatan", {}),
+            "business": aggregates.get("by_bidang_usaha", {}),
+            "gender": gender_counts(aggregates),
+        }
 
     def _build_document_stats(self, documents_data: list) -> dict:
         """Build statistik dari data documents"""
@@ -358,25 +539,86 @@ Gunakan bahasa yang profesional namun mudah dipahami."""
             "total_pages": total_pages,
         }
 
-    def _call_api(self, prompt: str) -> str:
-        """Call Gemini API"""
-        if not self.client:
-            raise Exception("Gemini API client not initialized. Check GEMINI_API_KEY.")
+    def model_for(self, caller: str) -> str:
+        """Model dasar untuk caller (tanpa routing ukuran prompt), mis. untuk key cache analytics"""
+        return model_router.model_for(caller, self.model)
 
+    def _call_api(self, prompt: str, caller: str = CALLER_OTHER) -> str:
+        """Call Gemini API (panggilan identik yang bersamaan digabung)"""
+        route = model_router.route(caller, prompt, self.model)
+        key = request_key(route.model, prompt, GENERATION_CONFIG)
         try:
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    temperature=0.7,
-                    top_p=0.95,
-                    max_output_tokens=2048,
-                ),
+            return gemini_single_flight.do(
+                key, lambda: self._generate(prompt, caller, route), timeout=remaining_seconds()
             )
+        except TimeoutError as e:
+            raise DeadlineExceededError("Gemini API call failed: deadline exceeded", retryable=True) from e
 
-            if response.text is None:
-                raise Exception("Gemini API returned empty response")
-
-            return response.text
-        except Exception as e:
-            raise Exception(f"Gemini API call failed: {str(e)}")
+    async def _call_api_async(self, prompt: str, caller: str = CALLER_OTHER) -> str:
+        """Versi async dari _call_api, berbagi panggilan in-flight dengan caller thread"""
+        route = model_router.route(caller, prompt, self.model)
+        key = request_key(route.model, prompt, GENERATION_CONFIG)
+        try:
+            return await gemini_single_flight.do_async(
+                key, lambda: self._generate(prompt, caller, route), timeout=remaining_seconds()
+            )
+        except TimeoutError as e:
+            raise DeadlineExceededError("Gemini API call failed: deadline exceeded", retryable=True) from e
+
+    def _generate(
+        self, prompt: str, caller: str = CALLER_OTHER, route: Optional[model_router.ModelRoute] = None
+    ) -> str:
+        """
+        Satu panggilan logis: deadline, retry dan circuit breaker lewat gemini_caller
+
+        Slot Gemini dibagi per lane (work_scheduler): chat tidak antri di belakang
+        enrichment/analytics background. Token (usage_metadata) dan latency
+        panggilan dicatat di gemini_telemetry per caller; panggilan yang digabung
+        single flight hanya tercatat sekali.
+        """
+        if not self.client:
+            raise GeminiCallError("Gemini API client not initialized. Check GEMINI_API_KEY.")
+        route = route or model_router.route(caller, prompt, self.model)
+        if self.rate_limiter and not self.rate_limiter.acquire(timeout=remaining_seconds()):
+            raise DeadlineExceededError("Gemini API call failed: rate limit wait exceeded deadline", retryable=True)
+        try:
+            with gemini_scheduler.slot(timeout=remaining_seconds()):
+                started = time.perf_counter()
+                try:
+                    response = gemini_caller.call(
+                        lambda timeout: self._generate_once(prompt, timeout, route.model)
+                    )
+                except Exception:
+                    gemini_telemetry.record(
+                        caller, route.model, time.perf_counter() - started, ok=False, route_reason=route.reason
+                    )
+                    raise
+        except SchedulerTimeoutError as e:
+            raise DeadlineExceededError(f"Gemini API call failed: {e}", retryable=True) from e
+
+        usage = getattr(response, "usage_metadata", None)
+        gemini_telemetry.record(
+            caller,
+            route.model,
+            time.perf_counter() - started,
+            prompt_tokens=usage.prompt_token_count if usage else None,
+            response_tokens=usage.candidates_token_count if usage else None,
+            estimated_prompt_tokens=estimate_tokens(prompt),
+            route_reason=route.reason,
+        )
+        return response.text
+
+    def _generate_once(self, prompt: str, timeout: float, model: str) -> types.GenerateContentResponse:
+        response = self.client.models.generate_content(
+            model=model,
+            contents=prompt,
+            config=types.GenerateContentConfig(
+                **GENERATION_CONFIG,
+                http_options=types.HttpOptions(timeout=max(int(timeout * 1000), 1)),
+            ),
+        )
+
+        if response.text is None:
+            raise GeminiCallError("Gemini API returned empty response")
+
+        return response
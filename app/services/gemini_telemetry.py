@@ -0,0 +1,241 @@
+"""
+Gemini Telemetry
+Token dan latency setiap panggilan Gemini, per caller (chat, analytics, ringkasan).
+
+Token diambil dari usage_metadata response SDK (prompt_token_count,
+candidates_token_count). Setiap caller punya histogram latency, token prompt
+dan token jawaban, ditambah rata-rata latency per ukuran prompt supaya terlihat
+pengaruh ukuran context terhadap latency.
+
+Perkiraan token lokal (prompt_encoding.estimate_tokens) dikalibrasi dengan token
+sebenarnya per caller; hasilnya dipakai token_budget untuk mengecilkan context
+sebelum panggilan.
+
+Per route (caller + model yang dipilih model_router) dicatat juga latency dan
+estimasi biaya (GEMINI_MODEL_PRICES), untuk men-tune policy routing.
+"""
+
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, Optional, Sequence
+import threading
+
+from app.core.config import GEMINI_MODEL_PRICES
+
+# Caller yang dikenal (tag telemetry + kunci budget token)
+CALLER_CHAT = "chat"
+CALLER_ANALYTICS_MEMBERS = "analytics_members"
+CALLER_ANALYTICS_DOCUMENTS = "analytics_documents"
+CALLER_ANALYTICS_OVERVIEW = "analytics_overview"
+CALLER_SUMMARIZATION = "summarization"
+CALLER_DOCUMENT_SUMMARY = "document_summary"
+CALLER_EXTRACTION = "extraction"
+CALLER_OTHER = "other"
+
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+TOKEN_BUCKETS = (128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+# Bobot sampel baru untuk rasio token sebenarnya / perkiraan (EMA)
+_CALIBRATION_ALPHA = 0.2
+# Bobot sampel baru untuk latency route (EMA, dipakai model_router)
+_LATENCY_ALPHA = 0.2
+
+
+def estimate_cost_usd(model: str, prompt_tokens: int, response_tokens: int) -> float:
+    """Biaya panggilan dari harga per 1 juta token (0 jika model tidak ada di daftar harga)"""
+    input_price, output_price = GEMINI_MODEL_PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * input_price + response_tokens * output_price) / 1_000_000
+
+
+class Histogram:
+    """Histogram bucket tetap (batas atas inklusif, bucket terakhir +Inf)"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        """Perkiraan kuantil: batas atas bucket tempat kuantil jatuh"""
+        if not self.count:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return self.buckets[index] if index < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"le_{bound:g}" for bound in self.buckets] + ["le_inf"]
+        return {
+            "count": self.count,
+            "sum": round(self.total, 1),
+            "mean": round(self.total / self.count, 1) if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class _CallerStats:
+    def __init__(self) -> None:
+        self.counters: Counter = Counter()
+        self.models: Counter = Counter()
+        self.latency_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.prompt_tokens = Histogram(TOKEN_BUCKETS)
+        self.response_tokens = Histogram(TOKEN_BUCKETS)
+        # bucket token prompt -> [jumlah panggilan, total latency ms]
+        self.latency_by_prompt = [[0, 0.0] for _ in range(len(TOKEN_BUCKETS) + 1)]
+        self.calibration = 1.0
+
+
+class _RouteStats:
+    def __init__(self) -> None:
+        self.counters: Counter = Counter()
+        self.cost_usd = 0.0
+        self.latency_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.latency_ema_ms: Optional[float] = None
+        self.reasons: Counter = Counter()
+
+
+class GeminiTelemetry:
+    """Agregasi token/latency per caller (thread-safe)"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._callers: Dict[str, _CallerStats] = {}
+        self._routes: Dict[tuple, _RouteStats] = {}
+
+    def _caller(self, caller: str) -> _CallerStats:
+        stats = self._callers.get(caller)
+        if stats is None:
+            stats = self._callers[caller] = _CallerStats()
+        return stats
+
+    def record(
+        self,
+        caller: str,
+        model: str,
+        latency_seconds: float,
+        prompt_tokens: Optional[int] = None,
+        response_tokens: Optional[int] = None,
+        estimated_prompt_tokens: Optional[int] = None,
+        ok: bool = True,
+        route_reason: Optional[str] = None,
+    ) -> None:
+        """Catat satu panggilan ke API (token None jika response tanpa usage_metadata)"""
+        latency_ms = latency_seconds * 1000
+        with self._lock:
+            stats = self._caller(caller)
+            stats.counters["calls"] += 1
+            stats.models[model] += 1
+            stats.latency_ms.observe(latency_ms)
+            route = self._routes.get((caller, model))
+            if route is None:
+                route = self._routes[(caller, model)] = _RouteStats()
+            route.counters["calls"] += 1
+            if route_reason:
+                route.reasons[route_reason] += 1
+            if not ok:
+                stats.counters["errors"] += 1
+                route.counters["errors"] += 1
+                return
+            route.latency_ms.observe(latency_ms)
+            previous = route.latency_ema_ms
+            route.latency_ema_ms = latency_ms if previous is None else previous + _LATENCY_ALPHA * (latency_ms - previous)
+            if prompt_tokens is None:
+                stats.counters["missing_usage"] += 1
+                return
+            response_tokens = response_tokens or 0
+            route.counters["prompt_tokens"] += prompt_tokens
+            route.counters["response_tokens"] += response_tokens
+            route.cost_usd += estimate_cost_usd(model, prompt_tokens, response_tokens)
+            stats.counters["prompt_tokens"] += prompt_tokens
+            stats.counters["response_tokens"] += response_tokens
+            stats.prompt_tokens.observe(prompt_tokens)
+            stats.response_tokens.observe(response_tokens)
+            bucket = stats.latency_by_prompt[bisect_left(TOKEN_BUCKETS, prompt_tokens)]
+            bucket[0] += 1
+            bucket[1] += latency_ms
+            if estimated_prompt_tokens:
+                ratio = prompt_tokens / estimated_prompt_tokens
+                stats.calibration += _CALIBRATION_ALPHA * (ratio - stats.calibration)
+
+    def record_shrink(self, caller: str, before_tokens: int, after_tokens: int) -> None:
+        """Catat context yang dikecilkan karena melewati budget token"""
+        with self._lock:
+            stats = self._caller(caller)
+            stats.counters["budget_shrinks"] += 1
+            stats.counters["budget_tokens_removed"] += max(before_tokens - after_tokens, 0)
+
+    def calibration(self, caller: str) -> float:
+        """Token sebenarnya per token perkiraan untuk caller ini (1.0 sebelum ada data)"""
+        with self._lock:
+            stats = self._callers.get(caller)
+            return stats.calibration if stats else 1.0
+
+    def route_latency_ms(self, caller: str, model: str) -> Optional[float]:
+        """Latency terbaru (EMA) panggilan sukses caller ke model ini, None jika belum ada"""
+        with self._lock:
+            route = self._routes.get((caller, model))
+            return route.latency_ema_ms if route else None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._callers.clear()
+            self._routes.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            callers = {}
+            for caller, stats in sorted(self._callers.items()):
+                counters = stats.counters
+                labels = [f"le_{bound:g}" for bound in TOKEN_BUCKETS] + ["le_inf"]
+                callers[caller] = {
+                    "calls": counters["calls"],
+                    "errors": counters["errors"],
+                    "missing_usage": counters["missing_usage"],
+                    "prompt_tokens": counters["prompt_tokens"],
+                    "response_tokens": counters["response_tokens"],
+                    "budget_shrinks": counters["budget_shrinks"],
+                    "budget_tokens_removed": counters["budget_tokens_removed"],
+                    "models": dict(stats.models),
+                    "token_estimate_calibration": round(stats.calibration, 3),
+                    "latency_ms": stats.latency_ms.snapshot(),
+                    "prompt_tokens_histogram": stats.prompt_tokens.snapshot(),
+                    "response_tokens_histogram": stats.response_tokens.snapshot(),
+                    "mean_latency_ms_by_prompt_tokens": {
+                        label: round(total / count, 1)
+                        for label, (count, total) in zip(labels, stats.latency_by_prompt)
+                        if count
+                    },
+                }
+            routes = {}
+            for (caller, model), route in sorted(self._routes.items()):
+                counters = route.counters
+                successes = counters["calls"] - counters["errors"]
+                routes[f"{caller}:{model}"] = {
+                    "caller": caller,
+                    "model": model,
+                    "calls": counters["calls"],
+                    "errors": counters["errors"],
+                    "prompt_tokens": counters["prompt_tokens"],
+                    "response_tokens": counters["response_tokens"],
+                    "cost_usd": round(route.cost_usd, 6),
+                    "cost_usd_per_call": round(route.cost_usd / successes, 6) if successes else None,
+                    "reasons": dict(route.reasons),
+                    "latency_ms_ema": round(route.latency_ema_ms, 1) if route.latency_ema_ms is not None else None,
+                    "latency_ms": route.latency_ms.snapshot(),
+                }
+            return {"callers": callers, "routes": routes}
+
+
+gemini_telemetry = GeminiTelemetry()
@@ -0,0 +1,485 @@
+"""
+Member Aggregation Service
+Menghitung statistik pengurus langsung di database (GROUP BY / CASE / COUNT DISTINCT)
+sehingga tidak perlu me-load semua row Member ke memory.
+
+Hasil agregasi juga disimpan di tabel member_aggregates (materialized) yang di-update
+dalam transaksi yang sama dengan import/mutasi Member, sehingga query statistik cukup
+membaca beberapa row kecil.
+"""
+
+from collections import Counter
+from sqlalchemy import and_, case, delete, func, literal, select, union_all
+from sqlalchemy.orm import Session
+from app.models.member import Member
+from app.models.member_aggregate import MemberAggregate
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+UNKNOWN_LABEL = "Tidak Diketahui"
+
+# (batas atas eksklusif, label) - sama dengan rentang histogram usia di dashboard
+AGE_BUCKETS = [
+    (25, "20-25"),
+    (30, "25-30"),
+    (35, "30-35"),
+    (40, "35-40"),
+    (45, "40-45"),
+    (None, "45+"),
+]
+
+HAS_COMPANY_LABEL = "Memiliki Perusahaan"
+NO_COMPANY_LABEL = "Tidak Memiliki Perusahaan"
+
+
+def build_age_range(age: int) -> str:
+    """Konversi usia ke rentang untuk histogram"""
+    for upper, label in AGE_BUCKETS:
+        if upper is None or age < upper:
+            return label
+    return AGE_BUCKETS[-1][1]
+
+
+def _clean(column):
+    """TRIM + NULLIF sehingga string kosong dianggap NULL"""
+    return func.nullif(func.trim(column), "")
+
+
+def _labelled(column):
+    """Nilai kolom dengan fallback label 'Tidak Diketahui'"""
+    return func.coalesce(_clean(column), UNKNOWN_LABEL)
+
+
+def _age_bucket_sums() -> list:
+    """SUM(CASE ...) per rentang usia, dihitung dalam satu scan"""
+    columns = []
+    lower = None
+    for upper, label in AGE_BUCKETS:
+        conditions = [Member.usia > 0]
+        if lower is not None:
+            conditions.append(Member.usia >= lower)
+        if upper is not None:
+            conditions.append(Member.usia < upper)
+        columns.append(
+            func.sum(case((and_(*conditions), 1), else_=0)).label(f"age_{label}")
+        )
+        lower = upper
+    return columns
+
+
+def _dimension_counts_query(include_companies: bool = False):
+    """GROUP BY untuk semua dimensi kategorikal, digabung dengan UNION ALL"""
+    dimensions = {
+        "jabatan": _labelled(Member.jabatan),
+        "bidang_usaha": _labelled(Member.kategori_bidang_usaha),
+        "status_kta": _labelled(Member.status_kta),
+        "gender": _clean(Member.jenis_kelamin),
+    }
+    if include_companies:
+        dimensions["perusahaan"] = _clean(Member.nama_perusahaan)
+
+    selects = []
+    for dimension, expr in dimensions.items():
+        stmt = select(
+            literal(dimension).label("dimension"),
+            expr.label("value"),
+            func.count().label("count"),
+        ).group_by(expr)
+        if dimension in ("gender", "perusahaan"):
+            stmt = stmt.where(expr.isnot(None))
+        selects.append(stmt)
+
+    return union_all(*selects)
+
+
+def compute_member_aggregates(db: Session) -> Dict[str, Any]:
+    """
+    Hitung semua statistik pengurus di sisi database
+
+    Returns:
+        Dictionary berisi total, distribusi jabatan/bidang usaha/status KTA/gender,
+        distribusi usia, kepemilikan perusahaan dan jumlah perusahaan unik
+    """
+    company = _clean(Member.nama_perusahaan)
+
+    totals = db.execute(
+        select(
+            func.count().label("total_pengurus"),
+            func.count(Member.name).label("with_name"),
+            func.coalesce(func.sum(Member.jmlh_karyawan), 0).label("total_karyawan"),
+            func.count(Member.jmlh_karyawan).label("pengurus_with_karyawan"),
+            func.count(func.distinct(company)).label("total_perusahaan"),
+            func.coalesce(func.sum(case((company.isnot(None), 1), else_=0)), 0).label(
+                "with_company"
+            ),
+            *_age_bucket_sums(),
+        )
+    ).one()
+
+    result: Dict[str, Any] = {
+        "total_pengurus": totals.total_pengurus,
+        "with_name": totals.with_name,
+        "total_karyawan": int(totals.total_karyawan or 0),
+        "pengurus_with_karyawan": totals.pengurus_with_karyawan,
+        "total_perusahaan": totals.total_perusahaan,
+        "by_jabatan": {},
+        "by_bidang_usaha": {},
+        "by_status_kta": {},
+        "by_gender": {},
+        "age_distribution": {},
+        "company_ownership": {
+            HAS_COMPANY_LABEL: int(totals.with_company or 0),
+            NO_COMPANY_LABEL: totals.total_pengurus - int(totals.with_company or 0),
+        },
+    }
+
+    for _, label in AGE_BUCKETS:
+        count = int(getattr(totals, f"age_{label}") or 0)
+        if count:
+            result["age_distribution"][label] = count
+
+    for row in db.execute(_dimension_counts_query()):
+        result[f"by_{row.dimension}"][row.value] = row.count
+
+    return result
+
+
+def gender_counts(aggregates: Dict[str, Any]) -> Dict[str, int]:
+    """Ambil jumlah Male/Female dari hasil agregasi (nilai lain diabaikan)"""
+    by_gender = aggregates.get("by_gender", {})
+    return {"Male": by_gender.get("Male", 0), "Female": by_gender.get("Female", 0)}
+
+
+# ===== MATERIALIZED AGGREGATES =====
+
+CATEGORICAL_DIMENSIONS = ["jabatan", "bidang_usaha", "status_kta", "gender"]
+TOTALS_DIMENSION = "totals"
+# Dimensi kecil yang dibaca get_member_aggregates; "perusahaan" (satu row per
+# perusahaan) hanya dipakai untuk menjaga totals/perusahaan tetap benar
+SUMMARY_DIMENSIONS = CATEGORICAL_DIMENSIONS + ["age_bucket", "company_ownership"]
+
+# Batas jumlah parameter per IN (...) saat membaca count perusahaan
+_IN_CHUNK = 500
+
+_bootstrapped = False
+
+
+def _clean_value(value: Any) -> Optional[str]:
+    """Versi Python dari _clean: trim dan string kosong menjadi None"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def accumulate_member_contributions(
+    deltas: Counter, values: Mapping[str, Any], sign: int = 1
+) -> None:
+    """
+    Tambahkan kontribusi satu pengurus ke Counter delta member_aggregates
+
+    Args:
+        deltas: Counter {(dimension, value): jumlah} yang di-update in-place
+        values: Dict kolom Member (name, jabatan, usia, nama_perusahaan, dll)
+        sign: 1 untuk row baru, -1 untuk row yang dihapus/nilai lama
+    """
+    deltas[(TOTALS_DIMENSION, "pengurus")] += sign
+    if values.get("name") is not None:
+        deltas[(TOTALS_DIMENSION, "with_name")] += sign
+    karyawan = values.get("jmlh_karyawan")
+    if karyawan is not None:
+        deltas[(TOTALS_DIMENSION, "karyawan")] += sign * int(karyawan)
+        deltas[(TOTALS_DIMENSION, "pengurus_with_karyawan")] += sign
+
+    deltas[("jabatan", _clean_value(values.get("jabatan")) or UNKNOWN_LABEL)] += sign
+    deltas[
+        (
+            "bidang_usaha",
+            _clean_value(values.get("kategori_bidang_usaha")) or UNKNOWN_LABEL,
+        )
+    ] += sign
+    deltas[
+        ("status_kta", _clean_value(values.get("status_kta")) or UNKNOWN_LABEL)
+    ] += sign
+
+    gender = _clean_value(values.get("jenis_kelamin"))
+    if gender:
+        deltas[("gender", gender)] += sign
+
+    usia = values.get("usia")
+    if usia and usia > 0:
+        deltas[("age_bucket", build_age_range(usia))] += sign
+
+    company = _clean_value(values.get("nama_perusahaan"))
+    if company:
+        deltas[("company_ownership", HAS_COMPANY_LABEL)] += sign
+        deltas[("perusahaan", company)] += sign
+    else:
+        deltas[("company_ownership", NO_COMPANY_LABEL)] += sign
+
+
+def _upsert_increments(db: Session, deltas: Counter) -> None:
+    """INSERT ... ON CONFLICT DO UPDATE SET count = count + delta"""
+    rows = [
+        {"dimension": dimension, "value": value, "count": count}
+        for (dimension, value), count in deltas.items()
+        if count
+    ]
+    if not rows:
+        return
+
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    table = MemberAggregate.__table__
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.dimension, table.c.value],
+        set_={"count": table.c.count + stmt.excluded.count},
+    )
+    db.execute(stmt, rows)
+
+
+def apply_member_deltas(
+    db: Session,
+    added: Iterable[Mapping[str, Any]] = (),
+    removed: Iterable[Mapping[str, Any]] = (),
+) -> None:
+    """
+    Update tabel member_aggregates secara incremental
+
+    Dipanggil SEBELUM db.commit() dari import/mutasi Member supaya ringkasan
+    ikut ter-commit (atau ter-rollback) di transaksi yang sama.
+    Untuk update: kirim nilai lama di `removed` dan nilai baru di `added`.
+    """
+    deltas: Counter = Counter()
+    for values in added:
+        accumulate_member_contributions(deltas, values)
+    for values in removed:
+        accumulate_member_contributions(deltas, values, sign=-1)
+
+    apply_aggregate_deltas(db, deltas)
+
+
+def apply_aggregate_deltas(db: Session, deltas: Counter) -> None:
+    """
+    Terapkan Counter {(dimension, value): delta} ke member_aggregates (tanpa commit)
+
+    Dipakai langsung oleh import kolumnar yang menghitung delta per batch sekaligus.
+    """
+    if _needs_bootstrap(db):
+        # Ringkasan belum pernah dibuat: hitung penuh termasuk perubahan transaksi ini
+        db.flush()
+        rebuild_member_aggregates(db)
+        return
+
+    company_delta = _distinct_company_delta(db, deltas)
+    if company_delta:
+        deltas = Counter(deltas)
+        deltas[(TOTALS_DIMENSION, "perusahaan")] += company_delta
+
+    _upsert_increments(db, deltas)
+
+    # Bersihkan nilai dimensi yang sudah tidak dipakai pengurus manapun
+    db.execute(
+        delete(MemberAggregate).where(
+            MemberAggregate.count <= 0,
+            MemberAggregate.dimension != TOTALS_DIMENSION,
+        )
+    )
+
+
+def _distinct_company_delta(db: Session, deltas: Counter) -> int:
+    """
+    Perubahan jumlah perusahaan unik akibat deltas: +1 untuk perusahaan yang count-nya
+    naik dari 0, -1 untuk yang turun ke 0 (hanya membaca perusahaan yang berubah)
+    """
+    changes = {
+        value: count
+        for (dimension, value), count in deltas.items()
+        if dimension == "perusahaan" and count
+    }
+    if not changes:
+        return 0
+
+    names = list(changes)
+    existing: Dict[str, int] = {}
+    for start in range(0, len(names), _IN_CHUNK):
+        rows = db.query(MemberAggregate.value, MemberAggregate.count).filter(
+            MemberAggregate.dimension == "perusahaan",
+            MemberAggregate.value.in_(names[start : start + _IN_CHUNK]),
+        )
+        existing.update({row.value: row.count for row in rows})
+
+    delta = 0
+    for value, change in changes.items():
+        before = existing.get(value, 0)
+        delta += int(before + change > 0) - int(before > 0)
+    return delta
+
+
+def rebuild_member_aggregates(db: Session) -> None:
+    """Hitung ulang seluruh tabel member_aggregates dari tabel members (tanpa commit)"""
+    aggregates = compute_member_aggregates(db)
+
+    rows: Counter = Counter()
+    rows[(TOTALS_DIMENSION, "pengurus")] = aggregates["total_pengurus"]
+    rows[(TOTALS_DIMENSION, "with_name")] = aggregates["with_name"]
+    rows[(TOTALS_DIMENSION, "karyawan")] = aggregates["total_karyawan"]
+    rows[(TOTALS_DIMENSION, "pengurus_with_karyawan")] = aggregates[
+        "pengurus_with_karyawan"
+    ]
+    rows[(TOTALS_DIMENSION, "perusahaan")] = aggregates["total_perusahaan"]
+    for label, count in aggregates["age_distribution"].items():
+        rows[("age_bucket", label)] = count
+    for label, count in aggregates["company_ownership"].items():
+        rows[("company_ownership", label)] = count
+    for row in db.execute(_dimension_counts_query(include_companies=True)):
+        rows[(row.dimension, row.value)] = row.count
+
+    db.execute(delete(MemberAggregate))
+    db.execute(
+        MemberAggregate.__table__.insert(),
+        [
+            {"dimension": dimension, "value": value, "count": count}
+            for (dimension, value), count in rows.items()
+            # totals selalu ditulis walaupun 0 sebagai penanda tabel sudah terisi
+            if count or dimension == TOTALS_DIMENSION
+        ],
+    )
+
+
+def _needs_bootstrap(db: Session) -> bool:
+    """
+    Cek (sekali per proses) apakah member_aggregates masih kosong
+
+    Ringkasan lama tanpa totals/perusahaan juga dibangun ulang sekali.
+    """
+    global _bootstrapped
+    if _bootstrapped:
+        return False
+
+    has_totals = (
+        db.query(MemberAggregate.id)
+        .filter(
+            MemberAggregate.dimension == TOTALS_DIMENSION,
+            MemberAggregate.value == "perusahaan",
+        )
+        .first()
+    )
+    if has_totals:
+        _bootstrapped = True
+    return not has_totals
+
+
+def _ensure_bootstrapped(db: Session) -> None:
+    """Isi member_aggregates untuk database lama yang belum punya ringkasan"""
+    global _bootstrapped
+    if _needs_bootstrap(db):
+        rebuild_member_aggregates(db)
+        db.commit()
+        _bootstrapped = True
+
+
+def get_member_aggregates(
+    db: Session, dimensions: Iterable[str] = SUMMARY_DIMENSIONS
+) -> Dict[str, Any]:
+    """
+    Baca statistik pengurus dari tabel member_aggregates
+
+    Hanya membaca row totals dan `dimensions` (default semua dimensi ringkasan,
+    tanpa row per perusahaan). Format return sama dengan compute_member_aggregates;
+    dimensi yang tidak diminta tetap ada tetapi kosong.
+    """
+    _ensure_bootstrapped(db)
+
+    result: Dict[str, Any] = {
+        "total_pengurus": 0,
+        "with_name": 0,
+        "total_karyawan": 0,
+        "pengurus_with_karyawan": 0,
+        "total_perusahaan": 0,
+        "by_jabatan": {},
+        "by_bidang_usaha": {},
+        "by_status_kta": {},
+        "by_gender": {},
+        "age_distribution": {},
+        "company_ownership": {HAS_COMPANY_LABEL: 0, NO_COMPANY_LABEL: 0},
+    }
+    totals_keys = {
+        "pengurus": "total_pengurus",
+        "with_name": "with_name",
+        "karyawan": "total_karyawan",
+        "pengurus_with_karyawan": "pengurus_with_karyawan",
+        "perusahaan": "total_perusahaan",
+    }
+
+    wanted = [TOTALS_DIMENSION] + [d for d in dimensions if d != "perusahaan"]
+    for row in db.query(
+        MemberAggregate.dimension, MemberAggregate.value, MemberAggregate.count
+    ).filter(MemberAggregate.dimension.in_(wanted)):
+        if row.dimension == TOTALS_DIMENSION:
+            if row.value in totals_keys:
+                result[totals_keys[row.value]] = row.count
+        elif row.dimension == "age_bucket":
+            result["age_distribution"][row.value] = row.count
+        elif row.dimension == "company_ownership":
+            result["company_ownership"][row.value] = row.count
+        else:
+            result[f"by_{row.dimension}"][row.value] = row.count
+
+    return result
+
+
+def get_dimension_counts(
+    db: Session, dimension: str, include_unknown: bool = True, limit: Optional[int] = None
+) -> Dict[str, int]:
+    """Jumlah pengurus per nilai dimensi, urut dari yang terbanyak (maksimal `limit` nilai)"""
+    _ensure_bootstrapped(db)
+
+    query = db.query(MemberAggregate.value, MemberAggregate.count).filter(
+        MemberAggregate.dimension == dimension
+    )
+    if not include_unknown:
+        query = query.filter(MemberAggregate.value != UNKNOWN_LABEL)
+
+    return {
+        row.value: row.count
+        for row in query.order_by(MemberAggregate.count.desc()).limit(limit).all()
+    }
+
+
+def get_dimension_values(db: Session, dimensions: Iterable[str]) -> Dict[str, list]:
+    """Nilai yang ada per dimensi (tanpa UNKNOWN_LABEL), satu query untuk semua dimensi"""
+    _ensure_bootstrapped(db)
+
+    dimensions = list(dimensions)
+    result: Dict[str, list] = {dimension: [] for dimension in dimensions}
+    rows = (
+        db.query(MemberAggregate.dimension, MemberAggregate.value)
+        .filter(
+            MemberAggregate.dimension.in_(dimensions),
+            MemberAggregate.value != UNKNOWN_LABEL,
+            MemberAggregate.count > 0,
+        )
+        .order_by(MemberAggregate.dimension, MemberAggregate.value)
+    )
+    for row in rows:
+        result[row.dimension].append(row.value)
+    return result
+
+
+def get_total(db: Session, key: str) -> int:
+    """Ambil satu nilai dari dimensi totals (pengurus, karyawan, dll)"""
+    _ensure_bootstrapped(db)
+
+    value = (
+        db.query(MemberAggregate.count)
+        .filter(
+            MemberAggregate.dimension == TOTALS_DIMENSION,
+            MemberAggregate.value == key,
+        )
+        .scalar()
+    )
+    return int(value or 0)
@@ -0,0 +1,674 @@
+"""
+Member Import Service
+Import CSV pengurus secara streaming: file dibaca baris per baris, divalidasi, lalu
+di-insert per batch dengan Core INSERT (executemany) dan di-commit per batch.
+
+Mode sync mencocokkan row CSV dengan pengurus yang sudah ada lewat natural key
+(no_kta, lalu email, lalu nama) dan content hash per row: row baru di-insert, row
+yang berubah di-update, row yang sama dilewati, dan (opsional) pengurus yang tidak
+ada lagi di CSV dihapus - semuanya dalam satu transaksi.
+
+Ringkasan statistik (member_aggregates) di-update di transaksi yang sama dengan
+setiap batch. Error validasi dilaporkan per baris dengan nomor baris CSV, dan
+progress import bisa dipantau lewat get_import_progress.
+"""
+
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.orm import Session
+from app.core.config import MEMBER_IMPORT_BATCH_SIZE
+from app.models.member import Member
+from app.services.member_aggregation import apply_member_deltas
+from app.services.member_name_search import (
+    index_inserted_members,
+    member_name_index_bounds,
+    reindex_member_names,
+    remove_member_names,
+)
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
+import csv
+import hashlib
+import io
+import re
+import threading
+import time
+import uuid
+
+# Batas jumlah pesan error yang dikirim di response (total tetap dihitung)
+MAX_REPORTED_ERRORS = 1000
+
+# Jumlah progress import yang disimpan di memory
+MAX_TRACKED_IMPORTS = 50
+
+# (kolom Member, header CSV)
+STRING_COLUMNS = [
+    ("name", "nama"),
+    ("jabatan", "jabatan"),
+    ("status_kta", "status_kta"),
+    ("no_kta", "no_kta"),
+    ("tanggal_lahir", "tanggal_lahir"),
+    ("jenis_kelamin", "jenis_kelamin"),
+    ("phone", "whatsapp"),
+    ("email", "email"),
+    ("instagram", "instagram"),
+    ("nama_perusahaan", "nama_perusahaan"),
+    ("jabatan_dlm_akta_perusahaan", "jabatan_dlm_akta_perusahaan"),
+    ("kategori_bidang_usaha", "kategori_bidang_usaha"),
+    ("alamat_perusahaan", "alamat_perusahaan"),
+    ("perusahaan_berdiri_sejak", "perusahaan_berdiri_sejak"),
+    ("website", "website"),
+    ("twitter", "twitter"),
+    ("facebook", "facebook"),
+    ("youtube", "youtube"),
+]
+INT_COLUMNS = [
+    ("no", "no"),
+    ("usia", "usia"),
+    ("jmlh_karyawan", "jmlh_karyawan"),
+]
+
+# Kolom yang ikut dihitung di content hash (isi CSV)
+CONTENT_COLUMNS = [column for column, _ in STRING_COLUMNS + INT_COLUMNS]
+
+# Jumlah id per query IN (...) saat sync
+SYNC_CHUNK_SIZE = 500
+
+# Format tanggal_lahir yang diterima; disimpan sebagai DD-MM-YYYY
+DATE_FORMATS = ["%d-%m-%Y", "%d/%m/%Y", "%Y-%m-%d"]
+DATE_OUTPUT_FORMAT = "%d-%m-%Y"
+
+# Karakter pemisah di nomor WhatsApp (spasi, strip, titik, kurung)
+PHONE_SEPARATORS = re.compile(r"[\s\-.()]+")
+
+_imports: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_imports_lock = threading.Lock()
+
+
+class RowParser:
+    """Parser row CSV berbasis posisi kolom (header di-resolve sekali per file)"""
+
+    def __init__(self, fieldnames: List[str]):
+        index = {name.strip(): i for i, name in enumerate(fieldnames)}
+        self.width = len(fieldnames)
+        self.string_columns = [
+            (column, index[header])
+            for column, header in STRING_COLUMNS
+            if header in index
+        ]
+        self.int_columns = [
+            (column, header, index[header])
+            for column, header in INT_COLUMNS
+            if header in index
+        ]
+        # Kolom yang tidak ada di header CSV selalu None
+        self.missing = {
+            column: None
+            for column, header in STRING_COLUMNS + INT_COLUMNS
+            if header not in index
+        }
+
+    def parse(self, cells: List[str]) -> Tuple[Dict[str, Any], List[str]]:
+        if len(cells) < self.width:
+            cells = cells + [""] * (self.width - len(cells))
+
+        values: Dict[str, Any] = dict(self.missing)
+        problems: List[str] = []
+
+        for column, i in self.string_columns:
+            values[column] = cells[i].strip() or None
+
+        for column, header, i in self.int_columns:
+            raw = cells[i].strip()
+            if not raw:
+                values[column] = None
+            elif raw.isdigit():
+                values[column] = int(raw)
+            else:
+                values[column] = None
+                problems.append(f"{header} '{raw}' bukan angka")
+
+        values["phone"] = normalize_phone(values["phone"])
+        values["email"] = normalize_email(values["email"])
+        values["tanggal_lahir"], valid_date = normalize_date(values["tanggal_lahir"])
+        if not valid_date:
+            problems.append(
+                f"tanggal_lahir '{values['tanggal_lahir']}' bukan tanggal (DD-MM-YYYY)"
+            )
+
+        # Backward compatibility
+        values["position"] = values["jabatan"]
+        values["organization"] = values["kategori_bidang_usaha"]
+
+        return values, problems
+
+
+def normalize_phone(value: Optional[str]) -> Optional[str]:
+    """Hapus pemisah dari nomor WhatsApp (mis. '0812-3456 789' -> '08123456789')"""
+    if not value:
+        return None
+    return PHONE_SEPARATORS.sub("", value) or None
+
+
+def normalize_email(value: Optional[str]) -> Optional[str]:
+    return value.lower() if value else None
+
+
+def normalize_date(value: Optional[str]) -> Tuple[Optional[str], bool]:
+    """
+    Normalisasi tanggal_lahir ke DD-MM-YYYY
+
+    Returns:
+        Tuple (nilai, valid). Nilai yang tidak bisa di-parse dikembalikan apa adanya.
+    """
+    if not value:
+        return None, True
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).strftime(DATE_OUTPUT_FORMAT), True
+        except ValueError:
+            continue
+    return value, False
+
+
+def normalize_natural_key(values: Dict[str, Any]) -> Optional[str]:
+    """
+    Natural key pengurus untuk sync: no_kta, fallback ke email lalu nama
+
+    Key dinormalisasi (spasi/kapital) supaya perbedaan penulisan kecil di CSV
+    tidak dianggap pengurus baru.
+    """
+    no_kta = "".join((values.get("no_kta") or "").split()).upper()
+    if no_kta:
+        return f"kta:{no_kta}"
+    email = (values.get("email") or "").strip().lower()
+    if email:
+        return f"email:{email}"
+    name = " ".join((values.get("name") or "").split()).casefold()
+    if name:
+        return f"name:{name}"
+    return None
+
+
+def build_content_hash(values: Dict[str, Any]) -> str:
+    """SHA-256 dari semua kolom CSV, dipakai untuk melewati row yang tidak berubah"""
+    raw = "\x1f".join(
+        "" if values.get(column) is None else str(values[column])
+        for column in CONTENT_COLUMNS
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def parse_member_row(row: Dict[str, str]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Konversi satu row CSV (header -> value) ke kolom Member
+
+    Returns:
+        Tuple (values, problems). problems berisi pesan validasi; nilai yang tidak
+        valid di-set None tetapi row tetap di-import.
+    """
+    return RowParser(list(row.keys())).parse(list(row.values()))
+
+
+def iter_csv_rows(stream: IO[bytes]) -> Iterator[Tuple[int, List[str], List[str]]]:
+    """
+    Baca CSV secara streaming dari file binary
+
+    Yields:
+        Tuple (nomor baris CSV, header yang sudah di-trim, cells)
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.reader(text)
+        header = next(reader, None)
+        if not header:
+            return
+        # Bersihkan header (trim spasi)
+        fieldnames = [h.strip() for h in header]
+
+        for cells in reader:
+            if not any(cells) or not "".join(cells).strip():
+                continue
+            yield reader.line_num, fieldnames, cells
+    finally:
+        # Jangan tutup file milik UploadFile
+        text.detach()
+
+
+def _start_progress(import_id: str, filename: str) -> Dict[str, Any]:
+    progress = {
+        "import_id": import_id,
+        "filename": filename,
+        "status": "running",
+        "rows_processed": 0,
+        "imported": 0,
+        "failed_rows": 0,
+        "batches_committed": 0,
+        "errors_total": 0,
+        "started_at": datetime.utcnow().isoformat(),
+        "finished_at": None,
+        "rows_per_second": 0.0,
+    }
+    with _imports_lock:
+        _imports[import_id] = progress
+        while len(_imports) > MAX_TRACKED_IMPORTS:
+            _imports.popitem(last=False)
+    return progress
+
+
+def get_import_progress(import_id: str) -> Optional[Dict[str, Any]]:
+    """Progress import CSV yang sedang/sudah berjalan"""
+    with _imports_lock:
+        progress = _imports.get(import_id)
+        return dict(progress) if progress else None
+
+
+def list_import_progress() -> List[Dict[str, Any]]:
+    with _imports_lock:
+        return [dict(p) for p in reversed(_imports.values())]
+
+
+# Kolom yang diisi importer; timestamp diisi database (CURRENT_TIMESTAMP)
+IMPORT_COLUMNS = CONTENT_COLUMNS + [
+    "position",
+    "organization",
+    "natural_key",
+    "content_hash",
+]
+
+_compiled_inserts: Dict[str, Any] = {}
+
+
+def _compiled_insert(dialect) -> Any:
+    """INSERT members yang sudah di-compile per dialect (dipakai ulang setiap batch)"""
+    compiled = _compiled_inserts.get(dialect.name)
+    if compiled is None:
+        values: Dict[str, Any] = {column: bindparam(column) for column in IMPORT_COLUMNS}
+        for column in ("joined_date", "created_at", "updated_at"):
+            values[column] = func.current_timestamp()
+        stmt = Member.__table__.insert().values(values)
+        compiled = stmt.compile(dialect=dialect)
+        _compiled_inserts[dialect.name] = compiled
+    return compiled
+
+
+def bulk_insert_members(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """
+    INSERT banyak row sekaligus lewat executemany DBAPI
+
+    Semua kolom berupa str/int sehingga parameter bisa dikirim langsung ke driver
+    tanpa type processing per row dari SQLAlchemy.
+    """
+    if not rows:
+        return
+    connection = db.connection()
+    compiled = _compiled_insert(connection.dialect)
+    if compiled.positional:
+        keys = compiled.positiontup
+        params: Any = [tuple(row[key] for key in keys) for row in rows]
+    else:
+        params = [{key: row[key] for key in IMPORT_COLUMNS} for row in rows]
+    connection.exec_driver_sql(str(compiled), params)
+
+
+def bulk_insert_member_columns(db: Session, columns: Dict[str, List[Any]]) -> None:
+    """Sama dengan bulk_insert_members, tetapi input berupa list per kolom"""
+    connection = db.connection()
+    compiled = _compiled_insert(connection.dialect)
+    if compiled.positional:
+        params: Any = list(zip(*(columns[key] for key in compiled.positiontup)))
+    else:
+        params = [
+            dict(zip(IMPORT_COLUMNS, values))
+            for values in zip(*(columns[key] for key in IMPORT_COLUMNS))
+        ]
+    if params:
+        connection.exec_driver_sql(str(compiled), params)
+
+
+def bulk_update_members(db: Session, rows: List[Tuple[int, Dict[str, Any]]]) -> None:
+    """UPDATE banyak pengurus (id, nilai baru) dengan satu executemany"""
+    if not rows:
+        return
+    table = Member.__table__
+    values: Dict[str, Any] = {
+        column: bindparam(f"new_{column}") for column in IMPORT_COLUMNS
+    }
+    values["updated_at"] = func.current_timestamp()
+    stmt = table.update().where(table.c.id == bindparam("member_id")).values(values)
+    db.execute(
+        stmt,
+        [
+            {
+                "member_id": member_id,
+                **{f"new_{column}": values[column] for column in IMPORT_COLUMNS},
+            }
+            for member_id, values in rows
+        ],
+    )
+
+
+def _chunks(items: List[Any], size: int = SYNC_CHUNK_SIZE) -> Iterator[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def load_member_values(db: Session, ids: List[int]) -> List[Dict[str, Any]]:
+    """Nilai kolom CSV pengurus berdasarkan id (untuk delta member_aggregates)"""
+    columns = [Member.__table__.c[column] for column in CONTENT_COLUMNS]
+    rows: List[Dict[str, Any]] = []
+    for chunk in _chunks(ids):
+        result = db.execute(select(*columns).where(Member.id.in_(chunk)))
+        rows.extend(dict(row._mapping) for row in result)
+    return rows
+
+
+def backfill_member_keys(db: Session) -> int:
+    """
+    Isi natural_key/content_hash untuk pengurus lama (import sebelum mode sync ada)
+
+    Tidak commit; dipanggil di awal transaksi sync. Return jumlah row yang diisi.
+    """
+    columns = [Member.id] + [Member.__table__.c[column] for column in CONTENT_COLUMNS]
+    rows = [
+        dict(row._mapping)
+        for row in db.execute(select(*columns).where(Member.natural_key.is_(None)))
+    ]
+    params = []
+    for values in rows:
+        key = normalize_natural_key(values)
+        if key is None:
+            continue
+        params.append(
+            {
+                "member_id": values["id"],
+                "new_natural_key": key,
+                "new_content_hash": build_content_hash(values),
+            }
+        )
+    if params:
+        table = Member.__table__
+        db.execute(
+            table.update()
+            .where(table.c.id == bindparam("member_id"))
+            .values(
+                natural_key=bindparam("new_natural_key"),
+                content_hash=bindparam("new_content_hash"),
+            ),
+            params,
+        )
+    return len(params)
+
+
+def _flush_batch(db: Session, batch: List[Dict[str, Any]]) -> Optional[str]:
+    """Insert satu batch + update ringkasan statistik lalu commit, return pesan error jika gagal"""
+    try:
+        bulk_insert_members(db, batch)
+        apply_member_deltas(db, added=batch)
+        db.commit()
+        return None
+    except Exception as e:
+        db.rollback()
+        return str(e)
+
+
+class _ImportRun:
+    """State satu import: progress, error yang dilaporkan, dan waktu mulai"""
+
+    def __init__(self, import_id: Optional[str], filename: str, mode: str):
+        self.import_id = import_id or uuid.uuid4().hex
+        self.progress = _start_progress(self.import_id, filename)
+        self.progress["mode"] = mode
+        self.started = time.perf_counter()
+        self.errors: List[str] = []
+        self.errors_total = 0
+
+    def report(self, message: str) -> None:
+        self.errors_total += 1
+        self.progress["errors_total"] = self.errors_total
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(message)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def update_rate(self) -> None:
+        elapsed = self.elapsed()
+        self.progress["rows_per_second"] = (
+            round(self.progress["rows_processed"] / elapsed, 1) if elapsed else 0.0
+        )
+
+    def iter_valid_rows(self, stream: IO[bytes]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Row CSV yang lolos validasi, sudah dilengkapi natural_key dan content_hash"""
+        parser: Optional[RowParser] = None
+
+        for line_num, fieldnames, cells in iter_csv_rows(stream):
+            if parser is None:
+                parser = RowParser(fieldnames)
+            self.progress["rows_processed"] += 1
+            values, problems = parser.parse(cells)
+
+            for problem in problems:
+                self.report(f"Line {line_num}: {problem}")
+            if not values["name"]:
+                self.report(f"Line {line_num}: kolom 'nama' kosong, row dilewati")
+                self.progress["failed_rows"] += 1
+                continue
+
+            values["natural_key"] = normalize_natural_key(values)
+            values["content_hash"] = build_content_hash(values)
+            yield line_num, values
+
+    def finish(self) -> None:
+        self.progress["errors_total"] = self.errors_total
+        self.progress["finished_at"] = datetime.utcnow().isoformat()
+        self.progress["duration_seconds"] = round(self.elapsed(), 3)
+        self.update_rate()
+
+    def result(self, **extra: Any) -> Dict[str, Any]:
+        progress = self.progress
+        return {
+            "import_id": self.import_id,
+            "mode": progress["mode"],
+            "status": progress["status"],
+            "imported": progress["imported"],
+            "rows_processed": progress["rows_processed"],
+            "failed_rows": progress["failed_rows"],
+            "batches_committed": progress["batches_committed"],
+            **extra,
+            "errors": self.errors,
+            "errors_total": self.errors_total,
+            "duration_seconds": progress["duration_seconds"],
+            "rows_per_second": progress["rows_per_second"],
+        }
+
+
+def import_members_csv(
+    db: Session,
+    stream: IO[bytes],
+    filename: str = "",
+    import_id: Optional[str] = None,
+    batch_size: int = MEMBER_IMPORT_BATCH_SIZE,
+) -> Dict[str, Any]:
+    """
+    Import CSV pengurus secara streaming dan batch (mode append)
+
+    Args:
+        db: Database session
+        stream: File CSV (binary, mis. UploadFile.file)
+        filename: Nama file untuk progress
+        import_id: ID progress (opsional, dibuat otomatis)
+        batch_size: Jumlah row per batch INSERT/commit
+
+    Returns:
+        Dictionary hasil import (imported, errors, progress, throughput)
+    """
+    run = _ImportRun(import_id, filename, "append")
+    progress = run.progress
+    batch: List[Dict[str, Any]] = []
+    batch_lines: List[int] = []
+
+    def commit_batch() -> None:
+        if not batch:
+            return
+        error = _flush_batch(db, batch)
+        if error:
+            run.report(
+                f"Line {batch_lines[0]}-{batch_lines[-1]}: batch gagal disimpan ({error})"
+            )
+            progress["failed_rows"] += len(batch)
+        else:
+            progress["imported"] += len(batch)
+            progress["batches_committed"] += 1
+        run.update_rate()
+        batch.clear()
+        batch_lines.clear()
+
+    try:
+        for line_num, values in run.iter_valid_rows(stream):
+            batch.append(values)
+            batch_lines.append(line_num)
+            if len(batch) >= batch_size:
+                commit_batch()
+
+        commit_batch()
+        progress["status"] = "completed"
+    except UnicodeDecodeError as e:
+        db.rollback()
+        progress["status"] = "failed"
+        run.report(f"File harus ber-encoding UTF-8 ({e})")
+    except Exception:
+        db.rollback()
+        progress["status"] = "failed"
+        raise
+    finally:
+        run.finish()
+
+    return run.result()
+
+
+def sync_members_csv(
+    db: Session,
+    stream: IO[bytes],
+    filename: str = "",
+    import_id: Optional[str] = None,
+    delete_missing: bool = False,
+) -> Dict[str, Any]:
+    """
+    Sinkronkan tabel members dengan isi CSV (upsert berdasarkan natural key)
+
+    - row baru (natural key belum ada) di-insert
+    - row yang content hash-nya berubah di-update, yang sama dilewati
+    - duplikat lama dengan natural key yang sama (sisa import append) dihapus
+    - jika delete_missing, pengurus yang tidak ada di CSV dihapus
+
+    Semua perubahan + delta member_aggregates di-commit dalam satu transaksi.
+
+    Returns:
+        Dictionary hasil import dengan ringkasan diff (inserted, updated,
+        unchanged, deleted, duplicates_removed)
+    """
+    run = _ImportRun(import_id, filename, "sync")
+    progress = run.progress
+    diff = {
+        "inserted": 0,
+        "updated": 0,
+        "unchanged": 0,
+        "deleted": 0,
+        "duplicates_removed": 0,
+        "duplicate_rows_in_file": 0,
+    }
+
+    try:
+        # 1. Baca CSV; natural key yang muncul lebih dari sekali memakai baris terakhir
+        incoming: Dict[str, Dict[str, Any]] = {}
+        incoming_lines: Dict[str, int] = {}
+        for line_num, values in run.iter_valid_rows(stream):
+            key = values["natural_key"]
+            if key in incoming:
+                diff["duplicate_rows_in_file"] += 1
+                run.report(
+                    f"Line {line_num}: duplikat dari line {incoming_lines[key]} "
+                    f"({key}), baris terakhir yang dipakai"
+                )
+            incoming[key] = values
+            incoming_lines[key] = line_num
+
+        # 2. Peta natural key -> (id, content_hash) pengurus yang sudah ada
+        backfill_member_keys(db)
+        existing: Dict[str, Tuple[int, Optional[str]]] = {}
+        stale_ids: List[int] = []
+        duplicate_ids: List[int] = []
+        for member_id, key, content_hash in db.execute(
+            select(Member.id, Member.natural_key, Member.content_hash).order_by(
+                Member.id
+            )
+        ):
+            if key is None:
+                stale_ids.append(member_id)
+            elif key in existing:
+                duplicate_ids.append(member_id)
+            else:
+                existing[key] = (member_id, content_hash)
+                if key not in incoming:
+                    stale_ids.append(member_id)
+
+        # 3. Diff
+        inserts: List[Dict[str, Any]] = []
+        updates: List[Tuple[int, Dict[str, Any]]] = []
+        for key, values in incoming.items():
+            match = existing.get(key)
+            if match is None:
+                inserts.append(values)
+            elif match[1] != values["content_hash"]:
+                updates.append((match[0], values))
+            else:
+                diff["unchanged"] += 1
+
+        delete_ids = duplicate_ids + (stale_ids if delete_missing else [])
+
+        # 4. Tulis semua perubahan + delta statistik dalam satu transaksi
+        removed = load_member_values(db, [member_id for member_id, _ in updates])
+        removed.extend(load_member_values(db, delete_ids))
+        name_index_bounds = member_name_index_bounds(db)
+
+        bulk_insert_members(db, inserts)
+        bulk_update_members(db, updates)
+        for chunk in _chunks(delete_ids):
+            db.query(Member).filter(Member.id.in_(chunk)).delete(
+                synchronize_session=False
+            )
+
+        added = inserts + [values for _, values in updates]
+        if added or removed:
+            apply_member_deltas(db, added=added, removed=removed)
+        # Index nama (fuzzy search) di transaksi yang sama: nama yang berubah
+        # di-index ulang, row baru langsung di-index (kecuali index masih tertinggal,
+        # row baru lalu ikut refresh berikutnya)
+        reindex_member_names(
+            db, [(member_id, values["name"]) for member_id, values in updates]
+        )
+        remove_member_names(db, delete_ids)
+        index_inserted_members(db, name_index_bounds)
+        db.commit()
+
+        diff["inserted"] = len(inserts)
+        diff["updated"] = len(updates)
+        diff["duplicates_removed"] = len(duplicate_ids)
+        diff["deleted"] = len(delete_ids) - len(duplicate_ids)
+        progress.update(diff)
+        progress["imported"] = len(inserts) + len(updates)
+        progress["batches_committed"] = 1
+        progress["status"] = "completed"
+    except UnicodeDecodeError as e:
+        db.rollback()
+        progress["status"] = "failed"
+        run.report(f"File harus ber-encoding UTF-8 ({e})")
+    except Exception:
+        db.rollback()
+        progress["status"] = "failed"
+        raise
+    finally:
+        run.finish()
+
+    return run.result(delete_missing=delete_missing, diff=diff)
@@ -0,0 +1,343 @@
+"""
+Member Import (Columnar)
+Jalur import CSV pengurus berbasis pandas: CSV dibaca ke DataFrame (engine pyarrow
+jika terpasang), lalu trim, konversi angka, parsing tanggal, normalisasi
+WhatsApp/email, natural key dan delta member_aggregates dihitung per kolom untuk
+seluruh batch sekaligus - bukan per field per row.
+
+Hasil normalisasi sama dengan RowParser di member_import sehingga content hash
+dari kedua jalur konsisten (penting untuk mode sync).
+"""
+
+from sqlalchemy.orm import Session
+from app.core.config import MEMBER_IMPORT_BATCH_SIZE
+from app.services.member_aggregation import (
+    HAS_COMPANY_LABEL,
+    NO_COMPANY_LABEL,
+    TOTALS_DIMENSION,
+    UNKNOWN_LABEL,
+    apply_aggregate_deltas,
+    build_age_range,
+)
+from app.services.member_import import (
+    CONTENT_COLUMNS,
+    DATE_FORMATS,
+    DATE_OUTPUT_FORMAT,
+    IMPORT_COLUMNS,
+    INT_COLUMNS,
+    STRING_COLUMNS,
+    _ImportRun,
+    bulk_insert_member_columns,
+)
+from collections import Counter
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
+import csv
+import hashlib
+import importlib.util
+
+import pandas as pd
+
+# pyarrow opsional: jauh lebih cepat untuk file besar, fallback ke parser C pandas
+CSV_ENGINE = "pyarrow" if importlib.util.find_spec("pyarrow") else "c"
+
+HEADER_LINES = 1
+
+# Jumlah row yang dinormalisasi sekaligus; operasi pandas punya overhead tetap per
+# panggilan sehingga chunk besar jauh lebih cepat. Insert/commit tetap per batch_size.
+COLUMNAR_CHUNK_ROWS = 50000
+
+
+def read_csv_frames(
+    stream: IO[bytes], chunk_rows: int = COLUMNAR_CHUNK_ROWS
+) -> Iterator[pd.DataFrame]:
+    """
+    Baca CSV sebagai DataFrame string (semua kolom dtype str, kosong = "")
+
+    Kedua engine membaca file secara streaming per chunk_rows row sehingga memory
+    tetap datar berapa pun ukuran upload. Index DataFrame adalah posisi row data
+    di file (berlanjut antar chunk).
+    """
+    if CSV_ENGINE == "pyarrow":
+        yield from _read_csv_pyarrow(stream, chunk_rows)
+        return
+
+    options: Dict[str, Any] = {
+        "dtype": str,
+        "keep_default_na": False,
+        "encoding": "utf-8-sig",
+    }
+    for frame in pd.read_csv(stream, engine="c", chunksize=chunk_rows, **options):
+        frame.columns = [str(column).strip() for column in frame.columns]
+        yield frame
+
+
+def _read_csv_pyarrow(stream: IO[bytes], chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """
+    Baca CSV dengan pyarrow secara streaming (open_csv), semua kolom sebagai string
+
+    pd.read_csv(engine="pyarrow") tetap menebak tipe kolom walaupun dtype=str,
+    sehingga nomor WhatsApp/KTA seperti "0812..." kehilangan nol di depan. Header
+    dibaca dulu supaya semua kolom bisa dipaksa bertipe string; record batch
+    pyarrow dikumpulkan sampai chunk_rows row lalu dikonversi ke DataFrame.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    header = stream.readline().decode("utf-8-sig").rstrip("\r\n")
+    names = next(csv.reader([header]), [])
+    if not names:
+        return
+    reader = pa_csv.open_csv(
+        stream,
+        read_options=pa_csv.ReadOptions(column_names=names),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={name: pa.string() for name in names},
+            strings_can_be_null=False,
+            quoted_strings_can_be_null=False,
+        ),
+    )
+    columns = [name.strip() for name in names]
+    offset = 0
+    batches: List[Any] = []
+    pending = 0
+
+    def to_frame() -> pd.DataFrame:
+        frame = pa.Table.from_batches(batches, schema=reader.schema).to_pandas()
+        frame.columns = columns
+        frame.index = pd.RangeIndex(offset, offset + len(frame))
+        return frame
+
+    for batch in reader:
+        batches.append(batch)
+        pending += batch.num_rows
+        if pending >= chunk_rows:
+            frame = to_frame()
+            yield frame
+            offset += len(frame)
+            batches, pending = [], 0
+    if pending:
+        yield to_frame()
+
+
+def _nullable(column: pd.Series) -> pd.Series:
+    """Kolom string -> object dengan None untuk string kosong (siap untuk DBAPI)"""
+    return column.astype(object).where(column != "", None)
+
+
+def _normalize_dates(column: pd.Series) -> pd.Series:
+    """
+    Tanggal dari DATE_FORMATS -> DD-MM-YYYY ("" jika kosong, NaN jika tidak valid)
+
+    Parsing dan format dijalankan sekali per nilai unik (tanggal lahir banyak
+    yang sama), lalu dipetakan kembali ke seluruh kolom.
+    """
+    unique = pd.Series(column.unique(), dtype="str")
+    unique = unique[unique != ""]
+    parsed = pd.Series(pd.NaT, index=unique.index, dtype="datetime64[ns]")
+    for fmt in DATE_FORMATS:
+        missing = parsed.isna()
+        if not missing.any():
+            break
+        parsed[missing] = pd.to_datetime(unique[missing], format=fmt, errors="coerce")
+    valid = parsed.notna()
+    formatted = parsed[valid].dt.strftime(DATE_OUTPUT_FORMAT)
+    lookup = dict(zip(unique[valid], formatted))
+    lookup[""] = ""
+    return column.map(lookup)
+
+
+def normalize_frame(raw: pd.DataFrame, run: _ImportRun) -> pd.DataFrame:
+    """
+    Validasi + normalisasi satu batch CSV secara kolumnar
+
+    Operasi string dijalankan pada kolom string pandas (kosong = "") dan baru
+    dikonversi ke object/None di akhir.
+
+    Args:
+        raw: DataFrame string dari read_csv_frames
+        run: State import untuk melaporkan error per baris
+
+    Returns:
+        DataFrame dengan kolom IMPORT_COLUMNS (object dtype, None untuk kosong);
+        row tanpa nama sudah dibuang. Index tetap posisi row di file.
+    """
+    index = raw.index
+    lines = pd.Series(index + HEADER_LINES + 1, index=index)
+    blank = pd.Series("", index=index, dtype="str")
+    # (nomor baris, pesan) dilaporkan berurutan setelah semua kolom divalidasi
+    problems: List[Tuple[int, str]] = []
+
+    text: Dict[str, pd.Series] = {}
+    for column, header in STRING_COLUMNS + INT_COLUMNS:
+        text[column] = raw[header].str.strip() if header in raw else blank
+
+    # WhatsApp tanpa pemisah, email lowercase
+    text["phone"] = text["phone"].str.replace(r"[\s\-.()]+", "", regex=True)
+    text["email"] = text["email"].str.lower()
+
+    # tanggal_lahir -> DD-MM-YYYY; yang tidak valid disimpan apa adanya + warning
+    dates = _normalize_dates(text["tanggal_lahir"])
+    invalid_dates = dates.isna()
+    for line, value in zip(lines[invalid_dates], text["tanggal_lahir"][invalid_dates]):
+        problems.append((line, f"tanggal_lahir '{value}' bukan tanggal (DD-MM-YYYY)"))
+    text["tanggal_lahir"] = dates.fillna(text["tanggal_lahir"]).astype("str")
+
+    frame = pd.DataFrame(
+        {column: _nullable(text[column]) for column, _ in STRING_COLUMNS}, index=index
+    )
+
+    for column, header in INT_COLUMNS:
+        valid = text[column].str.fullmatch(r"\d+")
+        frame[column] = pd.Series(
+            [
+                int(value) if ok else None
+                for value, ok in zip(text[column].tolist(), valid.tolist())
+            ],
+            index=index,
+            dtype=object,
+        )
+        invalid = (text[column] != "") & ~valid
+        for line, value in zip(lines[invalid], text[column][invalid]):
+            problems.append((line, f"{header} '{value}' bukan angka"))
+        # Bentuk teks kanonik (sama dengan str(int)) untuk content hash
+        digits = text[column].where(valid, "").str.lstrip("0")
+        text[column] = digits.mask(valid & (digits == ""), "0")
+
+    # Row tanpa nama dilewati
+    no_name = text["name"] == ""
+    for line in lines[no_name]:
+        problems.append((line, "kolom 'nama' kosong, row dilewati"))
+    for line, message in sorted(problems, key=lambda problem: problem[0]):
+        run.report(f"Line {line}: {message}")
+    run.progress["failed_rows"] += int(no_name.sum())
+
+    keep = ~no_name
+    frame = frame[keep].copy()
+
+    # Backward compatibility
+    frame["position"] = frame["jabatan"]
+    frame["organization"] = frame["kategori_bidang_usaha"]
+
+    kept = {column: text[column][keep] for column in CONTENT_COLUMNS}
+    frame["natural_key"] = build_natural_keys(kept)
+    frame["content_hash"] = build_content_hashes(kept)
+    return frame[IMPORT_COLUMNS]
+
+
+def build_natural_keys(text: Dict[str, pd.Series]) -> pd.Series:
+    """Versi kolumnar dari normalize_natural_key (no_kta -> email -> nama)"""
+    no_kta = text["no_kta"].str.replace(r"\s+", "", regex=True).str.upper()
+    name = text["name"].str.replace(r"\s+", " ", regex=True).str.casefold()
+    keys = ("name:" + name).astype(object).where(name != "", None)
+    keys = keys.mask(text["email"] != "", "email:" + text["email"])
+    keys = keys.mask(no_kta != "", "kta:" + no_kta)
+    return keys
+
+
+def build_content_hashes(text: Dict[str, pd.Series]) -> List[str]:
+    """
+    Versi kolumnar dari build_content_hash (hasil identik)
+
+    Input berupa kolom teks yang sudah dinormalisasi ("" untuk kosong, angka
+    dalam bentuk kanonik).
+    """
+    columns = [text[column].tolist() for column in CONTENT_COLUMNS]
+    return [
+        hashlib.sha256("\x1f".join(values).encode("utf-8")).hexdigest()
+        for values in zip(*columns)
+    ]
+
+
+def frame_member_contributions(frame: pd.DataFrame) -> Counter:
+    """
+    Delta member_aggregates untuk satu batch (versi kolumnar dari
+    accumulate_member_contributions)
+    """
+    deltas: Counter = Counter()
+    deltas[(TOTALS_DIMENSION, "pengurus")] += len(frame)
+    deltas[(TOTALS_DIMENSION, "with_name")] += int(frame["name"].notna().sum())
+    karyawan = frame["jmlh_karyawan"].dropna()
+    deltas[(TOTALS_DIMENSION, "karyawan")] += int(sum(karyawan))
+    deltas[(TOTALS_DIMENSION, "pengurus_with_karyawan")] += len(karyawan)
+
+    for dimension, column in [
+        ("jabatan", "jabatan"),
+        ("bidang_usaha", "kategori_bidang_usaha"),
+        ("status_kta", "status_kta"),
+    ]:
+        counts = frame[column].fillna(UNKNOWN_LABEL).value_counts()
+        for value, count in counts.items():
+            deltas[(dimension, value)] += int(count)
+
+    for value, count in frame["jenis_kelamin"].dropna().value_counts().items():
+        deltas[("gender", value)] += int(count)
+
+    for usia, count in frame["usia"].dropna().value_counts().items():
+        if usia > 0:
+            deltas[("age_bucket", build_age_range(usia))] += int(count)
+
+    companies = frame["nama_perusahaan"].dropna()
+    deltas[("company_ownership", HAS_COMPANY_LABEL)] += len(companies)
+    deltas[("company_ownership", NO_COMPANY_LABEL)] += len(frame) - len(companies)
+    for value, count in companies.value_counts().items():
+        deltas[("perusahaan", value)] += int(count)
+
+    return Counter({key: count for key, count in deltas.items() if count})
+
+
+def import_members_csv_columnar(
+    db: Session,
+    stream: IO[bytes],
+    filename: str = "",
+    import_id: Optional[str] = None,
+    batch_size: int = MEMBER_IMPORT_BATCH_SIZE,
+) -> Dict[str, Any]:
+    """
+    Import CSV pengurus (mode append) lewat DataFrame
+
+    Response sama dengan import_members_csv. Nomor baris di pesan error dihitung
+    dari posisi row data (baris kosong/multiline di CSV tidak ikut dihitung).
+    """
+    run = _ImportRun(import_id, filename, "append")
+    run.progress["parser"] = f"columnar:{CSV_ENGINE}"
+    progress = run.progress
+
+    def commit_batch(batch: pd.DataFrame) -> None:
+        try:
+            bulk_insert_member_columns(
+                db, {column: batch[column].tolist() for column in IMPORT_COLUMNS}
+            )
+            apply_aggregate_deltas(db, frame_member_contributions(batch))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            first = batch.index[0] + HEADER_LINES + 1
+            last = batch.index[-1] + HEADER_LINES + 1
+            run.report(f"Line {first}-{last}: batch gagal disimpan ({e})")
+            progress["failed_rows"] += len(batch)
+        else:
+            progress["imported"] += len(batch)
+            progress["batches_committed"] += 1
+        run.update_rate()
+
+    try:
+        chunk_rows = max(batch_size, COLUMNAR_CHUNK_ROWS)
+        for raw in read_csv_frames(stream, chunk_rows):
+            progress["rows_processed"] += len(raw)
+            frame = normalize_frame(raw, run)
+            for start in range(0, len(frame), batch_size):
+                commit_batch(frame.iloc[start : start + batch_size])
+
+        progress["status"] = "completed"
+    except UnicodeDecodeError as e:
+        db.rollback()
+        progress["status"] = "failed"
+        run.report(f"File harus ber-encoding UTF-8 ({e})")
+    except Exception:
+        db.rollback()
+        progress["status"] = "failed"
+        raise
+    finally:
+        run.finish()
+
+    return run.result()
@@ -0,0 +1,483 @@
+"""
+Member Name Search Service
+Pencarian nama pengurus secara fuzzy dengan index trigram.
+
+Nama dinormalisasi (lowercase, tanpa aksen/tanda baca, huruf ganda dilipat, ejaan
+lama oe/dj/tj) sehingga variasi seperti "Muhamad/Muhammad" atau "Soekarno/Sukarno"
+dianggap sama, lalu dipecah menjadi trigram seperti pg_trgm.
+
+Di SQLite trigram disimpan di side table (member_name_trigrams + document
+frequency di member_name_trigram_stats). Kandidat diambil lewat trigram paling
+langka dari query, kemudian diberi skor di Python. Di PostgreSQL dipakai
+ekstensi pg_trgm (similarity + GIN index pada lower(name)).
+
+Index di-update secara incremental: pengurus baru (id > id terbesar yang sudah
+di-index) di-index di background (session sendiri) setelah upload, atau dijadwalkan
+oleh pencarian yang menemukan index tertinggal; pencarian sendiri hanya membaca.
+Import sync meng-index insert/update/hapus di transaksi yang sama.
+
+Index bisa tertinggal dari tabel members: setelah import append (sampai refresh
+background selesai) dan untuk perubahan nama di luar jalur import (edit langsung
+ke tabel tidak di-index ulang). Pengurus yang belum di-index tidak muncul di hasil
+pencarian fuzzy.
+"""
+
+from collections import Counter
+from sqlalchemy import bindparam, case, delete, func, select, text
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.services.work_scheduler import BACKGROUND, cpu_scheduler, work_lane
+from app.models.member import Member
+from app.models.member_name_index import (
+    MemberNameIndex,
+    MemberNameTrigram,
+    MemberNameTrigramStat,
+)
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+import math
+import re
+import threading
+import unicodedata
+
+# Skor minimum supaya sebuah nama dianggap cocok
+MIN_SCORE = 0.45
+
+# Selisih skor di bawah ini antara kandidat teratas dianggap ambigu
+AMBIGUITY_MARGIN = 0.08
+
+# Trigram query dipakai mulai dari yang paling langka sampai total posting yang
+# dibaca melewati budget ini (minimal MIN_CANDIDATE_TRIGRAMS trigram), sehingga
+# trigram umum seperti " mu" tidak membuat pencarian men-scan seluruh index
+POSTING_BUDGET = 2000
+MIN_CANDIDATE_TRIGRAMS = 3
+
+# Jumlah kandidat (paling banyak trigram yang sama) yang diberi skor
+MAX_CANDIDATES = 50
+
+# Jumlah pengurus per batch (satu commit) saat membangun index
+INDEX_BATCH_SIZE = 5000
+
+# Ejaan lama / variasi umum -> bentuk baku (diterapkan sebelum melipat huruf ganda)
+SPELLING_VARIANTS = [("oe", "u"), ("dj", "j"), ("tj", "c")]
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_REPEATED = re.compile(r"([a-z])\1+")
+
+_refresh_lock = threading.Lock()
+_refresh_scheduled = threading.Event()
+
+
+@dataclass
+class NameMatch:
+    member_id: int
+    name: str
+    score: float
+
+
+@dataclass
+class NameLookup:
+    """Hasil pencarian nama: kandidat terbaik + alternatif"""
+
+    matches: List[NameMatch] = field(default_factory=list)
+    ambiguous: bool = False
+
+    @property
+    def best(self) -> Optional[NameMatch]:
+        return self.matches[0] if self.matches else None
+
+    @property
+    def alternatives(self) -> List[NameMatch]:
+        return self.matches[1:]
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """Normalisasi nama untuk pencarian fuzzy (mis. 'Muhammad  Rizky!' -> 'muhamad rizky')"""
+    if not name:
+        return ""
+    value = unicodedata.normalize("NFKD", name)
+    value = "".join(char for char in value if not unicodedata.combining(char))
+    value = _NON_ALNUM.sub(" ", value.lower())
+    for old, new in SPELLING_VARIANTS:
+        value = value.replace(old, new)
+    value = _REPEATED.sub(r"\1", value)
+    return " ".join(value.split())
+
+
+def name_trigrams(normalized: str) -> Set[str]:
+    """Trigram per kata dengan padding seperti pg_trgm ('budi' -> '  b', ' bu', 'bud', ...)"""
+    trigrams: Set[str] = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        trigrams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+def score_name(query: Set[str], candidate: Set[str]) -> float:
+    """
+    Skor kemiripan 0..1
+
+    Gabungan seberapa banyak trigram query yang ditemukan di nama (supaya query
+    sebagian seperti 'budi' tetap cocok dengan 'Budi Santoso') dan kemiripan
+    Jaccard (supaya nama yang panjangnya sama dengan query diutamakan).
+    """
+    if not query or not candidate:
+        return 0.0
+    shared = len(query & candidate)
+    containment = shared / len(query)
+    jaccard = shared / len(query | candidate)
+    return round(0.6 * containment + 0.4 * jaccard, 4)
+
+
+def _is_postgresql(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+# ===== MAINTENANCE INDEX =====
+
+
+def _update_trigram_stats(db: Session, deltas: Counter) -> None:
+    """Upsert count document frequency per trigram"""
+    rows = [{"trigram": t, "count": c} for t, c in deltas.items() if c]
+    if not rows:
+        return
+    from sqlalchemy.dialects.sqlite import insert
+
+    table = MemberNameTrigramStat.__table__
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.trigram],
+        set_={"count": table.c.count + stmt.excluded.count},
+    )
+    db.execute(stmt, rows)
+    if any(row["count"] < 0 for row in rows):
+        db.execute(delete(MemberNameTrigramStat).where(MemberNameTrigramStat.count <= 0))
+
+
+def remove_member_names(db: Session, member_ids: Sequence[int]) -> None:
+    """Hapus pengurus dari index trigram (tanpa commit)"""
+    if not member_ids or _is_postgresql(db):
+        return
+    ids = list(member_ids)
+    deltas: Counter = Counter()
+    for start in range(0, len(ids), 500):
+        chunk = ids[start : start + 500]
+        for (trigram,) in db.execute(
+            select(MemberNameTrigram.trigram).where(
+                MemberNameTrigram.member_id.in_(chunk)
+            )
+        ):
+            deltas[trigram] -= 1
+        db.execute(delete(MemberNameTrigram).where(MemberNameTrigram.member_id.in_(chunk)))
+        db.execute(delete(MemberNameIndex).where(MemberNameIndex.member_id.in_(chunk)))
+    _update_trigram_stats(db, deltas)
+
+
+def index_member_names(db: Session, members: Iterable[Tuple[int, Optional[str]]]) -> int:
+    """
+    Tambahkan (member_id, name) ke index trigram (tanpa commit)
+
+    Pengurus yang sudah ada di index harus dihapus dulu lewat remove_member_names.
+    Return jumlah pengurus yang di-index.
+    """
+    if _is_postgresql(db):
+        return 0
+
+    names: List[tuple] = []
+    postings: List[tuple] = []
+    deltas: Counter = Counter()
+    indexed = 0
+
+    # executemany langsung ke DBAPI (jalur ini hanya untuk SQLite), ~1 row per trigram
+    connection = db.connection()
+
+    def flush() -> None:
+        if names:
+            connection.exec_driver_sql(
+                "INSERT INTO member_name_index (member_id, normalized) VALUES (?, ?)",
+                names,
+            )
+        if postings:
+            connection.exec_driver_sql(
+                "INSERT INTO member_name_trigrams (trigram, member_id) VALUES (?, ?)",
+                postings,
+            )
+        names.clear()
+        postings.clear()
+
+    for member_id, name in members:
+        normalized = normalize_name(name)
+        names.append((member_id, normalized))
+        for trigram in name_trigrams(normalized):
+            postings.append((trigram, member_id))
+            deltas[trigram] += 1
+        indexed += 1
+        if len(names) >= INDEX_BATCH_SIZE:
+            flush()
+    flush()
+    _update_trigram_stats(db, deltas)
+    return indexed
+
+
+def reindex_member_names(db: Session, members: Sequence[Tuple[int, Optional[str]]]) -> None:
+    """
+    Index ulang pengurus yang sudah ada di index (tanpa commit)
+
+    Pengurus yang belum di-index dilewati; mereka akan ikut refresh berikutnya.
+    """
+    if not members or _is_postgresql(db):
+        return
+    names = dict(members)
+    indexed: List[int] = []
+    ids = list(names)
+    for start in range(0, len(ids), 500):
+        indexed.extend(
+            db.execute(
+                select(MemberNameIndex.member_id).where(
+                    MemberNameIndex.member_id.in_(ids[start : start + 500])
+                )
+            ).scalars()
+        )
+    remove_member_names(db, indexed)
+    index_member_names(db, [(member_id, names[member_id]) for member_id in indexed])
+
+
+def member_name_index_bounds(db: Session) -> Tuple[Optional[int], Optional[int]]:
+    """(id terbesar di index, id terbesar di members)"""
+    return tuple(
+        db.execute(
+            select(
+                select(func.max(MemberNameIndex.member_id)).scalar_subquery(),
+                select(func.max(Member.id)).scalar_subquery(),
+            )
+        ).one()
+    )
+
+
+def _is_stale(indexed_max: Optional[int], members_max: Optional[int]) -> bool:
+    return members_max is not None and (indexed_max is None or members_max > indexed_max)
+
+
+def _unindexed_batches(db: Session, last_id: int) -> Iterator[List[Tuple[int, Optional[str]]]]:
+    """Batch (id, name) pengurus dengan id > last_id yang belum ada di index"""
+    while True:
+        batch = db.execute(
+            select(Member.id, Member.name)
+            .where(
+                Member.id > last_id,
+                Member.id.notin_(
+                    select(MemberNameIndex.member_id).where(
+                        MemberNameIndex.member_id > last_id
+                    )
+                ),
+            )
+            .order_by(Member.id)
+            .limit(INDEX_BATCH_SIZE)
+        ).all()
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1][0]
+
+
+def index_inserted_members(
+    db: Session, bounds: Tuple[Optional[int], Optional[int]]
+) -> int:
+    """
+    Index pengurus yang di-insert setelah bounds diambil (tanpa commit)
+
+    bounds adalah hasil member_name_index_bounds sebelum insert. Jika index saat itu
+    sudah tertinggal, tidak ada yang di-index: refresh berikutnya mengambil semua
+    id > id terbesar di index, jadi tidak ada pengurus yang terlewat.
+    """
+    if _is_postgresql(db) or _is_stale(*bounds):
+        return 0
+    last_id = bounds[1] if bounds[1] is not None else 0
+    return sum(index_member_names(db, batch) for batch in _unindexed_batches(db, last_id))
+
+
+def refresh_member_name_index(db: Session) -> int:
+    """
+    Index pengurus yang belum masuk index (id > id terbesar di index) lalu commit
+
+    Murah jika tidak ada yang baru: hanya dua MAX() pada primary key.
+    Return jumlah pengurus yang di-index.
+    """
+    if _is_postgresql(db):
+        return 0
+
+    with _refresh_lock:
+        indexed_max, members_max = member_name_index_bounds(db)
+        if not _is_stale(indexed_max, members_max):
+            return 0
+
+        # Commit per batch supaya transaksi tulis tidak menahan lock SQLite lama;
+        # jika terhenti di tengah, refresh berikutnya melanjutkan dari id terakhir
+        count = 0
+        last_id = indexed_max if indexed_max is not None else 0
+        for batch in _unindexed_batches(db, last_id):
+            count += index_member_names(db, batch)
+            db.commit()
+        if count > 1000:
+            print(f"🔎 Member name index: {count} pengurus di-index")
+        return count
+
+
+def refresh_member_name_index_in_background() -> None:
+    """Background task saat startup, setelah upload CSV dan saat index tertinggal"""
+    db = SessionLocal()
+    try:
+        with work_lane(BACKGROUND), cpu_scheduler.slot():
+            ensure_postgresql_trigram_index(db)
+            refresh_member_name_index(db)
+    except Exception as e:
+        db.rollback()
+        print(f"⚠️ Member name index refresh failed: {e}")
+    finally:
+        db.close()
+
+
+def _run_scheduled_refresh() -> None:
+    try:
+        refresh_member_name_index_in_background()
+    finally:
+        _refresh_scheduled.clear()
+
+
+def _schedule_refresh_if_stale(db: Session) -> None:
+    """
+    Jadwalkan refresh di thread terpisah jika ada pengurus yang belum di-index
+
+    Dipanggil dari pencarian (session request): hanya membaca dua MAX() dan tidak
+    pernah menulis/commit. Pengurus baru ikut hasil pencarian setelah refresh selesai.
+    """
+    if _refresh_scheduled.is_set() or _refresh_lock.locked():
+        return
+    if not _is_stale(*member_name_index_bounds(db)):
+        return
+    _refresh_scheduled.set()
+    threading.Thread(
+        target=_run_scheduled_refresh, name="member-name-index", daemon=True
+    ).start()
+
+
+# ===== PENCARIAN =====
+
+
+def _sqlite_candidates(db: Session, trigrams: Set[str]) -> List[int]:
+    """member_id yang paling banyak memiliki trigram (langka) dari query"""
+    stats = db.execute(
+        select(MemberNameTrigramStat.trigram, MemberNameTrigramStat.count).where(
+            MemberNameTrigramStat.trigram.in_(list(trigrams))
+        )
+    ).all()
+    present = sorted((count, trigram) for trigram, count in stats if count > 0)
+    if not present:
+        return []
+
+    rare: List[str] = []
+    postings = 0
+    for count, trigram in present:
+        if len(rare) >= MIN_CANDIDATE_TRIGRAMS and postings + count > POSTING_BUDGET:
+            break
+        rare.append(trigram)
+        postings += count
+
+    # Bobot IDF: nama yang sama-sama punya trigram langka (mis. 'ram' dari
+    # 'Ramadhan') didahulukan dari nama yang hanya cocok di trigram umum
+    total = max(count for count, _ in present)
+    weights = {trigram: math.log(1 + total / count) for count, trigram in present}
+    weight = case(
+        {trigram: weights[trigram] for trigram in rare},
+        value=MemberNameTrigram.trigram,
+        else_=0.0,
+    )
+    rows = db.execute(
+        select(MemberNameTrigram.member_id)
+        .where(MemberNameTrigram.trigram.in_(rare))
+        .group_by(MemberNameTrigram.member_id)
+        .order_by(func.sum(weight).desc())
+        .limit(MAX_CANDIDATES)
+    )
+    return [member_id for (member_id,) in rows]
+
+
+def _sqlite_search(db: Session, query: str, limit: int) -> List[NameMatch]:
+    normalized = normalize_name(query)
+    trigrams = name_trigrams(normalized)
+    if not trigrams:
+        return []
+
+    _schedule_refresh_if_stale(db)
+    candidate_ids = _sqlite_candidates(db, trigrams)
+    if not candidate_ids:
+        return []
+
+    rows = db.execute(
+        select(Member.id, Member.name, MemberNameIndex.normalized)
+        .join(MemberNameIndex, MemberNameIndex.member_id == Member.id)
+        .where(Member.id.in_(candidate_ids))
+    ).all()
+
+    matches = []
+    for member_id, name, candidate in rows:
+        score = 1.0 if candidate == normalized else score_name(trigrams, name_trigrams(candidate))
+        if score >= MIN_SCORE:
+            matches.append(NameMatch(member_id=member_id, name=name, score=score))
+    matches.sort(key=lambda match: (-match.score, match.member_id))
+    return matches[:limit]
+
+
+def _postgresql_search(db: Session, query: str, limit: int) -> List[NameMatch]:
+    rows = db.execute(
+        text(
+            "SELECT id, name, similarity(lower(name), :query) AS score "
+            "FROM members WHERE lower(name) % :query "
+            "ORDER BY score DESC, id LIMIT :limit"
+        ).bindparams(bindparam("query"), bindparam("limit")),
+        {"query": query.lower().strip(), "limit": limit},
+    ).all()
+    return [
+        NameMatch(member_id=row.id, name=row.name, score=round(float(row.score), 4))
+        for row in rows
+        if row.score >= MIN_SCORE
+    ]
+
+
+def ensure_postgresql_trigram_index(db: Session) -> None:
+    """Aktifkan pg_trgm + GIN index pada lower(name) (hanya PostgreSQL)"""
+    if not _is_postgresql(db):
+        return
+    db.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    db.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_members_name_trgm "
+            "ON members USING gin (lower(name) gin_trgm_ops)"
+        )
+    )
+    db.commit()
+
+
+def search_member_names(db: Session, query: str, limit: int = 5) -> List[NameMatch]:
+    """Nama pengurus yang paling mirip dengan query, urut skor tertinggi"""
+    if not query or not query.strip():
+        return []
+    if _is_postgresql(db):
+        return _postgresql_search(db, query, limit)
+    return _sqlite_search(db, query, limit)
+
+
+def lookup_member_name(db: Session, query: str, limit: int = 5) -> NameLookup:
+    """
+    Cari pengurus berdasarkan nama untuk chat handler
+
+    ambiguous=True jika beberapa kandidat teratas skornya hampir sama (mis. query
+    'budi' cocok dengan beberapa pengurus bernama Budi) sehingga user perlu memilih.
+    """
+    matches = search_member_names(db, query, limit)
+    if len(matches) < 2:
+        return NameLookup(matches=matches)
+
+    best, second = matches[0], matches[1]
+    ambiguous = best.score - second.score < AMBIGUITY_MARGIN
+    return NameLookup(matches=matches, ambiguous=ambiguous)
@@ -0,0 +1,199 @@
+"""
+Member Query Service
+Query daftar pengurus dengan keyset pagination (cursor = id terakhir) dan proyeksi
+kolom di SQL, sehingga endpoint tidak perlu me-load semua row + semua kolom.
+
+Filter pencarian (jabatan, bidang usaha, status KTA, gender, rentang usia, prefix
+nama perusahaan) memakai index komposit di model Member; lihat
+benchmarks/explain_member_search.py untuk verifikasi query plan.
+"""
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.models.member import Member
+from typing import Any, Dict, List, Optional
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Rentang usia yang masuk akal; filter usia satu sisi dilengkapi batas ini supaya
+# query planner SQLite memilih index usia (range dua sisi) alih-alih scan urut id
+USIA_LOWER_BOUND = 0
+USIA_UPPER_BOUND = 150
+
+# Field yang boleh diminta lewat `fields=` (urutan = urutan di response)
+MEMBER_FIELDS = [
+    "id",
+    "no",
+    "name",
+    "email",
+    "phone",
+    "jabatan",
+    "status_kta",
+    "no_kta",
+    "tanggal_lahir",
+    "usia",
+    "jenis_kelamin",
+    "instagram",
+    "nama_perusahaan",
+    "jabatan_dlm_akta_perusahaan",
+    "kategori_bidang_usaha",
+    "alamat_perusahaan",
+    "perusahaan_berdiri_sejak",
+    "jmlh_karyawan",
+    "website",
+    "twitter",
+    "facebook",
+    "youtube",
+    "position",
+    "organization",
+    "status",
+    "region",
+    "entry_year",
+]
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """
+    Parse parameter `fields` (dipisah koma) menjadi daftar kolom
+
+    id selalu ikut karena dipakai sebagai cursor. Raise ValueError untuk field
+    yang tidak dikenal.
+    """
+    if not fields:
+        return list(MEMBER_FIELDS)
+
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in MEMBER_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    selected = set(requested) | {"id"}
+    return [field for field in MEMBER_FIELDS if field in selected]
+
+
+def prefix_upper_bound(prefix: str) -> str:
+    """Batas atas eksklusif untuk prefix (mis. 'pt a' -> 'pt b')"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+# Dimensi kategori (nama di member_aggregates) -> kolom Member
+VALUE_COLUMNS = {
+    "jabatan": Member.jabatan,
+    "bidang_usaha": Member.kategori_bidang_usaha,
+    "status_kta": Member.status_kta,
+}
+
+
+def value_condition(dimension: str, value: str, prefix: bool = False) -> list:
+    """
+    Kondisi WHERE untuk satu nilai dimensi kategori
+
+    prefix=True untuk awalan nilai (mis. "Ketua Bidang" mencakup "Ketua Bidang 1",
+    "Ketua Bidang 2"); ditulis sebagai range, bukan LIKE 'x%', supaya index kolom
+    tetap terpakai di SQLite.
+    """
+    column = VALUE_COLUMNS[dimension]
+    if prefix:
+        return [column >= value, column < prefix_upper_bound(value)]
+    return [column == value]
+
+
+def build_member_filters(
+    jabatan: Optional[str] = None,
+    kategori_bidang_usaha: Optional[str] = None,
+    status_kta: Optional[str] = None,
+    jenis_kelamin: Optional[str] = None,
+    usia_min: Optional[int] = None,
+    usia_max: Optional[int] = None,
+    perusahaan_prefix: Optional[str] = None,
+) -> list:
+    """
+    Kondisi WHERE untuk pencarian pengurus
+
+    Filter kategori memakai kecocokan persis; prefix perusahaan case-insensitive
+    dan ditulis sebagai range pada lower(nama_perusahaan) supaya bisa memakai
+    expression index (LIKE 'x%' tidak memakai index di SQLite secara default).
+    """
+    conditions = []
+    for column, value in [
+        (Member.jabatan, jabatan),
+        (Member.kategori_bidang_usaha, kategori_bidang_usaha),
+        (Member.status_kta, status_kta),
+        (Member.jenis_kelamin, jenis_kelamin),
+    ]:
+        if value:
+            conditions.append(column == value)
+
+    if usia_min is not None or usia_max is not None:
+        lower = USIA_LOWER_BOUND if usia_min is None else usia_min
+        upper = USIA_UPPER_BOUND if usia_max is None else usia_max
+        conditions.append(Member.usia >= lower)
+        conditions.append(Member.usia <= upper)
+
+    prefix = (perusahaan_prefix or "").strip().lower()
+    if prefix:
+        company = func.lower(Member.nama_perusahaan)
+        conditions.append(company >= prefix)
+        conditions.append(company < prefix_upper_bound(prefix))
+
+    return conditions
+
+
+def count_members(db: Session, conditions: Optional[list] = None) -> int:
+    """COUNT(*) pengurus yang cocok dengan filter"""
+    stmt = select(func.count()).select_from(Member)
+    if conditions:
+        stmt = stmt.where(*conditions)
+    return db.execute(stmt).scalar() or 0
+
+
+def build_page_query(
+    fields: List[str],
+    cursor: Optional[int] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    conditions: Optional[list] = None,
+):
+    """SELECT satu halaman (limit + 1 row untuk deteksi halaman berikutnya)"""
+    stmt = select(*[getattr(Member, field) for field in fields])
+    if conditions:
+        stmt = stmt.where(*conditions)
+    if cursor is not None:
+        stmt = stmt.where(Member.id > cursor)
+    return stmt.order_by(Member.id).limit(limit + 1)
+
+
+def fetch_member_page(
+    db: Session,
+    fields: List[str],
+    cursor: Optional[int] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    conditions: Optional[list] = None,
+) -> Dict[str, Any]:
+    """
+    Ambil satu halaman pengurus urut id (keyset pagination)
+
+    Args:
+        fields: Kolom yang di-SELECT (hasil parse_fields)
+        cursor: id terakhir dari halaman sebelumnya (None = halaman pertama)
+        limit: Jumlah row per halaman
+        conditions: Filter WHERE tambahan
+
+    Returns:
+        Dictionary berisi data, count, has_more dan next_cursor
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    # Ambil satu row ekstra untuk tahu apakah masih ada halaman berikutnya
+    rows = db.execute(build_page_query(fields, cursor, limit, conditions)).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    data = [dict(row._mapping) for row in rows]
+
+    return {
+        "data": data,
+        "count": len(data),
+        "limit": limit,
+        "has_more": has_more,
+        "next_cursor": data[-1]["id"] if has_more else None,
+    }
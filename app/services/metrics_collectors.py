@@ -0,0 +1,119 @@
+"""
+Metrics Collectors
+Metric /metrics yang dibaca dari get_stats() service saat scrape (tidak ada biaya
+di jalur request):
+- Gemini: latency per caller, token, biaya per route, retry, circuit breaker,
+  single flight
+- Cache: hit ratio cache jawaban chat, cache analytics dan single flight Gemini
+- Antrian: kedalaman antrian dan pekerjaan berjalan per lane (slot Gemini/CPU),
+  dokumen per ai_status (antrian enrichment)
+"""
+
+from typing import List
+
+from app.core.database import SessionLocal
+from app.core.metrics import Counter, Gauge, Histogram, Metric, registry
+from app.services.ai_enrichment import ai_enrichment_worker, status_counts
+from app.services.analytics_cache import get_cache_stats
+from app.services.chat_answer_cache import chat_answer_cache
+from app.services.gemini_resilience import gemini_caller
+from app.services.gemini_service import gemini_single_flight
+from app.services.gemini_telemetry import LATENCY_BUCKETS_MS, gemini_telemetry
+from app.services.work_scheduler import cpu_scheduler, gemini_scheduler
+
+
+def collect_gemini() -> List[Metric]:
+    stats = gemini_telemetry.get_stats()
+    latency = Histogram(
+        "gemini_request_duration_seconds",
+        "Latency panggilan Gemini per caller (dari telemetry)",
+        ("caller",),
+        buckets=[bound / 1000 for bound in LATENCY_BUCKETS_MS],
+    )
+    calls = Counter("gemini_calls_total", "Panggilan Gemini per caller", ("caller", "result"))
+    tokens = Counter("gemini_tokens_total", "Token Gemini per caller (usage_metadata)", ("caller", "kind"))
+    for caller, caller_stats in stats["callers"].items():
+        snapshot = caller_stats["latency_ms"]
+        latency.set_counts(list(snapshot["buckets"].values()), snapshot["sum"] / 1000, caller=caller)
+        calls.set_total(caller_stats["calls"] - caller_stats["errors"], caller=caller, result="ok")
+        calls.set_total(caller_stats["errors"], caller=caller, result="error")
+        tokens.set_total(caller_stats["prompt_tokens"], caller=caller, kind="prompt")
+        tokens.set_total(caller_stats["response_tokens"], caller=caller, kind="response")
+
+    route_calls = Counter("gemini_route_calls_total", "Panggilan Gemini per route", ("caller", "model"))
+    route_cost = Counter(
+        "gemini_route_cost_usd_total", "Estimasi biaya Gemini per route (USD)", ("caller", "model")
+    )
+    for route in stats["routes"].values():
+        route_calls.set_total(route["calls"], caller=route["caller"], model=route["model"])
+        route_cost.set_total(route["cost_usd"], caller=route["caller"], model=route["model"])
+
+    resilience = gemini_caller.get_stats()
+    retries = Counter("gemini_resilience_total", "Percobaan, retry dan kegagalan Gemini", ("event",))
+    for event in ("attempts", "retries", "failures", "deadline_exceeded"):
+        retries.set_total(resilience[event], event=event)
+    breaker = Gauge("gemini_circuit_open", "1 jika circuit breaker Gemini terbuka")
+    breaker.set(1 if resilience["circuit_breaker"]["state"] == "open" else 0)
+
+    return [latency, calls, tokens, route_calls, route_cost, retries, breaker]
+
+
+def collect_caches() -> List[Metric]:
+    lookups = Counter("cache_lookups_total", "Lookup cache per hasil", ("cache", "result"))
+    ratio = Gauge("cache_hit_ratio", "Rasio hit cache sejak start", ("cache",))
+
+    chat = chat_answer_cache.get_stats()
+    lookups.set_total(chat["exact_hits"], cache="chat_answer", result="exact_hit")
+    lookups.set_total(chat["similar_hits"], cache="chat_answer", result="similar_hit")
+    lookups.set_total(chat["misses"], cache="chat_answer", result="miss")
+    ratio.set(chat["hit_ratio"], cache="chat_answer")
+
+    hits = total = 0
+    for kind, statuses in get_cache_stats().items():
+        for status, count in statuses.items():
+            lookups.set_total(count, cache=f"analytics_{kind}", result=status)
+            total += count
+            # stale tetap dijawab dari cache (refresh di background)
+            hits += count if status != "miss" else 0
+    ratio.set(hits / total if total else 0.0, cache="analytics")
+
+    single_flight = gemini_single_flight.get_stats()
+    lookups.set_total(single_flight["executed"], cache="gemini_single_flight", result="miss")
+    lookups.set_total(single_flight["coalesced"], cache="gemini_single_flight", result="hit")
+    ratio.set(single_flight["coalesced_ratio"], cache="gemini_single_flight")
+
+    entries = Gauge("chat_answer_cache_entries", "Entry di cache jawaban chat")
+    entries.set(chat["entries"])
+    return [lookups, ratio, entries]
+
+
+def collect_queues() -> List[Metric]:
+    depth = Gauge("work_queue_depth", "Pekerjaan yang menunggu slot", ("scheduler", "lane"))
+    running = Gauge("work_queue_running", "Pekerjaan yang sedang memegang slot", ("scheduler", "lane"))
+    completed = Counter("work_queue_completed_total", "Pekerjaan selesai per lane", ("scheduler", "lane"))
+    timeouts = Counter("work_queue_timeouts_total", "Timeout menunggu slot per lane", ("scheduler", "lane"))
+    for name, scheduler in (("gemini", gemini_scheduler), ("cpu", cpu_scheduler)):
+        for lane, stats in scheduler.get_stats()["lanes"].items():
+            depth.set(stats["queue_depth"], scheduler=name, lane=lane)
+            running.set(stats["running"], scheduler=name, lane=lane)
+            completed.set_total(stats.get("completed", 0), scheduler=name, lane=lane)
+            timeouts.set_total(stats.get("timeouts", 0), scheduler=name, lane=lane)
+
+    documents = Gauge("ai_enrichment_documents", "Dokumen per ai_status (pending = antrian enrichment)", ("status",))
+    db = SessionLocal()
+    try:
+        for status, count in status_counts(db).items():
+            documents.set(count, status=status)
+    finally:
+        db.close()
+    worker = ai_enrichment_worker.get_stats()
+    enrichment = Counter("ai_enrichment_total", "Hasil enrichment dokumen oleh worker", ("result",))
+    enrichment.set_total(worker["succeeded"], result="succeeded")
+    enrichment.set_total(worker["failed_attempts"], result="failed_attempt")
+    return [depth, running, completed, timeouts, documents, enrichment]
+
+
+def register_default_collectors() -> None:
+    registry.register_collector("gemini", collect_gemini)
+    registry.register_collector("caches", collect_caches)
+    registry.register_collector("queues", collect_queues)
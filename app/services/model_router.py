@@ -0,0 +1,116 @@
+"""
+Model Router
+Pilih model Gemini per panggilan berdasarkan jenis tugas (caller), ukuran prompt
+dan target latency.
+
+Tier:
+- light   : GEMINI_LIGHT_MODEL (JSON overview satu baris, ekstraksi singkat)
+- default : GEMINI_MODEL (analisis analytics, ringkasan dokumen map-reduce)
+- size    : light jika perkiraan token prompt <= GEMINI_LIGHT_MAX_PROMPT_TOKENS,
+            atau jika latency model utama untuk caller ini (EMA dari telemetry)
+            melewati GEMINI_LATENCY_TARGETS_MS; selain itu default. Selama
+            latency di atas target, 1 dari LATENCY_PROBE_EVERY panggilan tetap
+            ke model utama supaya EMA-nya ikut pulih
+
+Tier per caller bisa di-override lewat GEMINI_MODEL_ROUTES
+("caller=light|default|size|<nama model>"). Latency dan biaya per route
+(caller + model) ada di gemini_telemetry.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict
+import itertools
+
+from app.core.config import (
+    GEMINI_LATENCY_TARGETS_MS,
+    GEMINI_LIGHT_MAX_PROMPT_TOKENS,
+    GEMINI_LIGHT_MODEL,
+    GEMINI_MODEL,
+    GEMINI_MODEL_ROUTES,
+)
+from app.services.gemini_telemetry import (
+    CALLER_ANALYTICS_DOCUMENTS,
+    CALLER_ANALYTICS_MEMBERS,
+    CALLER_ANALYTICS_OVERVIEW,
+    CALLER_CHAT,
+    CALLER_DOCUMENT_SUMMARY,
+    CALLER_EXTRACTION,
+    CALLER_SUMMARIZATION,
+    gemini_telemetry,
+)
+from app.services.token_budget import estimate_prompt_tokens
+
+TIER_LIGHT = "light"
+TIER_DEFAULT = "default"
+TIER_SIZE = "size"
+
+LATENCY_PROBE_EVERY = 10
+
+_latency_fallbacks = itertools.count(1)
+
+DEFAULT_TIERS = {
+    CALLER_ANALYTICS_OVERVIEW: TIER_LIGHT,
+    CALLER_EXTRACTION: TIER_LIGHT,
+    CALLER_ANALYTICS_MEMBERS: TIER_DEFAULT,
+    CALLER_ANALYTICS_DOCUMENTS: TIER_DEFAULT,
+    CALLER_DOCUMENT_SUMMARY: TIER_DEFAULT,
+    CALLER_SUMMARIZATION: TIER_SIZE,
+    CALLER_CHAT: TIER_SIZE,
+}
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    model: str
+    # Alasan pemilihan (untuk debugging/telemetry): tier:light, size:<=1500, latency:>8000ms, ...
+    reason: str
+
+
+def tier_for(caller: str) -> str:
+    return GEMINI_MODEL_ROUTES.get(caller) or DEFAULT_TIERS.get(caller, TIER_DEFAULT)
+
+
+def model_for(caller: str, default_model: str = GEMINI_MODEL) -> str:
+    """
+    Model dasar untuk caller tanpa melihat prompt (dipakai mis. sebagai bagian key
+    cache analytics); tier size dianggap default
+    """
+    tier = tier_for(caller)
+    if tier == TIER_LIGHT:
+        return GEMINI_LIGHT_MODEL
+    if tier in (TIER_DEFAULT, TIER_SIZE):
+        return default_model
+    return tier
+
+
+def route(caller: str, prompt: str, default_model: str = GEMINI_MODEL) -> ModelRoute:
+    """Model untuk satu panggilan"""
+    tier = tier_for(caller)
+    if tier == TIER_LIGHT:
+        return ModelRoute(GEMINI_LIGHT_MODEL, "tier:light")
+    if tier == TIER_DEFAULT:
+        return ModelRoute(default_model, "tier:default")
+    if tier != TIER_SIZE:
+        return ModelRoute(tier, "override")
+
+    if estimate_prompt_tokens(caller, prompt) <= GEMINI_LIGHT_MAX_PROMPT_TOKENS:
+        return ModelRoute(GEMINI_LIGHT_MODEL, f"size:<={GEMINI_LIGHT_MAX_PROMPT_TOKENS}")
+    target = GEMINI_LATENCY_TARGETS_MS.get(caller)
+    latency = gemini_telemetry.route_latency_ms(caller, default_model)
+    if target and latency is not None and latency > target:
+        if next(_latency_fallbacks) % LATENCY_PROBE_EVERY:
+            return ModelRoute(GEMINI_LIGHT_MODEL, f"latency:>{target:g}ms")
+        return ModelRoute(default_model, "latency:probe")
+    return ModelRoute(default_model, f"size:>{GEMINI_LIGHT_MAX_PROMPT_TOKENS}")
+
+
+def get_policy() -> Dict[str, Any]:
+    """Policy routing yang berlaku (untuk endpoint stats)"""
+    callers = sorted(set(DEFAULT_TIERS) | set(GEMINI_MODEL_ROUTES))
+    return {
+        "default_model": GEMINI_MODEL,
+        "light_model": GEMINI_LIGHT_MODEL,
+        "light_max_prompt_tokens": GEMINI_LIGHT_MAX_PROMPT_TOKENS,
+        "latency_targets_ms": GEMINI_LATENCY_TARGETS_MS,
+        "tiers": {caller: tier_for(caller) for caller in callers},
+    }
@@ -0,0 +1,116 @@
+"""
+Prompt Encoding
+Encoding ringkas untuk data tabular di prompt Gemini (chat + analytics).
+
+Format lama mengulang label di setiap baris ("- Nama (Jabatan: X), Perusahaan: Y,
+Bidang: Z") dan distribusi ditulis sebagai repr dict Python ("{'IT': 3, ...}").
+Di sini:
+- tabel: satu baris header + nilai dipisah delimiter; nilai yang berulang di kolom
+  kategori (jabatan, bidang) diganti kode pendek yang didefinisikan sekali di atas
+- distribusi: "IT=3, Property=2"
+
+Contoh:
+    KODE jabatan: J1=Ketua Bidang 1, J2=Wakil Ketua Bidang
+    nama|jabatan|perusahaan|bidang
+    Budi Santoso|J1|PT Maju|IT
+"""
+
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+DELIMITER = "|"
+
+
+_WHITESPACE = re.compile(r"\s+")
+_ESTIMATE_PIECES = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+
+def _cell(value, delimiter: str) -> str:
+    if value is None:
+        return ""
+    text = _WHITESPACE.sub(" ", str(value)).strip()
+    return text.replace(delimiter, "/")
+
+
+def encode_table(
+    columns: Sequence[str],
+    rows: Iterable[Sequence],
+    coded_columns: Optional[Mapping[str, str]] = None,
+    delimiter: str = DELIMITER,
+) -> str:
+    """
+    Encode rows sebagai tabel header + delimiter
+
+    Args:
+        columns: Nama kolom (header)
+        rows: Nilai per baris, urutan sama dengan columns
+        coded_columns: kolom -> prefix kode (mis. {"jabatan": "J"}); nilai yang
+            berulang di kolom ini diganti kode J1, J2, ... (urut frekuensi)
+    """
+    coded_columns = coded_columns or {}
+    cells = [[_cell(value, delimiter) for value in row] for row in rows]
+    if not cells:
+        return ""
+
+    lines: List[str] = []
+    codebooks: List[Dict[str, str]] = []
+    for index, column in enumerate(columns):
+        prefix = coded_columns.get(column)
+        codebook: Dict[str, str] = {}
+        if prefix:
+            counts = Counter(row[index] for row in cells if row[index])
+            for value, count in counts.most_common():
+                code = f"{prefix}{len(codebook) + 1}"
+                # Kode hanya dipakai jika hematnya lebih besar dari biaya definisinya
+                saved = count * (estimate_tokens(value) - estimate_tokens(code))
+                if saved > estimate_tokens(f"{code}={value}, "):
+                    codebook[value] = code
+            if codebook:
+                entries = ", ".join(f"{code}={value}" for value, code in codebook.items())
+                lines.append(f"KODE {column}: {entries}")
+        codebooks.append(codebook)
+
+    lines.append(delimiter.join(columns))
+    for row in cells:
+        lines.append(
+            delimiter.join(codebooks[index].get(value, value) for index, value in enumerate(row))
+        )
+    return "\n".join(lines)
+
+
+def encode_counts(counts: Mapping[str, int], limit: Optional[int] = None) -> str:
+    """Distribusi sebagai "nilai=jumlah, ..." (opsional hanya `limit` nilai pertama)"""
+    items = list(counts.items())
+    text = ", ".join(f"{_cell(value, ',')}={count}" for value, count in items[:limit])
+    if limit is not None and len(items) > limit:
+        text += f", ... (+{len(items) - limit} lainnya)"
+    return text or "-"
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Perkiraan jumlah token (tanpa tokenizer model)
+
+    Menghitung potongan kata/angka/tanda baca, cukup untuk membandingkan dua
+    encoding dari data yang sama.
+    """
+    return len(_ESTIMATE_PIECES.findall(text))
+
+
+# Kolom daftar pengurus di prompt: (header, atribut row, prefix kode)
+MEMBER_COLUMNS = [
+    ("nama", "name", None),
+    ("jabatan", "jabatan", "J"),
+    ("perusahaan", "nama_perusahaan", None),
+    ("bidang", "kategori_bidang_usaha", "B"),
+]
+
+
+def encode_members(members: Iterable) -> str:
+    """Daftar pengurus (row dengan name/jabatan/nama_perusahaan/kategori_bidang_usaha)"""
+    return encode_table(
+        [header for header, _, _ in MEMBER_COLUMNS],
+        ([getattr(member, attribute) for _, attribute, _ in MEMBER_COLUMNS] for member in members),
+        {header: prefix for header, _, prefix in MEMBER_COLUMNS if prefix},
+    )
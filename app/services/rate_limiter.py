@@ -0,0 +1,57 @@
+"""
+Rate Limiter
+Token bucket thread-safe untuk membatasi laju panggilan (mis. Gemini dari worker
+background) lintas thread.
+"""
+
+from typing import Any, Dict, Optional
+import threading
+import time
+
+
+class RateLimiter:
+    """Token bucket: `rate` token per detik, maksimal `burst` token tersimpan"""
+
+    def __init__(self, rate_per_second: float, burst: Optional[float] = None):
+        self.rate = rate_per_second
+        self.burst = burst if burst is not None else max(rate_per_second, 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._acquired = 0
+        self._waited = 0.0
+
+    @classmethod
+    def per_minute(cls, calls: float) -> Optional["RateLimiter"]:
+        """Limiter untuk N panggilan per menit (None jika tanpa batas)"""
+        return cls(calls / 60.0, burst=max(calls / 60.0, 1.0)) if calls > 0 else None
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Tunggu sampai satu token tersedia; False jika timeout lewat lebih dulu"""
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self._acquired += 1
+                    self._waited += now - started
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if timeout is not None and now + wait - started > timeout:
+                return False
+            time.sleep(wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "rate_per_minute": round(self.rate * 60, 2),
+                "burst": self.burst,
+                "acquired": self._acquired,
+                "waited_seconds": round(self._waited, 2),
+            }
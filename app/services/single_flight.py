@@ -0,0 +1,94 @@
+"""
+Single Flight
+Coalescing panggilan yang identik dan berjalan bersamaan.
+
+Saat dashboard dibuka di beberapa tab sekaligus, setiap request analytics
+mengirim prompt yang sama ke Gemini. Dengan SingleFlight, pemanggil pertama untuk
+sebuah key ("leader") menjalankan fungsi; pemanggil lain dengan key yang sama
+selama panggilan itu masih berjalan ("follower") menunggu dan menerima hasil (atau
+exception) yang sama.
+
+Bisa dipakai dari thread (do) maupun coroutine (do_async): keduanya berbagi
+concurrent.futures.Future yang sama, jadi request async dan background task
+thread ikut ter-coalesce satu sama lain. Hasil tidak disimpan setelah panggilan
+selesai - ini bukan cache.
+"""
+
+from collections import Counter
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+import asyncio
+import threading
+
+
+class SingleFlight:
+    """Satu panggilan in-flight per key, dibagi ke semua pemanggil yang bersamaan"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self._stats: Counter = Counter()
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        """Future untuk key + apakah pemanggil ini leader"""
+        with self._lock:
+            self._stats["calls"] += 1
+            future = self._calls.get(key)
+            if future is not None:
+                self._stats["coalesced"] += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self._stats["executed"] += 1
+            return future, True
+
+    def _run(self, key: str, future: Future, fn: Callable[[], Any]) -> Any:
+        """Jalankan fn sebagai leader lalu bagikan hasilnya ke follower"""
+        try:
+            result = fn()
+        except BaseException as e:
+            with self._lock:
+                self._calls.pop(key, None)
+                self._stats["errors"] += 1
+            future.set_exception(e)
+            raise
+        # Key dilepas sebelum hasil dibagikan: pemanggil berikutnya memulai panggilan baru
+        with self._lock:
+            self._calls.pop(key, None)
+        future.set_result(result)
+        return result
+
+    def do(self, key: str, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """
+        Panggil fn (blocking), atau tunggu panggilan fn yang sedang berjalan untuk key ini
+
+        timeout hanya membatasi waktu tunggu follower (TimeoutError); leader
+        membatasi dirinya sendiri.
+        """
+        future, leader = self._join(key)
+        if leader:
+            return self._run(key, future, fn)
+        return future.result(timeout)
+
+    async def do_async(self, key: str, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """
+        Versi async dari do: fn (blocking) dijalankan di thread pool, follower
+        menunggu tanpa memblokir event loop
+        """
+        future, leader = self._join(key)
+        if leader:
+            return await asyncio.to_thread(self._run, key, future, fn)
+        # shield: follower yang dibatalkan/timeout tidak ikut membatalkan Future bersama
+        return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = self._stats["calls"]
+            return {
+                "calls": calls,
+                "executed": self._stats["executed"],
+                "coalesced": self._stats["coalesced"],
+                "errors": self._stats["errors"],
+                "in_flight": len(self._calls),
+                "coalesced_ratio": round(self._stats["coalesced"] / calls, 3) if calls else 0.0,
+            }
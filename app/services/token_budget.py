@@ -0,0 +1,102 @@
+"""
+Token Budget
+Budget token prompt per caller Gemini (GEMINI_TOKEN_BUDGETS).
+
+Token prompt diperkirakan lokal (prompt_encoding.estimate_tokens) lalu dikali
+rasio kalibrasi dari telemetry (token sebenarnya dari usage_metadata / perkiraan).
+Jika melewati budget, context dikecilkan SEBELUM panggilan:
+- fit_to_budget: bagian context (dipisah separator) dipertahankan dari depan,
+  bagian belakang (paling tidak penting, mis. isi dokumen di chat) dibuang
+- choose_within_budget: prompt dengan detail terbanyak (mis. jumlah nilai
+  distribusi) yang masih muat
+- chars_for_budget: ukuran potongan teks maksimal untuk ringkasan map-reduce
+"""
+
+from math import ceil
+from typing import Callable, Iterable, Optional
+
+from app.core.config import GEMINI_TOKEN_BUDGETS
+from app.services.gemini_telemetry import gemini_telemetry
+from app.services.prompt_encoding import estimate_tokens
+
+TRUNCATION_NOTE = "\n\n[Context dipotong agar muat batas token]"
+
+# Jumlah nilai per distribusi yang dicoba choose_within_budget (None = semua)
+DISTRIBUTION_LIMITS = (None, 30, 15, 8, 5)
+
+
+def token_budget(caller: str) -> Optional[int]:
+    """Budget token prompt untuk caller (None = tanpa batas)"""
+    return GEMINI_TOKEN_BUDGETS.get(caller) or None
+
+
+def estimate_prompt_tokens(caller: str, text: str) -> int:
+    return ceil(estimate_tokens(text) * gemini_telemetry.calibration(caller))
+
+
+def _truncate(caller: str, text: str, max_tokens: int, separator: str) -> str:
+    kept, used = [], estimate_prompt_tokens(caller, TRUNCATION_NOTE)
+    for section in text.split(separator):
+        tokens = estimate_prompt_tokens(caller, section + separator)
+        if used + tokens > max_tokens:
+            if not kept:
+                # Bagian pertama saja sudah terlalu besar: potong per karakter
+                length = int(len(section) * max(max_tokens - used, 0) / max(tokens, 1))
+                while length > 0 and used + estimate_prompt_tokens(caller, section[:length]) > max_tokens:
+                    length = int(length * 0.9)
+                kept.append(section[:length])
+            break
+        kept.append(section)
+        used += tokens
+    return separator.join(kept) + TRUNCATION_NOTE
+
+
+def fit_to_budget(caller: str, text: str, overhead: str = "", separator: str = "\n\n") -> str:
+    """
+    Kecilkan text supaya overhead (bagian prompt lain) + text muat di budget caller
+
+    Returns:
+        text apa adanya jika muat, atau bagian depannya + TRUNCATION_NOTE
+    """
+    budget = token_budget(caller)
+    if not budget:
+        return text
+    available = budget - estimate_prompt_tokens(caller, overhead)
+    before = estimate_prompt_tokens(caller, text)
+    if before <= available:
+        return text
+    shrunk = _truncate(caller, text, available, separator)
+    gemini_telemetry.record_shrink(caller, before, estimate_prompt_tokens(caller, shrunk))
+    return shrunk
+
+
+def choose_within_budget(
+    caller: str,
+    build: Callable[[Optional[int]], str],
+    limits: Iterable[Optional[int]] = DISTRIBUTION_LIMITS,
+) -> str:
+    """Prompt build(limit) pertama yang muat di budget (limit terakhir jika tidak ada)"""
+    budget = token_budget(caller)
+    limits = list(limits)
+    prompt = build(limits[0])
+    if not budget:
+        return prompt
+    before = estimate_prompt_tokens(caller, prompt)
+    if before <= budget:
+        return prompt
+    for limit in limits[1:]:
+        prompt = build(limit)
+        if estimate_prompt_tokens(caller, prompt) <= budget:
+            break
+    gemini_telemetry.record_shrink(caller, before, estimate_prompt_tokens(caller, prompt))
+    return prompt
+
+
+def chars_for_budget(caller: str, sample: str, overhead: str = "") -> Optional[int]:
+    """Jumlah karakter teks (seperti sample) yang muat di budget bersama overhead"""
+    budget = token_budget(caller)
+    if not budget or not sample:
+        return None
+    tokens_per_char = estimate_prompt_tokens(caller, sample) / len(sample)
+    available = budget - estimate_prompt_tokens(caller, overhead)
+    return max(int(available / max(tokens_per_char, 1e-6)), 1)
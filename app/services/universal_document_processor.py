@@ -5,9 +5,17 @@ Handles ANY type of PDF documents for knowledge base
 
 import pdfplumber
 from pathlib import Path
+from app.core.metrics import (
+    extraction_document_duration,
+    extraction_documents,
+    extraction_page_duration,
+    extraction_pages,
+    extraction_pages_per_second,
+)
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 import re
+import time
 
 
 class UniversalDocumentProcessor:
@@ -42,6 +50,7 @@ class UniversalDocumentProcessor:
             "keywords": [],
         }
 
+        started = time.perf_counter()
         try:
             # Validate PDF file before processing
             with open(file_path, "rb") as f:
@@ -69,6 +78,7 @@ class UniversalDocumentProcessor:
                 tables = []
 
                 for page_num, page in enumerate(pdf.pages, 1):
+                    page_started = time.perf_counter()
                     # Extract text
                     text = page.extract_text()
                     if text:
@@ -86,6 +96,8 @@ class UniversalDocumentProcessor:
                                     "cols": len(table[0]) if table else 0,
                                 }
                             )
+                    extraction_page_duration.observe(time.perf_counter() - page_started)
+                    extraction_pages.inc()
 
                 result["full_text"] = "\n\n".join(full_text)
                 result["tables"] = tables
@@ -108,8 +120,14 @@ class UniversalDocumentProcessor:
                 )
 
         except Exception as e:
+            extraction_documents.inc(status="error")
             raise Exception(f"Error processing PDF: {str(e)}")
 
+        elapsed = time.perf_counter() - started
+        extraction_documents.inc(status="ok")
+        extraction_document_duration.observe(elapsed)
+        if elapsed > 0:
+            extraction_pages_per_second.set(result["page_count"] / elapsed)
         return result
 
     @staticmethod
@@ -6,7 +6,14 @@ Handles ALL document operations for knowledge base
 from sqlalchemy.orm import Session
 from app.models.universal_document import UniversalDocument, DocumentCollection
 from app.services.universal_document_processor import UniversalDocumentProcessor
+from app.services.ai_enrichment import (
+    STATUS_PENDING,
+    STATUS_PROCESSING,
+    ai_enrichment_worker,
+    enrich_document,
+)
 from app.services.gemini_service import GeminiService
+from app.services.work_scheduler import cpu_scheduler
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 import json
@@ -31,8 +38,9 @@ class UniversalDocumentService:
 
         This is the MAIN function for handling ANY document upload
         """
-        # Extract content from PDF
-        extracted_data = UniversalDocumentProcessor.extract_document_content(file_path)
+        # Extract content from PDF (slot CPU bersama, lane dari pemanggil)
+        with cpu_scheduler.slot():
+            extracted_data = UniversalDocumentProcessor.extract_document_content(file_path)
 
         # Auto-detect document type
         document_type = UniversalDocumentProcessor.detect_document_type(
@@ -68,44 +76,27 @@ class UniversalDocumentService:
         db.commit()
         db.refresh(document)
 
-        # Generate AI summary asynchronously (optional, non-blocking)
-        # Note: This runs synchronously but won't block the response
-        # If it fails, document is already marked as processed
+        # Ringkasan AI dikerjakan worker enrichment di background (ai_status
+        # pending -> processing -> done/failed), jadi upload tidak menunggu Gemini.
+        # Tanpa worker (AI_ENRICHMENT_ENABLED=false) tetap dikerjakan inline.
         if generate_ai_summary and extracted_data["full_text"]:
-            try:
-                print(f"🤖 Generating AI summary for {filename}...")
-                gemini = GeminiService()
-
-                # Generate summary (limit to 15000 chars to avoid timeout)
-                ai_summary = gemini.summarize_text(extracted_data["full_text"][:15000])
-
-                # Generate insights
-                insights_prompt = f"""
-Analyze this document briefly and extract key information:
-Document Type: {document_type}
-Content: {extracted_data['full_text'][:8000]}
-
-Provide a brief analysis covering:
-1. Main topics (2-3 points)
-2. Key findings (2-3 points)
-3. Important entities (people, organizations, dates)
-"""
-
-                ai_insights_text = gemini.summarize_text(insights_prompt)
-
-                # Update document with AI data
-                document.ai_summary = ai_summary  # type: ignore
-                document.ai_insights = {"analysis": ai_insights_text}  # type: ignore
+            document.ai_status = STATUS_PENDING  # type: ignore
+            document.ai_attempts = 0  # type: ignore
+            document.ai_updated_at = datetime.utcnow()  # type: ignore
+            db.commit()
 
+            if ai_enrichment_worker.is_running():
+                print(f"🤖 AI summary queued for {filename}")
+                ai_enrichment_worker.notify()
+            else:
+                print(f"🤖 Generating AI summary for {filename}...")
+                # Document is already processed, AI summary is just bonus:
+                # kegagalan hanya tercatat di ai_status/ai_error
+                document.ai_status = STATUS_PROCESSING  # type: ignore
                 db.commit()
+                enrich_document(db, document.id, GeminiService())  # type: ignore
                 db.refresh(document)
 
-                print(f"✅ AI summary generated for {filename}")
-
-            except Exception as e:
-                print(f"⚠️ AI processing error (non-critical): {e}")
-                # Document is already processed, AI summary is just bonus
-
         return document
 
     @staticmethod
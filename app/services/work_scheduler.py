@@ -0,0 +1,219 @@
+"""
+Work Scheduler
+Antrian prioritas bersama untuk pekerjaan yang berebut kapasitas yang sama
+(kuota/konkurensi Gemini, CPU untuk ekstraksi PDF dan analytics).
+
+Dua lane:
+- interactive: ada user yang menunggu (chat, upload, analytics cache miss)
+- background: enrichment AI, backfill, refresh analytics terjadwal
+
+Lane dibawa lewat contextvar (work_lane), jadi kode yang memanggil Gemini
+tidak perlu tahu siapa pemanggilnya; thread background cukup membungkus
+pekerjaannya dengan `with work_lane(BACKGROUND):`.
+
+Setiap scheduler punya sejumlah slot. Kalau slot penuh, pekerjaan antri per lane
+dan slot yang kosong dibagi dengan weighted fair queuing: setiap tiket mendapat
+finish tag = max(virtual time, finish tag terakhir lane-nya) + 1 / bobot lane,
+lalu tiket dengan finish tag terkecil yang jalan lebih dulu. Dengan bobot
+interactive 8 : background 1, pekerjaan interactive yang baru datang menyalip
+antrian background (background tetap jalan, tidak kelaparan). Pekerjaan yang
+sudah berjalan tidak dihentikan; sebagai gantinya background tidak boleh
+memakai slot yang dicadangkan untuk interactive.
+"""
+
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, List, Optional
+import os
+import threading
+import time
+
+from app.core.config import (
+    EXTRACTION_MAX_CONCURRENT,
+    GEMINI_INTERACTIVE_RESERVED_SLOTS,
+    GEMINI_MAX_CONCURRENT_CALLS,
+    WORK_BACKGROUND_WEIGHT,
+    WORK_INTERACTIVE_WEIGHT,
+)
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+LANES = (INTERACTIVE, BACKGROUND)
+
+# Jumlah waktu tunggu terakhir per lane untuk persentil di stats
+_WAIT_SAMPLES = 500
+
+_current_lane: ContextVar[str] = ContextVar("work_lane", default=INTERACTIVE)
+
+
+@contextmanager
+def work_lane(lane: str) -> Iterator[None]:
+    """Jalankan blok ini (dan panggilan Gemini/ekstraksi di dalamnya) di lane tertentu"""
+    if lane not in LANES:
+        raise ValueError(f"Unknown work lane: {lane}")
+    token = _current_lane.set(lane)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+def current_lane() -> str:
+    return _current_lane.get()
+
+
+class SchedulerTimeoutError(TimeoutError):
+    """Slot tidak didapat sebelum timeout"""
+
+
+class _Ticket:
+    __slots__ = ("lane", "finish", "enqueued_at", "granted")
+
+    def __init__(self, lane: str, finish: float):
+        self.lane = lane
+        self.finish = finish
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+
+
+class WorkScheduler:
+    """Slot terbatas, dibagi antar lane dengan weighted fair queuing"""
+
+    def __init__(
+        self,
+        name: str,
+        slots: int,
+        weights: Optional[Dict[str, float]] = None,
+        reserved_interactive: int = 0,
+    ):
+        self.name = name
+        self.slots = max(slots, 1)
+        self.weights = weights or {INTERACTIVE: WORK_INTERACTIVE_WEIGHT, BACKGROUND: WORK_BACKGROUND_WEIGHT}
+        # Background maksimal memakai slots - reserved_interactive slot
+        self.background_slots = max(self.slots - reserved_interactive, 1)
+        self._cond = threading.Condition()
+        self._queues: Dict[str, Deque[_Ticket]] = {lane: deque() for lane in LANES}
+        self._running: Dict[str, int] = {lane: 0 for lane in LANES}
+        self._last_finish: Dict[str, float] = {lane: 0.0 for lane in LANES}
+        self._virtual_time = 0.0
+        self._waits: Dict[str, Deque[float]] = {lane: deque(maxlen=_WAIT_SAMPLES) for lane in LANES}
+        self._counters: Dict[str, Dict[str, int]] = {
+            lane: {"completed": 0, "queued_total": 0, "timeouts": 0} for lane in LANES
+        }
+
+    def _can_run(self, lane: str) -> bool:
+        if sum(self._running.values()) >= self.slots:
+            return False
+        return lane == INTERACTIVE or self._running[BACKGROUND] < self.background_slots
+
+    def _dispatch(self) -> None:
+        """Beri slot ke tiket dengan finish tag terkecil yang boleh jalan (lock dipegang)"""
+        granted = False
+        while True:
+            heads = [queue[0] for lane, queue in self._queues.items() if queue and self._can_run(lane)]
+            if not heads:
+                break
+            ticket = min(heads, key=lambda head: head.finish)
+            self._queues[ticket.lane].popleft()
+            self._grant(ticket)
+            granted = True
+        if granted:
+            self._cond.notify_all()
+
+    def _grant(self, ticket: _Ticket) -> None:
+        ticket.granted = True
+        self._running[ticket.lane] += 1
+        self._virtual_time = max(self._virtual_time, ticket.finish)
+        self._waits[ticket.lane].append(time.monotonic() - ticket.enqueued_at)
+
+    def acquire(self, lane: Optional[str] = None, timeout: Optional[float] = None) -> str:
+        """
+        Tunggu slot untuk lane (default: lane dari contextvar)
+
+        Returns:
+            Lane yang dipakai (untuk release)
+
+        Raises:
+            SchedulerTimeoutError: slot tidak didapat dalam timeout detik
+        """
+        lane = lane or current_lane()
+        with self._cond:
+            start = max(self._virtual_time, self._last_finish[lane])
+            ticket = _Ticket(lane, start + 1.0 / self.weights[lane])
+            self._last_finish[lane] = ticket.finish
+            if not self._queues[lane] and self._can_run(lane):
+                self._grant(ticket)
+                return lane
+
+            self._queues[lane].append(ticket)
+            self._counters[lane]["queued_total"] += 1
+            # Slot bisa saja kosong tapi dipegang tiket lain dengan finish tag lebih kecil
+            self._dispatch()
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while not ticket.granted:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._queues[lane].remove(ticket)
+                    self._counters[lane]["timeouts"] += 1
+                    self._dispatch()
+                    raise SchedulerTimeoutError(f"{self.name}: no {lane} slot within {timeout:.1f}s")
+                self._cond.wait(remaining)
+            return lane
+
+    def release(self, lane: str) -> None:
+        with self._cond:
+            self._running[lane] -= 1
+            self._counters[lane]["completed"] += 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, lane: Optional[str] = None, timeout: Optional[float] = None) -> Iterator[str]:
+        """`with scheduler.slot():` - jalankan blok setelah mendapat slot"""
+        lane = self.acquire(lane, timeout)
+        try:
+            yield lane
+        finally:
+            self.release(lane)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            lanes = {}
+            for lane in LANES:
+                waits: List[float] = sorted(self._waits[lane])
+                lanes[lane] = {
+                    "weight": self.weights[lane],
+                    "queue_depth": len(self._queues[lane]),
+                    "running": self._running[lane],
+                    **self._counters[lane],
+                    "wait_ms_p50": _percentile_ms(waits, 0.5),
+                    "wait_ms_p95": _percentile_ms(waits, 0.95),
+                    "wait_ms_max": _percentile_ms(waits, 1.0),
+                }
+            return {
+                "slots": self.slots,
+                "background_slots": self.background_slots,
+                "lanes": lanes,
+            }
+
+
+def _percentile_ms(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(fraction * len(sorted_values)), len(sorted_values) - 1)
+    return round(sorted_values[index] * 1000, 1)
+
+
+# Konkurensi panggilan Gemini (chat vs enrichment/analytics)
+gemini_scheduler = WorkScheduler(
+    "gemini",
+    slots=GEMINI_MAX_CONCURRENT_CALLS,
+    reserved_interactive=GEMINI_INTERACTIVE_RESERVED_SLOTS,
+)
+
+# CPU: ekstraksi PDF dan build snapshot analytics
+cpu_scheduler = WorkScheduler(
+    "cpu",
+    slots=EXTRACTION_MAX_CONCURRENT or (os.cpu_count() or 2),
+    reserved_interactive=1,
+)
@@ -0,0 +1,109 @@
+"""
+Benchmark cache jawaban chat: hit ratio, hit yang salah, latency yang dihemat
+
+Memutar ulang log pertanyaan sintetis (beberapa topik, masing-masing dengan
+variasi kalimat) lewat ChatAnswerCache. Jawaban Gemini disimulasikan dengan
+latency tetap (--gemini-ms); tidak ada panggilan API. Versi data diganti setiap
+--version-every request (simulasi upload/import) sehingga cache mulai dari kosong
+lagi. Hit "salah" = pertanyaan dijawab dengan entry dari topik lain (hanya
+mungkin lewat similarity). Pasangan di COLLISIONS (kata sama, kata tanya beda)
+juga dicek: pertanyaan kedua tidak boleh memakai jawaban pertanyaan pertama.
+
+    python benchmarks/bench_chat_answer_cache.py --requests 2000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.chat_answer_cache import ChatAnswerCache  # noqa: E402
+
+# topik -> variasi pertanyaan
+TOPICS = {
+    "visi_misi": ["visi misi HIPMI", "apa visi dan misi hipmi?", "Jelaskan visi & misi HIPMI", "misi dan visi hipmi apa"],
+    "syarat_anggota": ["syarat jadi anggota", "apa syarat menjadi anggota HIPMI?", "syarat-syarat jadi anggota hipmi", "Apa saja syarat jadi anggota?"],
+    "sejarah": ["sejarah HIPMI", "ceritakan sejarah hipmi", "bagaimana sejarah berdirinya HIPMI?"],
+    "motto": ["apa motto hipmi", "motto HIPMI apa?", "Motto HIPMI"],
+    "iuran": ["berapa iuran anggota per tahun?", "iuran anggota hipmi berapa", "besaran iuran tahunan anggota"],
+    "masa_jabatan": ["berapa lama masa jabatan ketua umum?", "masa jabatan ketua umum berapa tahun", "masa bakti ketua umum"],
+    "tugas_sekum": ["apa tugas sekretaris umum?", "tugas sekretaris umum hipmi", "jelaskan tugas sekretaris umum"],
+    "tugas_bendum": ["apa tugas bendahara umum?", "tugas bendahara umum hipmi"],
+    "musda": ["kapan musda berikutnya?", "jadwal musda selanjutnya", "musda berikutnya kapan"],
+    "syarat_pengurus": ["syarat jadi pengurus", "apa syarat menjadi pengurus HIPMI?"],
+    "batas_usia": ["berapa batas usia anggota biasa?", "batas umur anggota biasa hipmi", "usia maksimal anggota biasa"],
+}
+
+# Pertanyaan berbeda yang hanya beda kata tanya/kata depan
+COLLISIONS = [
+    ("Kapan musda HIPMI?", "Apa itu musda HIPMI?"),
+    ("Berapa iuran anggota HIPMI?", "Kapan iuran anggota HIPMI?"),
+    ("Siapa ketua umum HIPMI?", "Kapan ketua umum HIPMI dipilih?"),
+    ("Iuran dari anggota", "Iuran untuk anggota"),
+]
+
+
+def count_collisions(similarity: float) -> int:
+    """Jumlah pasangan COLLISIONS (dua arah) yang salah dijawab dari cache"""
+    collisions = 0
+    for first, second in COLLISIONS:
+        for stored, asked in [(first, second), (second, first)]:
+            cache = ChatAnswerCache(max_entries=16, ttl_seconds=3600, similarity=similarity, enabled=True)
+            cache.put(stored, "v", {"query": stored}, 0.0)
+            if cache.get(asked, "v"):
+                print(f"  collision: {asked!r} dijawab dengan entry {stored!r}")
+                collisions += 1
+    return collisions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--gemini-ms", type=float, default=1500.0)
+    parser.add_argument("--similarity", type=float, default=0.85)
+    parser.add_argument("--max-entries", type=int, default=256)
+    parser.add_argument("--version-every", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    # Beberapa topik jauh lebih sering ditanyakan (distribusi Zipf kasar)
+    topics = list(TOPICS)
+    weights = [1 / (rank + 1) for rank in range(len(topics))]
+
+    for similarity in sorted({0.0, 0.7, args.similarity}):
+        rng.seed(42)
+        cache = ChatAnswerCache(
+            max_entries=args.max_entries, ttl_seconds=3600, similarity=similarity, enabled=True
+        )
+        wrong = 0
+        lookup_ms = 0.0
+        for request in range(args.requests):
+            version = f"v{request // args.version_every}"
+            topic = rng.choices(topics, weights)[0]
+            query = rng.choice(TOPICS[topic])
+            started = time.perf_counter()
+            cached = cache.get(query, version)
+            lookup_ms += (time.perf_counter() - started) * 1000
+            if cached:
+                if cached[0].response["topic"] != topic:
+                    wrong += 1
+            else:
+                cache.put(query, version, {"topic": topic}, args.gemini_ms)
+
+        stats = cache.get_stats()
+        mode = f"similarity>={similarity}" if similarity else "exact only"
+        print(
+            f"{mode:18s} hit ratio {stats['hit_ratio']:.3f} "
+            f"(exact {stats['exact_hits']}, similar {stats['similar_hits']}, salah {wrong}) "
+            f"lookup avg {lookup_ms / args.requests:.3f}ms, "
+            f"Gemini dihemat {stats['latency_saved_ms'] / 1000:.0f}s dari "
+            f"{args.requests * args.gemini_ms / 1000:.0f}s, "
+            f"collision {count_collisions(similarity)}/{len(COLLISIONS) * 2}"
+        )
+
+
+if __name__ == "__main__":
+    main()
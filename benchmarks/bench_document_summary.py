@@ -0,0 +1,84 @@
+"""
+Benchmark ringkasan AI dokumen: cara lama (2 panggilan serial, teks dipotong)
+vs map-reduce (document_summarizer) terhadap fake Gemini server lokal
+
+Dokumen sintetis (~2.500 karakter per halaman) diringkas dengan kedua cara.
+Yang dibandingkan: wall-clock, jumlah panggilan, jumlah level dan bagian teks
+yang benar-benar dikirim ke model (coverage).
+
+    python benchmarks/bench_document_summary.py --pages 5,50,200,500 --latency fixed:0.4
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import DOCUMENT_SUMMARY_CONCURRENCY  # noqa: E402
+from app.services.document_summarizer import summarize_document  # noqa: E402
+from app.services.gemini_service import GeminiService, create_client  # noqa: E402
+from benchmarks.fake_gemini_server import FakeBehavior, FakeGeminiServer  # noqa: E402
+
+PAGE_CHARS = 2500
+
+
+def synthetic_document(pages: int) -> str:
+    paragraphs = []
+    for page in range(pages):
+        text = ""
+        article = page * 3
+        while len(text) < PAGE_CHARS:
+            article += 1
+            text += (
+                f"Pasal {article}. Setiap anggota wajib mematuhi ketentuan organisasi yang diatur "
+                f"dalam peraturan ini, termasuk kewajiban iuran dan tata cara musyawarah. "
+                f"Perubahan ketentuan pasal {article} hanya dapat dilakukan melalui musyawarah.\n\n"
+            )
+        paragraphs.append(text[:PAGE_CHARS])
+    return "".join(paragraphs)
+
+
+def old_summary(gemini: GeminiService, text: str) -> int:
+    """Alur lama process_and_save_document: ringkasan 15.000 karakter + insight 8.000 karakter"""
+    gemini.summarize_text(text[:15000])
+    gemini.summarize_text(f"Analyze this document briefly:\nContent: {text[:8000]}")
+    return 2
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default="5,50,200,500")
+    parser.add_argument("--latency", default="fixed:0.4", help="time-to-first-token fake server")
+    parser.add_argument("--token-rate", type=float, default=100.0)
+    parser.add_argument("--concurrency", type=int, default=DOCUMENT_SUMMARY_CONCURRENCY)
+    args = parser.parse_args()
+
+    server = FakeGeminiServer(behavior=FakeBehavior(latency=args.latency, token_rate=args.token_rate)).start()
+    gemini = GeminiService(api_key="fake", client=create_client("fake", server.base_url))
+    print(f"Fake Gemini latency={args.latency} token_rate={args.token_rate}/s concurrency={args.concurrency}\n")
+    print(f"{'halaman':>8} {'karakter':>10} | {'lama':>8} {'calls':>5} {'cover':>6} | "
+          f"{'map-reduce':>10} {'calls':>5} {'level':>5} {'cover':>6}")
+
+    for pages in [int(value) for value in args.pages.split(",")]:
+        text = synthetic_document(pages)
+
+        started = time.perf_counter()
+        old_calls = old_summary(gemini, text)
+        old_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        result = summarize_document(text, "HIPMI_PO", gemini=gemini, concurrency=args.concurrency)
+        new_seconds = time.perf_counter() - started
+
+        print(
+            f"{pages:>8} {len(text):>10} | {old_seconds:>7.2f}s {old_calls:>5} {min(15000 / len(text), 1):>6.0%} | "
+            f"{new_seconds:>9.2f}s {result.calls:>5} {result.levels:>5} {1:>6.0%}"
+        )
+
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Benchmark app (chat, analytics, GeminiService) terhadap fake Gemini server lokal
+
+Fake server (benchmarks/fake_gemini_server.py) dijalankan di proses ini dan app
+diarahkan ke sana lewat GEMINI_BASE_URL, sehingga seluruh jalur (build context,
+SDK google-genai, HTTP, parsing jawaban) terukur tanpa kuota API dan dengan
+latency yang bisa diulang (--seed). Yang diukur:
+
+1. /api/chat/query (cache jawaban dimatikan): latency end-to-end p50/p95/p99
+2. /api/analytics/members dan /overview: jawaban canned ter-parse (bukan fallback)
+3. GeminiService.answer_question dari N thread: throughput dan latency
+4. Streaming (generate_content_stream): time-to-first-chunk vs total
+
+    python benchmarks/bench_gemini_stub.py --latency "lognormal:0.3,0.5" --token-rate 200
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+PORT = free_port()
+DB_DIR = tempfile.mkdtemp(prefix="kintari-bench-")
+# Harus di-set sebelum app.core.config di-import
+os.environ.update(
+    {
+        "DATABASE_URL": f"sqlite:///{os.path.join(DB_DIR, 'bench.db')}",
+        "UPLOAD_DIR": os.path.join(DB_DIR, "uploads"),
+        "GEMINI_API_KEY": "fake",
+        "GEMINI_BASE_URL": f"http://127.0.0.1:{PORT}/",
+        "CHAT_CACHE_ENABLED": "false",
+        "ANALYTICS_SCHEDULER_ENABLED": "false",
+    }
+)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.services.gemini_service import GeminiService  # noqa: E402
+from benchmarks.fake_gemini_server import FakeBehavior, FakeGeminiServer  # noqa: E402
+
+QUESTIONS = [
+    "apa visi dan misi HIPMI?",
+    "bagaimana sejarah berdirinya HIPMI?",
+    "apa syarat menjadi anggota HIPMI?",
+    "berapa lama masa jabatan ketua umum?",
+    "apa tugas sekretaris umum?",
+    "jelaskan struktur organisasi HIPMI",
+]
+
+CSV_HEADER = (
+    "no,nama,jabatan,status_kta,no_kta,tanggal_lahir,usia,jenis_kelamin,whatsapp,"
+    "email,instagram,nama_perusahaan,jabatan_dlm_akta_perusahaan,"
+    "kategori_bidang_usaha,alamat_perusahaan,perusahaan_berdiri_sejak,"
+    "jmlh_karyawan,website,twitter,facebook,youtube"
+)
+
+
+def members_csv(rows: int) -> bytes:
+    jabatan = ["Ketua Bidang", "Wakil Ketua Bidang", "Anggota"]
+    bidang = ["IT", "Property", "F&B"]
+    lines = [CSV_HEADER] + [
+        f"{i + 1},Pengurus {i},{jabatan[i % 3]},KTA Fisik,KTA-{i:06d},16-03-1990,{25 + i % 20},"
+        f"{'Male' if i % 2 else 'Female'},0812{i:07d},user{i}@mail.com,,PT Usaha {i % 40},Direktur,"
+        f"{bidang[i % 3]},Jl X,2015,{i % 50},,,,"
+        for i in range(rows)
+    ]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def percentiles(samples_ms: list) -> str:
+    ordered = sorted(samples_ms)
+
+    def pick(fraction):
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+    return (
+        f"p50={statistics.median(ordered):7.1f} ms  p95={pick(0.95):7.1f} ms  "
+        f"p99={pick(0.99):7.1f} ms  max={ordered[-1]:7.1f} ms"
+    )
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - started) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", default="lognormal:0.3,0.5", help="distribusi time-to-first-token fake server")
+    parser.add_argument("--token-rate", type=float, default=200.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--chat-requests", type=int, default=30)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--calls", type=int, default=64)
+    args = parser.parse_args()
+
+    server = FakeGeminiServer(
+        PORT,
+        FakeBehavior(latency=args.latency, token_rate=args.token_rate, error_rate=args.error_rate),
+        seed=args.seed,
+    ).start()
+    print(f"Fake Gemini {server.base_url}  latency={args.latency}  token_rate={args.token_rate}/s  seed={args.seed}")
+
+    with TestClient(app) as client:
+        client.post("/api/members/upload-csv", files={"file": ("bench.csv", members_csv(300), "text/csv")})
+
+        samples, errors = [], 0
+        for index in range(args.chat_requests):
+            response, elapsed = timed(
+                lambda: client.post("/api/chat/query", json={"query": QUESTIONS[index % len(QUESTIONS)]}).json()
+            )
+            samples.append(elapsed)
+            errors += str(response.get("response", "")).startswith("Error:")
+        print(f"\n1. chat/query      n={len(samples):<4} {percentiles(samples)}  error={errors}")
+
+        print("\n2. analytics (canned answer ter-parse, bukan fallback statistik)")
+        for path in ("/api/analytics/members", "/api/analytics/overview"):
+            body, elapsed = timed(lambda: client.get(path).json())
+            data = body.get("data", {})
+            ai = data.get("ai_analysis", data)
+            fallback = "error_detail" in ai or "message" in data and "tidak tersedia" in data["message"]
+            print(f"   {path:<26} {elapsed:7.1f} ms  fallback={fallback}  {str(ai.get('summary', ai.get('health_status')))[:50]!r}")
+
+    service = GeminiService()
+    prompts = [f"Pertanyaan benchmark nomor {index}" for index in range(args.calls)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as pool:
+        results = list(pool.map(lambda prompt: timed(lambda: service.answer_question(prompt, "konteks")), prompts))
+    wall = time.perf_counter() - started
+    print(
+        f"\n3. answer_question {args.calls} panggilan / {args.threads} thread: "
+        f"{args.calls / wall:6.1f} call/s  {percentiles([elapsed for _, elapsed in results])}"
+    )
+
+    started = time.perf_counter()
+    first_chunk, chunks = None, 0
+    for _ in service.client.models.generate_content_stream(
+        model=service.model, contents="DATA ANGGOTA:\n- Total: 300 orang"
+    ):
+        chunks += 1
+        first_chunk = first_chunk or (time.perf_counter() - started) * 1000
+    total = (time.perf_counter() - started) * 1000
+    print(f"\n4. streaming: {chunks} chunk, first chunk {first_chunk:.1f} ms, total {total:.1f} ms")
+    print(f"\nFake server: {server.get_stats()}")
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
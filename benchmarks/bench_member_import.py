@@ -0,0 +1,162 @@
+"""
+Benchmark import CSV pengurus: parser per-row vs parser kolumnar (pandas)
+
+Membuat CSV sintetis, lalu mengukur (1) parsing + normalisasi + delta statistik
+saja, tanpa database, dan (2) import penuh ke database SQLite sementara, untuk
+setiap parser.
+
+    python benchmarks/bench_member_import.py --rows 200000
+"""
+
+from collections import Counter
+import argparse
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+DB_DIR = tempfile.mkdtemp(prefix="kintari-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'bench.db')}"
+os.environ.setdefault("UPLOAD_DIR", os.path.join(DB_DIR, "uploads"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import Member  # noqa: E402
+from app.services import member_import_columnar  # noqa: E402
+from app.services.member_aggregation import (  # noqa: E402
+    accumulate_member_contributions,
+    rebuild_member_aggregates,
+)
+from app.services.member_import import _ImportRun, import_members_csv  # noqa: E402
+
+HEADER = (
+    "no,nama,jabatan,status_kta,no_kta,tanggal_lahir,usia,jenis_kelamin,whatsapp,"
+    "email,instagram,nama_perusahaan,jabatan_dlm_akta_perusahaan,"
+    "kategori_bidang_usaha,alamat_perusahaan,perusahaan_berdiri_sejak,"
+    "jmlh_karyawan,website,twitter,facebook,youtube"
+)
+JABATAN = ["Ketum", "WKU", "Sekum", "Bendum", "Ketua Bidang", "Anggota", ""]
+BIDANG = ["IT", "Property", "F&B", "Fashion", "Industri Kreatif", ""]
+STATUS_KTA = ["KTA Fisik", "KTA HIPMI NET", "Hilang", ""]
+
+
+def generate_csv(rows: int, seed: int = 42) -> bytes:
+    rng = random.Random(seed)
+    lines = [HEADER]
+    for i in range(rows):
+        lines.append(
+            ",".join(
+                [
+                    str(i + 1),
+                    f" Pengurus {i} ",
+                    rng.choice(JABATAN),
+                    rng.choice(STATUS_KTA),
+                    f"KTA-{i:07d}" if rng.random() < 0.8 else "",
+                    f"{rng.randint(1, 28)}-{rng.randint(1, 12)}-{rng.randint(1970, 2003)}",
+                    str(rng.randint(20, 55)),
+                    rng.choice(["Male", "Female", ""]),
+                    f"0812-{i:04d} {rng.randint(100, 999)}",
+                    f"User{i}@Mail.com",
+                    f"@user{i}",
+                    rng.choice(["PT Maju", "CV Jaya", f"PT Usaha {i % 700}", ""]),
+                    "Direktur",
+                    rng.choice(BIDANG),
+                    "Jl. Merdeka No. 1",
+                    str(rng.randint(2000, 2023)),
+                    str(rng.randint(0, 500)),
+                    "",
+                    "",
+                    "",
+                    "",
+                ]
+            )
+        )
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def reset(db) -> None:
+    """Kosongkan tabel + VACUUM supaya setiap parser mulai dari file database yang sama"""
+    db.query(Member).delete()
+    rebuild_member_aggregates(db)
+    db.commit()
+    with engine.connect() as connection:
+        connection.exec_driver_sql("VACUUM")
+
+
+def parse_rows(data: bytes) -> int:
+    run = _ImportRun(None, "bench", "append")
+    deltas: Counter = Counter()
+    count = 0
+    for _, values in run.iter_valid_rows(io.BytesIO(data)):
+        accumulate_member_contributions(deltas, values)
+        count += 1
+    return count
+
+
+def parse_columnar(data: bytes) -> int:
+    run = _ImportRun(None, "bench", "append")
+    count = 0
+    for raw in member_import_columnar.read_csv_frames(io.BytesIO(data)):
+        frame = member_import_columnar.normalize_frame(raw, run)
+        member_import_columnar.frame_member_contributions(frame)
+        count += len(frame)
+    return count
+
+
+def report(name: str, rows: int, elapsed: float) -> None:
+    print(f"{name:<18} {rows:>9} rows  {elapsed:7.2f}s  {rows / elapsed:>10,.0f} rows/s")
+
+
+def timed(name: str, parse, data: bytes) -> None:
+    started = time.perf_counter()
+    rows = parse(data)
+    report(name, rows, time.perf_counter() - started)
+
+
+def run(name, importer, data: bytes, batch_size: int) -> None:
+    db = SessionLocal()
+    try:
+        reset(db)
+        started = time.perf_counter()
+        result = importer(db, io.BytesIO(data), batch_size=batch_size)
+        report(name, result["imported"], time.perf_counter() - started)
+    finally:
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    data = generate_csv(args.rows)
+    print(f"CSV: {args.rows} rows, {len(data) / 1_000_000:.1f} MB, db: {DB_DIR}")
+
+    default_engine = member_import_columnar.CSV_ENGINE
+    engines = ["c"] + (["pyarrow"] if default_engine == "pyarrow" else [])
+
+    print("\nParse + normalisasi + delta statistik (tanpa database)")
+    timed("rows", parse_rows, data)
+    for csv_engine in engines:
+        member_import_columnar.CSV_ENGINE = csv_engine
+        timed(f"columnar:{csv_engine}", parse_columnar, data)
+
+    print("\nImport penuh ke SQLite")
+    run("rows", import_members_csv, data, args.batch_size)
+    for csv_engine in engines:
+        member_import_columnar.CSV_ENGINE = csv_engine
+        run(
+            f"columnar:{csv_engine}",
+            member_import_columnar.import_members_csv_columnar,
+            data,
+            args.batch_size,
+        )
+    member_import_columnar.CSV_ENGINE = default_engine
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark pencarian nama pengurus: index trigram vs LIKE '%nama%'
+
+Membuat nama sintetis, membangun index trigram, lalu mencari nama dengan satu
+salah ketik (huruf diganti/dihapus) dan mengukur latency + recall@5. Sebagai
+pembanding diukur juga LIKE '%nama%' (full scan) dengan nama yang benar.
+
+    python benchmarks/bench_member_name_search.py --rows 50000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+DB_DIR = tempfile.mkdtemp(prefix="kintari-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'bench.db')}"
+os.environ.setdefault("UPLOAD_DIR", os.path.join(DB_DIR, "uploads"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func  # noqa: E402
+from app.core.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import Member  # noqa: E402
+from app.services.member_name_search import (  # noqa: E402
+    refresh_member_name_index,
+    search_member_names,
+)
+
+SYLLABLES = [
+    "ma", "mu", "ha", "ri", "di", "an", "to", "so", "wi", "ja", "ya", "pra",
+    "ta", "sa", "pu", "tra", "hi", "da", "yat", "nu", "gro", "ku", "su", "la",
+    "ra", "hman", "se", "tia", "wan", "lu", "bis", "re", "gar", "har", "tan",
+    "jung", "gu", "na", "lim", "dwi", "tri", "fa", "jar", "in", "dah", "yu",
+    "ka", "rno", "ko", "ba", "ci", "ndra", "zki", "mad",
+]
+
+
+def generate_names(rows: int, rng: random.Random) -> list:
+    def word() -> str:
+        return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+
+    return [
+        " ".join(word() for _ in range(rng.choice([2, 2, 3]))) for _ in range(rows)
+    ]
+
+
+def with_typo(name: str, rng: random.Random) -> str:
+    chars = list(name)
+    position = rng.randrange(len(chars))
+    if chars[position] != " ":
+        chars[position] = rng.choice("aiueo") if rng.random() < 0.5 else ""
+    return "".join(chars)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    Base.metadata.create_all(bind=engine)
+    names = generate_names(args.rows, rng)
+
+    db = SessionLocal()
+    try:
+        db.execute(Member.__table__.insert(), [{"name": name} for name in names])
+        db.commit()
+
+        started = time.perf_counter()
+        refresh_member_name_index(db)
+        print(f"Index {args.rows} nama: {time.perf_counter() - started:.2f}s (db: {DB_DIR})")
+
+        sample = rng.sample(range(args.rows), min(args.queries, args.rows))
+        hits = 0
+        elapsed = 0.0
+        for position in sample:
+            query = with_typo(names[position], rng)
+            started = time.perf_counter()
+            matches = search_member_names(db, query)
+            elapsed += time.perf_counter() - started
+            hits += any(match.member_id == position + 1 for match in matches)
+        print(
+            f"trigram (1 typo)   avg {elapsed / len(sample) * 1000:7.2f}ms  "
+            f"recall@5 {hits / len(sample):.2f}"
+        )
+
+        elapsed = 0.0
+        for position in sample[:20]:
+            pattern = f"%{names[position].lower()}%"
+            started = time.perf_counter()
+            db.query(Member).filter(func.lower(Member.name).like(pattern)).first()
+            elapsed += time.perf_counter() - started
+        print(f"LIKE '%nama%'      avg {elapsed / min(20, len(sample)) * 1000:7.2f}ms")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark overhead instrumentation: latency request tanpa instrumentation,
+dengan MetricsMiddleware + event SQLAlchemy (/metrics), dan ditambah
+SQLProfilerMiddleware (profil SQL per request, N+1)
+
+App FastAPI kecil dengan dua endpoint: /ping (tanpa DB) dan /query (--queries
+SELECT ringan ke SQLite in-memory). Request dikirim lewat httpx ASGITransport
+(tanpa jaringan) supaya overhead middleware tidak tertutup noise socket.
+
+    python benchmarks/bench_metrics_overhead.py --requests 3000 --queries 5
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.core.metrics import MetricsMiddleware, instrument_engine, registry  # noqa: E402
+from app.core.sql_profiler import SQLProfilerMiddleware, install_sql_profiler  # noqa: E402
+
+
+def build_app(instrumented: bool, queries: int, profiled: bool = False) -> FastAPI:
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    if instrumented:
+        instrument_engine(engine)
+    if profiled:
+        install_sql_profiler(engine)
+    app = FastAPI()
+
+    @app.get("/ping")
+    def ping():
+        return {"ok": True}
+
+    @app.get("/query/{item_id}")
+    def query(item_id: int):
+        with engine.connect() as conn:
+            return {"rows": [conn.execute(text("SELECT :id + 1"), {"id": item_id}).scalar() for _ in range(queries)]}
+
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+    if profiled:
+        app.add_middleware(SQLProfilerMiddleware)
+    return app
+
+
+async def measure(app: FastAPI, path: str, requests: int) -> list:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(50):  # warm-up
+            await client.get(path)
+        latencies = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            await client.get(path)
+            latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--queries", type=int, default=5, help="SELECT per request /query")
+    args = parser.parse_args()
+
+    apps = {
+        "plain": build_app(False, args.queries),
+        "metrics": build_app(True, args.queries),
+        "profiler": build_app(True, args.queries, profiled=True),
+    }
+    for path in ("/ping", "/query/7"):
+        results = {}
+        for name, app in apps.items():
+            latencies = asyncio.run(measure(app, path, args.requests))
+            results[name] = statistics.median(latencies) * 1e6
+            print(f"{path:<9} {name:>8} | p50 {results[name]:>7.1f} us  mean {statistics.mean(latencies) * 1e6:>7.1f} us")
+        print(
+            f"{path:<9} overhead p50 metrics {results['metrics'] - results['plain']:+.1f} us, "
+            f"metrics+profiler {results['profiler'] - results['plain']:+.1f} us\n"
+        )
+
+    started = time.perf_counter()
+    body = registry.render()
+    print(f"render /metrics: {len(body.splitlines())} baris, {(time.perf_counter() - started) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
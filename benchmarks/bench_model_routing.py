@@ -0,0 +1,94 @@
+"""
+Benchmark routing model: semua panggilan ke model utama vs policy model_router
+
+Workload campuran seperti dashboard + chat: overview analytics (JSON satu
+baris), analytics pengurus, chat pendek (context kecil), chat panjang (context
+~25k karakter) dan ringkasan teks pendek. Fake Gemini server memberi latency
+berbeda per model (--default-latency / --light-latency) + waktu proses prompt.
+Biaya dihitung dari GEMINI_MODEL_PRICES dan token usage_metadata.
+
+    python benchmarks/bench_model_routing.py --rounds 5
+"""
+
+import argparse
+import itertools
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import GEMINI_LIGHT_MODEL, GEMINI_MODEL, GEMINI_MODEL_ROUTES  # noqa: E402
+from app.services import model_router  # noqa: E402
+from app.services.gemini_service import GeminiService, create_client  # noqa: E402
+from app.services.gemini_telemetry import gemini_telemetry  # noqa: E402
+from benchmarks.bench_token_budget import synthetic_context  # noqa: E402
+from benchmarks.fake_gemini_server import FakeBehavior, FakeGeminiServer  # noqa: E402
+
+_counter = itertools.count()
+
+AGGREGATES = {
+    "total_pengurus": 1200,
+    "by_jabatan": {"Anggota": 800, "Ketua Bidang": 120, "WKU": 40, "Bendahara": 12},
+    "by_bidang_usaha": {"IT": 300, "Property": 200, "F&B": 150},
+    "by_gender": {"Male": 700, "Female": 500},
+}
+
+
+def workload(gemini: GeminiService, short_context: str, long_context: str) -> None:
+    # Angka unik supaya tidak digabung single flight antar ronde
+    n = next(_counter)
+    gemini.analyze_overview(1200 + n, 40)
+    gemini.analyze_members_data({**AGGREGATES, "total_pengurus": 1200 + n})
+    gemini.answer_question(f"Siapa ketua umum? #{n}", short_context)
+    gemini.answer_question(f"Apa isi PO tentang iuran? #{n}", long_context)
+    gemini.summarize_text(f"Rapat pengurus #{n} membahas program kerja dan iuran anggota. " * 5)
+
+
+def run(name: str, gemini: GeminiService, rounds: int, short_context: str, long_context: str) -> None:
+    gemini_telemetry.reset()
+    for _ in range(rounds):
+        workload(gemini, short_context, long_context)
+    stats = gemini_telemetry.get_stats()
+    total_ms = sum(caller["latency_ms"]["sum"] for caller in stats["callers"].values())
+    total_cost = sum(route["cost_usd"] for route in stats["routes"].values())
+    calls = sum(route["calls"] for route in stats["routes"].values())
+    print(f"\n{name}: {calls} panggilan, total latency {total_ms / 1000:.1f} s, biaya ${total_cost:.6f}")
+    for key, route in stats["routes"].items():
+        print(
+            f"  {key:<42} {route['calls']:>3} calls  mean {route['latency_ms']['mean']:>6.0f} ms  "
+            f"${route['cost_usd_per_call'] * 1000:.4f}/1k calls  {route['reasons']}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--default-latency", default="fixed:0.6")
+    parser.add_argument("--light-latency", default="fixed:0.25")
+    parser.add_argument("--prompt-token-rate", type=float, default=20000.0)
+    args = parser.parse_args()
+
+    server = FakeGeminiServer(
+        behavior=FakeBehavior(
+            latency=args.default_latency,
+            model_latency={GEMINI_LIGHT_MODEL: args.light_latency},
+            prompt_token_rate=args.prompt_token_rate,
+        )
+    ).start()
+    gemini = GeminiService(api_key="fake", client=create_client("fake", server.base_url))
+    short_context = synthetic_context(0)
+    long_context = synthetic_context(10)
+    print(
+        f"Fake Gemini {GEMINI_MODEL}={args.default_latency}, {GEMINI_LIGHT_MODEL}={args.light_latency}, "
+        f"prompt {args.prompt_token_rate}/s, {args.rounds} ronde"
+    )
+
+    GEMINI_MODEL_ROUTES.update({caller: model_router.TIER_DEFAULT for caller in model_router.DEFAULT_TIERS})
+    run("semua model utama", gemini, args.rounds, short_context, long_context)
+    GEMINI_MODEL_ROUTES.clear()
+    run("model_router", gemini, args.rounds, short_context, long_context)
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
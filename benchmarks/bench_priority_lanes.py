@@ -0,0 +1,114 @@
+"""
+Benchmark lane prioritas: latency chat saat backfill enrichment berjalan
+
+Fake Gemini server dengan kapasitas terbatas (--provider-concurrency request
+bersamaan, sisanya antri di provider). Beban background: --background-threads
+thread yang terus memanggil Gemini di lane background (seperti enrichment
+map-reduce). Interactive: panggilan chat berurutan, latency-nya diukur.
+
+Skenario:
+- idle        : tanpa beban background
+- no-lanes    : beban background, semua panggilan langsung ke provider
+- lanes       : beban background lewat gemini_scheduler (WFQ + slot cadangan)
+
+    python benchmarks/bench_priority_lanes.py --latency fixed:0.3 --chat-calls 30
+"""
+
+import argparse
+import itertools
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import GEMINI_INTERACTIVE_RESERVED_SLOTS, GEMINI_MAX_CONCURRENT_CALLS  # noqa: E402
+from app.services import gemini_service  # noqa: E402
+from app.services.gemini_service import GeminiService, create_client  # noqa: E402
+from app.services.work_scheduler import BACKGROUND, WorkScheduler, work_lane  # noqa: E402
+from benchmarks.fake_gemini_server import FakeBehavior, FakeGeminiServer  # noqa: E402
+
+_counter = itertools.count()
+
+
+def background_load(gemini: GeminiService, stop: threading.Event) -> None:
+    with work_lane(BACKGROUND):
+        while not stop.is_set():
+            gemini.summarize_text(f"Bagian dokumen {next(_counter)}. Setiap anggota wajib hadir.")
+
+
+def measure_chat(gemini: GeminiService, calls: int, gap: float) -> list:
+    latencies = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        gemini.summarize_text(f"PERTANYAAN: berapa jumlah pengurus? #{next(_counter)}")
+        latencies.append(time.perf_counter() - started)
+        time.sleep(gap)
+    return latencies
+
+
+def run(name: str, gemini: GeminiService, scheduler: WorkScheduler, args) -> None:
+    gemini_service.gemini_scheduler = scheduler
+    stop = threading.Event()
+    threads = []
+    if name != "idle":
+        threads = [
+            threading.Thread(target=background_load, args=(gemini, stop), daemon=True)
+            for _ in range(args.background_threads)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(1.0)  # antrian background terisi dulu
+    started = time.perf_counter()
+    latencies = sorted(measure_chat(gemini, args.chat_calls, args.gap))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    p95 = latencies[min(int(0.95 * len(latencies)), len(latencies) - 1)]
+    lanes = scheduler.get_stats()["lanes"]
+    print(
+        f"{name:>9} | chat p50 {statistics.median(latencies) * 1000:>6.0f} ms  p95 {p95 * 1000:>6.0f} ms | "
+        f"background {lanes['background']['completed'] / elapsed:>5.1f}/s, wait p95 "
+        f"interactive {lanes['interactive']['wait_ms_p95']:>6.0f} ms / background {lanes['background']['wait_ms_p95']:>6.0f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", default="fixed:0.3")
+    parser.add_argument("--provider-concurrency", type=int, default=8)
+    parser.add_argument("--background-threads", type=int, default=16)
+    parser.add_argument("--chat-calls", type=int, default=30)
+    parser.add_argument("--gap", type=float, default=0.1, help="jeda antar panggilan chat (detik)")
+    args = parser.parse_args()
+
+    server = FakeGeminiServer(
+        behavior=FakeBehavior(latency=args.latency, max_concurrent=args.provider_concurrency)
+    ).start()
+    gemini = GeminiService(api_key="fake", client=create_client("fake", server.base_url))
+    print(
+        f"Fake Gemini latency={args.latency} provider_concurrency={args.provider_concurrency} "
+        f"background_threads={args.background_threads} slots={GEMINI_MAX_CONCURRENT_CALLS} "
+        f"(reserved interactive {GEMINI_INTERACTIVE_RESERVED_SLOTS})\n"
+    )
+
+    unlimited = lambda: WorkScheduler("unlimited", slots=10_000)  # noqa: E731
+    run("idle", gemini, unlimited(), args)
+    run("no-lanes", gemini, unlimited(), args)
+    run(
+        "lanes",
+        gemini,
+        WorkScheduler(
+            "gemini", slots=GEMINI_MAX_CONCURRENT_CALLS, reserved_interactive=GEMINI_INTERACTIVE_RESERVED_SLOTS
+        ),
+        args,
+    )
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
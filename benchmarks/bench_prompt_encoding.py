@@ -0,0 +1,96 @@
+"""
+Benchmark encoding daftar pengurus di prompt chat: format lama vs tabel ringkas
+
+Format lama: "- Nama (Jabatan: X), Perusahaan: Y, Bidang: Z" per pengurus.
+Format baru: app/services/prompt_encoding.encode_members (header + delimiter +
+kode untuk jabatan/bidang yang berulang).
+
+Token dihitung dengan estimate_tokens (potongan kata/angka/tanda baca), karena
+tokenizer Gemini tidak tersedia offline; angka absolutnya perkiraan, rasionya
+yang dibandingkan.
+
+    python benchmarks/bench_prompt_encoding.py --rows 50
+"""
+
+import argparse
+import os
+import random
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.prompt_encoding import encode_members, estimate_tokens  # noqa: E402
+
+FIRST = ["Muhammad", "Ahmad", "Budi", "Siti", "Dewi", "Rizky", "Andi", "Putri", "Fajar", "Indah", "Yusuf", "Rangga"]
+LAST = ["Santoso", "Pratama", "Hidayat", "Wijaya", "Saputra", "Kusuma", "Ramadhan", "Nugroho", "Lestari", "Hasan"]
+JABATAN = (
+    ["Ketua Umum", "Sekretaris Umum", "Bendahara Umum"]
+    + [f"Wakil Ketua Umum {i}" for i in range(1, 6)]
+    + [f"Ketua Bidang {i}" for i in range(1, 11)]
+    + ["Wakil Ketua Bidang"] * 8
+    + ["Anggota"] * 20
+)
+BIDANG = ["IT", "Property", "F&B", "Fashion", "Industri Kreatif", "Konstruksi", "Perdagangan", "Jasa Keuangan", None]
+BADAN = ["PT", "CV"]
+WORDS = ["Maju", "Jaya", "Sejahtera", "Abadi", "Nusantara", "Mandiri", "Prima", "Karya", "Sentosa", "Digital"]
+
+
+def generate_members(rows: int, rng: random.Random) -> list:
+    return [
+        SimpleNamespace(
+            name=f"{rng.choice(FIRST)} {rng.choice(LAST)}",
+            jabatan=rng.choice(JABATAN),
+            nama_perusahaan=(
+                f"{rng.choice(BADAN)} {rng.choice(WORDS)} {rng.choice(WORDS)}" if rng.random() < 0.8 else None
+            ),
+            kategori_bidang_usaha=rng.choice(BIDANG),
+        )
+        for _ in range(rows)
+    ]
+
+
+def legacy_format(members: list) -> str:
+    lines = []
+    for m in members:
+        line = f"- {m.name}"
+        if m.jabatan:
+            line += f" (Jabatan: {m.jabatan})"
+        if m.nama_perusahaan:
+            line += f", Perusahaan: {m.nama_perusahaan}"
+        if m.kategori_bidang_usaha:
+            line += f", Bidang: {m.kategori_bidang_usaha}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    pool = generate_members(args.rows * 10, rng)
+    members = pool[: args.rows]
+
+    legacy = legacy_format(members)
+    compact = encode_members(members)
+    legacy_tokens, compact_tokens = estimate_tokens(legacy), estimate_tokens(compact)
+    print(f"{args.rows} pengurus")
+    print(f"  lama    {len(legacy):6d} chars  ~{legacy_tokens:5d} token")
+    print(f"  ringkas {len(compact):6d} chars  ~{compact_tokens:5d} token")
+    print(f"  hemat   {1 - len(compact) / len(legacy):6.1%} chars  {1 - compact_tokens / legacy_tokens:6.1%} token")
+
+    # Berapa pengurus muat di budget token yang sama dengan format lama
+    low, high = args.rows, len(pool)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(encode_members(pool[:middle])) <= legacy_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    print(f"  budget ~{legacy_tokens} token: {args.rows} pengurus (lama) -> {low} pengurus (ringkas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark budget token chat: ukuran prompt, token (usage_metadata) dan latency
+per budget, terhadap fake Gemini server yang memproses prompt --prompt-token-rate
+token/detik
+
+Context chat sintetis seperti build_ai_context: statistik pengurus lalu isi
+beberapa dokumen (dipisah "---"). Untuk setiap budget, pertanyaan yang sama
+dikirim --calls kali; telemetry mencatat token dan latency per panggilan.
+
+    python benchmarks/bench_token_budget.py --budgets 0,8000,4000,2000
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import config  # noqa: E402
+from app.services.gemini_service import GeminiService, create_client  # noqa: E402
+from app.services.gemini_telemetry import CALLER_CHAT, gemini_telemetry  # noqa: E402
+from benchmarks.bench_document_summary import synthetic_document  # noqa: E402
+from benchmarks.fake_gemini_server import FakeBehavior, FakeGeminiServer  # noqa: E402
+
+
+def synthetic_context(documents: int) -> str:
+    stats = (
+        "=== DATA PENGURUS HIPMI ===\n\nSTATISTIK PENGURUS:\n- Total Pengurus: 1200\n"
+        "- Distribusi Jabatan: Anggota=800, Ketua Bidang=120, WKU=40\n"
+    )
+    parts = [stats] + [f"[Peraturan Organisasi (PO{index}): po{index}.pdf]\n{synthetic_document(2)[:3000]}\n" for index in range(documents)]
+    return "\n\n---\n\n".join(parts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budgets", default="0,8000,4000,2000")
+    parser.add_argument("--documents", type=int, default=10)
+    parser.add_argument("--calls", type=int, default=5)
+    parser.add_argument("--latency", default="fixed:0.2")
+    parser.add_argument("--prompt-token-rate", type=float, default=20000.0)
+    args = parser.parse_args()
+
+    server = FakeGeminiServer(
+        behavior=FakeBehavior(latency=args.latency, prompt_token_rate=args.prompt_token_rate)
+    ).start()
+    gemini = GeminiService(api_key="fake", client=create_client("fake", server.base_url))
+    context = synthetic_context(args.documents)
+    print(
+        f"Fake Gemini latency={args.latency} prompt_token_rate={args.prompt_token_rate}/s, "
+        f"context {len(context)} karakter\n"
+    )
+    print(f"{'budget':>7} | {'prompt tokens':>13} {'jawaban':>8} | {'latency mean':>12} {'p95 (bucket)':>12} | shrinks")
+
+    for budget in [int(value) for value in args.budgets.split(",")]:
+        config.GEMINI_TOKEN_BUDGETS[CALLER_CHAT] = budget
+        gemini_telemetry.reset()
+        for index in range(args.calls):
+            # Pertanyaan berbeda supaya tidak digabung single flight
+            gemini.answer_question(f"Apa isi PO tentang iuran? #{budget}-{index}", context)
+        stats = gemini_telemetry.get_stats()["callers"][CALLER_CHAT]
+        print(
+            f"{budget or '-':>7} | {stats['prompt_tokens'] / stats['calls']:>13.0f} "
+            f"{stats['response_tokens'] / stats['calls']:>8.0f} | "
+            f"{stats['latency_ms']['mean']:>9.0f} ms {stats['latency_ms']['p95']:>9.0f} ms | {stats['budget_shrinks']}"
+        )
+
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Cek endpoint analytics saat Gemini lambat: event loop tidak tertahan dan request
+yang bersamaan digabung single flight
+
+Menjalankan app lewat uvicorn sungguhan (thread) dengan database SQLite sementara,
+scheduler analytics mati (setiap request = cache miss) dan Gemini diarahkan ke
+fake server lokal dengan latency tetap. N request /api/analytics/members dikirim
+bersamaan, lalu /health di tengahnya. Exit code 1 jika /health menunggu Gemini
+atau tidak ada panggilan yang digabung (coalesced == 0).
+
+    python benchmarks/check_analytics_concurrency.py --latency 2 --concurrency 3
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_gemini_server import FakeBehavior, FakeGeminiServer  # noqa: E402
+
+MEMBERS_CSV = "\n".join(
+    ["no,nama,jabatan,status_kta,jenis_kelamin,usia,nama_perusahaan,kategori_bidang_usaha"]
+    + [
+        f"{i},Pengurus {i},{'Ketua Bidang' if i % 5 == 0 else 'Anggota'},KTA Fisik,"
+        f"{'Male' if i % 2 else 'Female'},{25 + i % 20},PT {i % 7},{'IT' if i % 3 else 'Property'}"
+        for i in range(1, 61)
+    ]
+) + "\n"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get(url: str) -> tuple:
+    started = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=120) as response:
+        body = json.loads(response.read())
+    return body, time.perf_counter() - started
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=2.0, help="latency fake Gemini (detik)")
+    parser.add_argument("--concurrency", type=int, default=3)
+    args = parser.parse_args()
+
+    gemini = FakeGeminiServer(behavior=FakeBehavior(latency=f"fixed:{args.latency}")).start()
+    workdir = tempfile.mkdtemp(prefix="kintari-check-")
+    # Harus di-set sebelum app.core.config di-import
+    os.environ.update(
+        {
+            "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'check.db')}",
+            "UPLOAD_DIR": os.path.join(workdir, "uploads"),
+            "GEMINI_API_KEY": "fake",
+            "GEMINI_BASE_URL": gemini.base_url,
+            "ANALYTICS_SCHEDULER_ENABLED": "false",
+            "AI_ENRICHMENT_ENABLED": "false",
+        }
+    )
+
+    import io
+    import uvicorn
+    from app.core.database import SessionLocal
+    from app.main import app
+    from app.services.gemini_service import gemini_single_flight
+    from app.services.member_import import import_members_csv
+
+    db = SessionLocal()
+    import_members_csv(db, io.BytesIO(MEMBERS_CSV.encode()), filename="check.csv")
+    db.close()
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    base = f"http://127.0.0.1:{port}"
+
+    before = gemini_single_flight.get_stats()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        analytics = [pool.submit(get, f"{base}/api/analytics/members") for _ in range(args.concurrency)]
+        time.sleep(min(0.3, args.latency / 4))
+        _, health_seconds = get(f"{base}/health")
+        results = [future.result() for future in analytics]
+    after = gemini_single_flight.get_stats()
+
+    executed = after["executed"] - before["executed"]
+    coalesced = after["coalesced"] - before["coalesced"]
+    slowest = max(seconds for _, seconds in results)
+    health_ok = health_seconds < args.latency / 2
+    coalesced_ok = coalesced > 0
+    statuses = {body["status"] for body, _ in results}
+
+    print(f"{'✅' if health_ok else '❌'} /health selama analytics berjalan: {health_seconds * 1000:.0f} ms")
+    print(
+        f"{'✅' if coalesced_ok else '❌'} single flight: executed={executed} coalesced={coalesced} "
+        f"({args.concurrency} request bersamaan, paling lambat {slowest:.2f}s, status {sorted(statuses)})"
+    )
+
+    server.should_exit = True
+    gemini.stop()
+    return 0 if health_ok and coalesced_ok and statuses == {"success"} else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
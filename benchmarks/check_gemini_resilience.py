@@ -0,0 +1,107 @@
+"""
+Harness resilience GeminiService terhadap fake Gemini server lokal
+
+Menjalankan skenario latency/error lewat GeminiService dan HTTP sungguhan
+(google-genai -> benchmarks/fake_gemini_server.py), lalu mencetak hasil, durasi
+dan jumlah percobaan per skenario. Timeout/retry/breaker di-set kecil lewat
+environment supaya harness selesai dalam beberapa detik. Exit code 1 jika ada
+skenario yang tidak sesuai harapan.
+
+    python benchmarks/check_gemini_resilience.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Harus di-set sebelum app.core.config di-import
+os.environ.update(
+    {
+        "GEMINI_TIMEOUT_SECONDS": "1",
+        "GEMINI_DEADLINE_SECONDS": "3",
+        "GEMINI_MAX_RETRIES": "2",
+        "GEMINI_RETRY_BASE_SECONDS": "0.05",
+        "GEMINI_RETRY_MAX_SECONDS": "0.2",
+        "GEMINI_BREAKER_FAILURE_THRESHOLD": "3",
+        "GEMINI_BREAKER_RESET_SECONDS": "1",
+    }
+)
+
+from app.services.gemini_resilience import gemini_caller, request_deadline  # noqa: E402
+from app.services.gemini_service import GeminiService, create_client, is_ai_error  # noqa: E402
+from benchmarks.fake_gemini_server import FakeBehavior, FakeGeminiServer  # noqa: E402
+
+AGGREGATES = {
+    "total_pengurus": 120,
+    "by_jabatan": {"Ketua Bidang": 20, "Anggota": 100},
+    "by_bidang_usaha": {"IT": 40, "Property": 80},
+    "by_gender": {"Male": 70, "Female": 50},
+}
+
+
+def run(server, service, name, behavior, call, expect):
+    server.behavior = behavior
+    before = gemini_caller.get_stats()
+    requests_before = server.stats["requests"]
+    started = time.perf_counter()
+    result = call(service)
+    elapsed = (time.perf_counter() - started) * 1000
+    after = gemini_caller.get_stats()
+    ok = expect(result, elapsed)
+    print(
+        f"{'✅' if ok else '❌'} {name:<34} {elapsed:8.0f} ms  "
+        f"attempts={after['attempts'] - before['attempts']}  "
+        f"http={server.stats['requests'] - requests_before}  "
+        f"breaker={after['circuit_breaker']['state']:<9}  {str(result)[:60]!r}"
+    )
+    return ok
+
+
+def main() -> int:
+    server = FakeGeminiServer().start()
+    service = GeminiService(api_key="fake", client=create_client("fake", server.base_url))
+
+    def summarize(text):
+        return lambda s: s.summarize_text(text)
+
+    def answer_within(seconds):
+        def call(s):
+            with request_deadline(seconds):
+                return s.answer_question("apa visi HIPMI?", "konteks")
+        return call
+
+    ok = True
+    ok &= run(server, service, "sehat (50 ms)", FakeBehavior(latency="fixed:0.05"), summarize("a"),
+              lambda r, ms: not is_ai_error(r))
+    ok &= run(server, service, "2x 503 lalu pulih (retry)", FakeBehavior(fail_next=2), summarize("b"),
+              lambda r, ms: not is_ai_error(r))
+    ok &= run(server, service, "429 sekali (retry)", FakeBehavior(fail_next=1, error_status=429), summarize("c"),
+              lambda r, ms: not is_ai_error(r))
+    ok &= run(server, service, "400 (tidak di-retry)", FakeBehavior(fail_next=1, error_status=400), summarize("d"),
+              lambda r, ms: r.startswith("Error:"))
+    ok &= run(server, service, "lambat 5 s, deadline default 3 s", FakeBehavior(latency="fixed:5"), summarize("e"),
+              lambda r, ms: r.startswith("Error:") and ms < 3500)
+    gemini_caller.breaker.reset()
+    ok &= run(server, service, "lambat 5 s, deadline request 0.5 s", FakeBehavior(latency="fixed:5"), answer_within(0.5),
+              lambda r, ms: r.startswith("Error:") and ms < 800)
+    gemini_caller.breaker.reset()
+    ok &= run(server, service, "outage 503 (breaker terbuka)", FakeBehavior(error_rate=1.0), summarize("f"),
+              lambda r, ms: r.startswith("Error:"))
+    ok &= run(server, service, "outage, breaker open (fail fast)", FakeBehavior(error_rate=1.0), summarize("g"),
+              lambda r, ms: "circuit breaker" in r and ms < 50)
+    ok &= run(server, service, "analytics fallback statistik", FakeBehavior(error_rate=1.0),
+              lambda s: s.analyze_members_data(AGGREGATES),
+              lambda r, ms: "error_detail" in r and r["total_members"] == 120 and ms < 50)
+    time.sleep(gemini_caller.breaker.reset_seconds + 0.1)
+    ok &= run(server, service, "pulih: probe half-open", FakeBehavior(), summarize("h"),
+              lambda r, ms: not is_ai_error(r) and gemini_caller.breaker.get_stats()["state"] == "closed")
+
+    print(gemini_caller.get_stats())
+    server.stop()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Evaluasi intent router chat: akurasi routing + latency
+
+Setiap kasus di chat_intent_corpus.json berisi pertanyaan dan intent yang
+diharapkan (null = tidak ada intent, pertanyaan diteruskan ke AI). Router diuji
+dengan gazetteer tetap dari corpus, tanpa database.
+
+    python benchmarks/eval_chat_intent_router.py
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.chat_intent_router import IntentRouter  # noqa: E402
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chat_intent_corpus.json")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", default=CORPUS)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--min-accuracy", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with open(args.corpus, encoding="utf-8") as f:
+        corpus = json.load(f)
+
+    router = IntentRouter()
+    router.set_gazetteer(corpus["gazetteer"])
+
+    correct = 0
+    for case in corpus["cases"]:
+        matches = router.route(case["query"])
+        predicted = matches[0].intent if matches else None
+        if predicted == case["intent"]:
+            correct += 1
+        else:
+            slots = matches[0].slots if matches else {}
+            print(f"MISS {case['query']!r}: expected {case['intent']}, got {predicted} {slots}")
+
+    total = len(corpus["cases"])
+    accuracy = correct / total
+    print(f"\nAccuracy: {correct}/{total} ({accuracy:.1%})")
+
+    queries = [case["query"] for case in corpus["cases"]]
+    samples = []
+    for _ in range(args.repeat):
+        for query in queries:
+            started = time.perf_counter()
+            router.route(query)
+            samples.append((time.perf_counter() - started) * 1_000_000)
+    samples.sort()
+    print(
+        f"Latency per query: p50 {statistics.median(samples):.1f}us, "
+        f"p95 {samples[int(len(samples) * 0.95)]:.1f}us, max {samples[-1]:.1f}us"
+    )
+
+    if accuracy < args.min_accuracy:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
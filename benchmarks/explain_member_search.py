@@ -0,0 +1,135 @@
+"""
+Verifikasi query plan GET /api/members/search
+
+Mengisi database SQLite sementara dengan pengurus sintetis (default 100k), lalu
+menjalankan EXPLAIN QUERY PLAN untuk setiap kombinasi filter (query halaman dan
+COUNT total). Script gagal (exit 1) jika ada kombinasi yang melakukan full table
+scan pada tabel members.
+
+    python benchmarks/explain_member_search.py --rows 100000
+"""
+
+from itertools import combinations
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+DB_DIR = tempfile.mkdtemp(prefix="kintari-explain-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'explain.db')}"
+os.environ.setdefault("UPLOAD_DIR", os.path.join(DB_DIR, "uploads"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, func  # noqa: E402
+from app.core.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import Member  # noqa: E402
+from app.services.member_import import (  # noqa: E402
+    IMPORT_COLUMNS,
+    bulk_insert_member_columns,
+)
+from app.services.member_query import (  # noqa: E402
+    MEMBER_FIELDS,
+    build_member_filters,
+    build_page_query,
+)
+
+JABATAN = ["Ketum", "WKU", "Sekum", "Bendum", "Ketua Bidang", "Anggota"]
+BIDANG = ["IT", "Property", "F&B", "Fashion", "Industri Kreatif", "Energi"]
+STATUS_KTA = ["KTA Fisik", "KTA HIPMI NET", "Hilang"]
+
+# Nilai contoh per filter
+FILTERS = {
+    "jabatan": "Ketum",
+    "kategori_bidang_usaha": "IT",
+    "status_kta": "Hilang",
+    "jenis_kelamin": "Female",
+    "usia_min": 30,
+    "usia_max": 35,
+    "perusahaan_prefix": "pt maju",
+}
+
+# SCAN members tanpa index = full table scan
+FULL_SCAN = re.compile(r"^SCAN members(?! USING (COVERING )?INDEX)")
+
+
+def populate(rows: int, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    columns = {column: [] for column in IMPORT_COLUMNS}
+    for i in range(rows):
+        values = {column: None for column in IMPORT_COLUMNS}
+        values.update(
+            name=f"Pengurus {i}",
+            jabatan=rng.choice(JABATAN),
+            kategori_bidang_usaha=rng.choice(BIDANG),
+            status_kta=rng.choice(STATUS_KTA),
+            jenis_kelamin=rng.choice(["Male", "Female"]),
+            usia=rng.randint(20, 55),
+            nama_perusahaan=f"{rng.choice(['PT', 'CV'])} {rng.choice(['Maju', 'Jaya', 'Abadi'])} {i % 997}",
+            natural_key=f"name:pengurus {i}",
+            content_hash=f"{i:064x}",
+        )
+        for column in IMPORT_COLUMNS:
+            columns[column].append(values[column])
+
+    db = SessionLocal()
+    try:
+        bulk_insert_member_columns(db, columns)
+        db.commit()
+    finally:
+        db.close()
+    with engine.connect() as connection:
+        # Statistik untuk query planner (sama seperti setelah import besar)
+        connection.exec_driver_sql("ANALYZE")
+
+
+def query_plan(connection, stmt) -> list:
+    """EXPLAIN QUERY PLAN dengan bound parameter (seperti query dari aplikasi)"""
+    compiled = stmt.compile(engine)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    result = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params)
+    return [row[-1] for row in result]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    started = time.perf_counter()
+    populate(args.rows)
+    print(f"{args.rows} members in {time.perf_counter() - started:.1f}s ({DB_DIR})")
+
+    names = list(FILTERS)
+    failures = 0
+    checked = 0
+    with engine.connect() as connection:
+        for size in range(1, len(names) + 1):
+            for combo in combinations(names, size):
+                conditions = build_member_filters(**{name: FILTERS[name] for name in combo})
+                statements = {
+                    "page": build_page_query(MEMBER_FIELDS, None, 100, conditions),
+                    "count": select(func.count()).select_from(Member).where(*conditions),
+                }
+                for kind, stmt in statements.items():
+                    checked += 1
+                    plan = query_plan(connection, stmt)
+                    scans = [line for line in plan if FULL_SCAN.match(line)]
+                    if scans:
+                        failures += 1
+                    if scans or args.verbose:
+                        status = "FULL SCAN" if scans else "ok"
+                        print(f"[{status}] {kind:<5} {'+'.join(combo)}")
+                        for line in plan:
+                            print(f"    {line}")
+
+    print(f"{checked} query plans checked, {failures} full table scans")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,424 @@
+"""
+Fake Gemini server lokal (stand-in generateContent) untuk benchmark dan uji offline
+
+Mengimplementasikan endpoint yang dipakai google-genai:
+
+    POST /v1beta/models/{model}:generateContent
+    POST /v1beta/models/{model}:streamGenerateContent?alt=sse
+
+- Latency: distribusi time-to-first-token (--latency "lognormal:0.6,0.4") +
+  waktu memproses prompt (--prompt-token-rate token/detik) + waktu generate
+  sesuai jumlah token jawaban (--token-rate token/detik). Mode streaming
+  mengirim jawaban per potongan sesuai token rate. --model-latency memberi
+  latency berbeda per model (mis. model ringan lebih cepat).
+- Error injection: --error-rate / --error-status, atau fail_next lewat /_control.
+- Kapasitas: --max-concurrent N membatasi request yang diproses bersamaan
+  (sisanya antri), meniru throughput/kuota provider yang terbatas.
+- Jawaban canned yang deterministik: prompt analytics (pengurus, dokumen,
+  overview), ringkasan dan chat dijawab dengan format yang di-parse GeminiService;
+  prompt yang sama selalu mendapat jawaban yang sama. Aturan tambahan bisa dibaca
+  dari file JSON (--answers, list {"match": regex, "answer": teks}).
+- Dengan --seed yang sama, urutan latency/error juga sama.
+
+Behavior bisa diubah saat server berjalan (server.update(...)) atau lewat
+POST /_control dengan body JSON, mis. {"latency": "fixed:2", "error_rate": 0.5};
+GET /_stats mengembalikan jumlah request/error.
+
+Menjalankan app terhadap server ini:
+
+    python benchmarks/fake_gemini_server.py --port 8765 --latency "lognormal:0.6,0.4"
+    GEMINI_BASE_URL=http://127.0.0.1:8765/ GEMINI_API_KEY=fake uvicorn app.main:app
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, fields
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+_ENDPOINT = re.compile(r"/models/([^/:]+):(generateContent|streamGenerateContent)$")
+
+_STATUS_NAMES = {
+    400: "INVALID_ARGUMENT",
+    408: "DEADLINE_EXCEEDED",
+    429: "RESOURCE_EXHAUSTED",
+    500: "INTERNAL",
+    503: "UNAVAILABLE",
+    504: "DEADLINE_EXCEEDED",
+}
+
+_WORDS = re.compile(r"\S+\s*")
+
+
+def parse_latency(spec) -> Callable[[random.Random], float]:
+    """
+    Distribusi latency (detik) dari spesifikasi teks:
+
+        "0.2" / "fixed:0.2"      konstan
+        "uniform:0.1,0.5"        uniform antara min dan max
+        "normal:0.8,0.2"         normal (mean, stddev), dipotong di 0
+        "lognormal:0.6,0.4"      lognormal (median, sigma) - ekor panjang seperti API sungguhan
+        "exponential:0.5"        eksponensial (mean)
+    """
+    text = str(spec).strip()
+    name, _, raw = text.partition(":")
+    if not raw:
+        name, raw = "fixed", name
+    params = [float(value) for value in raw.split(",") if value.strip()]
+    if name == "fixed":
+        return lambda rng: params[0]
+    if name == "uniform":
+        return lambda rng: rng.uniform(params[0], params[1])
+    if name == "normal":
+        return lambda rng: max(rng.gauss(params[0], params[1]), 0.0)
+    if name == "lognormal":
+        return lambda rng: rng.lognormvariate(math.log(params[0]), params[1])
+    if name == "exponential":
+        return lambda rng: rng.expovariate(1 / params[0])
+    raise ValueError(f"Distribusi latency tidak dikenal: {text}")
+
+
+def count_tokens(text: str) -> int:
+    """Perkiraan token (kata), cukup untuk usageMetadata dan token rate"""
+    return len(text.split())
+
+
+def _fingerprint(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+
+
+def _first_sentences(text: str, count: int = 2) -> str:
+    sentences = [part.strip() for part in re.split(r"(?<=[.!?])\s+", text) if part.strip()]
+    return " ".join(sentences[:count]) or text[:200]
+
+
+def canned_answer(prompt: str) -> str:
+    """Jawaban deterministik dengan format yang diharapkan GeminiService"""
+    ref = _fingerprint(prompt)
+    if "DATA ANGGOTA:" in prompt:
+        total = re.search(r"Total: (\d+)", prompt)
+        return f"""SUMMARY:
+Organisasi memiliki {total.group(1) if total else 'sejumlah'} anggota dengan komposisi jabatan dan bidang usaha yang beragam (ref {ref}).
+
+KEY_INSIGHTS:
+- Sebagian besar anggota terkonsentrasi di beberapa bidang usaha utama.
+- Struktur jabatan didominasi pengurus bidang.
+- Proporsi gender masih bisa diseimbangkan.
+
+TRENDS:
+Jumlah anggota stabil dengan bidang usaha yang semakin beragam.
+
+RECOMMENDATIONS:
+- Perkuat program pembinaan per bidang usaha.
+- Tingkatkan rekrutmen anggota perempuan.
+- Perbarui data anggota secara berkala."""
+    if "DATA DOKUMEN:" in prompt:
+        return f"""SUMMARY:
+Dokumentasi organisasi mencakup dokumen dasar dan peraturan organisasi (ref {ref}).
+
+KEY_INSIGHTS:
+- Dokumen dasar organisasi sudah tersedia.
+- Sebagian dokumen belum dikategorikan.
+- Peraturan organisasi mendominasi jumlah halaman.
+
+DOCUMENT_HEALTH:
+Kondisi dokumentasi cukup baik.
+
+RECOMMENDATIONS:
+- Lengkapi kategori dokumen.
+- Tambahkan ringkasan untuk dokumen panjang.
+- Tinjau dokumen lama secara berkala."""
+    if '"main_topics"' in prompt:
+        body = prompt.split("TEKS:", 1)[-1] if "TEKS:" in prompt else prompt.split("RINGKASAN BAGIAN:", 1)[-1]
+        return json.dumps(
+            {
+                "summary": f"{_first_sentences(body.strip(), 1)[:300]} (ref {ref})",
+                "main_topics": ["Ketentuan organisasi", "Keanggotaan"],
+                "key_findings": ["Aturan berlaku untuk seluruh anggota", "Perubahan melalui musyawarah"],
+                "entities": ["HIPMI", "Musyawarah Nasional"],
+            },
+            ensure_ascii=False,
+        )
+    if '"health_status"' in prompt:
+        return json.dumps(
+            {
+                "health_status": "Good",
+                "key_points": ["Data anggota tersedia", "Dokumen dasar lengkap", f"Ref {ref}"],
+                "next_actions": "Lengkapi kategori dokumen",
+            }
+        )
+    if "PERTANYAAN:" in prompt:
+        question = prompt.rsplit("PERTANYAAN:", 1)[1].replace("JAWABAN:", "").strip()
+        asked = re.search(r"Pertanyaan: (.+)", question)
+        return (
+            f"Berdasarkan data HIPMI yang tersedia, jawaban untuk \"{(asked.group(1) if asked else question)[:120]}\" "
+            f"dapat ditemukan pada dokumen organisasi dan daftar pengurus (ref {ref})."
+        )
+    if "Buatkan ringkasan" in prompt:
+        text = prompt.split("\n\n", 1)[-1].replace("Ringkasan:", "").strip()
+        return f"Ringkasan: {_first_sentences(text)} (ref {ref})"
+    return f"Jawaban dari fake Gemini (ref {ref})."
+
+
+@dataclass
+class FakeBehavior:
+    # Spesifikasi distribusi time-to-first-token (lihat parse_latency)
+    latency: str = "fixed:0"
+    # Latency khusus per model (nama model -> spesifikasi), mis. model ringan lebih cepat
+    model_latency: Dict[str, str] = field(default_factory=dict)
+    # Kecepatan generate jawaban (token/detik); 0 = instan
+    token_rate: float = 0.0
+    # Kecepatan memproses prompt (token/detik, ditambahkan ke time-to-first-token); 0 = instan
+    prompt_token_rate: float = 0.0
+    # Peluang request dijawab error_status (0..1)
+    error_rate: float = 0.0
+    error_status: int = 503
+    # N request berikutnya selalu error (untuk skenario "gagal lalu pulih")
+    fail_next: int = 0
+    # Jika diisi, semua prompt dijawab dengan teks ini
+    answer: str = ""
+    # Token per potongan di mode streaming
+    stream_chunk_tokens: int = 8
+    # Request yang diproses bersamaan; sisanya antri (0 = tanpa batas)
+    max_concurrent: int = 0
+
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    server: "FakeGeminiServer"
+
+    def log_message(self, format, *args):  # noqa: A002 - signature BaseHTTPRequestHandler
+        pass
+
+    def _send(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # Client sudah menyerah (timeout) sebelum jawaban dikirim
+            pass
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] == "/_stats":
+            self._send(200, self.server.get_stats())
+            return
+        self._send(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        path = self.path.split("?", 1)[0]
+
+        if path == "/_control":
+            self.server.update(**request)
+            self._send(200, asdict(self.server.behavior))
+            return
+
+        match = _ENDPOINT.search(path)
+        if not match:
+            self._send(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+            return
+        model, method = match.groups()
+        with self.server.capacity():
+            self._generate(model, method, request)
+
+    def _generate(self, model: str, method: str, request: dict) -> None:
+        behavior, status, first_token_seconds = self.server.next_response(model)
+        if first_token_seconds:
+            time.sleep(first_token_seconds)
+        if status != 200:
+            self._send(
+                status,
+                {"error": {"code": status, "message": "Injected error", "status": _STATUS_NAMES.get(status, "UNKNOWN")}},
+            )
+            return
+
+        prompt = " ".join(
+            part.get("text", "")
+            for content in request.get("contents", [])
+            for part in content.get("parts", [])
+        )
+        if behavior.prompt_token_rate:
+            time.sleep(count_tokens(prompt) / behavior.prompt_token_rate)
+        answer = behavior.answer or self.server.answer_for(prompt)
+        if method == "streamGenerateContent":
+            self._stream(model, prompt, answer, behavior)
+            return
+        if behavior.token_rate:
+            time.sleep(count_tokens(answer) / behavior.token_rate)
+        self._send(200, self._chunk(model, prompt, answer, final=True))
+
+    def _chunk(self, model: str, prompt: str, text: str, final: bool, answer: str = "") -> dict:
+        candidate = {"content": {"role": "model", "parts": [{"text": text}]}, "index": 0}
+        chunk = {"candidates": [candidate], "modelVersion": model}
+        if final:
+            prompt_tokens = count_tokens(prompt)
+            answer_tokens = count_tokens(answer or text)
+            candidate["finishReason"] = "STOP"
+            chunk["usageMetadata"] = {
+                "promptTokenCount": prompt_tokens,
+                "candidatesTokenCount": answer_tokens,
+                "totalTokenCount": prompt_tokens + answer_tokens,
+            }
+        return chunk
+
+    def _stream(self, model: str, prompt: str, answer: str, behavior: FakeBehavior) -> None:
+        """Server-sent events: satu event per stream_chunk_tokens token, sesuai token_rate"""
+        words = _WORDS.findall(answer) or [answer]
+        size = max(behavior.stream_chunk_tokens, 1)
+        pieces = ["".join(words[start : start + size]) for start in range(0, len(words), size)]
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            for index, piece in enumerate(pieces):
+                if behavior.token_rate:
+                    time.sleep(count_tokens(piece) / behavior.token_rate)
+                final = index == len(pieces) - 1
+                event = self._chunk(model, prompt, piece, final, answer)
+                self.wfile.write(f"data: {json.dumps(event)}\r\n\r\n".encode("utf-8"))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class FakeGeminiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        port: int = 0,
+        behavior: Optional[FakeBehavior] = None,
+        seed: int = 0,
+        answers: Optional[List[Tuple[str, str]]] = None,
+    ):
+        super().__init__(("127.0.0.1", port), FakeGeminiHandler)
+        self.behavior = behavior or FakeBehavior()
+        self.stats = {"requests": 0, "errors": 0, "max_active": 0}
+        self._answers = [(re.compile(pattern, re.IGNORECASE), answer) for pattern, answer in answers or []]
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._capacity = threading.Condition()
+        self._active = 0
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+    def update(self, **changes) -> None:
+        names = {field.name for field in fields(FakeBehavior)}
+        with self._lock:
+            for name, value in changes.items():
+                if name in names:
+                    setattr(self.behavior, name, value)
+
+    @contextmanager
+    def capacity(self) -> Iterator[None]:
+        """Tunggu giliran jika max_concurrent request sudah diproses"""
+        with self._capacity:
+            while self.behavior.max_concurrent and self._active >= self.behavior.max_concurrent:
+                self._capacity.wait(0.05)
+            self._active += 1
+            with self._lock:
+                self.stats["max_active"] = max(self.stats["max_active"], self._active)
+        try:
+            yield
+        finally:
+            with self._capacity:
+                self._active -= 1
+                self._capacity.notify()
+
+    def answer_for(self, prompt: str) -> str:
+        for pattern, answer in self._answers:
+            if pattern.search(prompt):
+                return answer
+        return canned_answer(prompt)
+
+    def next_response(self, model: str = "") -> Tuple[FakeBehavior, int, float]:
+        """Behavior saat ini, status HTTP dan time-to-first-token untuk request berikutnya"""
+        with self._lock:
+            self.stats["requests"] += 1
+            behavior = FakeBehavior(**asdict(self.behavior))
+            latency = parse_latency(behavior.model_latency.get(model, behavior.latency))(self._rng)
+            status = 200
+            if self.behavior.fail_next > 0:
+                self.behavior.fail_next -= 1
+                status = behavior.error_status
+            elif behavior.error_rate and self._rng.random() < behavior.error_rate:
+                status = behavior.error_status
+            if status != 200:
+                self.stats["errors"] += 1
+        return behavior, status, latency
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return dict(self.stats)
+
+    def start(self) -> "FakeGeminiServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+def load_answers(path: str) -> List[Tuple[str, str]]:
+    with open(path, encoding="utf-8") as file:
+        return [(rule["match"], rule["answer"]) for rule in json.load(file)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="fixed:0", help='distribusi time-to-first-token, mis. "lognormal:0.6,0.4"')
+    parser.add_argument(
+        "--model-latency", action="append", default=[], help='latency per model, mis. "gemini-2.0-flash-lite=fixed:0.2"'
+    )
+    parser.add_argument("--token-rate", type=float, default=0.0, help="token jawaban per detik (0 = instan)")
+    parser.add_argument("--prompt-token-rate", type=float, default=0.0, help="token prompt per detik (0 = instan)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--max-concurrent", type=int, default=0, help="request diproses bersamaan (0 = tanpa batas)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--answers", help="file JSON berisi list {match, answer}")
+    args = parser.parse_args()
+
+    parse_latency(args.latency)
+    server = FakeGeminiServer(
+        args.port,
+        FakeBehavior(
+            latency=args.latency,
+            model_latency=dict(item.split("=", 1) for item in args.model_latency),
+            token_rate=args.token_rate,
+            prompt_token_rate=args.prompt_token_rate,
+            error_rate=args.error_rate,
+            error_status=args.error_status,
+            max_concurrent=args.max_concurrent,
+        ),
+        seed=args.seed,
+        answers=load_answers(args.answers) if args.answers else None,
+    )
+    print(f"🧪 Fake Gemini server: {server.base_url} (latency {args.latency}, {args.token_rate or '∞'} token/s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
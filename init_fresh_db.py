@@ -6,7 +6,15 @@ Creates all tables from scratch with updated schema for Pengurus HIPMI
 from app.core.database import Base, engine
 from app.models.organization import OrganizationInfo, MembershipType, OrgStructure
 from app.models.member import Member
+from app.models.member_aggregate import MemberAggregate
+from app.models.member_name_index import (
+    MemberNameIndex,
+    MemberNameTrigram,
+    MemberNameTrigramStat,
+)
 from app.models.universal_document import UniversalDocument, DocumentCollection
+from app.models.analytics_cache import AnalyticsCache
+from app.models.analytics_snapshot import AnalyticsSnapshot
 
 print("🔄 Creating fresh database for Kintari - HIPMI Knowledge System...")
 print("=" * 70)
@@ -47,8 +55,13 @@ print("\n📋 Database Schema Summary:")
 print("   - members: Pengurus HIPMI with 30+ fields")
 print("     (no, name, jabatan, status_kta, usia, jenis_kelamin,")
 print("      kategori_bidang_usaha, nama_perusahaan, jmlh_karyawan, etc)")
+print("   - member_aggregates: Statistik pengurus (materialized)")
+print("   - member_name_index, member_name_trigrams, member_name_trigram_stats:")
+print("     Index trigram nama pengurus (fuzzy search)")
 print("   - universal_documents: HIPMI documents (PDF, DOCX)")
 print("   - document_collections: Document grouping")
+print("   - analytics_cache: Cache hasil analisis AI")
+print("   - analytics_snapshots: Snapshot dashboard analytics")
 print("   - organization_info: HIPMI organization data")
 print("   - membership_types: Membership categories")
 print("   - org_structure: Organizational structure")